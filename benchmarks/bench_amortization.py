@@ -0,0 +1,51 @@
+import sys
+import os
+import time
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.amortization import annuity_emi, emi_grid, relief_grid, schedule, GRID_TENURES, GRID_RATES, BASE_ANNUAL_RATE
+
+# Synthetic stressed segment (PD > 0.3)
+N_STRESSED = 250_000
+
+rng = np.random.default_rng(42)
+principal = rng.uniform(50_000, 2_500_000, N_STRESSED)
+current_tenure = rng.integers(6, 84, N_STRESSED)
+current_emi = annuity_emi(principal, BASE_ANNUAL_RATE, current_tenure)
+disposable_income = rng.uniform(5_000, 120_000, N_STRESSED)
+cells = len(GRID_TENURES) * len(GRID_RATES)
+
+print(f"--- Amortization benchmark ({N_STRESSED:,} stressed customers, {len(GRID_TENURES)} tenures x {len(GRID_RATES)} rates) ---")
+
+# Reference: Python loop over customers and grid cells (on a sample)
+sample = 500
+start = time.perf_counter()
+for i in range(sample):
+    for n in GRID_TENURES:
+        for rate in GRID_RATES:
+            r = rate / 12
+            emi = principal[i] * r * (1 + r) ** n / ((1 + r) ** n - 1)
+elapsed = time.perf_counter() - start
+print(f"Python loop:            {elapsed / sample * N_STRESSED:>8.2f} s (extrapolated from {sample} customers)")
+
+start = time.perf_counter()
+grid = relief_grid(principal, current_emi, current_tenure, disposable_income)
+elapsed = time.perf_counter() - start
+print(f"relief_grid:            {elapsed:>8.2f} s ({N_STRESSED * cells / elapsed / 1e6:,.0f}M customer-scenarios/s)")
+
+start = time.perf_counter()
+emis = emi_grid(principal[:20_000])
+elapsed = time.perf_counter() - start
+print(f"emi_grid (20k x {cells}):  {elapsed:>8.2f} s")
+
+start = time.perf_counter()
+sched = schedule(principal[:10_000], BASE_ANNUAL_RATE, current_tenure[:10_000])
+elapsed = time.perf_counter() - start
+print(f"schedule (10k loans):   {elapsed:>8.2f} s")
+
+best = np.unravel_index(np.argmax(grid['affordable']), grid['affordable'].shape)
+print(f"Most affordable cell: {GRID_TENURES[best[0]]} months @ {GRID_RATES[best[1]]:.1%} -> "
+      f"{grid['affordable'][best]:,} customers, relief ₹{grid['monthly_relief'][best] / 1e7:,.1f} Cr/month")
@@ -0,0 +1,69 @@
+import sys
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+# Add src/models to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models')))
+
+from preprocessing import encode_categoricals, OrdinalCategories
+from ensembles import BaseModelCache, PrefitVoting
+from xgb_training import HistXGBClassifier
+from lgbm_training import HistLGBMClassifier
+from model_registry import save_model, load_model
+
+# Ensemble shaped like train_ensemble.py's, trained on synthetic customer data
+N_ROWS = int(os.environ.get("BENCH_ROWS", 20_000))
+N_BATCH = 50_000                # generate_data-sized batch
+N_SINGLE = 200                  # single-row calls (portal-style scoring)
+
+rng = np.random.default_rng(42)
+def make_rows(n):
+    X = pd.DataFrame(rng.normal(size=(n, 20)), columns=[f"num_{i}" for i in range(20)])
+    X['region'] = rng.choice([f"region_{i}" for i in range(30)], n)
+    X['product'] = rng.choice(['card', 'loan', 'mortgage', 'overdraft'], n)
+    return encode_categoricals(X, ['region', 'product'], native_categoricals=True)
+
+X = make_rows(N_ROWS)
+logit = X.iloc[:, :5].sum(axis=1) + rng.normal(size=N_ROWS)
+y = np.digitize(logit, np.quantile(logit, [0.4, 0.7, 0.9]))
+
+estimators = [
+    ('lr', Pipeline([('ordinal', OrdinalCategories()), ('clf', LogisticRegression(max_iter=1000))])),
+    ('rf', Pipeline([('ordinal', OrdinalCategories()), ('clf', RandomForestClassifier(n_estimators=100, random_state=42))])),
+    ('xgb', Pipeline([('ordinal', OrdinalCategories()), ('clf', HistXGBClassifier())])),
+    ('lgbm', HistLGBMClassifier())
+]
+model = PrefitVoting(BaseModelCache(estimators, cv=2).fit(X, y).fitted())
+registry_dir = tempfile.mkdtemp()
+save_model(model, registry_dir=registry_dir)
+compiled = load_model(registry_dir=registry_dir)
+
+X_batch = make_rows(N_BATCH)
+rows = [X_batch.iloc[[i]] for i in range(N_SINGLE)]
+np.testing.assert_allclose(compiled.predict_proba(X_batch), model.predict_proba(X_batch), rtol=1e-5, atol=1e-6)
+
+def single_row_ms(m):
+    times = []
+    for row in rows:
+        start = time.perf_counter()
+        m.predict_proba(row)
+        times.append(time.perf_counter() - start)
+    return np.percentile(times, 50) * 1000, np.percentile(times, 99) * 1000
+
+def batch_rows_per_sec(m):
+    start = time.perf_counter()
+    m.predict_proba(X_batch)
+    return N_BATCH / (time.perf_counter() - start)
+
+print(f"--- Ensemble scoring (voting LR + RF(100) + XGB + LGBM, {N_ROWS:,} training rows) ---")
+print(f"{'Path':<22} {'1-row p50 ms':>13} {'1-row p99 ms':>13} {'batch rows/s':>13}")
+for name, m in (('sklearn predict_proba', model), ('compiled registry', compiled)):
+    p50, p99 = single_row_ms(m)
+    print(f"{name:<22} {p50:>13.2f} {p99:>13.2f} {batch_rows_per_sec(m):>13,.0f}")
+print(f"(single row: {N_SINGLE} calls on 1-row frames; batch: one call on {N_BATCH:,} rows; 1 CPU core)")
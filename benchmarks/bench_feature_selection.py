@@ -0,0 +1,107 @@
+import sys
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+
+# Add src/models (and src/models/train) to path
+MODELS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models'))
+sys.path.extend([MODELS_DIR, os.path.join(MODELS_DIR, 'train')])
+
+import data_loader
+from preprocessing import create_dataset
+from ensembles import BaseModelCache, PrefitVoting
+from feature_selection import select_features
+from model_registry import save_model, load_model
+from train_ensemble import make_base_estimators
+
+# Source CSVs shaped like data/processed (about 55 model columns, near-duplicate aggregates),
+# the train_ensemble.py voting ensemble trained on all columns and on the selected ones
+N_CUSTOMERS = int(os.environ.get("BENCH_ROWS", 20_000))
+N_TXNS_PER_CUSTOMER = 20
+N_SINGLE = 200                  # single-row calls (portal-style scoring)
+
+rng = np.random.default_rng(42)
+data_dir = tempfile.mkdtemp()
+n = N_CUSTOMERS
+ids = np.arange(n)
+salary = rng.lognormal(10.8, 0.5, n)
+stress = rng.normal(size=n)     # Latent driver of the risk band
+customer = pd.DataFrame({'customer_id': ids, 'full_name': 'x', 'age': rng.integers(21, 70, n),
+                         'gender': rng.choice(['F', 'M'], n), 'occupation': rng.choice([f"occ_{i}" for i in range(12)], n),
+                         'monthly_salary_inr': salary, 'itr_declared_income': salary * 12 * rng.normal(1, 0.02, n),
+                         'income_range': np.digitize(salary, np.quantile(salary, [0.25, 0.5, 0.75]))})
+for i in range(20):
+    customer[f"profile_{i}"] = rng.normal(size=n)
+feature_store = pd.DataFrame({'customer_id': ids, 'emi_amount': salary * rng.uniform(0.1, 0.5, n),
+                              'credit_utilization_percent': 50 + 15 * stress + rng.normal(scale=10, size=n),
+                              'failed_auto_debits_last_3m': rng.poisson(np.exp(0.5 * stress)),
+                              'salary_credit_delay_days': rng.poisson(np.exp(0.3 * stress)),
+                              'savings_balance_trend_percent': -5 * stress + rng.normal(scale=5, size=n)})
+for i in range(15):
+    feature_store[f"behaviour_{i}"] = rng.normal(size=n)
+risk = stress + rng.normal(scale=0.7, size=n)
+feature_store['risk_band'] = np.array(['Low', 'Medium', 'High', 'Very High'])[np.digitize(risk, np.quantile(risk, [0.4, 0.7, 0.9]))]
+txn_ids = rng.choice(ids, n * N_TXNS_PER_CUSTOMER)
+transactions = pd.DataFrame({'customer_id': txn_ids, 'amount_inr': rng.lognormal(7, 1, len(txn_ids)) * (1 + 0.2 * stress[txn_ids].clip(-2, 2)),
+                             'balance_after_transaction': salary[txn_ids] * rng.uniform(0.5, 3, len(txn_ids))})
+customer.to_csv(os.path.join(data_dir, 'CUSTOMER_MASTER.csv'), index=False)
+feature_store.to_csv(os.path.join(data_dir, 'FEATURE_STORE.csv'), index=False)
+transactions.to_csv(os.path.join(data_dir, 'TRANSACTIONS.csv'), index=False)
+data_loader.DATA_DIR = data_dir
+
+def build(features=None):
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = create_dataset(native_categoricals=True, features=features)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return df, seconds, peak / 2**20
+
+def train(X_train, y_train, features):
+    model = PrefitVoting(BaseModelCache(make_base_estimators(), cv=2).fit(X_train[features], y_train).fitted())
+    registry_dir = tempfile.mkdtemp()
+    path = save_model(model, registry_dir=registry_dir)
+    size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+    return load_model(registry_dir=registry_dir), size / 2**20
+
+def score(model, X):
+    rows = [X.iloc[[i]] for i in range(N_SINGLE)]
+    model.predict_proba(rows[0])
+    times = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict_proba(row)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    start = time.perf_counter()
+    proba = model.predict_proba(X)
+    rows_per_sec = len(X) / (time.perf_counter() - start)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return proba, np.median(times) * 1000, rows_per_sec, peak / 2**20
+
+df, full_build_s, full_build_mb = build()
+X = df.drop(columns=['target']).select_dtypes(include=[np.number, 'category'])
+y = df['target']
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+selection = select_features(X_train, y_train)
+selected = selection['features']
+_, pruned_build_s, pruned_build_mb = build(selected)
+
+print(f"--- Feature selection ({N_CUSTOMERS:,} customers, {len(transactions):,} transactions) ---")
+print(f"Kept {len(selected)} of {X.shape[1]} columns in {selection['seconds']:.1f}s: {selected}")
+print(f"{'Columns':<10} {'build s':>8} {'build MB':>9} {'model MB':>9} {'1-row ms':>9} {'rows/s':>10} {'score MB':>9} {'AUC':>7}")
+for name, features, build_s, build_mb in (('all', list(X.columns), full_build_s, full_build_mb),
+                                          ('selected', selected, pruned_build_s, pruned_build_mb)):
+    model, model_mb = train(X_train, y_train, features)
+    proba, p50, rows_per_sec, score_mb = score(model, X_test[features])
+    auc = roc_auc_score(y_test, proba, multi_class='ovr')
+    print(f"{name:<10} {build_s:>8.2f} {build_mb:>9.1f} {model_mb:>9.1f} {p50:>9.2f} {rows_per_sec:>10,.0f} {score_mb:>9.1f} {auc:>7.4f}")
+print("(build: create_dataset from the CSVs, peak traced MB; model: registry artifacts on disk; "
+      f"1-row: p50 of {N_SINGLE} calls; rows/s and score MB: one call on the {len(X_test):,} test rows; 1 CPU core)")
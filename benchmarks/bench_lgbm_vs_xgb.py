@@ -0,0 +1,69 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+# Add src/models to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models')))
+
+from preprocessing import encode_categoricals, OrdinalCategories
+from xgb_training import HistXGBClassifier
+from lgbm_training import HistLGBMClassifier, categorical_splits
+
+# Customer-shaped 4-class risk data: numeric features plus categoricals of growing cardinality
+# (region, product, branch, employer) whose levels carry most of the signal
+N_ROWS = int(os.environ.get("BENCH_ROWS", 50_000))
+N_NUMERIC = int(os.environ.get("BENCH_NUMERIC", 30))
+CARDINALITIES = {'region': 8, 'product': 20, 'branch': 150, 'employer': 600}
+SINGLE_ROW_CALLS = 200
+
+rng = np.random.default_rng(42)
+X = pd.DataFrame(rng.normal(size=(N_ROWS, N_NUMERIC)).astype(np.float32),
+                 columns=[f"num_{i}" for i in range(N_NUMERIC)])
+logit = X.iloc[:, :5].sum(axis=1).to_numpy() * 0.3
+for col, levels in CARDINALITIES.items():
+    codes = rng.integers(0, levels, N_ROWS)
+    logit += rng.normal(scale=1.0, size=levels)[codes]
+    X[col] = np.array([f"{col}_{i}" for i in range(levels)])[codes]
+logit += rng.normal(scale=1.0, size=N_ROWS)
+y = np.digitize(logit, np.quantile(logit, [0.4, 0.7, 0.9]))
+X = encode_categoricals(X, list(CARDINALITIES), native_categoricals=True)
+
+X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+models = {
+    # Current: XGBoost on label-encoded (ordinal) categoricals
+    'XGBoost (ordinal codes)': Pipeline([('ordinal', OrdinalCategories()), ('clf', HistXGBClassifier())]),
+    'LightGBM (ordinal codes)': Pipeline([('ordinal', OrdinalCategories()), ('clf', HistLGBMClassifier())]),
+    'LightGBM (native categoricals)': HistLGBMClassifier()
+}
+
+print(f"--- LightGBM vs XGBoost ({N_ROWS:,} rows, {N_NUMERIC} numeric + {len(CARDINALITIES)} categorical "
+      f"features, cardinalities {list(CARDINALITIES.values())}) ---")
+print(f"{'Model':<32} {'train s':>8} {'rounds':>7} {'batch ms':>9} {'row ms':>7} {'AUC':>7}")
+for name, model in models.items():
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    train_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    prob = model.predict_proba(X_test)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    # Single-customer scoring, as the dashboard detail view does
+    rows = [X_test.iloc[[i]] for i in range(SINGLE_ROW_CALLS)]
+    start = time.perf_counter()
+    for row in rows:
+        model.predict_proba(row)
+    row_ms = (time.perf_counter() - start) * 1000 / SINGLE_ROW_CALLS
+
+    booster = model.steps[-1][1] if hasattr(model, 'steps') else model
+    rounds = booster.best_iteration_ if hasattr(booster, 'best_iteration_') else booster.best_iteration + 1
+    auc_val = roc_auc_score(y_test, prob, multi_class='ovr')
+    print(f"{name:<32} {train_s:>8.1f} {rounds:>7} {batch_ms:>9.1f} {row_ms:>7.2f} {auc_val:>7.4f}")
+
+print(f"Categorical splits in the native LightGBM model: {categorical_splits(models['LightGBM (native categoricals)'])}")
@@ -0,0 +1,126 @@
+import sys
+import os
+import pickle
+import subprocess
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+# Add src/models to path
+MODELS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models'))
+sys.path.append(MODELS_DIR)
+
+from preprocessing import encode_categoricals, OrdinalCategories
+from ensembles import BaseModelCache, PrefitVoting
+from xgb_training import HistXGBClassifier
+from lgbm_training import HistLGBMClassifier
+from model_registry import save_model, load_model
+
+# Ensemble shaped like train_ensemble.py's, trained on synthetic customer data
+N_ROWS = int(os.environ.get("BENCH_ROWS", 20_000))
+N_SCORE = 1_000
+REPEATS = 5
+
+rng = np.random.default_rng(42)
+X = pd.DataFrame(rng.normal(size=(N_ROWS, 20)), columns=[f"num_{i}" for i in range(20)])
+X['region'] = rng.choice([f"region_{i}" for i in range(30)], N_ROWS)
+X['product'] = rng.choice(['card', 'loan', 'mortgage', 'overdraft'], N_ROWS)
+logit = X.iloc[:, :5].sum(axis=1) + rng.normal(size=N_ROWS)
+y = np.digitize(logit, np.quantile(logit, [0.4, 0.7, 0.9]))
+X = encode_categoricals(X, ['region', 'product'], native_categoricals=True)
+
+estimators = [
+    ('lr', Pipeline([('ordinal', OrdinalCategories()), ('clf', LogisticRegression(max_iter=1000))])),
+    ('rf', Pipeline([('ordinal', OrdinalCategories()), ('clf', RandomForestClassifier(n_estimators=100, random_state=42))])),
+    ('xgb', Pipeline([('ordinal', OrdinalCategories()), ('clf', HistXGBClassifier())])),
+    ('lgbm', HistLGBMClassifier())
+]
+model = PrefitVoting(BaseModelCache(estimators, cv=2).fit(X, y).fitted())
+
+workdir = tempfile.mkdtemp()
+pickle_path = os.path.join(workdir, 'ensemble_model.pkl')
+score_path = os.path.join(workdir, 'score.pkl')
+X.head(N_SCORE).to_pickle(score_path)
+
+start = time.perf_counter()
+with open(pickle_path, 'wb') as f:
+    pickle.dump(model, f)
+pickle_save = time.perf_counter() - start
+start = time.perf_counter()
+registry_path = save_model(model, registry_dir=workdir)
+registry_save = time.perf_counter() - start
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+# Each measurement runs in a fresh interpreter, so library imports count towards load time
+PICKLE_SCRIPT = f"""
+import sys, time, pickle, pandas as pd
+sys.path.insert(0, {MODELS_DIR!r})
+start = time.perf_counter()
+with open({pickle_path!r}, 'rb') as f:
+    model = pickle.load(f)
+loaded = time.perf_counter() - start
+X = pd.read_pickle({score_path!r})
+start = time.perf_counter()
+model.predict_proba(X)
+print(loaded, time.perf_counter() - start)
+"""
+REGISTRY_SCRIPT = f"""
+import sys, time, pandas as pd
+sys.path.insert(0, {MODELS_DIR!r})
+start = time.perf_counter()
+from model_registry import load_model
+model = load_model(registry_dir={workdir!r})
+loaded = time.perf_counter() - start
+X = pd.read_pickle({score_path!r})
+start = time.perf_counter()
+model.predict_proba(X)
+print(loaded, time.perf_counter() - start)
+"""
+
+def cold_run(script):
+    runs = []
+    for _ in range(REPEATS):
+        out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+        runs.append([float(v) for v in out.stdout.strip().splitlines()[-1].split()])
+    return np.median(np.array(runs), axis=0)
+
+pickle_load, pickle_first = cold_run(PICKLE_SCRIPT)
+registry_load, registry_first = cold_run(REGISTRY_SCRIPT)
+
+# Same steps in this process, where every library is already imported: the format's own cost
+def warm_run(load):
+    runs = []
+    X_score = X.head(N_SCORE)
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        loaded_model = load()
+        loaded = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded_model.predict_proba(X_score)
+        runs.append([loaded, time.perf_counter() - start])
+    return np.median(np.array(runs), axis=0)
+
+def load_pickle():
+    with open(pickle_path, 'rb') as f:
+        return pickle.load(f)
+
+pickle_warm = warm_run(load_pickle)
+registry_warm = warm_run(lambda: load_model(registry_dir=workdir))
+
+print(f"--- Model artifact benchmark (voting ensemble LR + RF(100) + XGB + LGBM, {N_ROWS:,} training rows) ---")
+print(f"{'Format':<10} {'save s':>7} {'size MB':>8} {'cold load ms':>13} {'first predict ms':>17} {'total ms':>9}")
+print(f"{'pickle':<10} {pickle_save:>7.2f} {os.path.getsize(pickle_path) / 1e6:>8.1f} {pickle_load * 1000:>13.0f} "
+      f"{pickle_first * 1000:>17.0f} {(pickle_load + pickle_first) * 1000:>9.0f}")
+print(f"{'registry':<10} {registry_save:>7.2f} {dir_size(registry_path) / 1e6:>8.1f} {registry_load * 1000:>13.0f} "
+      f"{registry_first * 1000:>17.0f} {(registry_load + registry_first) * 1000:>9.0f}")
+print(f"(cold: median of {REPEATS} fresh interpreters, library imports included; first predict scores "
+      f"{N_SCORE:,} rows and includes lazy loading)")
+print(f"{'warm':<10} {'load ms':>8} {'first predict ms':>17} {'total ms':>9}")
+for name, (load_s, first_s) in (('pickle', pickle_warm), ('registry', registry_warm)):
+    print(f"{name:<10} {load_s * 1000:>8.1f} {first_s * 1000:>17.1f} {(load_s + first_s) * 1000:>9.1f}")
@@ -29,11 +29,13 @@ def get_data_dir():
 
 DATA_DIR = get_data_dir()
 
-def load_csv(filename):
+def load_csv(filename, usecols=None, data_dir=None):
     """
-    Load a CSV file from the data directory.
+    Load a CSV file from the data directory (DATA_DIR unless `data_dir` is given). `usecols`
+    (list or callable, as for pd.read_csv) reads only those columns.
     """
-    filepath = os.path.join(DATA_DIR, filename)
+    data_dir = data_dir or DATA_DIR
+    filepath = os.path.join(data_dir, filename)
     
     if not os.path.exists(filepath):
          # Try looking in absolute project path if available
@@ -41,22 +43,22 @@ def load_csv(filename):
         
     if not os.path.exists(filepath):
         # Last ditch: try to find it in cwd recursively? No.
-        raise FileNotFoundError(f"File not found: {filepath}\nSearch path: {DATA_DIR}")
+        raise FileNotFoundError(f"File not found: {filepath}\nSearch path: {data_dir}")
         
     print(f"Loading {filename} from {filepath}...")
-    return pd.read_csv(filepath)
+    return pd.read_csv(filepath, usecols=usecols)
 
-def load_customer_data():
+def load_customer_data(usecols=None, data_dir=None):
     """Load CUSTOMER_MASTER.csv"""
-    return load_csv('CUSTOMER_MASTER.csv')
+    return load_csv('CUSTOMER_MASTER.csv', usecols, data_dir)
 
-def load_feature_store():
+def load_feature_store(usecols=None, data_dir=None):
     """Load FEATURE_STORE.csv"""
-    return load_csv('FEATURE_STORE.csv')
+    return load_csv('FEATURE_STORE.csv', usecols, data_dir)
 
-def load_transaction_data():
+def load_transaction_data(usecols=None, data_dir=None):
     """Load TRANSACTIONS.csv"""
-    return load_csv('TRANSACTIONS.csv')
+    return load_csv('TRANSACTIONS.csv', usecols, data_dir)
 
 if __name__ == "__main__":
     # verification
@@ -0,0 +1,143 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from preprocessing import load_dataset, QuantileBins
+from model_registry import REGISTRY_DIR, save_model, load_model
+
+# Distillation: a scorecard-style student (multinomial logistic regression on one-hot quantile
+# bins) trained on the ensemble's soft probabilities. Scoring it is a table lookup and sum per
+# feature. No call site scores live yet, so nothing loads the student: this script builds it and
+# its fidelity report for review, and a live site would get its own scoring.py mode.
+
+# --- DISTILLATION CONFIGURATION ---
+STUDENT_NAME = 'distilled'      # Registry name of the student
+N_BINS = 10                     # Quantile bins per numeric feature
+MAX_LEVELS = 20                 # Most frequent levels kept per categorical feature (the rest share a bin)
+STUDENT_C = 1.0                 # Inverse L2 strength of the student's logistic regression
+STUDENT_MAX_ITER = 1000
+MIN_SOFT_WEIGHT = 1e-3          # (row, class) pairs with less teacher probability are not fitted
+LATENCY_CALLS = 200             # Single-row calls timed per model
+RANDOM_STATE = 42
+
+def _auc(proba, y, classes):
+    if proba.shape[1] == 2:
+        return roc_auc_score(y, proba[:, 1])
+    return roc_auc_score(y, proba, multi_class='ovr', labels=classes)
+
+# --- 1. Student training on soft labels ---
+def fit_student(X, soft, classes, n_bins=N_BINS, max_levels=MAX_LEVELS, C=STUDENT_C):
+    """
+    Fits Pipeline([('bins', QuantileBins), ('clf', LogisticRegression)]) to the teacher's
+    class probabilities `soft` (n_rows, n_classes): every row is fitted once per class,
+    weighted by the teacher's probability for it, which minimises the cross-entropy to
+    the soft labels.
+    """
+    bins = QuantileBins(n_bins=n_bins, max_levels=max_levels).fit(X)
+    Xb = bins.transform(X)
+    rows, labels = np.nonzero(soft >= MIN_SOFT_WEIGHT)
+    clf = LogisticRegression(C=C, max_iter=STUDENT_MAX_ITER)
+    clf.fit(Xb[rows], np.asarray(classes)[labels], sample_weight=soft[rows, labels])
+    return Pipeline([('bins', bins), ('clf', clf)])
+
+def distill(teacher, X, **student_params):
+    """
+    Trains a student on the teacher's predict_proba over X.
+    """
+    start = time.perf_counter()
+    soft = teacher.predict_proba(X)
+    student = fit_student(X, soft, teacher.classes_, **student_params)
+    print(f"[DISTILL] Student fitted on {len(X)} rows x {soft.shape[1]} classes "
+          f"({student['bins'].n_bins_out_} bins) in {time.perf_counter() - start:.1f}s")
+    return student
+
+# --- 2. Fidelity and latency ---
+def latency(model, X, calls=LATENCY_CALLS):
+    """
+    Median single-row predict_proba latency (ms) over `calls` rows of X, and rows/s of one
+    predict_proba call on all of X.
+    """
+    rows = [X.iloc[[i % len(X)]] for i in range(calls)]
+    model.predict_proba(rows[0])            # Lazy loading is not part of the latency
+    times = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict_proba(row)
+        times.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    model.predict_proba(X)
+    return float(np.median(times) * 1000), len(X) / (time.perf_counter() - start)
+
+def fidelity_report(teacher, student, X, y, timing=True):
+    """
+    How closely the student tracks the teacher on held-out rows: AUC of each against the
+    true labels (and the gap), Spearman rank correlation of their per-class probabilities,
+    and predicted-class agreement. With timing=True, single-row latency and batch rows/s.
+    """
+    classes = np.asarray(teacher.classes_)
+    teacher_proba, student_proba = teacher.predict_proba(X), student.predict_proba(X)
+    report = {
+        'rows': len(X),
+        'auc_teacher': _auc(teacher_proba, y, classes),
+        'auc_student': _auc(student_proba, y, classes)
+    }
+    report['auc_gap'] = report['auc_teacher'] - report['auc_student']
+    report['spearman'] = {
+        str(c): float(pd.Series(teacher_proba[:, k]).corr(pd.Series(student_proba[:, k]), method='spearman'))
+        for k, c in enumerate(classes)
+    }
+    report['spearman_min'] = min(report['spearman'].values())
+    report['agreement'] = float(np.mean(teacher_proba.argmax(axis=1) == student_proba.argmax(axis=1)))
+    if timing:
+        for name, model in (('teacher', teacher), ('student', student)):
+            report[f'{name}_latency_ms'], report[f'{name}_rows_per_sec'] = latency(model, X)
+    return report
+
+def print_report(report):
+    print(f"[DISTILL] AUC teacher {report['auc_teacher']:.4f}, student {report['auc_student']:.4f} "
+          f"(gap {report['auc_gap']:+.4f}); Spearman min {report['spearman_min']:.4f}; "
+          f"class agreement {report['agreement']:.1%}")
+    if 'student_latency_ms' in report:
+        print(f"[DISTILL] Single row: teacher {report['teacher_latency_ms']:.2f} ms, student "
+              f"{report['student_latency_ms']:.3f} ms; batch: teacher {report['teacher_rows_per_sec']:,.0f} rows/s, "
+              f"student {report['student_rows_per_sec']:,.0f} rows/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Distil the registry ensemble into a binned logistic scorer.")
+    parser.add_argument('--teacher', default='ensemble', help="Registry name of the model to distil")
+    parser.add_argument('--registry-dir', default=REGISTRY_DIR)
+    parser.add_argument('--bins', type=int, default=N_BINS)
+    args = parser.parse_args()
+
+    teacher = load_model(args.teacher, registry_dir=args.registry_dir)
+    print("Loading data...")
+    # Only the teacher's (selected) columns are read
+    df = load_dataset(native_categoricals=True, features=list(teacher.feature_names_in_))
+    X = df.drop(columns=['target'])
+    y = df['target']
+    # Same held-out rows as train_ensemble.py: the student never sees the teacher's test set
+    X_train, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE, stratify=y)
+    student = distill(teacher, X_train, n_bins=args.bins)
+    # Time the student as deployed: through the registry
+    path = save_model(student, name=STUDENT_NAME, registry_dir=args.registry_dir)
+    report = fidelity_report(teacher, load_model(STUDENT_NAME, registry_dir=args.registry_dir), X_test, y_test)
+    print_report(report)
+    # Re-saved with the report in its manifest
+    save_model(student, name=STUDENT_NAME, registry_dir=args.registry_dir,
+               extra={'distillation': dict(report, teacher=args.teacher)})
+    print(f"[DISTILL] Saved student to {path}")
+
+if __name__ == "__main__":
+    main()
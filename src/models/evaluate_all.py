@@ -23,6 +23,16 @@ except ImportError:
          sys.path.append(os.path.dirname(os.path.abspath(__file__)))
          from preprocessing import create_dataset
 
+from model_registry import load_model
+
+# Registry component types -> the estimator they were saved from
+REGISTRY_KINDS = {
+    'linear': 'LogisticRegression',
+    'forest': 'RandomForestClassifier',
+    'xgboost': 'XGBClassifier',
+    'lightgbm': 'LGBMClassifier'
+}
+
 def get_metrics(y_true, y_pred, y_prob=None):
     acc = accuracy_score(y_true, y_pred)
     prec = precision_score(y_true, y_pred, average='macro', zero_division=0) # Macro as requested
@@ -93,7 +103,7 @@ def plot_roc_curve(y_test, y_prob, model_name, n_classes):
 def main():
     print("Loading data...")
     try:
-        df = create_dataset()
+        df = create_dataset(native_categoricals=True)
     except Exception as e:
         print(f"Error creating dataset: {e}")
         return
@@ -105,20 +115,24 @@ def main():
         
     X = df.drop(columns=[target_col])
     y = df[target_col]
-    X = X.select_dtypes(include=[np.number])
+    X = X.select_dtypes(include=[np.number, 'category'])
     
     # Recreate split with same random state
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
     n_classes = len(np.unique(y_test))
     
-    model_path = os.path.join(os.path.dirname(__file__), 'models', 'ensemble_model.pkl')
-    if not os.path.exists(model_path):
-        print(f"Model file not found: {model_path}")
-        return
-        
-    print(f"Loading ensemble model from {model_path}...")
-    with open(model_path, 'rb') as f:
-        ensemble_model = pickle.load(f)
+    # Registry artifacts (train_ensemble.py) first; a pickled ensemble is still read if present
+    try:
+        ensemble_model = load_model()
+    except FileNotFoundError:
+        model_path = os.path.join(os.path.dirname(__file__), 'models', 'ensemble_model.pkl')
+        if not os.path.exists(model_path):
+            print(f"Model file not found: {model_path}")
+            return
+
+        print(f"Loading ensemble model from {model_path}...")
+        with open(model_path, 'rb') as f:
+            ensemble_model = pickle.load(f)
         
     models_to_evaluate = {}
     
@@ -131,13 +145,18 @@ def main():
         # Extract base estimators
         # For VotingClassifier, estimators_ is a list of fitted estimators
         for est in ensemble_model.estimators_:
-            name = type(est).__name__
+            # Base learners may sit behind an OrdinalCategories step; name them by the final step
+            # (registry components carry their model type instead)
+            name = type(est.steps[-1][1] if hasattr(est, 'steps') else est).__name__
+            name = REGISTRY_KINDS.get(getattr(est, 'kind', None), name)
             if name == 'LogisticRegression':
                 models_to_evaluate['Logistic Regression'] = est
             elif name == 'RandomForestClassifier':
                 models_to_evaluate['Random Forest'] = est
-            elif name == 'XGBClassifier':
+            elif name in ('XGBClassifier', 'HistXGBClassifier'):
                 models_to_evaluate['XGBoost'] = est
+            elif name in ('LGBMClassifier', 'HistLGBMClassifier'):
+                models_to_evaluate['LightGBM'] = est
     else:
         print(f"Loaded model is {type(ensemble_model).__name__}, not a VotingClassifier. Cannot easily extract base models without retraining.")
         models_to_evaluate['Saved Model'] = ensemble_model
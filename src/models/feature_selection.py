@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.spatial.distance import squareform
+from sklearn.metrics import log_loss
+from sklearn.model_selection import train_test_split
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from preprocessing import load_dataset
+from lgbm_training import HistLGBMClassifier
+
+# Feature selection for the training pipeline. create_dataset emits every numeric column,
+# including near-duplicates (txn_amount_inr_sum / _mean / _count, balance aggregates), and
+# every extra column is read, preprocessed and scored for every customer. Selection:
+#   1. numeric columns are clustered by absolute Spearman correlation (categoricals stay alone)
+#   2. a LightGBM model is fitted once; each cluster keeps its highest-gain column
+#   3. each cluster's columns are permuted together on held-out rows; clusters whose
+#      permutation barely moves the log loss are dropped
+# Permuting a cluster jointly avoids the usual permutation-importance blind spot, where
+# each of two near-duplicates looks unimportant because the other stands in for it.
+
+# --- FEATURE SELECTION CONFIGURATION ---
+SELECTION_ENABLED = os.environ.get("FEATURE_SELECTION", "1") != "0"     # train_ensemble.py runs selection
+CORRELATION_THRESHOLD = 0.9     # |Spearman rho| (average linkage) at which columns share a cluster
+MIN_IMPORTANCE = 1e-3           # Held-out log-loss increase a cluster must cause when permuted
+N_REPEATS = 5                   # Permutations per cluster (importance is their mean)
+VALID_SIZE = 0.25               # Held-out share of the rows for permutation importance
+MAX_ROWS = 50_000               # Rows sampled for selection; training still uses every row
+RANDOM_STATE = 42
+
+# --- 1. Correlation clusters ---
+def correlation_clusters(X, threshold=CORRELATION_THRESHOLD):
+    """
+    Groups X's columns into clusters whose members correlate above `threshold` (absolute
+    Spearman rho, average-linkage hierarchical clustering on 1 - |rho|). Categorical
+    columns, whose codes have no order, are single-column clusters. Returns lists of
+    column names, in column order.
+    """
+    numeric = [col for col in X.columns if not isinstance(X[col].dtype, pd.CategoricalDtype)]
+    labels = {col: ('cat', col) for col in X.columns if col not in numeric}
+    if len(numeric) > 1:
+        # Constant columns correlate with nothing (NaN rho)
+        rho = X[numeric].corr(method='spearman').abs().fillna(0.0).to_numpy(copy=True)
+        np.fill_diagonal(rho, 1.0)
+        tree = linkage(squareform(1.0 - rho, checks=False), method='average')
+        labels.update(zip(numeric, fcluster(tree, t=1.0 - threshold, criterion='distance')))
+    else:
+        labels.update((col, col) for col in numeric)
+    clusters = {}
+    for col in X.columns:
+        clusters.setdefault(labels[col], []).append(col)
+    return list(clusters.values())
+
+# --- 2. Grouped permutation importance ---
+def cluster_importance(model, X, y, clusters, n_repeats=N_REPEATS, random_state=RANDOM_STATE):
+    """
+    Mean increase in log loss on (X, y) when each cluster's columns are shuffled together
+    (one row permutation per repeat, shared by the cluster's columns).
+    """
+    rng = np.random.default_rng(random_state)
+    baseline = log_loss(y, model.predict_proba(X), labels=model.classes_)
+    importance = []
+    for cluster in clusters:
+        losses = []
+        for _ in range(n_repeats):
+            order = rng.permutation(len(X))
+            X_perm = X.copy()
+            for col in cluster:
+                X_perm[col] = X[col].iloc[order].set_axis(X.index)
+            losses.append(log_loss(y, model.predict_proba(X_perm), labels=model.classes_))
+        importance.append(float(np.mean(losses)) - baseline)
+    return importance
+
+# --- 3. Selection ---
+def select_features(X, y, threshold=CORRELATION_THRESHOLD, min_importance=MIN_IMPORTANCE,
+                    n_repeats=N_REPEATS, max_rows=MAX_ROWS, random_state=RANDOM_STATE):
+    """
+    Pruned feature list for (X, y): one column per correlation cluster (the one with the
+    most LightGBM gain), for the clusters with permutation importance of at least
+    `min_importance`. Returns a JSON-serialisable report, stored in the registry manifest:
+    'features' (in X's column order), 'clusters' (multi-column clusters and the column
+    kept), 'importance' per kept column, and the 'correlated' / 'unimportant' drops.
+    """
+    start = time.perf_counter()
+    if len(X) > max_rows:
+        X, _, y, _ = train_test_split(X, y, train_size=max_rows, random_state=random_state, stratify=y)
+    X_fit, X_valid, y_fit, y_valid = train_test_split(X, y, test_size=VALID_SIZE, random_state=random_state, stratify=y)
+    model = HistLGBMClassifier().fit(X_fit, y_fit)
+    gain = dict(zip(X.columns, model.booster_.feature_importance(importance_type='gain')))
+
+    clusters = correlation_clusters(X_fit, threshold)
+    importance = cluster_importance(model, X_valid, y_valid, clusters, n_repeats, random_state)
+    kept, report = set(), {'clusters': [], 'importance': {}, 'correlated': [], 'unimportant': []}
+    for cluster, score in zip(clusters, importance):
+        best = max(cluster, key=lambda col: gain[col])
+        if len(cluster) > 1:
+            report['clusters'].append({'columns': cluster, 'kept': best})
+            report['correlated'] += [col for col in cluster if col != best]
+        if score >= min_importance:
+            kept.add(best)
+            report['importance'][best] = round(score, 6)
+        else:
+            report['unimportant'].append(best)
+    report['features'] = [col for col in X.columns if col in kept]
+    report.update(n_input=X.shape[1], threshold=threshold, min_importance=min_importance,
+                  seconds=round(time.perf_counter() - start, 1))
+    print(f"[FEATURES] Kept {len(report['features'])} of {X.shape[1]} columns "
+          f"({len(report['correlated'])} correlated, {len(report['unimportant'])} unimportant) "
+          f"in {report['seconds']:.1f}s")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the feature selection train_ensemble.py would make.")
+    parser.add_argument('--threshold', type=float, default=CORRELATION_THRESHOLD)
+    parser.add_argument('--min-importance', type=float, default=MIN_IMPORTANCE)
+    args = parser.parse_args()
+
+    df = load_dataset(native_categoricals=True)
+    X = df.drop(columns=['target']).select_dtypes(include=[np.number, 'category'])
+    y = df['target']
+    # Training rows only, as in train_ensemble.py
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE, stratify=y)
+    report = select_features(X_train, y_train, threshold=args.threshold, min_importance=args.min_importance)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,6 @@ import sys
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier, VotingClassifier
-from xgboost import XGBClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
@@ -17,15 +16,19 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 try:
-    from project.src.preprocessing import create_dataset
+    from project.src.preprocessing import load_dataset, OrdinalCategories
 except ImportError:
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-    from preprocessing import create_dataset
+    from preprocessing import load_dataset, OrdinalCategories
+
+from xgb_training import HistXGBClassifier
+from lgbm_training import HistLGBMClassifier
+from tune_hyperparams import load_params
 
 def final_evaluation():
     # 1. Load and Clean Data
     print("Loading data...")
-    df = create_dataset()
+    df = load_dataset(native_categoricals=True)
     target_col = 'target'
     X = df.drop(columns=[target_col])
     y = df[target_col]
@@ -39,13 +42,19 @@ def final_evaluation():
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
     
     # 2. Define Models
-    lr = Pipeline([('scaler', StandardScaler()), ('clf', LogisticRegression(max_iter=1000, random_state=42))])
-    rf = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
-    xgb = XGBClassifier(eval_metric='mlogloss', use_label_encoder=False, random_state=42, n_jobs=-1)
+    # LightGBM takes the pandas categoricals as-is; the others see their integer codes.
+    # Tuned hyperparameters (tune_hyperparams.py) override the defaults.
+    tuned = load_params()
+    lr = Pipeline([('ordinal', OrdinalCategories()), ('scaler', StandardScaler()),
+                   ('clf', LogisticRegression(**{'max_iter': 1000, 'random_state': 42, **tuned.get('lr', {})}))])
+    rf = Pipeline([('ordinal', OrdinalCategories()),
+                   ('clf', RandomForestClassifier(**{'n_estimators': 100, 'random_state': 42, 'n_jobs': -1, **tuned.get('rf', {})}))])
+    xgb = Pipeline([('ordinal', OrdinalCategories()), ('clf', HistXGBClassifier(n_jobs=-1, **tuned.get('xgb', {})))])
+    lgbm = HistLGBMClassifier(n_jobs=-1, **tuned.get('lgbm', {}))
     
     # Voting Ensemble
     voting = VotingClassifier(
-        estimators=[('lr', lr), ('rf', rf), ('xgb', xgb)],
+        estimators=[('lr', lr), ('rf', rf), ('xgb', xgb), ('lgbm', lgbm)],
         voting='soft'
     )
     
@@ -53,6 +62,7 @@ def final_evaluation():
         'Logistic Regression': lr,
         'Random Forest': rf,
         'XGBoost': xgb,
+        'LightGBM': lgbm,
         'Voting Ensemble': voting
     }
     
@@ -3,6 +3,7 @@ import numpy as np
 import pickle
 import os
 import sys
+import time
 
 # Setup paths
 import sys
@@ -13,13 +14,15 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
 sys.path.append(project_root)
 
 try:
-    from preprocessing import create_dataset, preprocess_customer_data, aggregate_transactions, preprocess_feature_store
+    from preprocessing import create_dataset, preprocess_customer_data, aggregate_transactions, preprocess_feature_store, fill_merged, OrdinalCategories
     from data_loader import load_customer_data, load_feature_store, load_transaction_data
 except ImportError:
     sys.path.append(current_dir)
-    from preprocessing import create_dataset, preprocess_customer_data, aggregate_transactions, preprocess_feature_store
+    from preprocessing import create_dataset, preprocess_customer_data, aggregate_transactions, preprocess_feature_store, fill_merged, OrdinalCategories
     from data_loader import load_customer_data, load_feature_store, load_transaction_data
 
+from scoring import get_model, mode_for
+
 def generate_dashboard_data():
     print("Generating full dashboard dataset...")
     
@@ -33,7 +36,9 @@ def generate_dashboard_data():
         return
 
     print("Preprocessing...")
-    cust_proc = preprocess_customer_data(cust_df)
+    # Same categorical handling as training (train_ensemble): pandas categories, which the
+    # ensemble's LightGBM splits on directly and its other learners map to integer codes
+    cust_proc = preprocess_customer_data(cust_df, native_categoricals=True)
     txn_agg = aggregate_transactions(txn_df)
     
     # We need to capture risk_band before it gets dropped/encoded in preprocess_feature_store if we want to use it
@@ -41,12 +46,12 @@ def generate_dashboard_data():
     # Let's manually preserve it or modify logic.
     # Actually, preprocess_feature_store converts risk_band to 'target' (0,1,2,3).
     # So we can use 'target' from feat_proc.
-    feat_proc = preprocess_feature_store(feat_df)
+    feat_proc = preprocess_feature_store(feat_df, native_categoricals=True)
     
     print("Merging...")
     merged = pd.merge(cust_proc, feat_proc, on='customer_id', how='inner')
     final_df = pd.merge(merged, txn_agg, on='customer_id', how='left')
-    final_df = final_df.fillna(0)
+    final_df = fill_merged(final_df)
     
     # Save IDs
     X = final_df.drop(columns=['customer_id'])
@@ -62,12 +67,17 @@ def generate_dashboard_data():
     # Attempt Prediction
     y_prob = None
     try:
+        model = None
         model_path = os.path.join(current_dir, 'ensemble_model.pkl')
-        if os.path.exists(model_path):
-            print("Loading model...")
-            with open(model_path, 'rb') as f:
-                model = pickle.load(f)
-                
+        try:
+            # Registry artifacts: manifest only until the first prediction, no sklearn unpickling
+            model = get_model(mode_for('dashboard_batch'))
+        except FileNotFoundError:
+            if os.path.exists(model_path):
+                print("Loading model...")
+                with open(model_path, 'rb') as f:
+                    model = pickle.load(f)
+        if model is not None:
             model_cols = model.feature_names_in_ if hasattr(model, 'feature_names_in_') else None
             if model_cols is not None:
                 missing = set(model_cols) - set(X.columns)
@@ -77,7 +87,10 @@ def generate_dashboard_data():
                 X_model = X
                 
             print("Predicting...")
+            start = time.perf_counter()
             y_prob = model.predict_proba(X_model)[:, 1]
+            elapsed = time.perf_counter() - start
+            print(f"Scored {len(X_model)} rows in {elapsed:.2f}s ({len(X_model) / max(elapsed, 1e-9):,.0f} rows/s)")
     except Exception as e:
         print(f"Model prediction failed: {e}")
         print("Falling back to historical risk bands...")
@@ -109,7 +122,8 @@ def generate_dashboard_data():
         
     final_df['risk_trend'] = np.random.choice(['Stable', 'Increasing', 'Decreasing'], size=len(final_df))
     
-    # Save
+    # Save (categoricals as their integer codes, the label encoding the dashboard data always had)
+    final_df = OrdinalCategories().fit_transform(final_df)
     output_path = os.path.join(current_dir, 'final_dataset_full.csv')
     final_df.to_csv(output_path, index=False)
     print(f"Saved {len(final_df)} rows to {output_path}")
@@ -0,0 +1,53 @@
+from lightgbm import LGBMClassifier
+from sklearn.model_selection import train_test_split
+
+from xgb_training import MAX_BIN, MAX_ROUNDS, EARLY_STOPPING_ROUNDS, VALID_FRACTION, RANDOM_STATE
+
+# --- LIGHTGBM TRAINING CONFIGURATION ---
+# Round budget, early stopping and holdout share are the XGBoost ones, so the two boosters
+# are compared like for like.
+LGBM_PARAMS = {
+    'num_leaves': 31,
+    'learning_rate': 0.1,
+    'max_bin': MAX_BIN,
+    'min_data_per_group': 50,   # Rows a category needs before it gets its own side of a split
+    'cat_smooth': 10,           # Shrinks rare categories' gradient stats towards the prior
+    'verbose': -1
+}
+
+# --- 1. Estimator for sklearn pipelines / ensembles ---
+class HistLGBMClassifier(LGBMClassifier):
+    """
+    LGBMClassifier with the shared defaults that early-stops on a stratified held-out fold
+    of whatever it is fit on, so it can be cloned into CV, voting and stacking.
+
+    Pandas 'category' columns (create_dataset(native_categoricals=True)) are split on
+    natively - no label encoding. The categories seen at fit are stored with the model and
+    scoring frames are remapped to them.
+    """
+    def __init__(self, *, valid_fraction=VALID_FRACTION, **kwargs):
+        params = {**LGBM_PARAMS, 'n_estimators': MAX_ROUNDS, 'early_stopping_rounds': EARLY_STOPPING_ROUNDS,
+                  'random_state': RANDOM_STATE, **kwargs}
+        super().__init__(**params)
+        self.valid_fraction = valid_fraction
+
+    def _process_params(self, stage):
+        params = super()._process_params(stage)
+        params.pop('valid_fraction', None)
+        return params
+
+    def fit(self, X, y, **kwargs):
+        if kwargs.get('eval_X') is None and self.get_params().get('early_stopping_rounds'):
+            X_train, X_valid, y_train, y_valid = train_test_split(
+                X, y, test_size=self.valid_fraction, random_state=RANDOM_STATE, stratify=y
+            )
+            kwargs.update(eval_X=X_valid, eval_y=y_valid)
+            return super().fit(X_train, y_train, **kwargs)
+        return super().fit(X, y, **kwargs)
+
+def categorical_splits(model):
+    """
+    Number of splits in the fitted model that test category membership (not a threshold).
+    """
+    trees = model.booster_.trees_to_dataframe()
+    return int((trees['decision_type'] == '==').sum())
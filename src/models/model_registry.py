@@ -0,0 +1,496 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from tree_compiler import TreeScorer, compile_forest, compile_xgboost, compile_lightgbm
+
+# Model registry: a fitted ensemble saved as a directory of native artifacts plus a JSON
+# manifest, instead of one pickle of the whole sklearn object graph.
+#   - Tree models (random forests, XGBoost, LightGBM): compiled node arrays (tree_compiler.py)
+#   - XGBoost / LightGBM boosters also in their native format (UBJSON / model text files),
+#     random forests also as a joblib file of the fitted estimator
+#   - Linear models / scalers: plain .npy arrays; all arrays are memory-mapped on load
+#   - Ensemble structure, classes, feature list, category levels: manifest.json
+# Each save is a new version directory (name/v0001, name/v0002, ...) and name/CURRENT names
+# the live one; the pointer file is swapped atomically, so a reader never sees a half-written
+# or missing model.
+# Loading reads only the manifest; each base model's arrays are loaded the first time it
+# predicts. Neither scikit-learn nor the boosting libraries are needed to score; a booster
+# that cannot be compiled is scored by its library from the native file. Large batches also
+# use the model's library when it is installed: its C++ traversal outruns NumPy once the
+# per-call overhead no longer dominates.
+
+# --- REGISTRY CONFIGURATION ---
+REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), 'registry'))
+FORMAT_VERSION = 2              # 2: compiled tree arrays for every tree model
+MANIFEST = 'manifest.json'
+# Keys save_model writes itself; anything else in a manifest came from `extra`
+MANIFEST_KEYS = ('format', 'created_at', 'libraries', 'classes', 'features', 'kind', 'estimators',
+                 'weights', 'final_estimator', 'files')
+CURRENT = 'CURRENT'             # Per-model pointer file: name of the live version directory
+KEEP_VERSIONS = 2               # Versions kept per model, so models opened before a re-save can still load their arrays
+LOOKUP_CACHE_SIZE = 256         # Category-level mappings kept per base model (one per scoring dtype and column)
+NATIVE_MIN_ROWS = 256           # Batches this large go to a booster's own predictor when its library is installed
+FOREST_NATIVE_MIN_ROWS = 4096   # Same for forests; scikit-learn's per-call overhead is larger (RF(100): compiled wins to ~4k rows)
+
+def _kind(obj):
+    return type(obj).__name__
+
+def _library_versions():
+    versions = {}
+    for module in ('numpy', 'pandas', 'sklearn', 'xgboost', 'lightgbm'):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            pass
+    return versions
+
+# --- 1. Writers (one per supported component type) ---
+class _Writer:
+    def __init__(self, path):
+        self.path = path
+        self.files = []
+
+    def array(self, name, values):
+        filename = f"{name}.npy"
+        np.save(os.path.join(self.path, filename), np.ascontiguousarray(values))
+        self.files.append(filename)
+        return filename
+
+def _save_step(writer, prefix, step):
+    kind = _kind(step)
+    if kind == 'OrdinalCategories':
+        return {'type': 'ordinal',
+                'categories': {col: [str(c) for c in cats] for col, cats in step.categories_.items()}}
+    if kind == 'StandardScaler':
+        return {'type': 'scaler',
+                'mean': writer.array(f"{prefix}_scaler_mean", step.mean_ if step.with_mean else np.zeros(step.n_features_in_)),
+                'scale': writer.array(f"{prefix}_scaler_scale", step.scale_ if step.with_std else np.ones(step.n_features_in_))}
+    if kind == 'QuantileBins':
+        return {'type': 'bins',
+                'edges': {col: [float(e) for e in edges] for col, edges in step.edges_.items()},
+                'levels': {col: [str(level) for level in levels] for col, levels in step.levels_.items()}}
+    raise TypeError(f"Model registry cannot save pipeline step {kind}")
+
+def _save_trees(writer, prefix, compiled):
+    if compiled is None:
+        return None
+    arrays, meta = compiled
+    return dict(meta, arrays={key: writer.array(f"{prefix}_trees_{key}", values) for key, values in arrays.items()})
+
+def _save_estimator(writer, prefix, est):
+    kind = _kind(est)
+    if kind == 'LogisticRegression':
+        return {'type': 'linear',
+                'coef': writer.array(f"{prefix}_coef", est.coef_),
+                'intercept': writer.array(f"{prefix}_intercept", est.intercept_)}
+    if kind == 'RandomForestClassifier':
+        import joblib
+        import sklearn
+        filename = f"{prefix}.joblib"
+        joblib.dump(est, os.path.join(writer.path, filename))
+        writer.files.append(filename)
+        return {'type': 'forest', 'file': filename, 'sklearn': sklearn.__version__,
+                'trees': _save_trees(writer, prefix, compile_forest(est))}
+    if kind in ('XGBClassifier', 'HistXGBClassifier'):
+        booster = est.get_booster()
+        best = getattr(est, 'best_iteration', None)
+        if best is not None and best + 1 < booster.num_boosted_rounds():
+            booster = booster[:best + 1]     # What predict_proba uses after early stopping
+        filename = f"{prefix}.ubj"
+        booster.save_model(os.path.join(writer.path, filename))
+        writer.files.append(filename)
+        return {'type': 'xgboost', 'file': filename, 'trees': _save_trees(writer, prefix, compile_xgboost(booster))}
+    if kind in ('LGBMClassifier', 'HistLGBMClassifier'):
+        filename = f"{prefix}.txt"
+        # The text model carries the pandas category levels, so scoring frames are remapped
+        est.booster_.save_model(os.path.join(writer.path, filename), num_iteration=est.best_iteration_ or None)
+        writer.files.append(filename)
+        compiled = compile_lightgbm(est.booster_, num_iteration=est.best_iteration_ or None)
+        return {'type': 'lightgbm', 'file': filename, 'trees': _save_trees(writer, prefix, compiled)}
+    raise TypeError(f"Model registry cannot save estimator {kind}")
+
+def _save_component(writer, name, model):
+    steps = model.steps[:-1] if hasattr(model, 'steps') else []
+    final = model.steps[-1][1] if hasattr(model, 'steps') else model
+    spec = {
+        'name': name,
+        'steps': [_save_step(writer, f"{name}_{step_name}", step) for step_name, step in steps],
+        'model': _save_estimator(writer, name, final)
+    }
+    trees = spec['model'].get('trees')
+    if trees and 'categories' in trees:
+        # Compiled LightGBM trees split on category codes of the booster's own levels
+        spec['steps'].append({'type': 'ordinal', 'categories': trees.pop('categories')})
+    return spec
+
+def _versions(path):
+    return sorted(int(entry[1:]) for entry in os.listdir(path) if re.fullmatch(r'v\d+', entry))
+
+def _current_path(path):
+    """
+    Version directory that path/CURRENT points to (a model saved before versioning is the
+    directory itself).
+    """
+    pointer = os.path.join(path, CURRENT)
+    if not os.path.exists(pointer):
+        return path
+    with open(pointer, 'r', encoding='utf-8') as f:
+        return os.path.join(path, f.read().strip())
+
+def save_model(model, name='ensemble', registry_dir=REGISTRY_DIR, extra=None):
+    """
+    Saves a fitted PrefitVoting / PrefitStacking ensemble (or a single base learner) as the
+    next version of registry_dir/name/ and then points CURRENT at it; the last KEEP_VERSIONS
+    versions are kept. `extra` is merged into the manifest. Returns the version directory.
+    """
+    path = os.path.join(registry_dir, name)
+    os.makedirs(path, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(suffix='.tmp', dir=path)
+    try:
+        _write_model(model, tmp_path, extra)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    version_path = os.path.join(path, f"v{max(_versions(path), default=0) + 1:04d}")
+    os.replace(tmp_path, version_path)
+
+    pointer_tmp = f"{tmp_path}.pointer"
+    with open(pointer_tmp, 'w', encoding='utf-8') as f:
+        f.write(os.path.basename(version_path))
+    os.replace(pointer_tmp, os.path.join(path, CURRENT))
+
+    # Files from a model saved before versioning, then versions past the retention window
+    for entry in os.listdir(path):
+        if entry != CURRENT and os.path.isfile(os.path.join(path, entry)):
+            os.remove(os.path.join(path, entry))
+    for version in _versions(path)[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(path, f"v{version:04d}"), ignore_errors=True)
+    return version_path
+
+def _write_model(model, tmp_path, extra):
+    writer = _Writer(tmp_path)
+
+    manifest = {
+        'format': FORMAT_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'libraries': _library_versions(),
+        'classes': np.asarray(model.classes_).tolist(),
+        'features': [str(f) for f in model.feature_names_in_]
+    }
+    if _kind(model) in ('PrefitVoting', 'PrefitStacking'):
+        manifest['kind'] = 'stacking' if _kind(model) == 'PrefitStacking' else 'voting'
+        manifest['estimators'] = [_save_component(writer, n, est) for n, est in model.named_estimators_.items()]
+        if manifest['kind'] == 'voting':
+            manifest['weights'] = None if model.weights is None else [float(w) for w in model.weights]
+        else:
+            manifest['final_estimator'] = _save_estimator(writer, 'final', model.final_estimator_)
+    else:
+        manifest['kind'] = 'single'
+        manifest['estimators'] = [_save_component(writer, 'model', model)]
+    manifest.update(extra or {})
+    manifest['files'] = writer.files
+
+    with open(os.path.join(tmp_path, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+# --- 2. Lazy scorers ---
+def _softmax(z):
+    z = z - z.max(axis=1, keepdims=True)
+    np.exp(z, out=z)
+    return z / z.sum(axis=1, keepdims=True)
+
+def _as_proba(raw):
+    # Binary boosters return P(class 1) only
+    raw = np.asarray(raw, dtype=float)
+    return np.column_stack([1 - raw, raw]) if raw.ndim == 1 else raw
+
+class _Linear:
+    def __init__(self, load, spec):
+        self.coef = load(spec['coef'])
+        self.intercept = load(spec['intercept'])
+
+    def predict_proba(self, X):
+        z = X @ self.coef.T + self.intercept
+        if z.shape[1] == 1:
+            p = 1.0 / (1.0 + np.exp(-z[:, 0]))
+            return np.column_stack([1 - p, p])
+        return _softmax(z)
+
+class _XGBoost:
+    def __init__(self, path, spec):
+        import xgboost as xgb
+        self.booster = xgb.Booster()
+        self.booster.load_model(os.path.join(path, spec['file']))
+
+    def predict_proba(self, X):
+        return _as_proba(self.booster.inplace_predict(np.asarray(X, dtype=np.float32), validate_features=False))
+
+class _Forest:
+    def __init__(self, path, spec):
+        import joblib
+        import sklearn
+        if sklearn.__version__ != spec['sklearn']:
+            # Estimator pickles only load reliably into the release that wrote them
+            raise ImportError(f"forest saved with scikit-learn {spec['sklearn']}, found {sklearn.__version__}")
+        self.forest = joblib.load(os.path.join(path, spec['file']))
+        # Scored on the transformed array, not the frame it was fitted on
+        self.forest.__dict__.pop('feature_names_in_', None)
+
+    def predict_proba(self, X):
+        return self.forest.predict_proba(X)
+
+class _LightGBM:
+    def __init__(self, path, spec):
+        import lightgbm as lgb
+        self.booster = lgb.Booster(model_file=os.path.join(path, spec['file']))
+
+    def predict_proba(self, X):
+        return _as_proba(self.booster.predict(X))
+
+def _category_codes(values, levels, lookups, missing=-1):
+    # Code of each value in `levels` (unseen levels -1, missing values `missing`). Categorical
+    # columns map their levels, not their rows, and the mapping is kept in `lookups` per
+    # dtype, so repeated small calls skip it entirely
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return np.where(values.isna().to_numpy(), missing, levels.get_indexer(values.astype(str)))
+    lookup = lookups.get((values.name, values.dtype))
+    if lookup is None:
+        if len(lookups) >= LOOKUP_CACHE_SIZE:
+            lookups.clear()
+        lookup = lookups[(values.name, values.dtype)] = levels.get_indexer(values.cat.categories.astype(str))
+    codes = values.cat.codes.to_numpy()
+    return np.where(codes >= 0, lookup[codes], missing)
+
+def _ordinal_codes(X, categories, lookups):
+    # Float matrix of X with category columns replaced by their code in `categories`
+    if not categories:
+        return X.to_numpy(dtype=float)
+    out = np.empty(X.shape)
+    numeric = [i for i, col in enumerate(X.columns) if col not in categories]
+    if numeric:
+        out[:, numeric] = X.iloc[:, numeric].to_numpy(dtype=float)
+    for i, col in enumerate(X.columns):
+        if col not in categories:
+            continue
+        out[:, i] = _category_codes(X[col], categories[col], lookups)
+    return out
+
+class _OneHot:
+    """
+    One-hot bins as the index of the active column per feature: `onehot @ W` sums the
+    matching rows of W, which is the product with the (never built) one-hot matrix.
+    """
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __matmul__(self, weights):
+        return np.asarray(weights)[self.index].sum(axis=1)
+
+def _bin_index(X, edges, levels, offsets, lookups):
+    # QuantileBins.bin_index for a registry component: value bins, then 'other', then missing
+    index = np.empty(X.shape, dtype=np.int64)
+    numeric = [j for j, col in enumerate(X.columns) if col in edges]
+    if numeric:
+        values = X.iloc[:, numeric].to_numpy(dtype=float)
+        for k, j in enumerate(numeric):
+            col_edges = edges[X.columns[j]]
+            bins = np.searchsorted(col_edges, values[:, k], side='right')
+            index[:, j] = np.where(np.isnan(values[:, k]), len(col_edges) + 1, bins)
+    for j, col in enumerate(X.columns):
+        if col in edges:
+            continue
+        n_levels = len(levels[col])
+        codes = _category_codes(X[col], levels[col], lookups, missing=n_levels + 1)
+        index[:, j] = np.where(codes == -1, n_levels, codes)
+    return _OneHot(index + offsets)
+
+class RegistryComponent:
+    """
+    One base model of a registry ensemble: its preprocessing steps (ordinal category codes,
+    standard scaling) and scorer, loaded on first predict_proba.
+    """
+    def __init__(self, path, spec, features, classes, mmap=True):
+        self.name = spec['name']
+        self.kind = spec['model']['type']
+        self.feature_names_in_ = np.asarray(features, dtype=object)
+        self.classes_ = classes
+        self._columns = pd.Index(self.feature_names_in_)
+        self._path = path
+        self._spec = spec
+        self._mmap = mmap
+        self._scorer = None
+        self._steps = None
+        self._native = None
+
+    def _load_array(self, filename):
+        return np.load(os.path.join(self._path, filename), mmap_mode='r' if self._mmap else None)
+
+    def load(self):
+        if self._scorer is None:
+            self._steps = []
+            key = ''
+            for step in self._spec['steps']:
+                # Cache key of the preprocessing up to and including this step
+                key += json.dumps(step, sort_keys=True)
+                if step['type'] == 'ordinal':
+                    categories = {col: pd.Index(levels) for col, levels in step['categories'].items()}
+                    self._steps.append(('ordinal', (categories, {}), key))
+                elif step['type'] == 'bins':
+                    edges = {col: np.asarray(e) for col, e in step['edges'].items()}
+                    levels = {col: pd.Index(values) for col, values in step['levels'].items()}
+                    widths = [len(edges[col]) + 2 if col in edges else len(levels[col]) + 2 for col in self.feature_names_in_]
+                    offsets = np.concatenate([[0], np.cumsum(widths)[:-1]]).astype(np.int64)
+                    self._steps.append(('bins', (edges, levels, offsets, {}), key))
+                else:
+                    self._steps.append(('scaler', (self._load_array(step['mean']), self._load_array(step['scale'])), key))
+            model = self._spec['model']
+            if self.kind == 'linear':
+                self._scorer = _Linear(self._load_array, model)
+            elif model.get('trees'):
+                trees = model['trees']
+                self._scorer = TreeScorer({key: self._load_array(f) for key, f in trees['arrays'].items()}, trees)
+            elif self.kind == 'xgboost':
+                self._scorer = _XGBoost(self._path, model)
+            elif self.kind == 'lightgbm':
+                self._scorer = _LightGBM(self._path, model)
+            else:
+                raise ValueError(f"Unknown model type {self.kind}")
+        return self
+
+    def transform(self, X, encoded=None):
+        """
+        The matrix the scorer sees: ordinal codes for categories (or one-hot bins), then
+        scaling. `encoded` is a dict shared between the base models of one call, so
+        identical preprocessing (e.g. the same category levels) runs once.
+        """
+        self.load()
+        if hasattr(X, 'columns') and not X.columns.equals(self._columns):
+            X = X[list(self.feature_names_in_)]
+        for kind, params, key in self._steps:
+            if encoded is not None and key in encoded:
+                X = encoded[key]
+                continue
+            if kind == 'ordinal':
+                X = _ordinal_codes(X, *params)
+            elif kind == 'bins':
+                X = _bin_index(X, *params)
+            else:
+                mean, scale = params
+                X = (np.asarray(X, dtype=float) - mean) / scale
+            if encoded is not None:
+                encoded[key] = X
+        return X
+
+    def _native_scorer(self):
+        # The library scorer for a compiled model, False when the library is not installed
+        if self._native is None:
+            self._native = False
+            try:
+                if self.kind == 'forest' and 'file' in self._spec['model']:   # Saved before forests kept one
+                    self._native = _Forest(self._path, self._spec['model'])
+                elif self.kind == 'xgboost':
+                    self._native = _XGBoost(self._path, self._spec['model'])
+                elif self.kind == 'lightgbm':
+                    self._native = _LightGBM(self._path, self._spec['model'])
+            except ImportError:
+                pass
+        return self._native
+
+    def predict_proba(self, X, encoded=None):
+        Xt = self.transform(X, encoded)
+        scorer = self._scorer
+        min_rows = FOREST_NATIVE_MIN_ROWS if self.kind == 'forest' else NATIVE_MIN_ROWS
+        if len(Xt) >= min_rows and isinstance(scorer, TreeScorer):
+            scorer = self._native_scorer() or scorer
+        return scorer.predict_proba(Xt)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+class RegistryModel:
+    """
+    A registry ensemble with the scoring interface of the saved model (predict_proba,
+    predict, classes_, feature_names_in_, estimators_ / named_estimators_).
+    """
+    def __init__(self, path, mmap=True):
+        self.path = path
+        with open(os.path.join(path, MANIFEST), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format', 0) != FORMAT_VERSION:
+            raise ValueError(f"{path} uses registry format {self.manifest.get('format')}; this reader supports "
+                             f"{FORMAT_VERSION} (re-save the model with save_model)")
+        self.kind = self.manifest['kind']
+        self.classes_ = np.asarray(self.manifest['classes'])
+        self.feature_names_in_ = np.asarray(self.manifest['features'], dtype=object)
+        self.n_features_in_ = len(self.feature_names_in_)
+        self._columns = pd.Index(self.feature_names_in_)
+        self.named_estimators_ = {
+            spec['name']: RegistryComponent(path, spec, self.feature_names_in_, self.classes_, mmap)
+            for spec in self.manifest['estimators']
+        }
+        self.estimators_ = list(self.named_estimators_.values())
+        self.weights = self.manifest.get('weights')
+        self._final = None
+
+    def predict_proba(self, X):
+        # Columns are selected and categories encoded once for all base models, and the
+        # soft vote is accumulated in place
+        if hasattr(X, 'columns') and not X.columns.equals(self._columns):
+            X = X[list(self.feature_names_in_)]
+        encoded = {}
+        if self.kind == 'stacking':
+            if self._final is None:
+                load = lambda filename: np.load(os.path.join(self.path, filename), mmap_mode='r')
+                self._final = _Linear(load, self.manifest['final_estimator'])
+            probas = [est.predict_proba(X, encoded) for est in self.estimators_]
+            return self._final.predict_proba(np.hstack([p[:, 1:] if p.shape[1] == 2 else p for p in probas]))
+        weights = self.weights or [1.0] * len(self.estimators_)
+        total = None
+        for est, weight in zip(self.estimators_, weights):
+            proba = est.predict_proba(X, encoded)
+            if total is None:
+                total = proba * weight
+            else:
+                total += proba * weight
+        return total / sum(weights)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+def manifest_extras(name='ensemble', registry_dir=REGISTRY_DIR):
+    """
+    The `extra` entries the current version of registry_dir/name/ was saved with (model name,
+    feature selection, ...), so a re-save can carry them forward; {} when there is no model.
+    """
+    path = os.path.join(_current_path(os.path.join(registry_dir, name)), MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return {key: value for key, value in manifest.items() if key not in MANIFEST_KEYS}
+
+def load_model(name='ensemble', registry_dir=REGISTRY_DIR, mmap=True):
+    """
+    Opens the current version of registry_dir/name/ (only the manifest is read until the
+    model first predicts).
+    """
+    path = _current_path(os.path.join(registry_dir, name))
+    if not os.path.exists(os.path.join(path, MANIFEST)):
+        raise FileNotFoundError(f"No registry model at {path}")
+    start = time.perf_counter()
+    model = RegistryModel(path, mmap=mmap)
+    print(f"[REGISTRY] Opened {model.kind} model '{name}' ({len(model.estimators_)} base models, "
+          f"created {model.manifest['created_at']}) in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return model
@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
+from scipy import sparse
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import LabelEncoder
+import hashlib
 import sys
 import os
 
@@ -11,12 +14,41 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 try:
-    from project.src.data_loader import load_customer_data, load_feature_store, load_transaction_data
+    from project.src.data_loader import load_customer_data, load_feature_store, load_transaction_data, DATA_DIR
 except ImportError:
     # Fallback if running from src directory
-    from data_loader import load_customer_data, load_feature_store, load_transaction_data
+    from data_loader import load_customer_data, load_feature_store, load_transaction_data, DATA_DIR
 
-def preprocess_customer_data(df):
+# --- DATASET CACHE ---
+# create_dataset() output is pickled (keeps category dtypes) under a key derived from the
+# source CSVs' size and mtime and from this module's code, so tuning and training runs reuse
+# it until either the data or the preprocessing changes
+CACHE_DIR = os.environ.get("DATASET_CACHE_DIR", os.path.join(current_dir, 'cache'))
+SOURCE_FILES = ('CUSTOMER_MASTER.csv', 'FEATURE_STORE.csv', 'TRANSACTIONS.csv')
+DATASET_SCHEMA_VERSION = 1      # Bump when create_dataset's output changes in a way the code hash can't see (e.g. data_loader)
+
+# Per-customer transaction aggregates: source column -> aggregations (feature txn_<column>_<agg>)
+TXN_AGG_FUNCS = {
+    'amount_inr': ['sum', 'mean', 'count', 'std'],
+    'balance_after_transaction': ['last', 'mean']
+}
+
+def encode_categoricals(df, cat_cols, native_categoricals=False):
+    """
+    Label-encodes `cat_cols` (customer_id excluded), or with native_categoricals=True casts them
+    to pandas 'category' dtype for learners that split on categories directly (LightGBM).
+    Categories are sorted like LabelEncoder's classes, so .cat.codes equal the label encoding.
+    """
+    for col in cat_cols:
+        if col != 'customer_id':
+            if native_categoricals:
+                df[col] = df[col].astype(str).astype('category')
+            else:
+                le = LabelEncoder()
+                df[col] = le.fit_transform(df[col].astype(str))
+    return df
+
+def preprocess_customer_data(df, native_categoricals=False):
     """
     Preprocess CUSTOMER_MASTER data.
     """
@@ -40,14 +72,7 @@ def preprocess_customer_data(df):
         df[col] = df[col].fillna(df[col].median())
         
     # Encode categorical variables
-    le_dict = {}
-    for col in cat_cols:
-        if col != 'customer_id':
-            le = LabelEncoder()
-            df[col] = le.fit_transform(df[col].astype(str))
-            le_dict[col] = le
-            
-    return df
+    return encode_categoricals(df, cat_cols, native_categoricals)
 
 def aggregate_transactions(df):
     """
@@ -57,17 +82,9 @@ def aggregate_transactions(df):
     if df.empty:
         return pd.DataFrame(columns=['customer_id'])
 
-    # Basic aggregations
-    agg_funcs = {
-        'amount_inr': ['sum', 'mean', 'count', 'std'],
-        'balance_after_transaction': ['last', 'mean']
-    }
-    
-    # Check if columns exist before aggregating
-    for col in agg_funcs.keys():
-        if col not in df.columns:
-            del agg_funcs[col]
-            
+    # Basic aggregations, for the columns present
+    agg_funcs = {col: funcs for col, funcs in TXN_AGG_FUNCS.items() if col in df.columns}
+
     agg_df = df.groupby('customer_id').agg(agg_funcs)
     
     # Flatten multi-level columns
@@ -79,7 +96,7 @@ def aggregate_transactions(df):
     
     return agg_df
 
-def preprocess_feature_store(df):
+def preprocess_feature_store(df, native_categoricals=False):
     """
     Preprocess FEATURE_STORE data.
     """
@@ -114,42 +131,186 @@ def preprocess_feature_store(df):
         df[col] = df[col].fillna(df[col].median())
 
     # Encode categoricals
-    for col in cat_cols:
-        if col != 'customer_id':
-            le = LabelEncoder()
-            df[col] = le.fit_transform(df[col].astype(str))
-            
+    return encode_categoricals(df, cat_cols, native_categoricals)
+
+def fill_merged(df):
+    """
+    Fills the NaNs a left join leaves behind: 0 for numeric columns; categorical columns
+    get an 'Unknown' category.
+    """
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            if df[col].isna().any():
+                if 'Unknown' not in df[col].cat.categories:
+                    df[col] = df[col].cat.add_categories('Unknown')
+                df[col] = df[col].fillna('Unknown')
+        else:
+            df[col] = df[col].fillna(0)
     return df
 
-def create_dataset():
+class OrdinalCategories(BaseEstimator, TransformerMixin):
+    """
+    Pipeline step giving ordinal-only learners (LR, RF, XGBoost) integer codes for 'category'
+    columns. Categories are learned at fit, so scoring data with a different category set
+    maps consistently (unseen values become -1).
+    """
+    def fit(self, X, y=None):
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = X.shape[1]
+        self.categories_ = {
+            col: X[col].cat.categories for col in X.select_dtypes(include=['category']).columns
+        }
+        return self
+
+    def transform(self, X):
+        if not self.categories_:
+            return X
+        X = X.copy()
+        for col, categories in self.categories_.items():
+            X[col] = categories.get_indexer(X[col].astype(str))
+        return X
+
+class QuantileBins(BaseEstimator, TransformerMixin):
+    """
+    Pipeline step turning every column into one-hot bins, for scorecard-style linear models:
+    numeric columns by quantile edges (n_bins), categorical columns by their max_levels most
+    frequent levels plus one bin for all others. Each column also gets a bin for missing
+    values. transform returns a sparse matrix; bin_index gives the active column per feature.
     """
-    Load, preprocess, and merge data.
+    def __init__(self, n_bins=10, max_levels=20):
+        self.n_bins = n_bins
+        self.max_levels = max_levels
+
+    def fit(self, X, y=None):
+        self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        self.n_features_in_ = X.shape[1]
+        self.edges_, self.levels_ = {}, {}
+        for col in X.columns:
+            if isinstance(X[col].dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(X[col]):
+                counts = X[col].dropna().astype(str).value_counts()
+                self.levels_[col] = pd.Index(sorted(counts.index[:self.max_levels]))
+            else:
+                values = X[col].to_numpy(dtype=float)
+                quantiles = np.nanquantile(values, np.linspace(0, 1, self.n_bins + 1)[1:-1]) if np.isfinite(values).any() else []
+                self.edges_[col] = np.unique(quantiles)
+        # Column j's bins start at offsets_[j]: value bins, then 'other' (categoricals), then missing
+        widths = [len(self.edges_[col]) + 2 if col in self.edges_ else len(self.levels_[col]) + 2 for col in X.columns]
+        self.offsets_ = np.concatenate([[0], np.cumsum(widths)[:-1]]).astype(np.int64)
+        self.n_bins_out_ = int(np.sum(widths))
+        return self
+
+    def bin_index(self, X):
+        """
+        (n_rows, n_features) matrix of the one-hot column each value falls in.
+        """
+        index = np.empty((len(X), self.n_features_in_), dtype=np.int64)
+        for j, col in enumerate(self.feature_names_in_):
+            if col in self.edges_:
+                values = X[col].to_numpy(dtype=float)
+                bins = np.searchsorted(self.edges_[col], values, side='right')
+                index[:, j] = np.where(np.isnan(values), len(self.edges_[col]) + 1, bins)
+            else:
+                levels = self.levels_[col]
+                missing = X[col].isna().to_numpy()
+                codes = levels.get_indexer(X[col].astype(str))
+                index[:, j] = np.where(missing, len(levels) + 1, np.where(codes < 0, len(levels), codes))
+        return index + self.offsets_
+
+    def transform(self, X):
+        index = self.bin_index(X)
+        n_rows = len(index)
+        return sparse.csr_matrix((np.ones(index.size), index.ravel(), np.arange(0, index.size + 1, self.n_features_in_)),
+                                 shape=(n_rows, self.n_bins_out_))
+
+def source_columns(features):
+    """
+    Columns each source file must provide for the create_dataset columns `features`: the
+    features themselves plus the join key and target, and for txn_* aggregates their
+    transaction column. Keyed by SOURCE_FILES name; an empty transactions list means the
+    file is not needed. Every preprocessing step works per column, so the selected
+    columns come out exactly as in the full dataset.
+    """
+    features = set(features)
+    txn_cols = [col for col, funcs in TXN_AGG_FUNCS.items() if any(f"txn_{col}_{f}" in features for f in funcs)]
+    return {
+        'CUSTOMER_MASTER.csv': lambda col: col in features or col == 'customer_id',
+        'FEATURE_STORE.csv': lambda col: col in features or col in ('customer_id', 'risk_band'),
+        'TRANSACTIONS.csv': ['customer_id'] + txn_cols if txn_cols else []
+    }
+
+def create_dataset(native_categoricals=False, features=None, data_dir=None):
+    """
+    Load, preprocess, and merge data. With native_categoricals=True categorical columns stay
+    pandas categoricals instead of being label-encoded. `features` (e.g. a model's
+    feature_names_in_) reads and returns only those columns, plus 'target'. The source CSVs
+    are read from `data_dir` (default: data_loader.DATA_DIR).
     """
     print("Loading data...")
-    cust_df = load_customer_data()
-    feat_df = load_feature_store()
-    txn_df = load_transaction_data()
+    usecols = source_columns(features) if features is not None else {}
+    cust_df = load_customer_data(usecols.get('CUSTOMER_MASTER.csv'), data_dir)
+    feat_df = load_feature_store(usecols.get('FEATURE_STORE.csv'), data_dir)
     
-    cust_proc = preprocess_customer_data(cust_df)
-    txn_agg = aggregate_transactions(txn_df)
-    feat_proc = preprocess_feature_store(feat_df)
+    cust_proc = preprocess_customer_data(cust_df, native_categoricals)
+    feat_proc = preprocess_feature_store(feat_df, native_categoricals)
     
     print("Merging datasets...")
     # Merge Customer + Features (Target is in Features)
-    merged = pd.merge(cust_proc, feat_proc, on='customer_id', how='inner')
+    final_df = pd.merge(cust_proc, feat_proc, on='customer_id', how='inner')
     
-    # Merge with Transactions
-    final_df = pd.merge(merged, txn_agg, on='customer_id', how='left')
+    # Merge with Transactions (skipped when no selected feature is a txn_* aggregate)
+    if usecols.get('TRANSACTIONS.csv', True):
+        txn_agg = aggregate_transactions(load_transaction_data(usecols.get('TRANSACTIONS.csv'), data_dir))
+        final_df = pd.merge(final_df, txn_agg, on='customer_id', how='left')
     
     # Fill NaNs from left join
-    final_df = final_df.fillna(0)
+    final_df = fill_merged(final_df)
     
     # Drop customer_id
     if 'customer_id' in final_df.columns:
         final_df = final_df.drop(columns=['customer_id'])
+
+    if features is not None:
+        final_df = final_df[[col for col in features if col in final_df.columns] +
+                            (['target'] if 'target' in final_df.columns else [])]
         
     return final_df
 
+def _code_hash():
+    with open(os.path.abspath(__file__), 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:16]
+
+def dataset_fingerprint(native_categoricals=False, data_dir=None, features=None):
+    """
+    Short hash of the source files' names, sizes and mtimes plus the encoding mode (and the
+    column selection, if any), DATASET_SCHEMA_VERSION and a hash of this module's source.
+    """
+    data_dir = data_dir or DATA_DIR
+    h = hashlib.sha1(f"schema={DATASET_SCHEMA_VERSION}|code={_code_hash()}|native={bool(native_categoricals)}".encode())
+    if features is not None:
+        h.update(f"|features={','.join(features)}".encode())
+    for name in SOURCE_FILES:
+        stat = os.stat(os.path.join(data_dir, name))
+        h.update(f"|{name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+def load_dataset(native_categoricals=False, cache_dir=CACHE_DIR, data_dir=None, features=None):
+    """
+    create_dataset() output, read from the on-disk cache when the source files and the
+    preprocessing code are unchanged.
+    """
+    key = dataset_fingerprint(native_categoricals, data_dir, features)
+    path = os.path.join(cache_dir, f"dataset_{key}.pkl")
+    if os.path.exists(path):
+        print(f"[DATASET] Using cached dataset {key}")
+        return pd.read_pickle(path)
+    df = create_dataset(native_categoricals, features, data_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+    print(f"[DATASET] Cached dataset {key} ({len(df)} rows) to {path}")
+    return df
+
 if __name__ == "__main__":
     try:
         df = create_dataset()
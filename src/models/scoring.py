@@ -0,0 +1,44 @@
+import os
+
+from model_registry import REGISTRY_DIR, load_model
+
+# Scoring entry point for call sites. Each call site picks a scoring mode, a registry model:
+#   - 'ensemble':  the full voting / stacking ensemble (batch scoring, model reviews)
+# A site's default comes from CALL_SITE_MODES (else DEFAULT_MODE) and can be overridden with
+# SCORING_MODE_<SITE>. There is no live, latency-sensitive site: the portal and alert paths
+# read the PDs generate_data.py precomputed, so distill_scorer.py's student has no mode here.
+
+# --- SCORING CONFIGURATION ---
+SCORING_MODES = {'ensemble': 'ensemble'}    # Mode -> registry model name
+DEFAULT_MODE = 'ensemble'
+CALL_SITE_MODES = {
+    'dashboard_batch': 'ensemble'       # generate_data.py: whole customer base, accuracy first
+}
+
+_models = {}
+
+def mode_for(site):
+    """
+    The scoring mode configured for a call site.
+    """
+    mode = os.environ.get(f"SCORING_MODE_{site.upper()}", CALL_SITE_MODES.get(site, DEFAULT_MODE))
+    if mode not in SCORING_MODES:
+        raise ValueError(f"Unknown scoring mode {mode!r} for {site}; expected one of {sorted(SCORING_MODES)}")
+    return mode
+
+def get_model(mode=DEFAULT_MODE, registry_dir=REGISTRY_DIR):
+    """
+    The registry model for `mode`, loaded once per process.
+    """
+    key = (mode, registry_dir)
+    if key not in _models:
+        _models[key] = load_model(SCORING_MODES[mode], registry_dir=registry_dir)
+    return _models[key]
+
+def score(X, site=None, mode=None, registry_dir=REGISTRY_DIR):
+    """
+    Class probabilities for the rows of X, from the model of `mode` (default: the mode
+    configured for `site`).
+    """
+    mode = mode or (mode_for(site) if site else DEFAULT_MODE)
+    return get_model(mode, registry_dir).predict_proba(X)
@@ -0,0 +1,243 @@
+import argparse
+import copy
+import os
+import pickle
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+# Add project root to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.append(project_root)
+# src/models: shared model code (ensembles, preprocessing)
+models_dir = os.path.dirname(current_dir)
+if models_dir not in sys.path:
+    sys.path.append(models_dir)
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from ensembles import BaseModelCache, PrefitVoting, PrefitStacking
+from preprocessing import load_dataset
+from tune_hyperparams import load_params
+from model_registry import save_model, manifest_extras
+from train_ensemble import make_base_estimators
+
+# --- INCREMENTAL RETRAINING CONFIGURATION ---
+MODEL_PATH = os.path.join(current_dir, 'models', 'ensemble_model.pkl')
+BOOST_ROUNDS = 100              # Extra boosting rounds per refresh (early stopping trims them)
+RF_NEW_TREES = 20               # Trees grown on each refresh's rows
+RF_MAX_TREES = 300              # Oldest trees are dropped beyond this (sliding window over months)
+LR_UPDATE_ITER = 25             # Solver iterations continuing from the current coefficients
+VALID_FRACTION = 0.2            # Share of the new rows held out to validate the update
+AUC_TOLERANCE = 0.005           # Allowed validation AUC drop before falling back to a full retrain
+RANDOM_STATE = 42
+
+def _auc(model, X, y):
+    prob = model.predict_proba(X)
+    if prob.shape[1] == 2:
+        return roc_auc_score(y, prob[:, 1])
+    return roc_auc_score(y, prob, multi_class='ovr', labels=model.classes_)
+
+def _split(model):
+    # (fitted preprocessing steps, final estimator); a bare estimator has no preprocessing
+    if isinstance(model, Pipeline):
+        return model.steps[:-1], model.steps[-1]
+    return [], (None, model)
+
+def _assemble(prep_steps, name, estimator):
+    return Pipeline(prep_steps + [(name, estimator)]) if prep_steps else estimator
+
+def align_categories(X, booster):
+    """
+    Recasts the categorical columns of X to the categories a LightGBM booster was trained
+    with, so codes mean the same levels as before (unseen levels become missing).
+    """
+    categories = getattr(booster, 'pandas_categorical', None)
+    if not categories:
+        return X
+    cat_cols = [col for col in X.columns if isinstance(X[col].dtype, pd.CategoricalDtype)]
+    X = X.copy()
+    for col, levels in zip(cat_cols, categories):
+        X[col] = pd.Categorical(X[col].astype(str), categories=levels)
+    return X
+
+# --- 1. Per-learner warm-start updates (the fitted model passed in is left untouched) ---
+def update_learner(model, X_new, y_new):
+    """
+    Continues training a fitted base learner on the new rows only:
+      - XGBoost: more boosting rounds on top of the current booster (xgb_model=)
+      - LightGBM: more boosting rounds on top of the current booster (init_model=)
+      - RandomForest: warm_start adds RF_NEW_TREES trees grown on the new rows
+      - LogisticRegression: warm-started solver steps from the current coefficients;
+        a StandardScaler in front is updated with partial_fit
+    Fitted preprocessing (OrdinalCategories) is reused, so category codes stay stable.
+    """
+    prep_steps, (name, estimator) = _split(model)
+    prep_steps = copy.deepcopy(prep_steps)
+    kind = type(estimator).__name__
+    Xt = X_new
+    for step_name, step in prep_steps:
+        if hasattr(step, 'partial_fit'):
+            step.partial_fit(Xt)
+        Xt = step.transform(Xt)
+
+    if kind in ('XGBClassifier', 'HistXGBClassifier'):
+        updated = clone(estimator).set_params(n_estimators=BOOST_ROUNDS)
+        updated.fit(Xt, y_new, xgb_model=estimator.get_booster())
+    elif kind in ('LGBMClassifier', 'HistLGBMClassifier'):
+        updated = clone(estimator).set_params(n_estimators=BOOST_ROUNDS)
+        updated.fit(align_categories(Xt, estimator.booster_), y_new, init_model=estimator.booster_)
+    elif kind == 'RandomForestClassifier':
+        updated = copy.deepcopy(estimator)
+        updated.set_params(warm_start=True, n_estimators=len(updated.estimators_) + RF_NEW_TREES)
+        updated.fit(Xt, y_new)
+        if len(updated.estimators_) > RF_MAX_TREES:
+            updated.estimators_ = updated.estimators_[-RF_MAX_TREES:]
+            updated.n_estimators = RF_MAX_TREES
+    elif kind == 'LogisticRegression':
+        updated = copy.deepcopy(estimator)
+        updated.set_params(warm_start=True, max_iter=LR_UPDATE_ITER)
+        with warnings.catch_warnings():
+            # A capped number of steps from the old optimum is the point, not a failure
+            warnings.simplefilter('ignore', ConvergenceWarning)
+            updated.fit(Xt, y_new)
+    else:
+        raise TypeError(f"No incremental update for {kind}")
+    return _assemble(prep_steps, name, updated)
+
+def _rebuild(ensemble, fitted):
+    # Same ensemble type over the updated base learners; a stacking meta-learner is kept
+    # as-is (it combines probabilities, which the updates keep on the same scale)
+    if isinstance(ensemble, PrefitStacking):
+        rebuilt = PrefitStacking(fitted, final_estimator=ensemble.final_estimator)
+        rebuilt.final_estimator_ = ensemble.final_estimator_
+        return rebuilt
+    if isinstance(ensemble, PrefitVoting):
+        return PrefitVoting(fitted, weights=ensemble.weights)
+    raise TypeError(f"Unsupported ensemble type {type(ensemble).__name__}")
+
+def full_retrain(ensemble, X, y, tuned=None):
+    """
+    Trains a fresh ensemble of the same type on (X, y), as train_ensemble.py does.
+    """
+    cache = BaseModelCache(make_base_estimators(tuned), cv=3).fit(X, y)
+    if isinstance(ensemble, PrefitStacking):
+        return PrefitStacking(cache.fitted(), final_estimator=clone(ensemble.final_estimator)).fit(cache.oof, y)
+    return PrefitVoting(cache.fitted(), weights=getattr(ensemble, 'weights', None))
+
+# --- 2. Monthly refresh ---
+def retrain(ensemble, X_new, y_new, history=None, retrain_full=None, auc_tolerance=AUC_TOLERANCE):
+    """
+    Updates every base learner of `ensemble` on the new month's rows. A stratified
+    VALID_FRACTION of the new rows is held out: if the updated ensemble's AUC there is more
+    than `auc_tolerance` below the current model's, the update is discarded and the model is
+    retrained from scratch on history + new rows (`retrain_full(X, y)`, default full_retrain).
+    `history` is a callable returning (X, y) of the earlier data; it is only called on fallback.
+
+    Returns (model, report).
+    """
+    X_new = X_new[list(ensemble.feature_names_in_)]
+    y_new = np.asarray(y_new)
+    report = {'new_rows': len(y_new), 'mode': 'incremental', 'learner_seconds': {}}
+
+    missing = set(ensemble.classes_) - set(np.unique(y_new))
+    if missing:
+        # Warm-started learners must keep the class layout they were trained with
+        report['reason'] = f"new data lacks classes {sorted(missing)}"
+        updated = None
+    else:
+        X_fit, X_valid, y_fit, y_valid = train_test_split(
+            X_new, y_new, test_size=VALID_FRACTION, random_state=RANDOM_STATE, stratify=y_new
+        )
+        start = time.perf_counter()
+        fitted = []
+        for name, model in ensemble.named_estimators_.items():
+            learner_start = time.perf_counter()
+            fitted.append((name, update_learner(model, X_fit, y_fit)))
+            report['learner_seconds'][name] = round(time.perf_counter() - learner_start, 3)
+        updated = _rebuild(ensemble, fitted)
+        report['update_seconds'] = round(time.perf_counter() - start, 3)
+        report['auc_before'] = _auc(ensemble, X_valid, y_valid)
+        report['auc_after'] = _auc(updated, X_valid, y_valid)
+        if report['auc_after'] < report['auc_before'] - auc_tolerance:
+            report['reason'] = (f"validation AUC fell {report['auc_before']:.4f} -> {report['auc_after']:.4f}")
+            updated = None
+
+    if updated is not None:
+        return updated, report
+
+    print(f"[RETRAIN] Falling back to a full retrain: {report['reason']}")
+    report['mode'] = 'full'
+    if history is not None:
+        X_hist, y_hist = history()
+        X_all = pd.concat([X_hist[X_new.columns], X_new], ignore_index=True)
+        y_all = np.concatenate([np.asarray(y_hist), y_new])
+    else:
+        X_all, y_all = X_new, y_new
+    for col in X_all.columns:
+        # Categoricals with different level sets concatenate to plain text; recast to one set
+        if isinstance(X_new[col].dtype, pd.CategoricalDtype):
+            X_all[col] = X_all[col].astype(str).astype('category')
+    start = time.perf_counter()
+    retrain_full = retrain_full or (lambda X, y: full_retrain(ensemble, X, y, load_params()))
+    model = retrain_full(X_all, y_all)
+    report['full_seconds'] = round(time.perf_counter() - start, 3)
+    report['full_rows'] = len(y_all)
+    return model, report
+
+def load_new_data(path):
+    """
+    A month of preprocessed, labelled rows (the create_dataset layout with a 'target'
+    column) from a .pkl or .csv file. Text columns become categoricals.
+    """
+    df = pd.read_pickle(path) if path.endswith('.pkl') else pd.read_csv(path)
+    for col in df.select_dtypes(include=['object', 'string']).columns:
+        df[col] = df[col].astype(str).astype('category')
+    return df.drop(columns=['target']), df['target']
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm-start the saved ensemble on a new month of labelled data.")
+    parser.add_argument('new_data', help="Preprocessed labelled rows (.pkl or .csv, with a 'target' column)")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--auc-tolerance', type=float, default=AUC_TOLERANCE)
+    args = parser.parse_args()
+
+    with open(args.model, 'rb') as f:
+        ensemble = pickle.load(f)
+    X_new, y_new = load_new_data(args.new_data)
+    print(f"[RETRAIN] {len(y_new)} new rows for {type(ensemble).__name__}")
+
+    def history():
+        # The saved model's columns only (a feature-selected model reads fewer)
+        df = load_dataset(native_categoricals=True, features=list(ensemble.feature_names_in_))
+        return df.drop(columns=['target']), df['target']
+
+    model, report = retrain(ensemble, X_new, y_new, history=history, auc_tolerance=args.auc_tolerance)
+    if report['mode'] == 'incremental':
+        print(f"[RETRAIN] Incremental update in {report['update_seconds']:.1f}s "
+              f"(per learner: {report['learner_seconds']}); validation AUC "
+              f"{report['auc_before']:.4f} -> {report['auc_after']:.4f}")
+    else:
+        print(f"[RETRAIN] Full retrain on {report['full_rows']} rows in {report['full_seconds']:.1f}s")
+
+    # Keep the previous model next to the new one for rollback
+    os.replace(args.model, args.model.replace('.pkl', '_prev.pkl'))
+    with open(args.model, 'wb') as f:
+        pickle.dump(model, f)
+    print(f"[RETRAIN] Saved model to {args.model}")
+    # The replaced model's extras (model_name, feature_selection, ...) still describe this one
+    registry_path = save_model(model, extra={**manifest_extras(), 'retrain': report})
+    print(f"[RETRAIN] Saved registry artifacts to {registry_path}")
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,12 @@ import numpy as np
 import os
 import sys
 import pickle
+import time
 from sklearn.model_selection import train_test_split, StratifiedKFold
 from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier, VotingClassifier, StackingClassifier
-from xgboost import XGBClassifier
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score, confusion_matrix, classification_report
 
 # Add project root to path
@@ -14,15 +16,26 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(current_dir))
 if project_root not in sys.path:
     sys.path.append(project_root)
+# src/models: shared model code (ensembles, preprocessing)
+models_dir = os.path.dirname(current_dir)
+if models_dir not in sys.path:
+    sys.path.append(models_dir)
+
+from ensembles import BaseModelCache, PrefitVoting, PrefitStacking
+from xgb_training import HistXGBClassifier
+from lgbm_training import HistLGBMClassifier
+from tune_hyperparams import load_params
+from model_registry import save_model
+from feature_selection import SELECTION_ENABLED, select_features
 
 try:
-    from project.src.preprocessing import create_dataset
+    from project.src.preprocessing import load_dataset, OrdinalCategories
 except ImportError:
     try:
-        from preprocessing import create_dataset
+        from preprocessing import load_dataset, OrdinalCategories
     except ImportError:
          sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-         from preprocessing import create_dataset
+         from preprocessing import load_dataset, OrdinalCategories
 
 def get_metrics(y_true, y_pred, y_prob=None):
     acc = accuracy_score(y_true, y_pred)
@@ -44,10 +57,27 @@ def get_metrics(y_true, y_pred, y_prob=None):
     cm = confusion_matrix(y_true, y_pred)
     return {'Accuracy': acc, 'Precision': prec, 'Recall': rec, 'F1 Score': f1, 'ROC-AUC': auc, 'Confusion Matrix': cm}
 
+def make_base_estimators(tuned=None):
+    """
+    Unfitted (name, estimator) base learners of the ensembles; `tuned` ({name: params}, as
+    load_params() returns) overrides the defaults.
+    """
+    tuned = tuned or {}
+    lr = Pipeline([('ordinal', OrdinalCategories()), ('scaler', StandardScaler()),
+                   ('clf', LogisticRegression(**{'max_iter': 1000, 'random_state': 42, **tuned.get('lr', {})}))])
+    rf = Pipeline([('ordinal', OrdinalCategories()),
+                   ('clf', RandomForestClassifier(**{'n_estimators': 100, 'random_state': 42, **tuned.get('rf', {})}))])
+    # hist trees, early stopping on a held-out slice of each fit
+    xgb = Pipeline([('ordinal', OrdinalCategories()), ('clf', HistXGBClassifier(**tuned.get('xgb', {})))])
+    lgbm = HistLGBMClassifier(**tuned.get('lgbm', {}))  # native categorical splits, same early stopping
+    return [('lr', lr), ('rf', rf), ('xgb', xgb), ('lgbm', lgbm)]
+
 def main():
     print("Loading and preprocessing data...")
     try:
-        df = create_dataset()
+        # Categoricals stay pandas categories: LightGBM splits on them natively, the other
+        # learners get their integer codes from an OrdinalCategories step
+        df = load_dataset(native_categoricals=True)
     except Exception as e:
         print(f"Error creating dataset: {e}")
         return
@@ -60,34 +90,49 @@ def main():
     X = df.drop(columns=[target_col])
     y = df[target_col]
     
-    # Ensure numeric
-    X = X.select_dtypes(include=[np.number])
+    # Ensure numeric (or categorical)
+    X = X.select_dtypes(include=[np.number, 'category'])
     
     # Split
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-    
-    # Base Models
-    lr = LogisticRegression(max_iter=1000, random_state=42)
-    rf = RandomForestClassifier(n_estimators=100, random_state=42)
-    xgb = XGBClassifier(eval_metric='mlogloss', use_label_encoder=False, random_state=42)
-    
-    estimators = [('lr', lr), ('rf', rf), ('xgb', xgb)]
+
+    # Feature selection on the training rows: the pruned list is saved in the registry
+    # manifest, and scoring reads only those columns (FEATURE_SELECTION=0 keeps them all)
+    selection = None
+    if SELECTION_ENABLED:
+        print("\n--- Feature Selection ---")
+        selection = select_features(X_train, y_train)
+        X_train, X_test = X_train[selection['features']], X_test[selection['features']]
+    
+    # Base Models (tune_hyperparams.py output overrides the defaults)
+    estimators = make_base_estimators(load_params())
+    
+    # Fit each base model once and compute its out-of-fold probabilities once (3-fold, as the
+    # stacking CV used); both ensembles are assembled from these fitted artifacts
+    print("\n--- Training Base Models ---")
+    train_start = time.perf_counter()
+    cache = BaseModelCache(estimators, cv=3).fit(X_train, y_train)
     
     # 1. Soft Voting Ensemble
-    print("\n--- Training Soft Voting Ensemble ---")
-    voting_clf = VotingClassifier(estimators=estimators, voting='soft')
-    voting_clf.fit(X_train, y_train)
+    print("\n--- Assembling Soft Voting Ensemble ---")
+    voting_clf = PrefitVoting(cache.fitted())
     
     # 2. Stacking Ensemble
-    print("\n--- Training Stacking Ensemble ---")
-    stacking_clf = StackingClassifier(estimators=estimators, final_estimator=LogisticRegression(), cv=3)
-    stacking_clf.fit(X_train, y_train)
+    print("\n--- Training Stacking Meta-Learner ---")
+    stacking_clf = PrefitStacking(cache.fitted(), final_estimator=LogisticRegression()).fit(cache.oof, y_train)
+    train_seconds = time.perf_counter() - train_start
+    
+    timings = cache.timing_report()
+    print(f"Training wall-clock: {train_seconds:.1f}s (base fits {timings['fit_s']:.1f}s, out-of-fold {timings['oof_s']:.1f}s)")
+    print(f"Refitting per ensemble would take ~{timings['refit_s']:.1f}s: saved ~{timings['saved_s']:.1f}s "
+          f"({timings['saved_s'] / max(timings['refit_s'], 1e-9):.0%})")
     
     # Evaluation
     models = {
-        'Logistic Regression': lr,
-        'Random Forest': rf,
-        'XGBoost': xgb,
+        'Logistic Regression': cache.models['lr'],
+        'Random Forest': cache.models['rf'],
+        'XGBoost': cache.models['xgb'],
+        'LightGBM': cache.models['lgbm'],
         'Voting Ensemble': voting_clf,
         'Stacking Ensemble': stacking_clf
     }
@@ -102,9 +147,6 @@ def main():
     print("\n--- Model Evaluation ---")
     for name, model in models.items():
         print(f"Evaluating {name}...")
-        if name not in ['Voting Ensemble', 'Stacking Ensemble']:
-            model.fit(X_train, y_train)
-            
         y_pred = model.predict(X_test)
         if hasattr(model, "predict_proba"):
             y_prob = model.predict_proba(X_test)
@@ -176,6 +218,12 @@ def main():
         pickle.dump(model_to_save, f)
         
     print(f"Saved best ensemble model ({best_ensemble_name}) to {save_path}")
+    
+    # Serving copy: native boosters + NumPy arrays + manifest, read by generate_data.py and
+    # evaluate_all.py. The pickle above stays the training checkpoint (retrain_incremental.py)
+    registry_path = save_model(model_to_save, extra={'model_name': best_ensemble_name, 'training_rows': len(y_train),
+                                                     'feature_selection': selection})
+    print(f"Saved registry artifacts to {registry_path}")
 
 if __name__ == "__main__":
     main()
@@ -5,7 +5,6 @@ import seaborn as sns
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
-from xgboost import XGBClassifier
 from sklearn.metrics import accuracy_score, classification_report, f1_score, roc_auc_score
 import sys
 import os
@@ -26,6 +25,13 @@ except ImportError:
          sys.path.append(os.path.dirname(os.path.abspath(__file__)))
          from preprocessing import create_dataset
 
+# src/models: shared model code
+models_dir = os.path.dirname(current_dir)
+if models_dir not in sys.path:
+    sys.path.append(models_dir)
+
+from xgb_training import fit_xgb
+
 def train_sklearn_models(X_train, y_train):
     print("Training Logistic Regression...")
     lr = LogisticRegression(max_iter=1000, random_state=42)
@@ -39,9 +45,8 @@ def train_sklearn_models(X_train, y_train):
 
 def train_xgboost(X_train, y_train):
     print("Training XGBoost...")
-    xgb = XGBClassifier(use_label_encoder=False, eval_metric='mlogloss', random_state=42)
-    xgb.fit(X_train, y_train)
-    return xgb
+    # Hist trees with early stopping on a held-out fold of the training data
+    return fit_xgb(X_train, y_train)
 
 def evaluate_models(models, X_test, y_test):
     results = {}
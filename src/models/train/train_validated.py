@@ -3,10 +3,9 @@ import numpy as np
 import os
 import sys
 import pickle
-from sklearn.model_selection import StratifiedKFold, cross_validate, train_test_split
+from sklearn.model_selection import StratifiedKFold, train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
-from xgboost import XGBClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score, confusion_matrix, make_scorer
@@ -16,6 +15,13 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(current_dir))
 if project_root not in sys.path:
     sys.path.append(project_root)
+# src/models: shared model code (train_scheduler, preprocessing)
+models_dir = os.path.dirname(current_dir)
+if models_dir not in sys.path:
+    sys.path.append(models_dir)
+
+from train_scheduler import TrainScheduler, TOTAL_THREADS
+from xgb_training import QuantileCache, cross_validate_xgb, fit_xgb
 
 try:
     from project.src.preprocessing import create_dataset
@@ -85,9 +91,19 @@ def main():
             ('scaler', StandardScaler()),
             ('clf', LogisticRegression(max_iter=1000, random_state=42))
         ]),
-        'Random Forest': RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1),
-        'XGBoost': XGBClassifier(eval_metric='mlogloss', use_label_encoder=False, random_state=42, n_jobs=-1)
+        'Random Forest': RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
     }
+    # XGBoost runs in the scheduler too, but in-process: its CV folds and final fit share one
+    # QuantileCache (one quantile sketch of the training split, each fold's matrices built once)
+    xgb_cache = QuantileCache(X_train, y_train)
+
+    def xgb_cv(folds, threads):
+        xgb_cache.nthread = threads
+        return cross_validate_xgb(xgb_cache, cv=folds)
+
+    def xgb_fit(threads):
+        xgb_cache.nthread = threads
+        return fit_xgb(X_train, y_train, cache=xgb_cache)
     
     # 5. Cross-Validation (5-Fold Stratified)
     scoring = {
@@ -96,12 +112,16 @@ def main():
         'roc_auc_ovr': 'roc_auc_ovr'
     }
     
+    # All model x fold jobs share one process pool; inner n_jobs are sized so the total
+    # thread count stays at the core budget instead of nesting n_jobs=-1 inside n_jobs=-1
     print("\n📊 Performing 5-Fold Stratified Cross-Validation...")
+    scheduler = TrainScheduler(total_threads=TOTAL_THREADS)
+    cv_all = scheduler.cross_validate(models, X_train, y_train, cv=5, scoring=scoring, local={'XGBoost': xgb_cv})
+    print(f"   XGBoost best iterations per fold: {cv_all['XGBoost']['best_iteration'].tolist()}")
     cv_results_summary = []
     
-    for name, model in models.items():
-        print(f"   Running CV for {name}...")
-        cv_scores = cross_validate(model, X_train, y_train, cv=5, scoring=scoring, n_jobs=-1)
+    for name in cv_all:
+        cv_scores = cv_all[name]
         
         mean_acc = np.mean(cv_scores['test_accuracy'])
         std_acc = np.std(cv_scores['test_accuracy'])
@@ -123,13 +143,19 @@ def main():
     # 6. Final Evaluation on Test Set
     print("\n--- 📊 Step 4: Final Evaluation on Clean Test Set ---")
     test_results = []
-    trained_models = {}
     
-    for name, model in models.items():
-        # Fit on full training data
-        model.fit(X_train, y_train)
-        trained_models[name] = model
-        
+    # Fit on full training data (all models in parallel under the same budget)
+    trained_models = scheduler.fit_all(models, X_train, y_train, local={'XGBoost': xgb_fit})
+    print(f"   XGBoost: {xgb_cache.builds} matrices built in {xgb_cache.build_seconds:.1f}s for CV and the final fit")
+    print(scheduler.format_report())
+    # Job timings go with the script's other outputs, whatever the working directory
+    reports_dir = os.path.join(current_dir, 'reports')
+    os.makedirs(reports_dir, exist_ok=True)
+    jobs_path = os.path.join(reports_dir, 'training_jobs.csv')
+    scheduler.report().to_csv(jobs_path, index=False)
+    print(f"Saved job timings to {jobs_path}")
+    
+    for name, model in trained_models.items():
         if hasattr(model, 'predict_proba'):
              # Access step inside pipeline if needed, but Pipeline handles predict/predict_proba
             y_pred = model.predict(X_test)
@@ -156,7 +182,7 @@ def main():
     # Check 1: Random Target Shuffle
     print("\n[Check 1] Retraining Random Forest with Shuffled Target (Expect ~Random Accuracy)...")
     y_shuffled = np.random.permutation(y_train)
-    rf_sanity = RandomForestClassifier(n_estimators=50, random_state=42, n_jobs=-1)
+    rf_sanity = RandomForestClassifier(n_estimators=50, random_state=42, n_jobs=TOTAL_THREADS)
     rf_sanity.fit(X_train, y_shuffled)
     y_sanity_pred = rf_sanity.predict(X_test)
     sanity_acc = accuracy_score(y_test, y_sanity_pred)
@@ -179,8 +205,7 @@ def main():
     X_train_reduced = X_train.drop(columns=top_3_features)
     X_test_reduced = X_test.drop(columns=top_3_features)
     
-    xgb_reduced = XGBClassifier(eval_metric='mlogloss', use_label_encoder=False, random_state=42, n_jobs=-1)
-    xgb_reduced.fit(X_train_reduced, y_train)
+    xgb_reduced = fit_xgb(X_train_reduced, y_train, nthread=TOTAL_THREADS)
     y_red_pred = xgb_reduced.predict(X_test_reduced)
     red_acc = accuracy_score(y_test, y_red_pred)
     
@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import StratifiedKFold
+
+try:
+    from threadpoolctl import threadpool_limits  # Installed with scikit-learn; caps BLAS/OpenMP pools
+except ImportError:
+    threadpool_limits = None
+
+# --- SCHEDULER CONFIGURATION ---
+# Global thread budget: (concurrent jobs) x (threads per job) never exceeds this
+TOTAL_THREADS = int(os.environ.get("TRAIN_THREADS", os.cpu_count() or 1))
+THREAD_PARAMS = ("n_jobs", "nthread", "num_threads", "thread_count")
+
+def plan_threads(n_jobs, total_threads=TOTAL_THREADS, max_workers=None):
+    """
+    Splits the thread budget: as many concurrent jobs as there are jobs (up to the budget),
+    each getting an equal share of the threads. Returns (workers, threads_per_job).
+    """
+    total_threads = max(1, int(total_threads))
+    workers = max(1, min(n_jobs, total_threads, max_workers or total_threads))
+    return workers, max(1, total_threads // workers)
+
+def set_estimator_threads(estimator, threads):
+    """
+    Sets every n_jobs / nthread style parameter (including inside pipelines) to `threads`.
+    Unset scikit-learn parameters are left alone (None already means one job there), while
+    XGBoost / LightGBM take None as "all cores" and are always capped.
+    """
+    all_params = estimator.get_params(deep=True)
+    params = {}
+    for key, value in all_params.items():
+        path, _, param = key.rpartition("__")
+        if param not in THREAD_PARAMS:
+            continue
+        owner = all_params[path] if path else estimator
+        if value is None and type(owner).__module__.startswith("sklearn"):
+            continue
+        params[key] = threads
+    if params:
+        estimator.set_params(**params)
+    return estimator
+
+# --- Worker process state (set once per worker, not shipped with every job) ---
+_WORKER = {}
+
+def _init_worker(X, y, threads, set_env=True):
+    _WORKER["X"] = X
+    _WORKER["y"] = y
+    _WORKER["threads"] = threads
+    if set_env:
+        # Stop OpenMP / BLAS inside the worker from spawning a pool per core
+        for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ[var] = str(threads)
+
+def _subset(data, idx):
+    if idx is None:
+        return data
+    return data.iloc[idx] if hasattr(data, "iloc") else data[idx]
+
+def _run_job(job):
+    """
+    Fits one model on one fold (or the full data when the job has no test rows) and scores it.
+    Wall time and process CPU time are measured around the fit and scoring.
+    """
+    name, fold, estimator, train_idx, test_idx, scoring = job
+    X, y, threads = _WORKER["X"], _WORKER["y"], _WORKER["threads"]
+    estimator = set_estimator_threads(clone(estimator), threads)
+
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    if threadpool_limits is not None:
+        with threadpool_limits(limits=threads):
+            estimator.fit(_subset(X, train_idx), _subset(y, train_idx))
+    else:
+        estimator.fit(_subset(X, train_idx), _subset(y, train_idx))
+    fit_time = time.perf_counter() - wall_start
+
+    score_start = time.perf_counter()
+    scores = {}
+    if test_idx is not None:
+        X_test, y_test = _subset(X, test_idx), _subset(y, test_idx)
+        scores = {key: get_scorer(scorer)(estimator, X_test, y_test) for key, scorer in scoring.items()}
+    score_time = time.perf_counter() - score_start
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    return {
+        "model": name,
+        "fold": fold,
+        "threads": threads,
+        "pid": os.getpid(),
+        "fit_time": fit_time,
+        "score_time": score_time,
+        "wall_s": wall,
+        "cpu_s": cpu,
+        # Share of the job's thread allowance actually kept busy
+        "cpu_utilization": cpu / (wall * threads) if wall > 0 else 0.0,
+        "scores": scores,
+        "estimator": estimator if test_idx is None else None
+    }
+
+class TrainScheduler:
+    """
+    Runs model x fold training jobs in a process pool under a global thread budget.
+
+    Instead of nesting parallelism (cross_validate(n_jobs=-1) around RandomForest/XGBoost with
+    n_jobs=-1, i.e. cores x cores threads), jobs run `workers` at a time and each model's inner
+    n_jobs / nthread is set to total_threads // workers. Every job's wall time, CPU time and
+    utilization is kept in `job_log` for tuning the budget on the training box.
+    """
+    def __init__(self, total_threads=TOTAL_THREADS, max_workers=None):
+        self.total_threads = max(1, int(total_threads))
+        self.max_workers = max_workers
+        self.job_log = []
+
+    def _run_local(self, local, threads, fold):
+        # In-process jobs: callables taking their thread share; timed like pool jobs
+        out = {}
+        for name, job in local.items():
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            out[name] = job(threads)
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            self.job_log.append({
+                "model": name, "fold": fold, "threads": threads, "pid": os.getpid(),
+                "fit_time": wall, "score_time": 0.0, "wall_s": wall, "cpu_s": cpu,
+                "cpu_utilization": cpu / (wall * threads) if wall > 0 else 0.0
+            })
+        return out
+
+    def _run(self, jobs, X, y, local=None, local_fold=None):
+        """
+        Runs `jobs` in the pool and the `local` callables ({name: fn(threads)}) in this process;
+        a local job takes one worker slot and runs in a thread beside the pool. Returns
+        (pool results, {name: local result}).
+        """
+        local = local or {}
+        workers, threads = plan_threads(len(jobs) + len(local), self.total_threads, self.max_workers)
+        print(f"[SCHEDULER] {len(jobs) + len(local)} jobs on {workers} workers x {threads} threads "
+              f"(budget {self.total_threads})")
+        pool_workers = workers - 1 if local and jobs and workers > 1 else workers
+        local_out, errors = {}, []
+
+        def run_local():
+            try:
+                local_out.update(self._run_local(local, threads, local_fold))
+            except BaseException as e:
+                errors.append(e)
+
+        if pool_workers == workers:
+            # One slot: local jobs and then pool jobs, one at a time
+            run_local()
+            thread = None
+        else:
+            thread = threading.Thread(target=run_local)
+            thread.start()
+        try:
+            if not jobs:
+                results = []
+            elif pool_workers == 1:
+                # No pool needed: run in-process with the same thread limits
+                _init_worker(X, y, threads, set_env=False)
+                try:
+                    results = [_run_job(job) for job in jobs]
+                finally:
+                    _WORKER.clear()
+            else:
+                with ProcessPoolExecutor(max_workers=pool_workers, initializer=_init_worker,
+                                         initargs=(X, y, threads)) as pool:
+                    results = list(pool.map(_run_job, jobs))
+        finally:
+            if thread is not None:
+                thread.join()
+        if errors:
+            raise errors[0]
+        self.job_log.extend({k: v for k, v in r.items() if k not in ("scores", "estimator")} for r in results)
+        return results, local_out
+
+    def cross_validate(self, models, X, y, cv=5, scoring=None, local=None):
+        """
+        Cross-validates every model in `models` ({name: estimator}) with all model x fold jobs
+        sharing one pool. Returns {name: dict like sklearn's cross_validate: fit_time,
+        score_time and test_<metric> arrays}. `local` ({name: fn(folds, threads)} returning
+        such a dict) are CV runs that must stay in this process, e.g. XGBoost on a shared
+        QuantileCache whose matrices cannot be sent to workers; they get the same folds and
+        one job's share of the thread budget.
+        """
+        scoring = scoring or {"score": "accuracy"}
+        if isinstance(scoring, str):
+            scoring = {"score": scoring}
+        splitter = StratifiedKFold(n_splits=cv) if isinstance(cv, int) else cv
+        folds = list(splitter.split(X, y))
+        jobs = [
+            (name, fold, model, train_idx, test_idx, scoring)
+            for name, model in models.items()
+            for fold, (train_idx, test_idx) in enumerate(folds)
+        ]
+        local = {name: (lambda threads, fn=fn: fn(folds, threads)) for name, fn in (local or {}).items()}
+        pool_results, local_results = self._run(jobs, X, y, local, local_fold="cv")
+        results = {}
+        for r in pool_results:
+            out = results.setdefault(r["model"], {"fit_time": [], "score_time": []})
+            out["fit_time"].append(r["fit_time"])
+            out["score_time"].append(r["score_time"])
+            for key, value in r["scores"].items():
+                out.setdefault(f"test_{key}", []).append(value)
+        results = {name: {k: np.array(v) for k, v in out.items()} for name, out in results.items()}
+        results.update(local_results)
+        return results
+
+    def fit_all(self, models, X, y, local=None):
+        """
+        Fits every model on the full data in parallel; returns {name: fitted estimator}.
+        `local` ({name: fn(threads)} returning a fitted model) run in this process, as in
+        cross_validate.
+        """
+        jobs = [(name, None, model, None, None, {}) for name, model in models.items()]
+        pool_results, local_results = self._run(jobs, X, y, local)
+        fitted = {r["model"]: r["estimator"] for r in pool_results}
+        fitted.update(local_results)
+        return fitted
+
+    def report(self):
+        """
+        Per-job timings as a DataFrame.
+        """
+        return pd.DataFrame(self.job_log)
+
+    def format_report(self):
+        df = self.report()
+        if df.empty:
+            return "[SCHEDULER] No jobs run."
+        lines = ["[SCHEDULER] Job timings:"]
+        for row in df.itertuples(index=False):
+            if isinstance(row.fold, str):
+                fold = row.fold     # A local job's folds, run together
+            else:
+                fold = "full" if row.fold is None or pd.isna(row.fold) else f"fold {int(row.fold)}"
+            lines.append(f"  {row.model:<22} {fold:<7} {row.threads:>3} thr {row.wall_s:>8.2f}s wall "
+                         f"{row.cpu_s:>8.2f}s cpu {row.cpu_utilization:>6.0%} util")
+        summary = df.groupby("model").agg(wall_s=("wall_s", "sum"), cpu_s=("cpu_s", "sum"),
+                                          cpu_utilization=("cpu_utilization", "mean"))
+        lines.append("  Per model (summed over jobs):")
+        for model, row in summary.iterrows():
+            lines.append(f"  {model:<22} {row.wall_s:>8.2f}s wall {row.cpu_s:>8.2f}s cpu {row.cpu_utilization:>6.0%} mean util")
+        return "\n".join(lines)
@@ -0,0 +1,297 @@
+import json
+
+import numpy as np
+
+# Tree compiler: random forests, XGBoost and LightGBM boosters flattened into one node-array
+# layout, scored by a vectorized NumPy traversal. Scoring a compiled model needs neither
+# scikit-learn nor the boosting libraries, and has no per-tree or per-call library overhead.
+#
+# Node arrays (all trees concatenated; the two children of a node are adjacent):
+#   child                             left child (right child = child + 1); a leaf points to itself
+#   feature, threshold                go right when x > threshold (leaves: +inf, so they stay put)
+#   default_left                      direction for missing values (NaN, LightGBM's "zero")
+#   value                             leaf outputs, one column per model output
+#   roots                             first node of each tree
+# Optional, LightGBM only:
+#   zero_missing                      node also treats |x| <= 1e-35 as missing
+#   cat_offset, cat_len, cat_table    categorical splits: codes going left, as flat bitsets
+# Thresholds are stored in the dtype the library compares features in, rewritten so the one
+# `x > threshold` test reproduces each library's own comparison exactly (XGBoost's float32
+# `x < split`, scikit-learn's float32 feature against a float64 threshold).
+
+CHUNK_ROWS = 4096               # Rows per traversal batch (bounds the trees x rows index arrays)
+COMPACT_EVERY = 2               # Levels between dropping (tree, row) pairs that reached a leaf
+ZERO_THRESHOLD = 1e-35          # LightGBM's kZeroThreshold
+
+def _floor(threshold, dtype):
+    # Largest `dtype` value <= threshold: `x <= threshold` <=> `x <= _floor(threshold)` for x in dtype
+    rounded = np.asarray(threshold, dtype=np.float64).astype(dtype)
+    return np.where(rounded.astype(np.float64) > threshold, np.nextafter(rounded, dtype(-np.inf)), rounded)
+
+class _TreeBuilder:
+    def __init__(self, width, dtype):
+        self.width = width
+        self.dtype = dtype
+        self.nodes = {key: [] for key in ('child', 'feature', 'threshold', 'default_left', 'zero_missing',
+                                          'value', 'cat_offset', 'cat_len')}
+        self.roots = []
+        self.cat_table = []
+        self.n_nodes = 0
+        self.n_cat_bits = 0
+
+    def add_tree(self, left, right, feature, threshold, default_left, value,
+                 zero_missing=None, categories=None):
+        """
+        Appends one tree given its local node arrays (-1 children = leaf, node 0 = root),
+        splitting left when x <= threshold. `value` is (n_nodes, width); `categories` maps
+        node -> codes going left for categorical splits.
+        """
+        left, right = np.asarray(left, dtype=np.int64), np.asarray(right, dtype=np.int64)
+        n = len(left)
+        internal = np.flatnonzero(left != -1)
+        # Renumber so each node's children are adjacent: root, then (left, right) per split
+        order = np.concatenate([[0], np.column_stack([left[internal], right[internal]]).ravel()])
+        new_id = np.empty(n, dtype=np.int64)
+        new_id[order] = np.arange(n) + self.n_nodes
+        is_leaf = left[order] == -1
+        child = np.where(is_leaf, new_id[order], new_id[np.maximum(left[order], 0)])
+        threshold = np.where(is_leaf, np.inf, _floor(np.where(is_leaf, 0.0, np.asarray(threshold, dtype=np.float64)[order]), self.dtype))
+        cat_offset, cat_len = np.full(n, -1, dtype=np.int64), np.zeros(n, dtype=np.int64)
+        for node, codes in (categories or {}).items():
+            bits = np.zeros(max(codes) + 1 if codes else 0, dtype=bool)
+            bits[codes] = True
+            position = new_id[node] - self.n_nodes
+            cat_offset[position], cat_len[position] = self.n_cat_bits, len(bits)
+            self.cat_table.append(bits)
+            self.n_cat_bits += len(bits)
+        self.nodes['child'].append(child)
+        self.nodes['feature'].append(np.where(is_leaf, 0, np.asarray(feature)[order]))
+        self.nodes['threshold'].append(threshold.astype(self.dtype))
+        # A leaf keeps missing values in place too
+        self.nodes['default_left'].append(is_leaf | np.asarray(default_left, dtype=bool)[order])
+        self.nodes['zero_missing'].append(np.zeros(n, dtype=bool) if zero_missing is None
+                                          else np.asarray(zero_missing, dtype=bool)[order])
+        self.nodes['value'].append(np.asarray(value, dtype=np.float64).reshape(n, self.width)[order])
+        self.nodes['cat_offset'].append(cat_offset)
+        self.nodes['cat_len'].append(cat_len)
+        self.roots.append(self.n_nodes)
+        self.n_nodes += n
+
+    def arrays(self):
+        nodes = {key: np.concatenate(parts) for key, parts in self.nodes.items()}
+        arrays = {
+            'child': nodes['child'].astype(np.int32),
+            'feature': nodes['feature'].astype(np.int32),
+            'threshold': nodes['threshold'],
+            'default_left': nodes['default_left'],
+            'value': nodes['value'],
+            'roots': np.asarray(self.roots, dtype=np.int32)
+        }
+        if nodes['zero_missing'].any():
+            arrays['zero_missing'] = nodes['zero_missing']
+        if self.cat_table:
+            arrays['cat_offset'] = nodes['cat_offset'].astype(np.int32)
+            arrays['cat_len'] = nodes['cat_len'].astype(np.int32)
+            arrays['cat_table'] = np.concatenate(self.cat_table)
+        return arrays
+
+def _meta(link, n_trees, intercept, precision):
+    # link: how summed leaf outputs become probabilities ('mean', 'sigmoid' or 'softmax');
+    # precision: dtype the features are cast to before comparing, as the library does
+    return {'link': link, 'n_trees': int(n_trees), 'intercept': [float(v) for v in np.atleast_1d(intercept)],
+            'precision': precision}
+
+# --- 1. Compilers (fitted model -> (arrays, meta), or None when it cannot be compiled) ---
+def compile_forest(forest):
+    """
+    A fitted RandomForestClassifier. Leaves hold class fractions; the forest averages them.
+    """
+    builder = _TreeBuilder(len(forest.classes_), np.float32)
+    for tree in (t.tree_ for t in forest.estimators_):
+        leaf_value = tree.value[:, 0, :]
+        builder.add_tree(tree.children_left, tree.children_right, tree.feature, tree.threshold,
+                         getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count)),
+                         leaf_value / np.maximum(leaf_value.sum(axis=1, keepdims=True), 1e-300))
+    return builder.arrays(), _meta('mean', len(forest.estimators_), 0.0, 'float32')
+
+def _calibrate_intercept(arrays, meta, raw_margin, n_features):
+    # The margin the library adds on top of the trees (base_score, boost_from_average),
+    # read off an all-zero row rather than re-deriving each library version's convention
+    probe = np.zeros((1, n_features))
+    meta['intercept'] = [0.0] * arrays['value'].shape[1]
+    trees = raw_margin(probe) - TreeScorer(arrays, meta).margin(probe)
+    meta['intercept'] = [float(v) for v in trees[0]]
+    return arrays, meta
+
+def compile_xgboost(booster):
+    """
+    A gbtree xgboost.Booster with a logistic / softmax objective and numeric splits.
+    """
+    model = json.loads(booster.save_raw('json'))['learner']
+    objective = model['objective']['name']
+    if model['gradient_booster']['name'] != 'gbtree' or objective not in ('binary:logistic', 'multi:softprob', 'multi:softmax'):
+        return None
+    gbtree = model['gradient_booster']['model']
+    width = max(int(model['learner_model_param']['num_class']), 1)
+    builder = _TreeBuilder(width, np.float32)
+    for tree, group in zip(gbtree['trees'], gbtree['tree_info']):
+        if any(tree['split_type']) or int(tree['tree_param'].get('size_leaf_vector', '1')) > 1:
+            return None
+        left = np.asarray(tree['left_children'])
+        split = np.asarray(tree['split_conditions'], dtype=np.float32)
+        # float32 `x < split`  ==  `x <= largest float32 below split`
+        threshold = np.nextafter(split, np.float32(-np.inf))
+        value = np.zeros((len(left), width))
+        value[:, group] = np.where(left == -1, split, 0.0)
+        builder.add_tree(left, tree['right_children'], tree['split_indices'], threshold, tree['default_left'], value)
+    arrays = builder.arrays()
+    meta = _meta('sigmoid' if width == 1 else 'softmax', len(gbtree['trees']), 0.0, 'float32')
+    n_features = int(model['learner_model_param']['num_feature'])
+    raw_margin = lambda X: booster.inplace_predict(X, predict_type='margin', validate_features=False).reshape(len(X), -1)
+    return _calibrate_intercept(arrays, meta, raw_margin, n_features)
+
+def compile_lightgbm(booster, num_iteration=None):
+    """
+    A lightgbm.Booster with a binary / multiclass objective. Returns (arrays, meta) where
+    meta['categories'] holds the pandas category levels its categorical codes refer to.
+    """
+    model = booster.dump_model(num_iteration=num_iteration)
+    objective = model['objective'].split()
+    if objective[0] not in ('binary', 'multiclass') or model.get('average_output'):
+        return None
+    sigmoid = float(dict(p.split(':') for p in objective[1:] if ':' in p).get('sigmoid', 1.0))
+    width = model['num_tree_per_iteration']
+    builder = _TreeBuilder(width, np.float64)
+    for info in model['tree_info']:
+        nodes = []
+        def visit(node):
+            # Pre-order numbering; children are patched in once known
+            index = len(nodes)
+            nodes.append(node)
+            if 'leaf_value' not in node:
+                node['_left'] = visit(node['left_child'])
+                node['_right'] = visit(node['right_child'])
+            return index
+        visit(info['tree_structure'])
+        n = len(nodes)
+        left, right, feature = np.full(n, -1), np.full(n, -1), np.zeros(n, dtype=np.int64)
+        # Categorical splits keep an +inf threshold; the category test decides them
+        threshold, default_left, zero_missing = np.full(n, np.inf), np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+        value, categories = np.zeros((n, width)), {}
+        for i, node in enumerate(nodes):
+            if 'leaf_value' in node:
+                # A binary model's sigmoid scale is folded into the leaves
+                value[i, info['tree_index'] % width] = node['leaf_value'] * (sigmoid if width == 1 else 1.0)
+                continue
+            left[i], right[i], feature[i] = node['_left'], node['_right'], node['split_feature']
+            if node['decision_type'] == '==':
+                codes = sorted(int(c) for c in str(node['threshold']).split('||'))
+                categories[i] = codes
+                # NaN and unseen levels always go right
+                default_left[i] = False
+            else:
+                threshold[i] = node['threshold']
+                # With no missing type NaN is read as 0.0
+                default_left[i] = node['default_left'] if node['missing_type'] != 'None' else 0.0 <= threshold[i]
+                zero_missing[i] = node['missing_type'] == 'Zero'
+        builder.add_tree(left, right, feature, threshold, default_left, value, zero_missing, categories)
+    arrays = builder.arrays()
+    meta = _meta('sigmoid' if width == 1 else 'softmax', len(model['tree_info']), 0.0, 'float64')
+    cat_features = [name for name in model['feature_names']
+                    if model['feature_infos'].get(name, {}).get('values')]
+    meta['categories'] = {name: [str(c) for c in levels]
+                          for name, levels in zip(cat_features, model.get('pandas_categorical') or [])}
+    scale = sigmoid if width == 1 else 1.0
+    raw_margin = lambda X: booster.predict(X, raw_score=True, num_iteration=num_iteration).reshape(len(X), -1) * scale
+    return _calibrate_intercept(arrays, meta, raw_margin, len(model['feature_names']))
+
+# --- 2. Scoring ---
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+def _softmax(z):
+    z = z - z.max(axis=1, keepdims=True)
+    np.exp(z, out=z)
+    return z / z.sum(axis=1, keepdims=True)
+
+class TreeScorer:
+    """
+    Scores compiled trees: every (tree, row) pair walks down one level per step, all trees
+    at once, then leaf outputs are summed and passed through the model's link.
+    """
+    def __init__(self, arrays, meta):
+        self.link = meta['link']
+        self.intercept = np.asarray(meta['intercept'])
+        self.dtype = np.float32 if meta['precision'] == 'float32' else np.float64
+        self.arrays = arrays
+        for key in ('child', 'feature', 'threshold', 'default_left', 'value', 'roots'):
+            setattr(self, key, arrays[key])
+
+    def margin(self, X):
+        """
+        Summed leaf outputs plus intercept, (n_rows, n_outputs).
+        """
+        X = np.ascontiguousarray(X, dtype=self.dtype)
+        total = np.empty((len(X), self.value.shape[1]))
+        for start in range(0, len(X), CHUNK_ROWS):
+            total[start:start + CHUNK_ROWS] = self._chunk(X[start:start + CHUNK_ROWS])
+        if self.link == 'mean':
+            total /= len(self.roots)
+        return total + self.intercept
+
+    def _go_right(self, a, node, x, has_nan):
+        go_right = x > a['threshold'].take(node)
+        missing = np.isnan(x) if has_nan else None
+        if 'zero_missing' in a:
+            zero = a['zero_missing'].take(node) & (np.abs(x) <= ZERO_THRESHOLD)
+            missing = zero if missing is None else missing | zero
+        if 'cat_offset' in a:
+            on_cat = np.flatnonzero(a['cat_offset'].take(node) >= 0)
+            if len(on_cat):
+                cat_node, code = node.take(on_cat), x.take(on_cat)
+                # Negative codes (levels unknown to the booster) and NaN go right
+                known = (code >= 0) & (code < a['cat_len'].take(cat_node))
+                bit = a['cat_offset'].take(cat_node) + np.where(known, code, 0).astype(np.int64)
+                go_right[on_cat] = ~(known & a['cat_table'].take(bit))
+                if missing is not None:
+                    missing[on_cat] = False
+        if missing is not None:
+            go_right = np.where(missing, ~a['default_left'].take(node), go_right)
+        return go_right
+
+    def _chunk(self, X):
+        # Plain ndarray views: memory-mapped arrays would wrap every intermediate result
+        a = {key: values.view(np.ndarray) for key, values in self.arrays.items()}
+        child, feature = a['child'], a['feature']
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        has_nan = bool(np.isnan(flat).any())
+        # `node` holds where every (tree, row) pair is; `pairs` indexes those still walking,
+        # with their `current` node and row offset into `flat`
+        node = np.repeat(a['roots'], n_rows)
+        offset = np.tile(np.arange(n_rows, dtype=np.int64) * n_features, len(a['roots']))
+        current, pairs, level = node, None, 0
+        while True:
+            x = flat.take(offset + feature.take(current))
+            current = child.take(current) + self._go_right(a, current, x, has_nan)
+            if pairs is None:
+                node = current
+            else:
+                node[pairs] = current
+            level += 1
+            if level % COMPACT_EVERY == 0:
+                walking = np.flatnonzero(child.take(current) != current)
+                if not len(walking):
+                    break
+                pairs = walking if pairs is None else pairs.take(walking)
+                current, offset = current.take(walking), offset.take(walking)
+        return a['value'].take(node, axis=0).reshape(len(a['roots']), n_rows, -1).sum(axis=0)
+
+    def predict_proba(self, X):
+        z = self.margin(X)
+        if self.link == 'mean':
+            return z
+        if self.link == 'sigmoid':
+            p = _sigmoid(z[:, 0])
+            return np.column_stack([1 - p, p])
+        return _softmax(z)
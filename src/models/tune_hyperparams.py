@@ -0,0 +1,223 @@
+import glob
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+from scipy.stats import loguniform, randint, uniform
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingRandomSearchCV)
+from sklearn.model_selection import HalvingRandomSearchCV, StratifiedKFold, train_test_split
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from preprocessing import load_dataset, dataset_fingerprint, OrdinalCategories
+from train_scheduler import TOTAL_THREADS, plan_threads, set_estimator_threads
+from xgb_training import HistXGBClassifier, HalvingSearch, QuantileCache
+from lgbm_training import HistLGBMClassifier
+
+# --- TUNING CONFIGURATION ---
+PARAMS_DIR = os.environ.get("HYPERPARAMS_DIR", os.path.join(current_dir, 'params'))
+PARAMS_VERSION = os.environ.get("HYPERPARAMS_VERSION")  # Pin a version; default is the latest file
+N_CANDIDATES = int(os.environ.get("TUNE_CANDIDATES", 27))
+HALVING_FACTOR = 3              # Each round keeps the best 1/3 of candidates on 3x the rows
+MIN_RESOURCES = 500             # Rows every candidate is first scored on
+CV = 3
+SCORING = 'roc_auc_ovr'
+RANDOM_STATE = 42
+
+# Distributions for the final estimator of each base learner (constructor argument names)
+SEARCH_SPACES = {
+    'lr': {
+        'C': loguniform(1e-3, 1e2)
+    },
+    'rf': {
+        'n_estimators': randint(100, 400),
+        'max_depth': [None, 8, 12, 16, 24],
+        'min_samples_leaf': randint(1, 10),
+        'max_features': ['sqrt', 'log2', 0.3, 0.5]
+    },
+    'xgb': {
+        'max_depth': randint(3, 10),
+        'learning_rate': loguniform(0.02, 0.3),
+        'min_child_weight': loguniform(0.5, 20),
+        'subsample': uniform(0.6, 0.4),
+        'colsample_bytree': uniform(0.5, 0.5),
+        'reg_lambda': loguniform(0.1, 10)
+    },
+    'lgbm': {
+        'num_leaves': randint(15, 128),
+        'learning_rate': loguniform(0.02, 0.3),
+        'min_child_samples': randint(10, 100),
+        'subsample': uniform(0.6, 0.4),
+        'subsample_freq': [1],
+        'colsample_bytree': uniform(0.5, 0.5),
+        'reg_lambda': loguniform(0.1, 10)
+    }
+}
+
+def base_estimators():
+    """
+    (name, estimator, step) for every tunable learner, with the same pipelines as
+    train_ensemble.make_base_estimators and final_evaluation (the LR scales its inputs in all
+    three, so a tuned C means the same thing); `step` is the pipeline step the search space
+    applies to (None: the estimator itself). 'xgb' is searched by tune_xgb instead.
+    """
+    return [
+        ('lr', Pipeline([('ordinal', OrdinalCategories()), ('scaler', StandardScaler()),
+                         ('clf', LogisticRegression(max_iter=1000, random_state=RANDOM_STATE))]), 'clf'),
+        ('rf', Pipeline([('ordinal', OrdinalCategories()),
+                         ('clf', RandomForestClassifier(random_state=RANDOM_STATE))]), 'clf'),
+        ('xgb', Pipeline([('ordinal', OrdinalCategories()), ('clf', HistXGBClassifier())]), 'clf'),
+        ('lgbm', HistLGBMClassifier(), None)
+    ]
+
+def _jsonable(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+# --- 1. Versioned params files ---
+def list_versions(params_dir=PARAMS_DIR):
+    """
+    {version: path} of the hyperparams_vNNN.json files in `params_dir`.
+    """
+    versions = {}
+    for path in glob.glob(os.path.join(params_dir, 'hyperparams_v*.json')):
+        match = re.search(r'hyperparams_v(\d+)\.json$', path)
+        if match:
+            versions[int(match.group(1))] = path
+    return versions
+
+def write_params(results, fingerprint=None, params_dir=PARAMS_DIR):
+    """
+    Writes `results` ({name: {'params': ..., 'cv_score': ..., ...}}) as the next version.
+    Earlier versions are kept so a training run can be pinned to one. Returns the path.
+    """
+    os.makedirs(params_dir, exist_ok=True)
+    version = max(list_versions(params_dir), default=0) + 1
+    doc = {
+        'version': version,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'dataset': fingerprint,
+        'scoring': SCORING,
+        'cv': CV,
+        'models': results
+    }
+    path = os.path.join(params_dir, f'hyperparams_v{version:03d}.json')
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(doc, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+def load_params(version=PARAMS_VERSION, params_dir=PARAMS_DIR, fingerprint=None):
+    """
+    Tuned constructor arguments per learner ({'lr': {...}, 'rf': {...}, ...}) from the given
+    (default: latest) params version; {} when nothing has been tuned, so callers keep their
+    hard-coded defaults. Warns when the version was tuned on a different dataset than
+    `fingerprint` (default: the current source files, as main() fingerprints them).
+    """
+    versions = list_versions(params_dir)
+    if not versions:
+        print(f"[PARAMS] No tuned hyperparameters in {params_dir}; using defaults")
+        return {}
+    version = int(version) if version else max(versions)
+    if version not in versions:
+        raise FileNotFoundError(f"Hyperparameter version {version} not found in {params_dir}")
+    with open(versions[version], 'r', encoding='utf-8') as f:
+        doc = json.load(f)
+    print(f"[PARAMS] Using tuned hyperparameters v{doc['version']:03d} ({doc['created_at']})")
+    if fingerprint is None:
+        try:
+            fingerprint = dataset_fingerprint(native_categoricals=True)
+        except OSError:
+            fingerprint = None  # Source files not available here; nothing to compare
+    if doc.get('dataset') and fingerprint and doc['dataset'] != fingerprint:
+        print(f"[PARAMS] Warning: v{doc['version']:03d} was tuned on dataset {doc['dataset']}, "
+              f"the current dataset is {fingerprint}; re-run tune_hyperparams.py")
+    return {name: entry['params'] for name, entry in doc['models'].items()}
+
+# --- 2. Search ---
+def tune_model(estimator, space, X, y, step=None, n_candidates=N_CANDIDATES, cv=CV,
+               total_threads=TOTAL_THREADS, min_resources=MIN_RESOURCES):
+    """
+    Successive halving over `n_candidates` random draws from `space`: every candidate is
+    scored on `min_resources` rows, and only the best 1/HALVING_FACTOR go on to the next
+    round with HALVING_FACTOR times more rows, so bad configurations stop early. Candidate x
+    fold fits run in parallel within the thread budget.
+    """
+    prefix = f"{step}__" if step else ""
+    distributions = {prefix + key: value for key, value in space.items()}
+    workers, threads = plan_threads(n_candidates * cv, total_threads)
+    search = HalvingRandomSearchCV(
+        set_estimator_threads(estimator, threads), distributions, n_candidates=n_candidates,
+        factor=HALVING_FACTOR, resource='n_samples', min_resources=min(min_resources, len(y) // 2),
+        cv=StratifiedKFold(n_splits=cv, shuffle=True, random_state=RANDOM_STATE),
+        scoring=SCORING, n_jobs=workers, refit=False, random_state=RANDOM_STATE
+    )
+    search.fit(X, y)
+    return search
+
+def tune_xgb(X, y, space, n_candidates=N_CANDIDATES, cv=CV, total_threads=TOTAL_THREADS,
+             min_resources=MIN_RESOURCES):
+    """
+    The same successive halving for XGBoost, on one QuantileCache of (X, y): the quantile
+    sketch is computed once and each round's fold matrices are built once for all of its
+    candidates, instead of HistXGBClassifier.fit rebuilding them for every candidate x fold.
+    Candidates run one after another, each with the whole thread budget.
+    """
+    cache = QuantileCache(OrdinalCategories().fit_transform(X), y, nthread=max(1, int(total_threads)))
+    search = HalvingSearch(space, n_candidates=n_candidates, factor=HALVING_FACTOR,
+                           min_resources=min(min_resources, len(y) // 2), cv=cv, random_state=RANDOM_STATE)
+    search.fit(cache)
+    print(f"[TUNE] xgb: {cache.builds} matrices built in {cache.build_seconds:.1f}s")
+    return search
+
+def tune_all(X, y, names=None, **kwargs):
+    """
+    Tunes every base learner (or only `names`); returns {name: summary} for write_params.
+    """
+    results = {}
+    for name, estimator, step in base_estimators():
+        if names and name not in names:
+            continue
+        print(f"[TUNE] {name}: {kwargs.get('n_candidates', N_CANDIDATES)} candidates, factor {HALVING_FACTOR}")
+        start = time.perf_counter()
+        if name == 'xgb':
+            search = tune_xgb(X, y, SEARCH_SPACES[name], **kwargs)
+        else:
+            search = tune_model(estimator, SEARCH_SPACES[name], X, y, step=step, **kwargs)
+        seconds = time.perf_counter() - start
+        prefix = f"{step}__" if step else ""
+        results[name] = {
+            'params': {key.removeprefix(prefix): _jsonable(value) for key, value in search.best_params_.items()},
+            'cv_score': float(search.best_score_),
+            'candidates_per_round': [int(n) for n in search.n_candidates_],
+            'rows_per_round': [int(n) for n in search.n_resources_],
+            'search_seconds': round(seconds, 1)
+        }
+        print(f"[TUNE] {name}: best {SCORING} {search.best_score_:.4f} in {seconds:.1f}s "
+              f"(candidates per round {search.n_candidates_}, rows {search.n_resources_})")
+    return results
+
+def main():
+    print("Loading data...")
+    df = load_dataset(native_categoricals=True)
+    X = df.drop(columns=['target']).select_dtypes(include=[np.number, 'category'])
+    y = df['target']
+
+    # Tune on the training split only; train_ensemble / final_evaluation hold out the same test rows
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE, stratify=y)
+    results = tune_all(X_train, y_train)
+    path = write_params(results, fingerprint=dataset_fingerprint(native_categoricals=True))
+    print(f"[TUNE] Saved best hyperparameters to {path}")
+
+if __name__ == "__main__":
+    main()
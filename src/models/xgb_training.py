@@ -0,0 +1,277 @@
+import hashlib
+import time
+import numpy as np
+import xgboost as xgb
+from xgboost import XGBClassifier
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+from sklearn.model_selection import ParameterSampler, StratifiedKFold, StratifiedShuffleSplit, train_test_split
+
+# --- XGBOOST TRAINING CONFIGURATION ---
+MAX_BIN = 64                    # Histogram bins per feature; 64 keeps AUC at 256's level and quarters the split search
+MAX_ROUNDS = 300                # Upper bound on boosting rounds; early stopping picks the real count (<180 on the benchmark)
+EARLY_STOPPING_ROUNDS = 10      # Stop after this many rounds without improvement on the held-out fold
+VALID_FRACTION = 0.1            # Share of the training split held out for early stopping
+RANDOM_STATE = 42
+
+# Shared defaults; names are valid for both xgb.train and XGBClassifier
+XGB_PARAMS = {
+    'tree_method': 'hist',
+    'max_bin': MAX_BIN,
+    'learning_rate': 0.1,       # Below XGBoost's 0.3: with MAX_ROUNDS early stopping has room to pick the count
+    'max_depth': 6
+}
+
+def xgb_params(n_classes, params=None):
+    """
+    Native training parameters for a problem with `n_classes` labels (0..n_classes-1).
+    """
+    out = dict(XGB_PARAMS)
+    if n_classes > 2:
+        out.update(objective='multi:softprob', num_class=n_classes, eval_metric='mlogloss')
+    else:
+        out.update(objective='binary:logistic', eval_metric='logloss')
+    out['seed'] = RANDOM_STATE
+    out.update(params or {})
+    return out
+
+def _labels(y):
+    y = np.asarray(y)
+    classes = np.unique(y)
+    if not np.array_equal(classes, np.arange(len(classes))):
+        raise ValueError(f"XGBoost expects labels 0..n_classes-1, got {classes}")
+    return y, len(classes)
+
+def _rows(X, idx):
+    return X.iloc[idx] if hasattr(X, "iloc") else X[idx]
+
+def _digest(idx):
+    return hashlib.sha1(np.ascontiguousarray(idx).tobytes()).hexdigest()
+
+def _holdout(y, valid_fraction=VALID_FRACTION, random_state=RANDOM_STATE):
+    splitter = StratifiedShuffleSplit(n_splits=1, test_size=valid_fraction, random_state=random_state)
+    train_idx, valid_idx = next(splitter.split(np.zeros(len(y)), y))
+    return np.sort(train_idx), np.sort(valid_idx)
+
+# --- 1. Matrix Cache ---
+class QuantileCache:
+    """
+    QuantileDMatrix cache for one train split.
+
+    The quantile sketch (bin edges) is computed once over the whole split (or over rows
+    `sketch_idx` only, whose matrix then doubles as the reference); every fold's train and
+    validation matrices are then binned against it (ref=) instead of re-sketching, and are
+    kept so later hyperparameter trials on the same folds reuse them as-is.
+    """
+    def __init__(self, X, y, max_bin=MAX_BIN, nthread=None, sketch_idx=None):
+        self.X = X
+        self.y, self.n_classes = _labels(y)
+        self.max_bin = max_bin
+        self.nthread = nthread
+        self.sketch_idx = sketch_idx
+        self._sketch_key = None if sketch_idx is None else _digest(sketch_idx)
+        self._reference = None
+        self._matrices = {}
+        self.builds = 0
+        self.build_seconds = 0.0
+
+    def _build(self, idx, ref):
+        start = time.perf_counter()
+        X = self.X if idx is None else _rows(self.X, idx)
+        y = self.y if idx is None else self.y[idx]
+        matrix = xgb.QuantileDMatrix(X, y, ref=ref, max_bin=self.max_bin, nthread=self.nthread)
+        self.builds += 1
+        self.build_seconds += time.perf_counter() - start
+        return matrix
+
+    @property
+    def reference(self):
+        """
+        The split (or its `sketch_idx` rows) as one QuantileDMatrix; its bins are shared by every fold.
+        """
+        if self._reference is None:
+            self._reference = self._build(self.sketch_idx, None)
+        return self._reference
+
+    def matrix(self, idx):
+        """
+        Rows `idx` of the split binned with the shared sketch (built once per distinct idx).
+        """
+        if idx is None and self.sketch_idx is None:
+            return self.reference
+        key = _digest(idx) if idx is not None else None
+        if key == self._sketch_key:
+            return self.reference
+        if key not in self._matrices:
+            self._matrices[key] = self._build(idx, self.reference)
+        return self._matrices[key]
+
+    def eval_matrix(self, train_idx, valid_idx):
+        """
+        Rows `valid_idx` for evaluating a model trained on `train_idx` (xgb.train requires the
+        training matrix as ref; it carries the same shared bins).
+        """
+        key = (_digest(train_idx) if train_idx is not None else None, _digest(valid_idx))
+        if key not in self._matrices:
+            self._matrices[key] = self._build(valid_idx, self.matrix(train_idx))
+        return self._matrices[key]
+
+    def folds(self, cv=5):
+        """
+        Stratified (train_idx, valid_idx) folds of the split, as sklearn's cross_validate uses.
+        """
+        return list(StratifiedKFold(n_splits=cv).split(np.zeros(len(self.y)), self.y))
+
+    def holdout(self, valid_fraction=VALID_FRACTION, random_state=RANDOM_STATE):
+        """
+        One stratified (train_idx, valid_idx) split for early stopping.
+        """
+        return _holdout(self.y, valid_fraction, random_state)
+
+# --- 2. Training ---
+def train_booster(cache, train_idx=None, valid_idx=None, params=None,
+                  num_boost_round=MAX_ROUNDS, early_stopping_rounds=EARLY_STOPPING_ROUNDS):
+    """
+    Trains on rows `train_idx` of the cached split, early stopping on rows `valid_idx`.
+    The returned booster is truncated to its best iteration.
+    """
+    params = xgb_params(cache.n_classes, params)
+    params['max_bin'] = cache.max_bin   # Training must use the matrices' bin count
+    if cache.nthread is not None:
+        params.setdefault('nthread', cache.nthread)
+    dtrain = cache.matrix(train_idx)
+    evals = []
+    if valid_idx is not None:
+        evals = [(cache.eval_matrix(train_idx, valid_idx), 'valid')]
+    booster = xgb.train(params, dtrain, num_boost_round=num_boost_round, evals=evals,
+                        early_stopping_rounds=early_stopping_rounds if evals else None, verbose_eval=False)
+    if evals:
+        booster = booster[:booster.best_iteration + 1]
+    return booster
+
+def booster_to_classifier(booster, params=None):
+    """
+    Wraps a trained booster as a fitted XGBClassifier (predict / predict_proba / feature_importances_).
+    """
+    clf = XGBClassifier(**{**XGB_PARAMS, **(params or {})})
+    clf.load_model(bytearray(booster.save_raw('ubj')))
+    clf.set_params(n_estimators=booster.num_boosted_rounds())
+    return clf
+
+def fit_xgb(X, y, params=None, cache=None, valid_fraction=VALID_FRACTION, num_boost_round=MAX_ROUNDS, nthread=None):
+    """
+    Fits an XGBClassifier with hist trees, early stopping on a stratified held-out fold of (X, y).
+    Pass the split's QuantileCache to reuse its matrices; without one, the training rows are
+    sketched and binned once and the held-out rows binned against them (two matrices).
+    """
+    if cache is None:
+        train_idx, valid_idx = _holdout(_labels(y)[0], valid_fraction)
+        cache = QuantileCache(X, y, nthread=nthread, sketch_idx=train_idx)
+    else:
+        train_idx, valid_idx = cache.holdout(valid_fraction)
+    booster = train_booster(cache, train_idx, valid_idx, params, num_boost_round=num_boost_round)
+    return booster_to_classifier(booster, params)
+
+def _scores(y_true, prob):
+    pred = prob.argmax(axis=1) if prob.ndim == 2 else (prob > 0.5).astype(int)
+    if prob.ndim == 2 and prob.shape[1] > 2:
+        auc = roc_auc_score(y_true, prob, multi_class='ovr')
+    else:
+        auc = roc_auc_score(y_true, prob if prob.ndim == 1 else prob[:, 1])
+    return {
+        'accuracy': accuracy_score(y_true, pred),
+        'f1_macro': f1_score(y_true, pred, average='macro', zero_division=0),
+        'roc_auc_ovr': auc
+    }
+
+def cross_validate_xgb(cache, params=None, cv=5, num_boost_round=MAX_ROUNDS):
+    """
+    K-fold CV on the cached split (`cv` folds, or a list of (train_idx, valid_idx) pairs),
+    early stopping on each held-out fold (as xgb.cv does). Returns a dict like sklearn's
+    cross_validate: fit_time, best_iteration and test_<metric> arrays (accuracy, f1_macro,
+    roc_auc_ovr).
+    """
+    results = {}
+    for train_idx, valid_idx in (cache.folds(cv) if isinstance(cv, int) else cv):
+        start = time.perf_counter()
+        booster = train_booster(cache, train_idx, valid_idx, params, num_boost_round=num_boost_round)
+        fit_time = time.perf_counter() - start
+        prob = booster.predict(cache.eval_matrix(train_idx, valid_idx))
+        scores = _scores(cache.y[valid_idx], prob)
+        results.setdefault('fit_time', []).append(fit_time)
+        results.setdefault('best_iteration', []).append(booster.num_boosted_rounds())
+        for key, value in scores.items():
+            results.setdefault(f'test_{key}', []).append(value)
+    return {k: np.array(v) for k, v in results.items()}
+
+class HalvingSearch:
+    """
+    Successive halving over `n_candidates` random draws from `space` (XGBClassifier argument
+    names) on one QuantileCache, as HalvingRandomSearchCV does with resource='n_samples':
+    every candidate is cross-validated on `min_resources` rows, and the best 1/`factor` go on
+    to the next round with `factor` times more rows. Each round's fold matrices are built once
+    (binned against the cache's sketch) and shared by all of its candidates. After fit:
+    best_params_, best_score_ (mean CV AUC), n_candidates_ and n_resources_ per round.
+    """
+    def __init__(self, space, n_candidates=27, factor=3, min_resources=500, cv=3,
+                 num_boost_round=MAX_ROUNDS, random_state=RANDOM_STATE):
+        self.space = space
+        self.n_candidates = n_candidates
+        self.factor = factor
+        self.min_resources = min_resources
+        self.cv = cv
+        self.num_boost_round = num_boost_round
+        self.random_state = random_state
+
+    def _rows(self, cache, n_rows):
+        if n_rows >= len(cache.y):
+            return np.arange(len(cache.y))
+        splitter = StratifiedShuffleSplit(n_splits=1, train_size=n_rows, random_state=self.random_state)
+        return np.sort(next(splitter.split(np.zeros(len(cache.y)), cache.y))[0])
+
+    def fit(self, cache):
+        candidates = [dict(p) for p in ParameterSampler(self.space, self.n_candidates, random_state=self.random_state)]
+        n_total = len(cache.y)
+        # Same round count as HalvingRandomSearchCV: limited by the candidates and by the rows
+        n_rounds = min(1 + int(np.floor(np.log(len(candidates)) / np.log(self.factor))),
+                       1 + int(np.floor(np.log(max(n_total // self.min_resources, 1)) / np.log(self.factor))))
+        self.n_candidates_, self.n_resources_ = [], []
+        splitter = StratifiedKFold(n_splits=self.cv, shuffle=True, random_state=self.random_state)
+        for round_ in range(n_rounds):
+            n_rows = min(self.min_resources * self.factor ** round_, n_total)
+            rows = self._rows(cache, n_rows)
+            folds = [(rows[tr], rows[va]) for tr, va in splitter.split(np.zeros(len(rows)), cache.y[rows])]
+            scores = [cross_validate_xgb(cache, params, cv=folds, num_boost_round=self.num_boost_round)
+                      ['test_roc_auc_ovr'].mean() for params in candidates]
+            self.n_candidates_.append(len(candidates))
+            self.n_resources_.append(len(rows))
+            order = np.argsort(scores)[::-1]
+            self.best_params_, self.best_score_ = candidates[order[0]], float(scores[order[0]])
+            candidates = [candidates[i] for i in order[:max(1, int(np.ceil(len(candidates) / self.factor)))]]
+        return self
+
+# --- 3. Estimator for sklearn pipelines / ensembles ---
+class HistXGBClassifier(XGBClassifier):
+    """
+    XGBClassifier with the shared hist defaults that early-stops on a stratified held-out
+    fold of whatever it is fit on, so it can be cloned into CV, voting and stacking.
+    """
+    def __init__(self, *, valid_fraction=VALID_FRACTION, **kwargs):
+        params = {**XGB_PARAMS, 'n_estimators': MAX_ROUNDS, 'early_stopping_rounds': EARLY_STOPPING_ROUNDS,
+                  'random_state': RANDOM_STATE, **kwargs}
+        super().__init__(**params)
+        self.valid_fraction = valid_fraction
+
+    def get_xgb_params(self):
+        params = super().get_xgb_params()
+        params.pop('valid_fraction', None)
+        return params
+
+    def fit(self, X, y, **kwargs):
+        if kwargs.get('eval_set') is None and self.early_stopping_rounds:
+            X_train, X_valid, y_train, y_valid = train_test_split(
+                X, y, test_size=self.valid_fraction, random_state=RANDOM_STATE, stratify=y
+            )
+            kwargs['eval_set'] = [(X_valid, y_valid)]
+            kwargs.setdefault('verbose', False)
+            return super().fit(X_train, y_train, **kwargs)
+        return super().fit(X, y, **kwargs)
@@ -5,6 +5,8 @@ import pandas as pd
 from components.cards import KPICard
 from components.charts import get_layout_template, colors
 from utils.data_loader import load_data
+from utils.event_store import get_event_store
+import datetime
 
 def layout():
     df = load_data()
@@ -41,15 +43,22 @@ def layout():
                           color_discrete_map=gender_color_map)
     fig_fairness.update_layout(**get_layout_template())
     
-    # Audit Logs (Mock Data)
-    audit_data = [
-        {"Timestamp": "2024-05-20 10:23", "User": "Analyst_01", "Action": "Overrode Risk Score", "ID": "CUST-102"},
-        {"Timestamp": "2024-05-20 09:15", "User": "System", "Action": "Model Retrain Triggered", "ID": "N/A"},
-        {"Timestamp": "2024-05-19 16:45", "User": "Manager_05", "Action": "Approved Payment Plan", "ID": "CUST-881"},
-        {"Timestamp": "2024-05-19 14:20", "User": "Analyst_02", "Action": "Viewed Sensitive Data", "ID": "CUST-334"},
-        {"Timestamp": "2024-05-19 11:00", "User": "System", "Action": "Batch Prediction Run", "ID": "BATCH-99"}
-    ]
-    audit_df = pd.DataFrame(audit_data)
+    # Audit Logs (intervention event store)
+    try:
+        store = get_event_store()
+        recent = store.recent(limit=10)
+        actions_today = store.count(since=datetime.date.today())
+    except Exception as e:
+        print(f"Failed to query intervention events: {e}")
+        recent, actions_today = pd.DataFrame(columns=["ts", "customer_id", "plan_id", "status"]), 0
+    audit_df = pd.DataFrame({
+        "Timestamp": recent['ts'].str.slice(0, 16).str.replace("T", " "),
+        "User": "Customer Portal",
+        "Action": recent['status'],
+        "Plan": recent['plan_id'],
+        "ID": recent['customer_id']
+    })
+    audit_df.loc[audit_df['Action'].str.startswith("SENT"), "User"] = "System"
 
     return html.Div([
         # Header REMOVED (Global Header Used)
@@ -58,7 +67,7 @@ def layout():
         dbc.Row([
             dbc.Col(KPICard("Fairness Index", "0.98", "No significant bias detected"), width=3),
             dbc.Col(KPICard("Consent Coverage", "99.2%", "GDPR/DPDP Compliant", color="success"), width=3),
-            dbc.Col(KPICard("Audit Logs", "145", "Actions today"), width=3),
+            dbc.Col(KPICard("Audit Logs", str(actions_today), "Actions today"), width=3),
             dbc.Col(KPICard("Model Drift", "Low", "PSI < 0.1", color="success"), width=3),
         ]),
         
@@ -2,8 +2,12 @@ import dash
 from dash import html, dcc, callback, Input, Output, State, MATCH, ALL
 import dash_bootstrap_components as dbc
 import pandas as pd
+import numpy as np
 from utils.data_loader import load_data
+from utils.segmentation import get_segmentation
 from utils.notification_service import AlertDispatcher
+from utils.contact_history import get_contact_history, ContactCapExceeded
+from utils.event_log import get_event_log
 from components.cards import KPICard
 
 def layout():
@@ -22,16 +26,8 @@ def layout():
     if 'existing_liabilities_inr' not in df.columns:
         df['existing_liabilities_inr'] = 0
 
-    # Calculate Segments based on LOGIC
-    # PD < 0.30 -> Normal
-    # 0.30 <= PD <= 0.70 -> Watchlist
-    # PD > 0.70 -> High Risk
-    
-    normal_risk = df[df['probability_of_default'] < 0.3]
-    watchlist_risk = df[(df['probability_of_default'] >= 0.3) & (df['probability_of_default'] <= 0.7)]
-    high_risk = df[df['probability_of_default'] > 0.7]
-    
-    avg_score = df['probability_of_default'].mean()
+    # Segment once per dataset; the grid and its filters reuse the band row arrays
+    get_segmentation(df)
 
     return html.Div([
         # Stores for State Management
@@ -46,31 +42,28 @@ def layout():
 
 # --- Helper Functions ---
 
-def get_risk_badge(pd_val):
-    if pd_val > 0.7:
+# Grid filter button -> risk band (the risk rules' category names)
+FILTER_BANDS = {"high": "High", "watchlist": "Moderate", "normal": "Low"}
+
+def get_risk_badge(risk_band):
+    if risk_band == "High":
         return dbc.Badge("High Risk", color="danger", className="ms-2")
-    elif pd_val >= 0.3:
+    elif risk_band == "Moderate":
         return dbc.Badge("Watchlist", color="warning", text_color="dark", className="ms-2")
     else:
         # User Image shows Dark Green for Normal
         return dbc.Badge("Normal", color="success", className="ms-2", style={"backgroundColor": "#198754"})
 
-def render_kpi_cards(df, high_risk, watchlist_risk, normal_risk, avg_score):
+def render_kpi_cards(df, band_counts, avg_score):
     return dbc.Row([
         dbc.Col(KPICard("Total Customers", f"{len(df)}", "Active Database", color="primary"), width=3),
-        dbc.Col(KPICard("High Risk", f"{len(high_risk)}", "Immediate Action", color="danger"), width=2),
-        dbc.Col(KPICard("Watchlist", f"{len(watchlist_risk)}", "Monitor Closely", color="warning"), width=2),
-        dbc.Col(KPICard("Normal", f"{len(normal_risk)}", "Stable Portfolio", color="success"), width=2),
+        dbc.Col(KPICard("High Risk", f"{band_counts['High']}", "Immediate Action", color="danger"), width=2),
+        dbc.Col(KPICard("Watchlist", f"{band_counts['Moderate']}", "Monitor Closely", color="warning"), width=2),
+        dbc.Col(KPICard("Normal", f"{band_counts['Low']}", "Stable Portfolio", color="success"), width=2),
         dbc.Col(KPICard("Avg Risk Score", f"{avg_score:.2f}", "Portfolio Weighted PD", color="info"), width=3),
     ], className="mb-4")
 
 def render_grid_view(df):
-    # Recalculate segments for KPIs
-    normal_risk = df[df['probability_of_default'] < 0.3]
-    watchlist_risk = df[(df['probability_of_default'] >= 0.3) & (df['probability_of_default'] <= 0.7)]
-    high_risk = df[df['probability_of_default'] > 0.7]
-    avg_score = df['probability_of_default'].mean()
-
     # Controls
     controls = dbc.Card([
         dbc.CardBody([
@@ -138,7 +131,13 @@ def render_grid_view(df):
 def render_detail_view(customer_row):
     cust_id = customer_row['customer_id']
     pd_val = customer_row.get('probability_of_default', 0)
-    badge = get_risk_badge(pd_val)
+    
+    # --- Integration with Intervention Logic for Plans ---
+    from utils.intervention_logic import RiskEngine, PlanEngine
+    
+    # 1. Determine Category (the risk rules' category is also the customer's risk band)
+    risk_cat = RiskEngine.get_risk_category(customer_row)
+    badge = get_risk_badge(risk_cat)
     
     income_val = customer_row.get('monthly_salary_inr', 0)
     income = f"₹{income_val:,.0f}"
@@ -146,34 +145,10 @@ def render_detail_view(customer_row):
     exposure = f"₹{exposure_val:,.0f}"
     full_name = customer_row.get('full_name', 'Unknown')
     
-    # --- Integration with Intervention Logic for Plans ---
-    from utils.intervention_logic import RiskEngine, PlanEngine
-    
-    # 1. Determine Category
-    # We can use the logic already in Dashboard or reusing RiskEngine
-    # Reusing dashboard logic for consistency with badge
-    if pd_val > 0.7:
-        risk_cat = "High"
-    elif pd_val >= 0.3:
-        risk_cat = "Moderate" # Intervention logic uses "Moderate" for watchlist
-    else:
-        risk_cat = "Low"
-        
     # 2. Get Plans
-    # Mapping Data to Engine
-    # Expense approximation: 40% of income
-    est_expenses = income_val * 0.4 
-    # Current EMI approximation: 10% of exposure (rough guess for monthly obligation)
-    est_emi = exposure_val * 0.05 
-    if est_emi == 0: est_emi = 5000
-    
-    plans = PlanEngine.get_plans(
-        risk_category=risk_cat,
-        current_emi=int(est_emi),
-        current_tenure=24, # Default
-        income=int(income_val),
-        expenses=int(est_expenses)
-    )
+    # Real EMI, tenure and income from the customer row (EMI estimated from exposure if missing,
+    # expenses at 40% of income) - the same inputs the precomputed portal offers use
+    plans = PlanEngine.get_plans(risk_category=risk_cat, **PlanEngine.plan_inputs(customer_row))
     
     # 3. Create Plan Cards
     plan_cards = []
@@ -353,6 +328,9 @@ def update_filter(n_all, n_high, n_watch, n_norm):
 def populate_grid(filter_val, sort_val, search_val):
     df = load_data()
     # Removed mock customer_id generation
+    segmentation = get_segmentation(df)
+    # Badge labels on a copy-on-write view; the shared load_data() frame is left untouched
+    df = df.assign(risk_band=segmentation.categorical("risk_band"))
 
     # 0. Search Logic (Priority)
     if search_val:
@@ -360,13 +338,17 @@ def populate_grid(filter_val, sort_val, search_val):
     else:
         # STRATIFIED SAMPLING LOGIC for 'All' view
         if filter_val == 'all':
-             # Split by risk logic
-             high = df[df['probability_of_default'] > 0.7].sort_values(by='probability_of_default', ascending=False).head(34)
-             watch = df[(df['probability_of_default'] >= 0.3) & (df['probability_of_default'] <= 0.7)].sort_values(by='probability_of_default', ascending=False).head(33)
-             normal = df[df['probability_of_default'] < 0.3].sort_values(by='probability_of_default', ascending=False).head(33)
+             # Top PDs of each band, taken from the precomputed band rows
+             pd_values = df['probability_of_default'].to_numpy(dtype=float)
+             picks = []
+             for band, quota in (("High", 34), ("Moderate", 33), ("Low", 33)):
+                 rows = segmentation.rows("risk_band", band)
+                 if len(rows) > quota:
+                     rows = rows[np.argpartition(-pd_values[rows], quota - 1)[:quota]]
+                 picks.append(rows)
              
              # Combined Stratified Set
-             df = pd.concat([high, watch, normal])
+             df = df.iloc[np.concatenate(picks)]
              
              # Re-sort the combined set according to user preference so it looks clean
              if sort_val == 'risk_desc':
@@ -378,23 +360,18 @@ def populate_grid(filter_val, sort_val, search_val):
                  
         else:
             # Standard Filter Logic
-            if filter_val == "high":
-                df = df[df['probability_of_default'] > 0.7]
-            elif filter_val == "watchlist":
-                df = df[(df['probability_of_default'] >= 0.3) & (df['probability_of_default'] <= 0.7)]
-            elif filter_val == "normal":
-                df = df[df['probability_of_default'] < 0.3]
+            if filter_val in FILTER_BANDS:
+                df = df.iloc[segmentation.rows("risk_band", FILTER_BANDS[filter_val])]
             
-            # Sort
+            # Sort, limited to 100
             if sort_val == 'risk_desc':
-                df = df.sort_values(by='probability_of_default', ascending=False)
+                df = df.nlargest(100, 'probability_of_default')
             elif sort_val == 'risk_asc':
-                df = df.sort_values(by='probability_of_default', ascending=True)
+                df = df.nsmallest(100, 'probability_of_default')
             elif sort_val == 'inc_desc':
-                df = df.sort_values(by='monthly_salary_inr', ascending=False)
-                
-            # Limit to 100
-            df = df.head(100)
+                df = df.nlargest(100, 'monthly_salary_inr')
+            else:
+                df = df.head(100)
         
     if df.empty:
         return html.Div("No customers found.", className="text-muted p-3")
@@ -411,7 +388,7 @@ def populate_grid(filter_val, sort_val, search_val):
              display_id = cust_id
         
         pd_val = row.get('probability_of_default', 0)
-        badge = get_risk_badge(pd_val)
+        badge = get_risk_badge(row['risk_band'])
         
         income_val = row.get('monthly_salary_inr', 0)
         income = f"₹{income_val:,.0f}"
@@ -456,10 +433,15 @@ def send_email(n_clicks, customer_id):
     customer = df[df['customer_id'] == customer_id].iloc[0]
     
     try:
-        AlertDispatcher.send_intervention_alert(customer)
+        AlertDispatcher.send_intervention_alert(customer, contact_history=get_contact_history(), event_log=get_event_log())
         outcome = "success"
         msg = f"Link sent to {customer.get('email_id', 'customer')}!"
         icon = "bi bi-check-circle-fill me-2"
+    except ContactCapExceeded as e:
+        # Frequency cap: customer was already emailed recently
+        outcome = "warning"
+        msg = str(e)
+        icon = "bi bi-clock-history me-2"
     except Exception as e:
         outcome = "danger"
         msg = f"Failed: {str(e)}"
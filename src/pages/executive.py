@@ -6,6 +6,7 @@ import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 import pandas as pd
 from utils.data_loader import load_data
+from utils.segmentation import get_segmentation
 from components.cards import KPICard
 from components.charts import (
     create_risk_migration_matrix,
@@ -48,6 +49,42 @@ SCENARIOS = {
     }
 }
 
+def build_relief_estimate(df):
+    """
+    Relief cost of restructuring the stressed segment (PD > 0.3): the standard offer totals and
+    a tenure x rate grid of customers whose restructured EMI fits their disposable income.
+    """
+    from utils.amortization import BASE_ANNUAL_RATE, principal_from_emi, relief_grid
+    from utils.intervention_logic import PlanEngine
+    if 'probability_of_default' not in df.columns:
+        return None
+    stressed = df.iloc[get_segmentation(df).rows('risk_band', 'Moderate', 'High')]
+    if stressed.empty:
+        return None
+    offers = PlanEngine.get_plans_batch(stressed)
+    offers = offers[offers['plan_id'] == 'emi_restructure']
+    principal = principal_from_emi(offers['current_emi'].to_numpy(), BASE_ANNUAL_RATE, offers['current_tenure'].to_numpy())
+    grid = relief_grid(principal, offers['current_emi'].to_numpy(), offers['current_tenure'].to_numpy(),
+                       disposable_income=(offers['income'] - offers['expenses']).to_numpy())
+
+    fig = go.Figure(go.Heatmap(
+        z=grid['affordable'], x=[f"{r:.1%}" for r in grid['annual_rates']], y=grid['tenures'],
+        colorscale='Greens', colorbar=dict(title="Customers"),
+        hovertemplate="Tenure %{y} m @ %{x}: %{z} affordable<extra></extra>"
+    ))
+    layout = get_layout_template()
+    layout['margin'] = dict(l=50, r=20, t=40, b=40)
+    layout['xaxis'].update(title="Annual Rate")
+    layout['yaxis'].update(title="Tenure (Months)")
+    layout['hovermode'] = 'closest'
+    fig.update_layout(title="Customers With Affordable EMI After Restructuring", height=420, **layout)
+    return {
+        "customers": grid['customers'],
+        "monthly_relief": offers['monthly_relief'].sum(),
+        "total_payment_change": offers['total_payment_change'].sum(),
+        "figure": fig
+    }
+
 def layout():
     df = load_data()
     
@@ -67,9 +104,9 @@ def layout():
 
     high_risk_count = 0
     if 'probability_of_default' in df.columns and 'existing_liabilities_inr' in df.columns:
-        high_risk_mask = df['probability_of_default'] > 0.7
-        high_risk_exposure = df.loc[high_risk_mask, 'existing_liabilities_inr'].sum()
-        high_risk_count = high_risk_mask.sum()
+        high_risk_rows = get_segmentation(df).rows('risk_band', 'High')
+        high_risk_exposure = df['existing_liabilities_inr'].iloc[high_risk_rows].sum()
+        high_risk_count = len(high_risk_rows)
         high_risk_pct = (high_risk_exposure / total_exposure * 100) if total_exposure > 0 else 0
     else:
         high_risk_pct = 0
@@ -80,6 +117,8 @@ def layout():
     else:
         default_proj_pct = 0
 
+    relief = build_relief_estimate(df)
+
     # ... (Charts Static Helpers) ...
     fig_migration = create_risk_migration_matrix()
     fig_vintage = create_vintage_curve()
@@ -169,7 +208,21 @@ def layout():
             dbc.Col(dbc.Card(dbc.CardBody(dcc.Graph(figure=fig_warning, config={'displayModeBar': False})), className="shadow-sm border-0 h-100"), xs=12, lg=6, className="mb-3"),
         ], className="mb-3 g-2"),
 
-        # Section 4: Insights Panel
+        # Section 4: Restructuring Relief (stressed segment what-ifs)
+        *([
+            html.H5("Restructuring Relief", className="mb-3 text-secondary"),
+            dbc.Card(dbc.CardBody([
+                html.P(
+                    f"Standard restructuring offer for {relief['customers']:,} stressed customers: "
+                    f"{format_cr(relief['monthly_relief'])} monthly relief, "
+                    f"{format_cr(relief['total_payment_change'])} additional interest over the extended tenures.",
+                    className="text-secondary small mb-2"
+                ),
+                dcc.Graph(figure=relief['figure'], config={'displayModeBar': False})
+            ]), className="shadow-sm border-0 mb-3")
+        ] if relief else []),
+
+        # Section 5: Insights Panel
         dbc.Card([
             dbc.CardHeader("Executive Insights", className="bg-white border-bottom-0 fw-bold"),
             dbc.CardBody([
@@ -1,9 +1,10 @@
 from dash import html, dcc, callback, Input, Output, State, no_update, ALL
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
-from utils.data_loader import load_data
 from utils.intervention_logic import RiskEngine, PlanEngine, OutcomeLogger, CommunicationEngine
+from utils.contact_history import get_contact_history
+from utils.risk_rules import get_risk_rules
 import urllib.parse
+import time
 
 # --- Styling Constants ---
 NAVY_BLUE = "#0a2342"
@@ -24,6 +25,7 @@ def layout():
 # --- Content Generation ---
 def render_intervention_page(token=None):
     # 1. Resolve Customer
+    started = time.perf_counter()
     customer = None
     
     if token:
@@ -35,17 +37,30 @@ def render_intervention_page(token=None):
             
             # LOG OPEN EVENT
             try:
-                # Avoid duplicate logging if reloaded quickly? For now, log every open to verify functionality.
-                OutcomeLogger.log_outcome(customer.get('customer_id'), "N/A", "OPENED")
+                # Reloads within the portal_open cap window are not logged again
+                if get_contact_history().try_record(customer.get('customer_id'), "portal_open", source="OPENED"):
+                    OutcomeLogger.log_outcome(customer.get('customer_id'), "N/A", "OPENED",
+                                              latency_ms=(time.perf_counter() - started) * 1000)
             except:
                 pass
     
-    # Fallback/Demo Mode if no token or invalid
+    # A link was used but did not verify (tampered, or past its 48h validity): don't fall back to demo data
+    if token and customer is None:
+        return html.Div("This link is invalid or has expired. Please contact your relationship manager for a new one.", className="p-5 text-center text-danger")
+    
+    # Fallback/Demo Mode if no token
+    if customer is None:
+        from utils.portal_store import get_portal_store
+        store = get_portal_store()
+        if store is not None:
+            customer = store.first(min_pd=get_risk_rules().current().category_threshold("High"))
     if customer is None:
+        from utils.data_loader import load_data
+        from utils.segmentation import get_segmentation
         df = load_data()
         if not df.empty:
-            # Default to a high risk customer for demo
-            high_risk = df[df['probability_of_default'] > 0.6]
+            # Default to a high risk customer for demo (band rows from the shared segmentation)
+            high_risk = df.iloc[get_segmentation(df).rows("risk_band", "High")[:1]]
             if not high_risk.empty:
                 customer = high_risk.iloc[0].to_dict()
             else:
@@ -62,11 +77,11 @@ def render_intervention_page(token=None):
     full_name = get_val('full_name', get_val('name', 'Valued Customer'))
     customer_id = get_val('customer_id', 'UNKNOWN')
     
-    # Logic
-    risk_category = RiskEngine.get_risk_category(customer)
-    reasons = RiskEngine.get_risk_reasons(customer)
-    plans = PlanEngine.get_plans(risk_category)
-    stability_points = RiskEngine.get_stability_points(customer)
+    # Logic (precomputed when the customer comes from the portal read model)
+    risk_category = customer.get('risk_category') or RiskEngine.get_risk_category(customer)
+    reasons = customer['reasons'] if 'reasons' in customer else RiskEngine.get_risk_reasons(customer)
+    plans = customer['plans'] if 'plans' in customer else PlanEngine.get_plans(risk_category, **PlanEngine.plan_inputs(customer))
+    stability_points = customer['stability_points'] if 'stability_points' in customer else RiskEngine.get_stability_points(customer)
     
     # Financial Metrics
     pd_val = get_val('probability_of_default', 0.0)
@@ -270,6 +285,7 @@ def toggle_views(n_clicks_view, n_clicks_back, plans_data):
 
 # 3. Acceptance/Detail Builder
 def build_detail_layout(plan):
+    import plotly.graph_objects as go  # Only the details view draws charts; keeps portal start-up light
     sim = plan.get('simulation')
     
     # 1. VISUALIZATIONS
@@ -297,6 +313,20 @@ def build_detail_layout(plan):
                 dbc.Col(dcc.Graph(figure=fig_cf, config={'displayModeBar': False}), md=6),
             ])
         ]
+
+        # Outstanding balance month by month: current loan vs restructured loan
+        if plan['id'] == 'emi_restructure':
+            from utils.amortization import BASE_ANNUAL_RATE, principal_from_emi, schedule
+            from utils.intervention_logic import RESTRUCTURE_RATE_BUMP
+            principal = float(principal_from_emi(sim['current_emi'], BASE_ANNUAL_RATE, sim['current_tenure']))
+            current = schedule(principal, BASE_ANNUAL_RATE, sim['current_tenure'], max_tenure=sim['new_tenure'])
+            restructured = schedule(principal, BASE_ANNUAL_RATE + RESTRUCTURE_RATE_BUMP, sim['new_tenure'])
+            fig_schedule = go.Figure()
+            fig_schedule.add_trace(go.Scatter(x=current['month'], y=current['balance'], name='Current Plan', line=dict(color='#6c757d')))
+            fig_schedule.add_trace(go.Scatter(x=restructured['month'], y=restructured['balance'], name='Restructured', line=dict(color=SUCCESS_GREEN)))
+            fig_schedule.update_layout(title="Outstanding Balance Over Time", xaxis_title="Month", yaxis_title="Balance (₹)",
+                                       height=300, template="plotly_white")
+            charts.append(dcc.Graph(figure=fig_schedule, config={'displayModeBar': False}))
     
     # 2. METRICS CARDS
     metrics = []
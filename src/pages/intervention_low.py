@@ -2,7 +2,9 @@ from dash import html, dcc, callback, Input, Output, State, no_update, ALL
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
 from utils.data_loader import load_data
+from utils.segmentation import get_segmentation
 from utils.intervention_logic import RiskEngine, PlanEngine, OutcomeLogger, CommunicationEngine
+from utils.contact_history import get_contact_history
 import urllib.parse
 
 # --- Styling Constants ---
@@ -31,16 +33,21 @@ def render_intervention_page(token=None):
             customer_data = CommunicationEngine.get_customer_by_token(token)
             if customer_data:
                 customer = customer_data
-                OutcomeLogger.log_outcome(customer.get('customer_id'), "N/A", "OPENED_LOW")
+                if get_contact_history().try_record(customer.get('customer_id'), "portal_open", source="OPENED_LOW"):
+                    OutcomeLogger.log_outcome(customer.get('customer_id'), "N/A", "OPENED_LOW")
         except:
             pass
     
+    # A link was used but did not verify (tampered, or past its 48h validity): don't fall back to demo data
+    if token and customer is None:
+        return html.Div("This link is invalid or has expired. Please contact your relationship manager for a new one.", className="p-5 text-center text-danger")
+    
     # Fallback/Demo Mode: Select a LOW risk customer
     if customer is None:
         df = load_data()
         if not df.empty:
-            # Low risk: PD < 0.2
-            low_risk = df[df['probability_of_default'] < 0.2]
+            # Low risk (band rows from the shared segmentation)
+            low_risk = df.iloc[get_segmentation(df).rows("risk_band", "Low")[:1]]
             if not low_risk.empty:
                 customer = low_risk.iloc[0].to_dict()
             else:
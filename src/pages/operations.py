@@ -6,6 +6,8 @@ import pandas as pd
 import numpy as np
 import os
 from utils.data_loader import load_data
+from utils.segmentation import get_segmentation
+from utils.event_store import get_event_store
 from components.cards import KPICard
 
 # dash.register_page(__name__, path='/operations', name="Operations") # Removed to fix app.py import error
@@ -16,56 +18,32 @@ def get_risk_tag(pd_val):
     if pd_val > 0.40: return "medium-risk"
     return "low-risk"
 
-def get_risk_label(pd_val):
-    if pd_val > 0.85: return "ESCALATION"
-    if pd_val > 0.70: return "High Priority"
-    if pd_val > 0.40: return "Follow-Up"
-    return "Low Monitor"
+# Recommended action per ops segment (OPS_LABELS order) for [stable/decreasing, increasing] risk trend
+# Logic: High PD + Increasing Trend = Maximum Urgency
+ACTION_TABLE = np.array([
+    ["Automated Statement", "Automated Statement"],                 # Low Monitor
+    ["SMS / Email Reminder", "Priority Call"],                      # Follow-Up
+    ["Call Within 24h", "Escalate to Senior Manager"],              # High Priority
+    ["Field Visit / Legal", "Field Visit / Legal"]                  # ESCALATION
+], dtype=object)
 
-def get_action_recommendation(pd, trend, exposure):
+def get_action_recommendations(segment_codes, trend):
     # Trend: 0=Stable, 1=Increasing Risk, 2=Decreasing Risk
-    # Logic: High PD + Increasing Trend = Maximum Urgency
-    
-    if pd > 0.85:
-        return "Field Visit / Legal"
-    elif pd > 0.70:
-        if trend == 1: return "Escalate to Senior Manager"
-        return "Call Within 24h"
-    elif pd > 0.40:
-        if trend == 1: return "Priority Call"
-        return "SMS / Email Reminder"
-    else:
-        return "Automated Statement"
+    increasing = (np.asarray(trend) == 1).astype(np.int8)
+    return ACTION_TABLE[segment_codes, increasing]
+
 def load_interaction_metrics():
-    """Parses the real-time audit log to get counts."""
-    opened = set()
-    accepted = set()
-    
-    # Calculate path relative to this file
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    log_path = os.path.join(base_dir, "intervention_audit_log.txt")
-    
+    """
+    Distinct customers sent an alert, who opened the portal and who accepted a plan.
+    Newly appended events are ingested into the indexed event store, which answers the counts.
+    """
     try:
-        with open(log_path, "r") as f:
-            for line in f:
-                if "INTERVENTION_LOG" in line:
-                    parts = line.split(",")
-                    cust_part = [p for p in parts if "Customer=" in p]
-                    status_part = [p for p in parts if "Status=" in p]
-                    
-                    if cust_part and status_part:
-                        cust_id = cust_part[0].split("=")[1].strip()
-                        status = status_part[0].split("=")[1].strip()
-                        
-                        if status == "OPENED":
-                            opened.add(cust_id)
-                        elif "ACCEPTED" in status:
-                            accepted.add(cust_id)
-    except FileNotFoundError:
-        print(f"Log file not found at: {log_path}")
-        return 0, 0
+        counts = get_event_store().stage_counts()
+    except Exception as e:
+        print(f"Failed to read intervention events: {e}")
+        return 0, 0, 0
         
-    return len(opened), len(accepted)
+    return counts['sent'], counts['opened'], counts['accepted']
 
 def layout():
     # 1. Load Real Data
@@ -100,14 +78,17 @@ def layout():
                                (df['failed_auto_debits_last_3m'] * bounce_weight) + \
                                (df['emi_amount'] * emi_weight)
                                
+    # Add Display Columns from the shared segmentation (row-aligned with df_raw, so before sorting)
+    segmentation = get_segmentation(df_raw)
+    df['Risk Segment'] = segmentation.labels('ops_segment')
+    df['Action'] = get_action_recommendations(segmentation.codes('ops_segment'), df['risk_trend'].to_numpy())
+    high_risk_df = df.iloc[segmentation.rows('risk_band', 'High')]
+    pending_followups = segmentation.counts('ops_segment')['Follow-Up']
+
     # Normalize score for display (0-100 is easier for humans, but let's keep raw density for sorting)
     # We will sort by Raw Score descending
     df = df.sort_values(by='priority_score_raw', ascending=False)
     
-    # Add Display Columns
-    df['Risk Segment'] = df['probability_of_default'].apply(get_risk_label)
-    df['Action'] = df.apply(lambda row: get_action_recommendation(row['probability_of_default'], row['risk_trend'], row['existing_liabilities_inr']), axis=1)
-    
     # Logic for Trend Text
     trend_map = {0: 'Stable', 1: 'Increasing ↗', 2: 'Decreasing ↘'}
     df['Trend_Text'] = df['risk_trend'].map(trend_map).fillna('Unknown')
@@ -125,7 +106,6 @@ def layout():
     # 4. KPI Calculations (Portfolio Level)
     total_exposure = df['existing_liabilities_inr'].sum()
     
-    high_risk_df = df[df['probability_of_default'] > 0.70]
     high_risk_exposure = high_risk_df['existing_liabilities_inr'].sum()
     total_expected_loss = df['expected_loss'].sum()
     avg_emi_high_risk = high_risk_df['emi_amount'].mean() if not high_risk_df.empty else 0
@@ -133,10 +113,9 @@ def layout():
     # Operational KPIs
     # Action Required Today: High Risk customers (PD > 0.7)
     action_today = len(high_risk_df)
-    pending_followups = len(df[(df['probability_of_default'] > 0.4) & (df['probability_of_default'] <= 0.7)])
     
     # New Engagement Metrics from REAL-TIME LOGS
-    real_opened_count, real_accepted_count = load_interaction_metrics()
+    real_sent_count, real_opened_count, real_accepted_count = load_interaction_metrics()
     
     opened_url_count = real_opened_count
     to_be_followed_up = real_accepted_count
@@ -166,11 +145,7 @@ def layout():
             dbc.Col(KPICard("Action Required Today", str(action_today), "Critical Escalations", color="danger"), xs=12, md=6, lg=3, className="mb-3"),
             dbc.Col(KPICard("Pending Follow-ups", str(pending_followups), "Medium Priority Queue", color="primary"), xs=12, md=6, lg=3, className="mb-3"),
             dbc.Col(KPICard("Avg Resolution Time", avg_resolution, "-12% vs Last Week", color="success"), xs=12, md=6, lg=3, className="mb-3"),
-            # Intervention Success moved to top row, leaving slot empty or we can add something else?
-            # Let's keep appearance balanced by making columns wider or adding a placeholder. 
-            # Actually, let's just span the last card or leave 3 columns. 
-            # Or duplicte? No.
-            # Let's remove the 4th column here for now.
+            dbc.Col(KPICard("Alerts Sent", str(real_sent_count), "Customers Emailed / Messaged", color="info"), xs=12, md=6, lg=3, className="mb-3"),
         ], className="mb-3 g-2"),
 
         # Main Execution Table
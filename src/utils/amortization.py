@@ -0,0 +1,126 @@
+import numpy as np
+
+# --- AMORTIZATION CONFIGURATION ---
+BASE_ANNUAL_RATE = 0.12         # Book rate assumed for loans (the dataset carries no per-loan rate)
+GRID_TENURES = np.arange(6, 301, 6)                          # 50 tenures: 6 .. 300 months
+GRID_RATES = np.round(np.arange(0.08, 0.18, 0.005), 4)       # 20 annual rates: 8% .. 17.5%
+
+# All functions broadcast over NumPy arrays (or plain scalars) of principal, annual rate and tenure.
+# Rates are annual fractions (0.12 = 12%), compounded monthly; tenures are in months.
+
+def annuity_factor(annual_rate, tenure_months):
+    """
+    EMI per unit of principal: r(1+r)^n / ((1+r)^n - 1), or 1/n at a zero rate.
+    """
+    r = np.asarray(annual_rate, dtype=float) / 12
+    n = np.asarray(tenure_months, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = np.power(1 + r, n)
+        factor = np.where(r > 0, r * growth / (growth - 1), 1 / n)
+    return factor
+
+def annuity_emi(principal, annual_rate, tenure_months):
+    """
+    Level monthly instalment that repays `principal` over `tenure_months`.
+    """
+    return np.asarray(principal, dtype=float) * annuity_factor(annual_rate, tenure_months)
+
+def principal_from_emi(emi, annual_rate, tenure_months):
+    """
+    Outstanding principal implied by paying `emi` for the remaining `tenure_months` (present value).
+    """
+    return np.asarray(emi, dtype=float) / annuity_factor(annual_rate, tenure_months)
+
+def total_interest(principal, annual_rate, tenure_months):
+    """
+    Interest paid over the life of the loan.
+    """
+    return annuity_emi(principal, annual_rate, tenure_months) * np.asarray(tenure_months) - np.asarray(principal, dtype=float)
+
+def schedule(principal, annual_rate, tenure_months, max_tenure=None):
+    """
+    Month-by-month amortization schedules for every (principal, rate, tenure) combination.
+
+    Returns a dict of arrays with a trailing month axis of length `max_tenure` (default: the
+    longest tenure): 'month', 'payment', 'interest', 'principal' and 'balance' (outstanding
+    after the payment). Months past a loan's tenure are zero.
+    """
+    principal, annual_rate, tenure_months = np.broadcast_arrays(
+        np.asarray(principal, dtype=float), np.asarray(annual_rate, dtype=float), np.asarray(tenure_months)
+    )
+    if max_tenure is None:
+        max_tenure = int(np.max(tenure_months)) if tenure_months.size else 0
+    months = np.arange(1, max_tenure + 1)
+    emi = annuity_emi(principal, annual_rate, tenure_months)[..., None]
+    r = (annual_rate / 12)[..., None]
+    P = principal[..., None]
+
+    # Closed form balance after k payments: P(1+r)^k - EMI((1+r)^k - 1)/r  (P - k*EMI at r = 0)
+    growth = np.power(1 + r, months)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        balance = np.where(r > 0, P * growth - emi * (growth - 1) / r, P - emi * months)
+    balance = np.maximum(balance, 0)
+    opening = np.concatenate([P, balance[..., :-1]], axis=-1)
+    interest = opening * r
+    active = months <= tenure_months[..., None]
+    payment = np.where(active, emi, 0.0)
+    return {
+        "month": months,
+        "payment": payment,
+        "interest": np.where(active, interest, 0.0),
+        "principal": np.where(active, emi - interest, 0.0),
+        "balance": np.where(active, balance, 0.0)
+    }
+
+def emi_grid(principal, tenures=GRID_TENURES, annual_rates=GRID_RATES):
+    """
+    What-if EMIs for each customer at every tenure x rate: shape (customers, tenures, rates).
+    """
+    factors = annuity_factor(np.asarray(annual_rates)[None, :], np.asarray(tenures)[:, None])
+    return np.asarray(principal, dtype=float)[:, None, None] * factors[None, :, :]
+
+def relief_cost(principal, current_emi, current_tenure, new_annual_rate, new_tenure):
+    """
+    Per-customer effect of restructuring to (new_annual_rate, new_tenure): monthly relief
+    (current EMI - new EMI) and the change in total remaining payments.
+    """
+    new_emi = annuity_emi(principal, new_annual_rate, new_tenure)
+    return {
+        "new_emi": new_emi,
+        "monthly_relief": np.asarray(current_emi, dtype=float) - new_emi,
+        "total_payment_change": new_emi * np.asarray(new_tenure) - np.asarray(current_emi, dtype=float) * np.asarray(current_tenure)
+    }
+
+def relief_grid(principal, current_emi, current_tenure, disposable_income=None,
+                tenures=GRID_TENURES, annual_rates=GRID_RATES):
+    """
+    Portfolio relief estimates for restructuring every customer to each tenure x rate.
+
+    Returns tenures x rates arrays: 'monthly_relief' (total EMI reduction), 'total_payment_change'
+    (total change in remaining payments) and, with `disposable_income`, 'affordable' (customers
+    whose new EMI fits within it). Cost is O(customers log customers), independent of the grid
+    size per customer, so the whole stressed segment fits in well under a second.
+    """
+    tenures = np.asarray(tenures)
+    annual_rates = np.asarray(annual_rates)
+    principal = np.asarray(principal, dtype=float)
+    current_emi = np.asarray(current_emi, dtype=float)
+    factors = annuity_factor(annual_rates[None, :], tenures[:, None])
+
+    # Sums are linear in principal, so they need only portfolio totals
+    new_emi_total = principal.sum() * factors
+    result = {
+        "tenures": tenures,
+        "annual_rates": annual_rates,
+        "customers": len(principal),
+        "monthly_relief": current_emi.sum() - new_emi_total,
+        "total_payment_change": new_emi_total * tenures[:, None] - (current_emi * np.asarray(current_tenure)).sum()
+    }
+    if disposable_income is not None:
+        # new EMI <= income  <=>  factor <= income / principal: one sort, then a binary search per cell
+        with np.errstate(divide="ignore", invalid="ignore"):
+            headroom = np.sort(np.asarray(disposable_income, dtype=float) / principal)
+        headroom = headroom[~np.isnan(headroom)]
+        affordable = len(headroom) - np.searchsorted(headroom, factors, side="left")
+        result["affordable"] = affordable
+    return result
@@ -0,0 +1,356 @@
+import asyncio
+import datetime
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.notification_service import AlertDispatcher, EmailService, SMSService
+
+# --- CAMPAIGN CONFIGURATION ---
+DEFAULT_MAX_CONCURRENCY = 64                         # In-flight sends across all channels
+DEFAULT_CHANNEL_RATES = {"email": 20.0, "sms": 50.0} # Sends per second, per channel
+MAX_REPORTED_FAILURES = 100                          # Failure details kept in the report
+ALERT_BATCH_SIZE = 1000                              # Alerts rendered per template pass
+ENQUEUE_BATCH_SIZE = 1000                            # Alerts written to the outbox per transaction
+OUTBOX_POLL_S = 0.5                                  # Max idle wait while retries are pending
+
+CHANNELS = ("email", "sms")
+
+# --- 1. Rate Limiter ---
+class RateLimiter:
+    """
+    Token bucket shared by every coroutine sending on one channel.
+    """
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+# --- 2. Campaign Engine ---
+class CampaignEngine:
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, channel_rates=None, campaign_id=None, contact_history=None,
+                 event_log=None):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.channel_rates = dict(DEFAULT_CHANNEL_RATES if channel_rates is None else channel_rates)
+        self.campaign_id = campaign_id or f"CAMP-{datetime.datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self.contact_history = contact_history
+        self.event_log = event_log
+
+    @staticmethod
+    def select_customers(df, threshold=None, top_k=None, pd_col='probability_of_default', exclude=None, stats=None):
+        """
+        Returns the eligible customers ordered by PD (highest first).
+        Only the selected rows are sorted: top-K uses argpartition, so the book is never fully sorted.
+        Rows flagged in the boolean `exclude` mask (e.g. frequency-capped customers) are skipped;
+        if a `stats` dict is given, stats['suppressed'] counts the excluded rows that would have been selected.
+        """
+        if stats is not None:
+            stats['suppressed'] = 0
+        if df.empty or pd_col not in df.columns:
+            return df.iloc[0:0]
+
+        pd_values = df[pd_col].to_numpy(dtype=float, na_value=np.nan)
+        pd_values = np.where(np.isnan(pd_values), -np.inf, pd_values)
+
+        if threshold is not None:
+            eligible = pd_values > threshold
+        else:
+            eligible = np.ones(len(pd_values), dtype=bool)
+        excluded = np.zeros(len(pd_values), dtype=bool) if exclude is None else np.asarray(exclude, dtype=bool)
+        candidates = np.flatnonzero(eligible & ~excluded)
+
+        if top_k is not None and top_k < len(candidates):
+            if top_k <= 0:
+                return df.iloc[0:0]
+            top = np.argpartition(-pd_values[candidates], top_k - 1)[:top_k]
+            candidates = candidates[top]
+
+        order = np.argsort(-pd_values[candidates], kind='stable')
+        candidates = candidates[order]
+
+        if stats is not None and excluded.any():
+            suppressed = eligible & excluded
+            if top_k is not None and len(candidates):
+                # Capped customers that ranked at least as high as the last one selected
+                suppressed &= pd_values >= pd_values[candidates[-1]]
+            stats['suppressed'] = int(np.count_nonzero(suppressed))
+        return df.iloc[candidates]
+
+    def run(self, customers, outbox=None):
+        """
+        Sends the campaign to every row of `customers` and returns the campaign report.
+        With an `outbox`, messages are queued durably first and delivered with retries.
+        """
+        return asyncio.run(self.run_async(customers, outbox=outbox))
+
+    def drain(self, outbox, campaign_id=None):
+        """
+        Delivers whatever is still outstanding in the outbox (all campaigns unless `campaign_id` is given).
+        """
+        return asyncio.run(self.drain_async(outbox, campaign_id=campaign_id))
+
+    async def run_async(self, customers, outbox=None):
+        records = customers.to_dict('records') if hasattr(customers, 'to_dict') else list(customers)
+        state = self._new_state()
+        alerts = self._iter_alerts(records, state)
+        # A resumed campaign's earlier deliveries are in the contact history too; they are
+        # counted as already sent, not as suppressed by the caps
+        sent = set()
+        if outbox is not None:
+            sent = {key for key, status in outbox.statuses(self.campaign_id).items() if status == "sent"}
+        messages = self._alert_messages(alerts, state, sent)
+
+        if outbox is None:
+            await self._fan_out(_as_async(messages), state)
+        else:
+            for chunk in _chunks(messages, ENQUEUE_BATCH_SIZE):
+                outbox.enqueue_many(dict(m, campaign_id=self.campaign_id) for m in chunk)
+            await self._fan_out(self._outbox_messages(outbox, self.campaign_id), state, outbox)
+
+            # A resumed campaign only re-sends what is outstanding; reflect earlier deliveries too
+            for (customer_id, channel), status in outbox.statuses(self.campaign_id).items():
+                if customer_id in state['results']:
+                    state['results'][customer_id][f"{channel}_sent"] = status == "sent"
+
+        return self._summarize(len(records), state, outbox, self.campaign_id)
+
+    async def drain_async(self, outbox, campaign_id=None):
+        state = self._new_state()
+        await self._fan_out(self._outbox_messages(outbox, campaign_id), state, outbox)
+        # Outbox stats for what was drained: every campaign unless one was given
+        return self._summarize(len(state['results']), state, outbox, campaign_id)
+
+    def _new_state(self):
+        return {
+            "started_at": datetime.datetime.now(),
+            "start": time.perf_counter(),
+            "results": {},
+            "latencies": {channel: [] for channel in CHANNELS},
+            "failures": [],
+            "suppressed": {channel: 0 for channel in CHANNELS},
+            "already_sent": {channel: 0 for channel in CHANNELS},
+            "superseded": 0
+        }
+
+    def _iter_alerts(self, records, state):
+        # Rendered in batches so only the alerts currently being sent are held in memory
+        for chunk in _chunks(records, ALERT_BATCH_SIZE):
+            errors = []
+            for alert in AlertDispatcher.build_alerts(chunk, errors=errors):
+                state['results'][alert['customer_id']] = self._new_result(alert['customer_id'], alert['risk_category'], alert['token'])
+                yield alert
+            for customer, error in errors:
+                state['failures'].append({"customer_id": customer.get('customer_id', 'Unknown'), "channel": "build", "error": str(error)})
+
+    @staticmethod
+    def _new_result(customer_id, risk_category=None, token=None):
+        return {
+            "customer_id": customer_id,
+            "risk_category": risk_category,
+            "email_sent": False,
+            "sms_sent": False,
+            "token": token,
+            "timestamp": datetime.datetime.now().isoformat()
+        }
+
+    def _alert_messages(self, alerts, state, sent=()):
+        history = self.contact_history
+        for alert in alerts:
+            messages = (
+                {"channel": "email", "customer_id": alert['customer_id'], "recipient": alert['email'],
+                 "subject": alert['email_subject'], "body": alert['email_body']},
+                {"channel": "sms", "customer_id": alert['customer_id'], "recipient": alert['phone'],
+                 "subject": None, "body": alert['sms_body']}
+            )
+            for message in messages:
+                if (str(message['customer_id']), message['channel']) in sent:
+                    state['already_sent'][message['channel']] += 1
+                    continue
+                # Per-channel frequency cap: O(1) lookup in the in-memory contact index
+                if history is not None and not history.allowed(message['customer_id'], message['channel']):
+                    state['suppressed'][message['channel']] += 1
+                    continue
+                yield message
+
+    async def _outbox_messages(self, outbox, campaign_id):
+        while True:
+            batch = outbox.claim(limit=self.max_concurrency * 2, campaign_id=campaign_id)
+            if batch:
+                for message in batch:
+                    yield message
+                continue
+            # Nothing due: stop once nothing is outstanding, otherwise wait for the next retry/lease
+            wait = outbox.next_due_in(campaign_id)
+            if wait is None:
+                return
+            await asyncio.sleep(min(max(wait, 0.05), OUTBOX_POLL_S))
+
+    async def _fan_out(self, messages, state, outbox=None):
+        limiters = {
+            channel: RateLimiter(rate) for channel, rate in self.channel_rates.items() if rate
+        }
+        queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+        loop = asyncio.get_running_loop()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="campaign") as executor:
+
+            async def producer():
+                try:
+                    async for message in messages:
+                        await queue.put(message)
+                finally:
+                    for _ in range(self.max_concurrency):
+                        await queue.put(None)
+
+            async def worker():
+                while True:
+                    message = await queue.get()
+                    if message is None:
+                        return
+                    channel = message['channel']
+                    limiter = limiters.get(channel)
+                    if limiter:
+                        await limiter.acquire()
+                    ok, error, latency, status = await loop.run_in_executor(executor, self._deliver, message, outbox)
+                    self._record(state, message, ok, error, latency, status)
+
+            await asyncio.gather(producer(), *(worker() for _ in range(self.max_concurrency)))
+
+    def _deliver(self, message, outbox=None):
+        start = time.perf_counter()
+        try:
+            if message['channel'] == "email":
+                ok = EmailService.send_email(message['recipient'], message['subject'], message['body'])
+            else:
+                ok = SMSService.send_sms(message['recipient'], message['body'])
+            error = None if ok else f"{message['channel']} send returned False"
+        except Exception as e:
+            ok, error = False, str(e)
+        latency = time.perf_counter() - start
+
+        if ok and self.contact_history is not None:
+            # Recorded as each send succeeds: caps hold for a resumed campaign, a drain, and
+            # dashboard sends made while the campaign is still running
+            self.contact_history.record(message['customer_id'], message['channel'], source=self.campaign_id)
+
+        status = None
+        if outbox is not None:
+            if ok:
+                status = outbox.mark_sent(message, latency_ms=latency * 1000)
+            else:
+                status = outbox.mark_failed(message, error, latency_ms=latency * 1000)
+        return ok, error, latency, status
+
+    def _record(self, state, message, ok, error, latency, status):
+        channel = message['channel']
+        customer_id = message['customer_id']
+        result = state['results'].get(customer_id)
+        if result is None:
+            result = state['results'][customer_id] = self._new_result(customer_id)
+        result[f"{channel}_sent"] = ok
+        if status == "superseded":
+            # Lease expired mid-send: another worker re-leased the message and owns its status
+            state['superseded'] += 1
+        if ok:
+            if self.event_log is not None:
+                self.event_log.log(customer_id, "N/A", f"SENT_{channel.upper()}", latency_ms=latency * 1000)
+        state['latencies'][channel].append(latency)
+        if error:
+            failure = {"customer_id": customer_id, "channel": channel, "error": error}
+            if status is not None:
+                failure.update({"attempt": message['attempts'], "dead_lettered": status == "dead"})
+            state['failures'].append(failure)
+
+    def _summarize(self, selected, state, outbox=None, campaign_id=None):
+        results = list(state['results'].values())
+        latencies = state['latencies']
+        duration = time.perf_counter() - state['start']
+
+        channels = {}
+        for channel in CHANNELS:
+            lat_ms = np.asarray(latencies[channel], dtype=float) * 1000
+            channels[channel] = {
+                "sent": sum(1 for r in results if r[f"{channel}_sent"]),
+                "attempts": len(lat_ms),
+                "failed": sum(1 for f in state['failures'] if f['channel'] == channel),
+                "latency_ms": {
+                    "p50": float(np.percentile(lat_ms, 50)) if len(lat_ms) else 0.0,
+                    "p95": float(np.percentile(lat_ms, 95)) if len(lat_ms) else 0.0,
+                    "p99": float(np.percentile(lat_ms, 99)) if len(lat_ms) else 0.0,
+                    "max": float(lat_ms.max()) if len(lat_ms) else 0.0
+                }
+            }
+
+        total_sends = sum(len(latencies[c]) for c in CHANNELS)
+        report = {
+            "campaign_id": self.campaign_id,
+            "started_at": state['started_at'].isoformat(),
+            "selected": selected,
+            "alerted": len(results),
+            "fully_delivered": sum(1 for r in results if r['email_sent'] and r['sms_sent']),
+            "failed": len(state['failures']),
+            "duration_s": duration,
+            "throughput_per_s": total_sends / duration if duration > 0 else 0.0,
+            "channels": channels,
+            "suppressed": dict(state['suppressed']),
+            "already_sent": dict(state['already_sent']),
+            "failures": state['failures'][:MAX_REPORTED_FAILURES],
+            "results": results
+        }
+        if outbox is not None:
+            report["outbox"] = outbox.stats(campaign_id)
+            report["superseded"] = state['superseded']
+        return report
+
+    @staticmethod
+    def format_report(report):
+        lines = [
+            f"[CAMPAIGN] {report['campaign_id']}: {report['alerted']}/{report['selected']} customers alerted "
+            f"in {report['duration_s']:.2f}s ({report['throughput_per_s']:.1f} sends/s), {report['failed']} failures"
+        ]
+        for channel, stats in report['channels'].items():
+            lat = stats['latency_ms']
+            lines.append(
+                f"[CAMPAIGN]   {channel:<5} sent={stats['sent']} attempts={stats['attempts']} failed={stats['failed']} "
+                f"p50={lat['p50']:.1f}ms p95={lat['p95']:.1f}ms p99={lat['p99']:.1f}ms"
+            )
+        suppressed = report.get('suppressed') or {}
+        if any(suppressed.values()):
+            details = " ".join(f"{key}={count}" for key, count in suppressed.items())
+            lines.append(f"[CAMPAIGN]   suppressed by frequency caps: {details}")
+        already_sent = report.get('already_sent') or {}
+        if any(already_sent.values()):
+            details = " ".join(f"{key}={count}" for key, count in already_sent.items())
+            lines.append(f"[CAMPAIGN]   already sent by an earlier run: {details}")
+        if report.get('superseded'):
+            lines.append(f"[CAMPAIGN]   {report['superseded']} acknowledgements lost to an expired lease")
+        return "\n".join(lines)
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+async def _as_async(iterable):
+    for item in iterable:
+        yield item
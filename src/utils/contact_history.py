@@ -0,0 +1,198 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+# Define history path dynamically relative to this file (next to the audit log)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTACT_DB = os.path.join(BASE_DIR, "contact_history.db")
+
+# --- FREQUENCY CAPS ---
+# channel -> (max contacts, window in hours). Channels without an entry are never capped.
+CONTACT_CAPS = {
+    "email": (1, 48),
+    "sms": (1, 48),
+    "portal_open": (1, 0.5)   # Portal reloads within 30 minutes count as a single OPENED event
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contact_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    contacted_at REAL NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_contact_customer ON contact_history(customer_id, channel, contacted_at);
+"""
+
+class ContactCapExceeded(Exception):
+    """
+    Raised when a customer was already contacted on a channel within its cap window.
+    """
+    def __init__(self, customer_id, channel, next_allowed_at):
+        self.customer_id = customer_id
+        self.channel = channel
+        self.next_allowed_at = next_allowed_at
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(next_allowed_at))
+        super().__init__(f"Customer {customer_id} was already contacted by {channel}; next contact allowed after {when}")
+
+class ContactHistory:
+    """
+    Per-customer, per-channel contact history with frequency caps.
+
+    Contacts are appended to SQLite (shared by the dashboard, the portal and campaign runs);
+    the recent window is mirrored in memory as a dict per channel of customer_id -> deque of
+    the last `max_contacts` timestamps, so a cap check is a single dict lookup. Writes made
+    by other processes are picked up incrementally via SQLite's data_version.
+    """
+    def __init__(self, path=CONTACT_DB, caps=None):
+        self.path = path
+        self.caps = dict(CONTACT_CAPS if caps is None else caps)
+        self._lock = threading.RLock()
+        self._index = {}
+        self._last_id = 0
+        self._data_version = None
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._refresh()
+
+    # --- Index maintenance ---
+    def _max_window_s(self):
+        return max((hours * 3600 for _, hours in self.caps.values()), default=0)
+
+    def _refresh(self):
+        """
+        Loads contacts written since the last refresh (by this or any other process).
+        """
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return
+            self._data_version = version
+            since = time.time() - self._max_window_s()
+            rows = self._conn.execute(
+                "SELECT id, customer_id, channel, contacted_at FROM contact_history "
+                "WHERE id > ? AND contacted_at >= ? ORDER BY contacted_at",
+                (self._last_id, since)
+            ).fetchall()
+            for row_id, customer_id, channel, contacted_at in rows:
+                self._remember(customer_id, channel, contacted_at)
+                self._last_id = max(self._last_id, row_id)
+
+    def _remember(self, customer_id, channel, contacted_at):
+        cap = self.caps.get(channel)
+        if cap is None:
+            return
+        contacts = self._index.setdefault(channel, {})
+        history = contacts.get(str(customer_id))
+        if history is None:
+            history = contacts[str(customer_id)] = deque(maxlen=cap[0])
+        if history and contacted_at < history[-1]:
+            # Late-arriving row from another process: keep the deque in time order
+            merged = sorted(list(history) + [contacted_at])
+            history.clear()
+            history.extend(merged)
+        else:
+            history.append(contacted_at)
+
+    # --- Cap checks ---
+    def next_allowed_at(self, customer_id, channel):
+        """
+        Epoch seconds from which `channel` may contact the customer again (0 if allowed now).
+        """
+        cap = self.caps.get(channel)
+        if cap is None:
+            return 0
+        max_contacts, window_hours = cap
+        history = self._index.get(channel, {}).get(str(customer_id))
+        if not history or len(history) < max_contacts:
+            return 0
+        return history[0] + window_hours * 3600
+
+    def allowed(self, customer_id, channel, now=None):
+        self._refresh()
+        return self.next_allowed_at(customer_id, channel) <= (time.time() if now is None else now)
+
+    def capped_mask(self, customer_ids, channels, now=None):
+        """
+        Boolean array: True where the customer is capped on every one of `channels`.
+        One dict lookup per customer for the first channel, then only for those still capped.
+        """
+        import numpy as np  # Kept out of module import: the portal only needs the O(1) checks
+        self._refresh()
+        now = time.time() if now is None else now
+        ids = [str(c) for c in customer_ids]
+        capped = np.arange(len(ids))
+        for channel in channels:
+            capped = capped[[self.next_allowed_at(ids[i], channel) > now for i in capped]] if len(capped) else capped
+        mask = np.zeros(len(ids), dtype=bool)
+        mask[capped] = True
+        return mask
+
+    # --- Recording ---
+    def record_many(self, contacts, source=None):
+        """
+        Appends (customer_id, channel, contacted_at) tuples; contacted_at may be None for "now".
+        """
+        now = time.time()
+        rows = [(str(c), ch, now if ts is None else ts, source) for c, ch, ts in contacts]
+        return len(self._append(rows)) if rows else 0
+
+    def record(self, customer_id, channel, source=None):
+        return self.record_many([(customer_id, channel, None)], source=source)
+
+    def try_record(self, customer_id, channel, source=None):
+        """
+        Records the contact only if the cap allows it. Returns True when recorded. The check
+        and the insert share one IMMEDIATE transaction, so concurrent processes cannot both
+        pass the cap.
+        """
+        now = time.time()
+        row = (str(customer_id), channel, now, source)
+        return bool(self._append([row], allow=lambda: self.next_allowed_at(customer_id, channel) <= now))
+
+    def _append(self, rows, allow=None):
+        # One IMMEDIATE transaction (it excludes other writers): other processes' rows are
+        # loaded first, so the `allow` check sees every committed contact and advancing
+        # _last_id below cannot skip their rows. Returns the rows inserted.
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh()
+                if allow is not None and not allow():
+                    self._conn.execute("ROLLBACK")
+                    return []
+                self._conn.executemany(
+                    "INSERT INTO contact_history (customer_id, channel, contacted_at, source) VALUES (?, ?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+            # Own writes do not bump data_version, so mirror them directly
+            for customer_id, channel, contacted_at, _ in rows:
+                self._remember(customer_id, channel, contacted_at)
+            self._last_id = self._conn.execute("SELECT MAX(id) FROM contact_history").fetchone()[0] or 0
+        return rows
+
+    def check(self, customer_id, channel):
+        """
+        Raises ContactCapExceeded if `channel` may not contact the customer right now.
+        """
+        if not self.allowed(customer_id, channel):
+            raise ContactCapExceeded(customer_id, channel, self.next_allowed_at(customer_id, channel))
+
+_HISTORIES = {}
+
+def get_contact_history(path=CONTACT_DB):
+    """
+    Returns the process-wide contact history for `path`, loading its index once.
+    """
+    if path not in _HISTORIES:
+        _HISTORIES[path] = ContactHistory(path)
+    return _HISTORIES[path]
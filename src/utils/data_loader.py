@@ -1,6 +1,8 @@
 import pandas as pd
+import numpy as np
 import os
 import re
+import hashlib
 
 # Define paths
 # Define paths
@@ -57,6 +59,27 @@ def load_data():
         print(f"Error loading data: {e}")
         return pd.DataFrame()
 
+def get_data_version():
+    """Short fingerprint of the dataset file in use; changes whenever the file is regenerated."""
+    for path in (DATA_PATH_FULL, DATA_PATH_SAMPLE):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            return hashlib.sha1(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:10]
+    return "none"
+
+@lru_cache(maxsize=1)
+def get_customer_index():
+    """
+    Hash index over load_data() customer_ids, built once: returns (pd.Index of unique ids, row positions).
+    Lookups are `positions[index.get_loc(customer_id)]` instead of a boolean scan of the frame.
+    """
+    df = load_data()
+    if 'customer_id' not in df.columns:
+        return pd.Index([]), np.array([], dtype=int)
+    ids = df['customer_id'].astype(str)
+    first = ~ids.duplicated(keep='first').to_numpy()
+    return pd.Index(ids[first]), np.flatnonzero(first)
+
 def load_model_metrics():
     """Parses final_results.txt to extract model performance metrics."""
     metrics = {}
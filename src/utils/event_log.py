@@ -0,0 +1,226 @@
+import atexit
+import datetime
+import json
+import os
+import re
+import threading
+
+try:
+    import fcntl  # POSIX only; without it writers are serialized per process only
+except ImportError:
+    fcntl = None
+
+# Define event log paths dynamically relative to this file (next to the legacy audit log)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EVENT_LOG = os.path.join(BASE_DIR, "intervention_events.jsonl")
+LEGACY_LOG_FILE = os.path.join(BASE_DIR, "intervention_audit_log.txt")
+
+# --- WRITER CONFIGURATION ---
+FSYNC_POLICY = os.environ.get("EVENT_LOG_FSYNC", "interval")  # always | interval | never
+FLUSH_INTERVAL_S = 0.5          # Background flush period
+FLUSH_BYTES = 64 * 1024         # Flush early once this much is buffered
+MAX_BYTES = 64 * 1024 * 1024    # Rotate the live file past this size
+BACKUP_COUNT = 5                # Rotated files kept: .1 (newest) ... .5 (oldest)
+
+# Event schema: every line is one JSON object with exactly these keys
+SCHEMA = ("ts", "customer_id", "plan_id", "status", "latency_ms", "reason")
+
+LEGACY_LINE = re.compile(r"^(?P<ts>[\d\-]+ [\d:.]+) - INTERVENTION_LOG: Customer=(?P<customer_id>[^,]*), Plan=(?P<plan_id>[^,]*), Status=(?P<status>\S+)")
+
+def make_event(customer_id, plan_id, status, latency_ms=None, reason=None, ts=None):
+    """
+    Builds a schema-conformant event. `ts` defaults to now (local time, ISO 8601, milliseconds).
+    """
+    if not status:
+        raise ValueError("Event status is required")
+    ts = ts or datetime.datetime.now().isoformat(timespec="milliseconds")
+    return {
+        "ts": ts,
+        "customer_id": None if customer_id is None else str(customer_id),
+        "plan_id": None if plan_id is None else str(plan_id),
+        "status": str(status),
+        "latency_ms": None if latency_ms is None else round(float(latency_ms), 3),
+        "reason": reason
+    }
+
+def parse_legacy_line(line):
+    """
+    Converts a free-text INTERVENTION_LOG line from the old audit log into an event (or None).
+    """
+    match = LEGACY_LINE.match(line)
+    if not match:
+        return None
+    ts = datetime.datetime.fromisoformat(match.group("ts")).isoformat(timespec="milliseconds")
+    return make_event(match.group("customer_id").strip(), match.group("plan_id").strip(), match.group("status"), ts=ts)
+
+def log_files(path=EVENT_LOG, backup_count=BACKUP_COUNT):
+    """
+    Existing event log files, oldest first (rotated backups, then the live file).
+    """
+    files = [f"{path}.{i}" for i in range(backup_count, 0, -1)] + [path]
+    return [f for f in files if os.path.exists(f)]
+
+def iter_events(path=EVENT_LOG, include_legacy=True):
+    """
+    Yields every event in chronological file order, starting with the legacy text audit log.
+    """
+    if include_legacy and os.path.exists(LEGACY_LOG_FILE):
+        with open(LEGACY_LOG_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                event = parse_legacy_line(line)
+                if event:
+                    yield event
+    for file_path in log_files(path):
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.endswith("\n"):  # A partial last line is still being written
+                    yield json.loads(line)
+
+class EventLogWriter:
+    """
+    Buffered, append-only JSONL writer for intervention events.
+
+    Events are encoded on the caller's thread and buffered in memory; a daemon thread
+    flushes the buffer every FLUSH_INTERVAL_S as a single O_APPEND write, so concurrent
+    processes never interleave partial lines. Writes and size-based rotation happen under
+    an exclusive flock on a sidecar lock file, and every writer re-opens the live file if
+    another process rotated it away. `fsync` is one of:
+        always   - flush and fsync before write() returns (durable, slowest)
+        interval - fsync on every background flush (default; loses < FLUSH_INTERVAL_S on power loss)
+        never    - leave it to the OS page cache
+    """
+    def __init__(self, path=EVENT_LOG, fsync=FSYNC_POLICY, flush_interval_s=FLUSH_INTERVAL_S,
+                 max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+        if fsync not in ("always", "interval", "never"):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.path = path
+        self.fsync = fsync
+        self.flush_interval_s = flush_interval_s
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._lock = threading.Lock()          # Guards the buffer
+        self._io_lock = threading.Lock()       # Serializes flushes within this process
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._fd = None
+        self._inode = None
+        self._lock_fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._thread = threading.Thread(target=self._run, name="event-log-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- Public API ---
+    def write(self, event):
+        """
+        Buffers one event (a dict with the SCHEMA keys; see make_event).
+        """
+        line = json.dumps({key: event.get(key) for key in SCHEMA}, ensure_ascii=False, separators=(",", ":")) + "\n"
+        data = line.encode("utf-8")
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Event log writer is closed")
+            self._buffer.append(data)
+            self._buffered_bytes += len(data)
+            flush_now = self.fsync == "always"
+            if self._buffered_bytes >= FLUSH_BYTES:
+                self._wakeup.set()
+        if flush_now:
+            self.flush()
+
+    def log(self, customer_id, plan_id, status, latency_ms=None, reason=None):
+        event = make_event(customer_id, plan_id, status, latency_ms=latency_ms, reason=reason)
+        self.write(event)
+        return event
+
+    def flush(self):
+        """
+        Writes everything buffered so far to disk (one write() call).
+        """
+        with self._io_lock:
+            with self._lock:
+                if not self._buffer:
+                    return 0
+                data = b"".join(self._buffer)
+                self._buffer = []
+                self._buffered_bytes = 0
+            self._write_locked(data)
+            return len(data)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        os.close(self._lock_fd)
+        atexit.unregister(self.close)
+
+    # --- Internals ---
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval_s)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[EVENT LOG] ERROR: Failed to flush events to {self.path}: {e}")
+
+    def _write_locked(self, data):
+        if fcntl:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            self._ensure_open()
+            if self.max_bytes and os.fstat(self._fd).st_size + len(data) > self.max_bytes and os.fstat(self._fd).st_size > 0:
+                self._rotate()
+            os.write(self._fd, data)
+            if self.fsync != "never":
+                os.fsync(self._fd)
+        finally:
+            if fcntl:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _ensure_open(self):
+        # Another process may have rotated the live file since we opened it
+        try:
+            current_inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            current_inode = None
+        if self._fd is not None and current_inode == self._inode:
+            return
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._inode = os.fstat(self._fd).st_ino
+
+    def _rotate(self):
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        os.close(self._fd)
+        self._fd = None
+        self._ensure_open()
+
+_WRITERS = {}
+_WRITERS_LOCK = threading.Lock()
+
+def get_event_log(path=EVENT_LOG):
+    """
+    Returns the process-wide writer for `path` (one buffer and flusher thread per file).
+    """
+    with _WRITERS_LOCK:
+        writer = _WRITERS.get(path)
+        if writer is None or writer._closed:
+            writer = _WRITERS[path] = EventLogWriter(path)
+        return writer
@@ -0,0 +1,197 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from utils.event_log import EVENT_LOG, BACKUP_COUNT
+from utils.interaction_metrics import EventLogTailer, funnel_stage, FUNNEL_STAGES
+
+# Define store path dynamically relative to this file (next to the event log)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EVENT_DB = os.path.join(BASE_DIR, "intervention_events.db")
+
+INGEST_BATCH_SIZE = 5000   # Rows per executemany call
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts TEXT NOT NULL,
+    customer_id TEXT,
+    plan_id TEXT,
+    status TEXT NOT NULL,
+    stage TEXT,
+    latency_ms REAL,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+CREATE INDEX IF NOT EXISTS idx_events_customer ON events(customer_id, ts);
+CREATE INDEX IF NOT EXISTS idx_events_plan ON events(plan_id, ts);
+CREATE INDEX IF NOT EXISTS idx_events_status ON events(status, ts);
+CREATE INDEX IF NOT EXISTS idx_events_stage ON events(stage, ts, customer_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+def _ts(value):
+    """
+    Normalizes a date / datetime / ISO string bound to the stored ISO 8601 text format.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(timespec="milliseconds")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value)
+
+def _range_filter(since, until, column="ts"):
+    clauses, params = [], []
+    if since is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(_ts(since))
+    if until is not None:
+        clauses.append(f"{column} < ?")
+        params.append(_ts(until))
+    return clauses, params
+
+class EventStore:
+    """
+    Indexed, queryable copy of the intervention event log.
+
+    `ingest()` tails the JSONL log from the checkpoint stored in the `meta` table and
+    inserts the new events in the same transaction as the checkpoint update, so every
+    event is stored exactly once even with several processes ingesting.
+    """
+    def __init__(self, path=EVENT_DB, log_path=EVENT_LOG, backup_count=BACKUP_COUNT, include_legacy=True):
+        self.path = path
+        self.log_path = log_path
+        self.backup_count = backup_count
+        self.include_legacy = include_legacy
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+
+    # --- Ingestion ---
+    def ingest(self):
+        """
+        Loads events appended to the log since the last ingest. Returns the number stored.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT value FROM meta WHERE key = 'log_checkpoint'").fetchone()
+                checkpoint = json.loads(row[0]) if row else None
+                tailer = EventLogTailer(self.log_path, self.backup_count, self.include_legacy, checkpoint=checkpoint)
+                events = tailer.read_new()
+                rows = [
+                    (e.get('ts'), e.get('customer_id'), e.get('plan_id'), e.get('status'),
+                     funnel_stage(e.get('status') or ""), e.get('latency_ms'), e.get('reason'))
+                    for e in events
+                ]
+                for start in range(0, len(rows), INGEST_BATCH_SIZE):
+                    self._conn.executemany(
+                        "INSERT INTO events (ts, customer_id, plan_id, status, stage, latency_ms, reason) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        rows[start:start + INGEST_BATCH_SIZE]
+                    )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('log_checkpoint', ?)", (json.dumps(tailer.checkpoint),)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # --- Queries ---
+    def customer_history(self, customer_id, since=None, until=None):
+        """
+        Everything a customer was sent, opened and accepted, oldest first.
+        """
+        clauses, params = _range_filter(since, until)
+        where = " AND ".join(["customer_id = ?"] + clauses)
+        rows = self._query(f"SELECT ts, plan_id, status, latency_ms, reason FROM events WHERE {where} ORDER BY ts, id",
+                           [str(customer_id)] + params)
+        return pd.DataFrame([dict(r) for r in rows], columns=["ts", "plan_id", "status", "latency_ms", "reason"])
+
+    def stage_counts(self, since=None, until=None):
+        """
+        Distinct customers per funnel stage in the time range.
+        """
+        clauses, params = _range_filter(since, until)
+        where = " AND ".join(["stage IS NOT NULL"] + clauses)
+        rows = self._query(f"SELECT stage, COUNT(DISTINCT customer_id) FROM events WHERE {where} GROUP BY stage", params)
+        counts = {stage: 0 for stage in FUNNEL_STAGES}
+        counts.update({stage: count for stage, count in rows})
+        return counts
+
+    def funnel(self, since=None, until=None):
+        """
+        Per-day distinct customers sent -> opened -> accepted, oldest day first.
+        """
+        clauses, params = _range_filter(since, until)
+        where = " AND ".join(["stage IS NOT NULL"] + clauses)
+        rows = self._query(
+            f"SELECT substr(ts, 1, 10) AS day, stage, COUNT(DISTINCT customer_id) FROM events WHERE {where} "
+            "GROUP BY day, stage ORDER BY day", params
+        )
+        funnel = pd.DataFrame(0, index=sorted({r[0] for r in rows}), columns=list(FUNNEL_STAGES))
+        for day, stage, count in rows:
+            funnel.loc[day, stage] = count
+        return funnel.rename_axis("day").reset_index()
+
+    def acceptance_by_plan(self, since=None, until=None):
+        """
+        Customers accepting each plan, and the acceptance rate against customers who opened the portal.
+        """
+        clauses, params = _range_filter(since, until)
+        where = " AND ".join(["stage = 'accepted'"] + clauses)
+        accepted = self._query(
+            f"SELECT plan_id, COUNT(DISTINCT customer_id) FROM events WHERE {where} GROUP BY plan_id ORDER BY 2 DESC", params
+        )
+        opened = self.stage_counts(since, until)['opened']
+        return pd.DataFrame(
+            [{"plan_id": plan_id, "accepted": count, "acceptance_rate": count / opened if opened else 0.0}
+             for plan_id, count in accepted],
+            columns=["plan_id", "accepted", "acceptance_rate"]
+        )
+
+    def recent(self, limit=20, since=None):
+        clauses, params = _range_filter(since, None)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        rows = self._query(
+            f"SELECT ts, customer_id, plan_id, status FROM events {where} ORDER BY ts DESC, id DESC LIMIT ?", params + [limit]
+        )
+        return pd.DataFrame([dict(r) for r in rows], columns=["ts", "customer_id", "plan_id", "status"])
+
+    def count(self, since=None, until=None):
+        clauses, params = _range_filter(since, until)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        return self._query(f"SELECT COUNT(*) FROM events {where}", params)[0][0]
+
+_STORES = {}
+
+def get_event_store(path=EVENT_DB):
+    """
+    Returns the process-wide event store for `path`, caught up with the event log.
+    """
+    if path not in _STORES:
+        _STORES[path] = EventStore(path)
+    store = _STORES[path]
+    store.ingest()
+    return store
+
+if __name__ == "__main__":
+    store = EventStore()
+    print(f"[EVENT STORE] Ingested {store.ingest()} events into {EVENT_DB} ({store.count()} total)")
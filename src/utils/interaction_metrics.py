@@ -0,0 +1,71 @@
+import json
+import os
+
+from utils.event_log import EVENT_LOG, BACKUP_COUNT, LEGACY_LOG_FILE, log_files, parse_legacy_line
+
+# --- METRICS CONFIGURATION ---
+FUNNEL_STAGES = ("sent", "opened", "accepted")
+
+def funnel_stage(status):
+    """
+    Maps an event status to its funnel stage (or None): SENT_* -> sent, OPENED* -> opened, *ACCEPTED* -> accepted.
+    """
+    if status.startswith("SENT"):
+        return "sent"
+    if status.startswith("OPENED"):
+        return "opened"
+    if "ACCEPTED" in status:
+        return "accepted"
+    return None
+
+# --- 1. Tail Reader ---
+class EventLogTailer:
+    """
+    Reads only the events appended since the previous call.
+
+    The checkpoint is (inode, byte offset) of the last complete line consumed. If the live
+    file was rotated in between, the remainder of the old file is read from its backup
+    (found by inode) before moving on to newer files. A partially written last line is left
+    for the next call. The legacy text audit log is read once.
+    """
+    def __init__(self, path=EVENT_LOG, backup_count=BACKUP_COUNT, include_legacy=True, checkpoint=None):
+        self.path = path
+        self.backup_count = backup_count
+        self.checkpoint = dict(checkpoint) if checkpoint else {"inode": None, "offset": 0, "legacy_done": not include_legacy}
+
+    def read_new(self):
+        events = []
+        if not self.checkpoint.get("legacy_done"):
+            if os.path.exists(LEGACY_LOG_FILE):
+                with open(LEGACY_LOG_FILE, "r", encoding="utf-8") as f:
+                    events.extend(e for e in map(parse_legacy_line, f) if e)
+            self.checkpoint["legacy_done"] = True
+
+        files = []
+        for file_path in log_files(self.path, self.backup_count):
+            try:
+                files.append((file_path, os.stat(file_path).st_ino))
+            except FileNotFoundError:
+                continue  # Rotated away while listing; picked up next time
+
+        start, offset = 0, 0
+        inodes = [inode for _, inode in files]
+        if self.checkpoint["inode"] in inodes:
+            start, offset = inodes.index(self.checkpoint["inode"]), self.checkpoint["offset"]
+        elif self.checkpoint["inode"] is not None:
+            print(f"[METRICS] Checkpointed event file rotated out of {self.path}.*; resuming from the oldest backup")
+
+        for file_path, inode in files[start:]:
+            try:
+                with open(file_path, "rb") as f:
+                    if os.fstat(f.fileno()).st_ino != inode:
+                        break  # Rotated between stat and open; resume next call
+                    f.seek(offset)
+                    data = f.read()
+            except FileNotFoundError:
+                break
+            end = data.rfind(b"\n") + 1
+            events.extend(json.loads(line) for line in data[:end].splitlines() if line)
+            self.checkpoint["inode"], self.checkpoint["offset"] = inode, offset + end
+            offset = 0
+        return events
@@ -1,241 +1,378 @@
+import copy
 import os
 
+import numpy as np
+
+from utils.risk_rules import get_risk_rules
+
 # Define log path dynamically relative to this file
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-LOG_FILE = os.path.join(BASE_DIR, "intervention_audit_log.txt")
+LOG_FILE = os.path.join(BASE_DIR, "intervention_events.jsonl")
 
 # --- 1. Risk Engine ---
+# Thresholds, reason texts and the points formula live in the declarative rules file
+# (src/risk_rules.json), compiled and hot-reloaded by utils.risk_rules.
 class RiskEngine:
     @staticmethod
     def get_risk_category(customer_data):
         """
         Derives risk category based on PD and behavioral flags.
         """
-        pd = customer_data.get('probability_of_default', 0.0)
-        
-        if pd > 0.7:
-            return "High"
-        elif pd > 0.3:
-            return "Moderate"
-        else:
-            return "Low"
+        return get_risk_rules().current().category(customer_data)
 
     @staticmethod
     def get_stability_points(customer_data):
         """
         Calculates gamified stability points for low risk customers.
         """
-        pd = customer_data.get('probability_of_default', 1.0)
-        tenure = customer_data.get('tenure_months', 12) # Mock if missing
-        
-        if pd < 0.3:
-            # Base 500 + (Low Risk Bonus) + Tenure Bonus
-            points = 500 + int((1 - pd) * 1000) + (tenure * 10)
-            return points
-        return 0
+        return get_risk_rules().current().stability_points(customer_data)
 
     @staticmethod
     def get_risk_reasons(customer_data):
         """
-        Generates dynamic, plain-language reasons for the intervention.
+        Generates dynamic, plain-language reasons for the intervention (top 3).
         """
-        reasons = []
-        
-        # Check specific flags
-        if customer_data.get('salary_credit_delay_days', 0) > 5:
-            reasons.append("Your salary was credited later than usual.")
-        
-        if customer_data.get('savings_balance_trend_percent', 0) < -10:
-            reasons.append("Your savings balance has reduced recently.")
-            
-        if customer_data.get('utility_payment_delay_days', 0) > 5:
-            reasons.append("Utility payments are happening later than normal.")
-            
-        if customer_data.get('credit_utilization_percent', 0) > 80:
-            reasons.append("Your credit card utilization is higher than recommended.")
-            
-        if customer_data.get('failed_auto_debits_last_3m', 0) > 0:
-            reasons.append("We noticed a recent failed auto-debit.")
+        return get_risk_rules().current().reasons_for(customer_data)
 
-        # Fallback if no specific reasons found but risk is high
-        if not reasons and customer_data.get('probability_of_default', 0) > 0.5:
-             reasons.append("We noticed some unusual patterns in your recent transactions.")
+    # --- Batch API (DataFrame or dict of column arrays; same results as the scalar methods) ---
+    @staticmethod
+    def get_risk_category_batch(data):
+        """
+        Risk category per customer as an object array of category names.
+        """
+        return get_risk_rules().current().category_batch(data)
 
-        return reasons[:3] # Return top 3
+    @staticmethod
+    def get_stability_points_batch(data):
+        """
+        Stability points per customer. Integer array when tenure_months is integral (or missing),
+        float otherwise, so a NaN tenure yields NaN exactly as the scalar version does.
+        """
+        return get_risk_rules().current().stability_points_batch(data)
+
+    @staticmethod
+    def get_risk_reasons_batch(data):
+        """
+        Reason bitmask per customer: bit i set when reason rule i fires, the fallback bit
+        when none does and PD is high. Decode with decode_reasons.
+        """
+        return get_risk_rules().current().reason_masks(data)
+
+    @staticmethod
+    def decode_reasons(masks):
+        """
+        Top-3 reason texts for one mask (list) or an array of masks (list of lists).
+        """
+        rules = get_risk_rules().current()
+        if np.ndim(masks) == 0:
+            return rules.decode_mask(masks)
+        return [rules.decode_mask(m) for m in np.asarray(masks).tolist()]
 
 # --- 2. Plan Engine ---
+# --- PLAN CONFIGURATION ---
+DEFAULT_EMI = 15000             # Used when neither emi_amount nor liabilities are known
+DEFAULT_TENURE = 24
+DEFAULT_INCOME = 50000
+EXPENSE_RATIO = 0.4             # Monthly expenses estimate as a share of income
+LIABILITY_EMI_RATIO = 0.05      # Monthly obligation estimate from outstanding liabilities
+RESTRUCTURE_EXTENSION_MONTHS = 12
+RESTRUCTURE_RATE_BUMP = 0.005   # "Interest rate will increase by 0.5% for the extended period."
+HARDSHIP_EXTENSION_MONTHS = 24
+
+# Plans offered per risk category, in display order
+CATEGORY_PLANS = {
+    "High": ("emi_restructure", "payment_holiday", "hardship_assistance"),
+    "Moderate": ("emi_restructure", "payment_holiday"),
+    "Low": ("reward_rate_cut", "reward_limit_increase", "reward_priority_support")
+}
+SIMULATED_PLANS = ("emi_restructure", "payment_holiday", "hardship_assistance")
+
+# One row per (customer, offered plan); simulation figures are NaN for reward plans
+OFFER_COLUMNS = (
+    "customer_id", "risk_category", "position", "plan_id", "current_emi", "new_emi", "current_tenure", "new_tenure",
+    "monthly_relief", "total_payment_change", "income", "expenses", "current_balance", "new_balance"
+)
+SIMULATION_FIELDS = OFFER_COLUMNS[4:]
+
+PLAN_CATALOG = {
+    # Plan 1: EMI Restructuring (Extend Tenure, Lower EMI)
+    "emi_restructure": {
+        "id": "emi_restructure",
+        "title": "EMI Restructuring Plan",
+        "tagline": "Reduce monthly payments by extending tenure.",
+        "type": "Relief",
+        "description": "Convert your outstanding balance into smaller, more manageable EMIs by extending your loan tenure.",
+        "reason": "Recommended because your recent account activity shows higher monthly expenses.",
+        "best_for": "Long-term affordability",
+        "eligibility": [
+            "Account must be standard (no current default).",
+            "Minimum outstanding balance of ₹50,000.",
+            "No previous restructuring in last 12 months."
+        ],
+        "conditions": [
+            "Interest rate will increase by 0.5% for the extended period.",
+            "Processing fee of ₹500 waived for this offer."
+        ]
+    },
+    # Plan 2: Payment Holiday (Skip 1 Month)
+    "payment_holiday": {
+        "id": "payment_holiday",
+        "title": "Payment Holiday",
+        "tagline": "Skip this month's EMI with zero penalty.",
+        "type": "Holiday",
+        "description": "Take a break from your loan payment this month to manage unexpected expenses. Zero late fees.",
+        "reason": "Recommended for short-term cash flow mismatches.",
+        "best_for": "Immediate cash relief",
+        "eligibility": [
+            "Consistent repayment history for last 6 months.",
+            "Not applicable for final EMI."
+        ],
+        "conditions": [
+            "Interest for the skipped month will be added to the end of tenure.",
+            "Next EMI date remains unchanged."
+        ]
+    },
+    # Plan 3: Hardship (Custom)
+    "hardship_assistance": {
+        "id": "hardship_assistance",
+        "title": "Hardship Assistance Program",
+        "tagline": "Customized support for difficult times.",
+        "type": "Assistance",
+        "impact_amount": "Variable",
+        "description": "Work directly with a relationship manager to restructure your debt based on your current income.",
+        "reason": "Recommended due to significant changes in income or financial status.",
+        "best_for": "Complex financial situations",
+        "eligibility": ["Proof of income reduction required."],
+        "conditions": ["Requires document verification."]
+    },
+    # STABILITY REWARDS PLANS
+    # 1. Reduced Interest Rate
+    "reward_rate_cut": {
+        "id": "reward_rate_cut",
+        "title": "Rate Reduction Benefit",
+        "tagline": "Unlock 0.5% lower interest on future loans.",
+        "type": "Stability Reward",
+        "impact_amount": "-0.5% Interest",
+        "description": "As a Stability Rewards member, you qualify for a preferential interest rate on your next personal loan or top-up.",
+        "reason": "Earned via consistent on-time payments and high Stability Score.",
+        "best_for": "Future borrowing",
+        "simulation": None,
+        "eligibility": ["Stability Points > 1000", "No late payments in 12 months."],
+        "conditions": ["Valid for 90 days."]
+    },
+    # 2. Credit Limit Increase
+    "reward_limit_increase": {
+        "id": "reward_limit_increase",
+        "title": "Pre-approved Limit Increase",
+        "tagline": "Instantly increase your credit limit by 20%.",
+        "type": "Stability Reward",
+        "impact_amount": "+20% Limit",
+        "description": "Get more financial flexibility with a pre-approved credit limit enhancement. No documentation required.",
+        "reason": "Reward for maintaining low credit utilization.",
+        "best_for": "Financial flexibility",
+        "simulation": None,
+        "eligibility": ["Stability Points > 1200"],
+        "conditions": ["Subject to final CIBIL check."]
+    },
+    # 3. Priority Support
+    "reward_priority_support": {
+        "id": "reward_priority_support",
+        "title": "Priority Customer Support",
+        "tagline": "Skip the queue with dedicated access.",
+        "type": "Stability Reward",
+        "impact_amount": "VIP Access",
+        "description": "Direct access to our senior relationship managers for any queries or faster loan processing.",
+        "reason": "Exclusive benefit for our most reliable customers.",
+        "best_for": "Convenience",
+        "simulation": None,
+        "eligibility": ["Stability Points > 800"],
+        "conditions": ["Available 24/7."]
+    }
+}
+
+# Simulation field shown as the headline impact of each relief plan
+IMPACT_FIELDS = {"emi_restructure": "monthly_relief", "payment_holiday": "current_emi"}
+
+def _positive(value):
+    # A usable positive amount, or None for missing/NaN/zero fields
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+def _positive_array(df, column):
+    if column not in df.columns:
+        return np.full(len(df), np.nan)
+    import pandas as pd
+    values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return np.where(values > 0, values, np.nan)
+
 class PlanEngine:
     @staticmethod
-    def get_plans(risk_category, current_emi=15000, current_tenure=24, income=50000, expenses=30000):
+    def plan_inputs(customer):
         """
-        Returns personalized plans based on Risk Category with RICH SIMULATED DATA.
+        The customer's real plan inputs (current_emi, current_tenure, income, expenses) from
+        emi_amount, tenure_months, monthly_salary_inr and existing_liabilities_inr, with defaults
+        for missing fields. Matches get_plans_batch row for row.
+        """
+        income = _positive(customer.get('monthly_salary_inr')) or DEFAULT_INCOME
+        emi = _positive(customer.get('emi_amount'))
+        if emi is None:
+            liabilities = _positive(customer.get('existing_liabilities_inr'))
+            emi = (liabilities * LIABILITY_EMI_RATIO) if liabilities else DEFAULT_EMI
+        return {
+            "current_emi": int(emi) or DEFAULT_EMI,
+            "current_tenure": int(_positive(customer.get('tenure_months')) or DEFAULT_TENURE) or DEFAULT_TENURE,
+            "income": int(income),
+            "expenses": int(income * EXPENSE_RATIO)
+        }
+
+    @staticmethod
+    def simulate(current_emi, current_tenure, income, expenses):
+        """
+        Simulation figures of each relief plan. Works elementwise on scalars or NumPy arrays,
+        so the per-customer and batch paths share one formula.
+
+        The outstanding principal is the present value of the remaining EMIs at the book rate;
+        restructuring re-amortizes it over the extended tenure at the bumped rate.
         """
-        plans = []
-        
-        # Base calculations for simulation
+        from utils.amortization import BASE_ANNUAL_RATE, annuity_emi, principal_from_emi
         original_total_repayment = current_emi * current_tenure
-        
-        if risk_category in ["Moderate", "High"]:
-            # Plan 1: EMI Restructuring (Extend Tenure, Lower EMI)
-            new_tenure_1 = current_tenure + 12
-            new_emi_1 = int(original_total_repayment / new_tenure_1 * 1.1) # 10% interest bump for ease
-            relief_1 = current_emi - new_emi_1
-            
-            plans.append({
-                "id": "emi_restructure",
-                "title": "EMI Restructuring Plan",
-                "tagline": "Reduce monthly payments by extending tenure.",
-                "type": "Relief",
-                "impact_amount": f"₹{relief_1:,}",
-                "description": "Convert your outstanding balance into smaller, more manageable EMIs by extending your loan tenure.",
-                "reason": "Recommended because your recent account activity shows higher monthly expenses.",
-                "best_for": "Long-term affordability",
-                
-                # Simulation Data for Charts
-                "simulation": {
-                    "current_emi": current_emi,
-                    "new_emi": new_emi_1,
-                    "current_tenure": current_tenure,
-                    "new_tenure": new_tenure_1,
-                    "monthly_relief": relief_1,
-                    "total_payment_change": (new_emi_1 * new_tenure_1) - original_total_repayment,
-                    
-                    # Cashflow Data (Income vs Expenses vs EMI)
-                    "cashflow": {
-                        "income": income,
-                        "expenses": expenses,
-                        "current_balance": income - expenses - current_emi,
-                        "new_balance": income - expenses - new_emi_1
-                    }
-                },
-                
-                "eligibility": [
-                    "Account must be standard (no current default).",
-                    "Minimum outstanding balance of ₹50,000.",
-                    "No previous restructuring in last 12 months."
-                ],
-                "conditions": [
-                    "Interest rate will increase by 0.5% for the extended period.",
-                    "Processing fee of ₹500 waived for this offer."
-                ]
+        principal = principal_from_emi(current_emi, BASE_ANNUAL_RATE, current_tenure)
+        restructure_tenure = current_tenure + RESTRUCTURE_EXTENSION_MONTHS
+        restructure_emi = np.trunc(annuity_emi(principal, BASE_ANNUAL_RATE + RESTRUCTURE_RATE_BUMP, restructure_tenure))
+        hardship_emi = np.trunc(current_emi * 0.5)  # Assume 50% relief
+        common = {
+            "current_emi": current_emi,
+            "current_tenure": current_tenure,
+            "income": income,
+            "expenses": expenses,
+            "current_balance": income - expenses - current_emi
+        }
+        return {
+            "emi_restructure": dict(common, **{
+                "new_emi": restructure_emi,
+                "new_tenure": restructure_tenure,
+                "monthly_relief": current_emi - restructure_emi,
+                "total_payment_change": restructure_emi * restructure_tenure - original_total_repayment,
+                "new_balance": income - expenses - restructure_emi
+            }),
+            "payment_holiday": dict(common, **{
+                "new_emi": 0 * current_emi,  # For this month
+                "new_tenure": current_tenure + 1,
+                "monthly_relief": current_emi,
+                "total_payment_change": np.trunc(principal * BASE_ANNUAL_RATE / 12),  # Interest for the skipped month
+                "new_balance": income - expenses  # Full relief this month
+            }),
+            "hardship_assistance": dict(common, **{
+                "new_emi": hardship_emi,
+                "new_tenure": current_tenure + HARDSHIP_EXTENSION_MONTHS,  # lengthy extension
+                "monthly_relief": hardship_emi,
+                "total_payment_change": 0 * current_emi,  # Custom
+                "new_balance": income - expenses - hardship_emi
             })
+        }
 
-            # Plan 2: Payment Holiday (Skip 1 Month)
-            plans.append({
-                "id": "payment_holiday",
-                "title": "Payment Holiday",
-                "tagline": "Skip this month's EMI with zero penalty.",
-                "type": "Holiday",
-                "impact_amount": f"₹{current_emi:,}",
-                "description": "Take a break from your loan payment this month to manage unexpected expenses. Zero late fees.",
-                "reason": "Recommended for short-term cash flow mismatches.",
-                "best_for": "Immediate cash relief",
-                
-                 "simulation": {
-                    "current_emi": current_emi,
-                    "new_emi": 0, # For this month
-                    "current_tenure": current_tenure,
-                    "new_tenure": current_tenure + 1,
-                    "monthly_relief": current_emi,
-                    "total_payment_change": int(current_emi * 0.02), # Small interest accrual
-                    
-                    "cashflow": {
-                        "income": income,
-                        "expenses": expenses,
-                        "current_balance": income - expenses - current_emi,
-                        "new_balance": income - expenses # Full relief this month
-                    }
-                },
-                
-                "eligibility": [
-                    "Consistent repayment history for last 6 months.",
-                    "Not applicable for final EMI."
-                ],
-                "conditions": [
-                    "Interest for the skipped month will be added to the end of tenure.",
-                    "Next EMI date remains unchanged."
-                ]
-            })
+    @staticmethod
+    def build_plan(plan_id, figures=None):
+        """
+        Full plan dict for the portal from the catalog text and (for relief plans) the flat
+        simulation figures of one customer.
+        """
+        plan = copy.deepcopy(PLAN_CATALOG[plan_id])
+        if plan_id in SIMULATED_PLANS:
+            f = {k: int(figures[k]) for k in SIMULATION_FIELDS}
+            if plan_id in IMPACT_FIELDS:
+                plan["impact_amount"] = f"₹{f[IMPACT_FIELDS[plan_id]]:,}"
+            # Simulation Data for Charts
+            plan["simulation"] = {
+                "current_emi": f["current_emi"],
+                "new_emi": f["new_emi"],
+                "current_tenure": f["current_tenure"],
+                "new_tenure": f["new_tenure"],
+                "monthly_relief": f["monthly_relief"],
+                "total_payment_change": f["total_payment_change"],
 
-        if risk_category == "High":
-             # Plan 3: Hardship (Custom)
-             plans.append({
-                "id": "hardship_assistance",
-                "title": "Hardship Assistance Program",
-                "tagline": "Customized support for difficult times.",
-                "type": "Assistance",
-                "impact_amount": "Variable",
-                "description": "Work directly with a relationship manager to restructure your debt based on your current income.",
-                "reason": "Recommended due to significant changes in income or financial status.",
-                "best_for": "Complex financial situations",
-                
-                "simulation": {
-                    "current_emi": current_emi,
-                    "new_emi": int(current_emi * 0.5), # Assume 50% relief
-                    "current_tenure": current_tenure,
-                    "new_tenure": current_tenure + 24, # lengthy extension
-                    "monthly_relief": int(current_emi * 0.5),
-                    "total_payment_change": 0, # Custom
-                    
-                    "cashflow": {
-                        "income": income,
-                        "expenses": expenses,
-                        "current_balance": income - expenses - current_emi,
-                        "new_balance": income - expenses - int(current_emi * 0.5)
-                    }
-                },
-                "eligibility": ["Proof of income reduction required."],
-                "conditions": ["Requires document verification."]
-            })
-            
-        elif risk_category == "Low":
-             # STABILITY REWARDS PLANS
-             # 1. Reduced Interest Rate
-             plans.append({
-                "id": "reward_rate_cut",
-                "title": "Rate Reduction Benefit",
-                "tagline": "Unlock 0.5% lower interest on future loans.",
-                "type": "Stability Reward",
-                "impact_amount": "-0.5% Interest",
-                "description": "As a Stability Rewards member, you qualify for a preferential interest rate on your next personal loan or top-up.",
-                "reason": "Earned via consistent on-time payments and high Stability Score.",
-                "best_for": "Future borrowing",
-                "simulation": None,
-                "eligibility": ["Stability Points > 1000", "No late payments in 12 months."],
-                "conditions": ["Valid for 90 days."]
-            })
+                # Cashflow Data (Income vs Expenses vs EMI)
+                "cashflow": {
+                    "income": f["income"],
+                    "expenses": f["expenses"],
+                    "current_balance": f["current_balance"],
+                    "new_balance": f["new_balance"]
+                }
+            }
+        return plan
 
-             # 2. Credit Limit Increase
-             plans.append({
-                "id": "reward_limit_increase",
-                "title": "Pre-approved Limit Increase",
-                "tagline": "Instantly increase your credit limit by 20%.",
-                "type": "Stability Reward",
-                "impact_amount": "+20% Limit",
-                "description": "Get more financial flexibility with a pre-approved credit limit enhancement. No documentation required.",
-                "reason": "Reward for maintaining low credit utilization.",
-                "best_for": "Financial flexibility",
-                "simulation": None,
-                "eligibility": ["Stability Points > 1200"],
-                "conditions": ["Subject to final CIBIL check."]
-            })
+    @staticmethod
+    def get_plans(risk_category, current_emi=15000, current_tenure=24, income=50000, expenses=30000):
+        """
+        Returns personalized plans based on Risk Category with RICH SIMULATED DATA.
+        Pass the customer's real figures with PlanEngine.plan_inputs(customer).
+        """
+        simulations = PlanEngine.simulate(int(current_emi), int(current_tenure), int(income), int(expenses))
+        return [
+            PlanEngine.build_plan(plan_id, simulations.get(plan_id))
+            for plan_id in CATEGORY_PLANS.get(risk_category, ())
+        ]
 
-             # 3. Priority Support
-             plans.append({
-                "id": "reward_priority_support",
-                "title": "Priority Customer Support",
-                "tagline": "Skip the queue with dedicated access.",
-                "type": "Stability Reward",
-                "impact_amount": "VIP Access",
-                "description": "Direct access to our senior relationship managers for any queries or faster loan processing.",
-                "reason": "Exclusive benefit for our most reliable customers.",
-                "best_for": "Convenience",
-                "simulation": None,
-                "eligibility": ["Stability Points > 800"],
-                "conditions": ["Available 24/7."]
-            })
+    @staticmethod
+    def get_plans_batch(df, risk_categories=None):
+        """
+        Plan offers for every customer in `df` at once, as a columnar table (OFFER_COLUMNS):
+        one row per (customer, offered plan), in customer order then display order.
+        Inputs are derived exactly as plan_inputs does; `risk_categories` defaults to
+        RiskEngine.get_risk_category_batch(df).
+        """
+        import pandas as pd
+        n = len(df)
+        customer_ids = (df['customer_id'] if 'customer_id' in df.columns else pd.Series(df.index)).astype(str).to_numpy()
+        if risk_categories is None:
+            risk_categories = RiskEngine.get_risk_category_batch(df)
+        risk_categories = np.asarray(risk_categories, dtype=object)
 
-        return plans
+        income = _positive_array(df, 'monthly_salary_inr')
+        income = np.where(np.isnan(income), DEFAULT_INCOME, income)
+        emi = _positive_array(df, 'emi_amount')
+        liabilities = _positive_array(df, 'existing_liabilities_inr')
+        emi = np.where(np.isnan(emi), np.where(np.isnan(liabilities), DEFAULT_EMI, liabilities * LIABILITY_EMI_RATIO), emi)
+        emi = np.trunc(emi).astype(np.int64)
+        emi[emi == 0] = DEFAULT_EMI
+        tenure = np.trunc(_positive_array(df, 'tenure_months'))
+        tenure = np.where(np.isnan(tenure) | (tenure == 0), DEFAULT_TENURE, tenure).astype(np.int64)
+        expenses = np.trunc(income * EXPENSE_RATIO).astype(np.int64)
+        income = np.trunc(income).astype(np.int64)
+
+        simulations = PlanEngine.simulate(emi, tenure, income, expenses)
+        rows = np.arange(n)
+        frames = []
+        for category, plan_ids in CATEGORY_PLANS.items():
+            selected = rows[risk_categories == category]
+            if not len(selected):
+                continue
+            for position, plan_id in enumerate(plan_ids):
+                frame = {
+                    "row": selected,
+                    "customer_id": customer_ids[selected],
+                    "risk_category": category,
+                    "position": position,
+                    "plan_id": plan_id
+                }
+                figures = simulations.get(plan_id)
+                for field in SIMULATION_FIELDS:
+                    frame[field] = np.asarray(figures[field], dtype=float)[selected] if figures else np.nan
+                frames.append(pd.DataFrame(frame))
+        if not frames:
+            return pd.DataFrame(columns=list(OFFER_COLUMNS))
+        offers = pd.concat(frames, ignore_index=True).sort_values(["row", "position"], kind="stable")
+        return offers.loc[:, list(OFFER_COLUMNS)].reset_index(drop=True)
+
+    @staticmethod
+    def plans_from_offers(offers):
+        """
+        Expands one customer's offer rows (dicts with OFFER_COLUMNS) into portal plan dicts.
+        """
+        return [PlanEngine.build_plan(o["plan_id"], o) for o in sorted(offers, key=lambda o: o["position"])]
 
 # --- 3. Communication Engine ---
 class CommunicationEngine:
@@ -244,34 +381,50 @@ class CommunicationEngine:
         """
         Generates the proactive alert message.
         """
-        # Bank-style, supportive, no jargon.
-        if risk_category == "High":
-            return f"Hi {customer_name}, we noticed some recent changes in your account activity and would like to help you stay financially comfortable. Please review your personalized options here: [Link]"
-        elif risk_category == "Moderate":
-             return f"Hi {customer_name}, to help you manage your upcoming payments more easily, we've prepared some flexible options for you. Check them out: [Link]"
-        else:
-             return f"Hi {customer_name}, thank you for banking with us! We have some new rewards and tips to help you grow your financial health. View here: [Link]"
+        # Bank-style, supportive, no jargon. Wording lives in the versioned notification templates.
+        from utils.notification_templates import get_templates
+        return get_templates().render("message", risk_category, customer_name)
 
     @staticmethod
     def generate_secure_token(customer_id):
-        # Mock token generation
-        return str(customer_id)
+        """
+        Signed, expiring link token carrying the customer_id and dataset version (see utils.secure_tokens).
+        """
+        from utils.secure_tokens import get_signer
+        from utils.data_loader import get_data_version
+        return get_signer().issue(customer_id, snapshot_version=get_data_version())
 
     @staticmethod
     def get_customer_by_token(token):
         """
-        Retrieves customer data from enriched dataset using the token (customer_id).
+        Verifies the token signature and expiry, then fetches the customer with one key lookup in the
+        portal read model (or, if it has not been built, through the customer_id index over the
+        enriched dataset). Returns None for invalid/expired tokens or unknown customers.
         """
+        from utils.secure_tokens import get_signer, InvalidToken
+        try:
+            claims = get_signer().verify(token)
+        except InvalidToken as e:
+            print(f"Rejected intervention token: {e}")
+            return None
+
+        from utils.portal_store import get_portal_store
+        store = get_portal_store()
+        if store is not None:
+            if claims['snapshot_version'] != store.snapshot_version:
+                print(f"Token snapshot {claims['snapshot_version']} differs from portal store {store.snapshot_version}; serving current data")
+            return store.get(claims['customer_id'])
+
         try:
-            from utils.data_loader import load_data
+            from utils.data_loader import load_data, get_customer_index
             df = load_data()
+            index, positions = get_customer_index()
             
-            # Token is assumed to be customer_id
-            customer_row = df[df['customer_id'] == token]
-            
-            if not customer_row.empty:
-                return customer_row.iloc[0].to_dict()
-            return None
+            try:
+                loc = index.get_loc(claims['customer_id'])
+            except KeyError:
+                return None
+            return df.iloc[positions[loc]].to_dict()
         except Exception as e:
             print(f"Error fetching customer by token: {e}")
             return None
@@ -279,22 +432,16 @@ class CommunicationEngine:
 # --- 4. Outcome Logger ---
 class OutcomeLogger:
     @staticmethod
-    def log_outcome(customer_id, plan_id, status, reason=None):
+    def log_outcome(customer_id, plan_id, status, reason=None, latency_ms=None):
         """
-        Logs the customer's decision.
+        Logs the customer's decision as a structured event.
+        Events are buffered and flushed by a background thread (see utils.event_log).
         """
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = {
-            "timestamp": timestamp,
-            "customer_id": customer_id,
-            "plan_id": plan_id,
-            "status": status,
-            "reason": reason
-        }
+        from utils.event_log import get_event_log, make_event
+        log_entry = make_event(customer_id, plan_id, status, latency_ms=latency_ms, reason=reason)
         # Append to log file
         try:
-            with open(LOG_FILE, "a") as f:
-                f.write(f"{timestamp} - INTERVENTION_LOG: Customer={customer_id}, Plan={plan_id}, Status={status}\n")
+            get_event_log(LOG_FILE).write(log_entry)
         except Exception as e:
             print(f"Failed to write log to {LOG_FILE}: {e}")
             
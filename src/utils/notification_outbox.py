@@ -0,0 +1,246 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+
+# Define outbox path dynamically relative to this file (next to the audit log)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTBOX_DB = os.path.join(BASE_DIR, "notification_outbox.db")
+
+# --- RETRY POLICY ---
+MAX_ATTEMPTS = 5          # Attempts before a message is dead-lettered
+BASE_BACKOFF_S = 2.0      # First retry delay, doubled on every attempt
+MAX_BACKOFF_S = 600.0     # Cap on a single retry delay
+LEASE_S = 120.0           # A claimed message is re-delivered if not acknowledged within this window
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    campaign_id TEXT NOT NULL,
+    customer_id TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    recipient TEXT,
+    subject TEXT,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    lease_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox(status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_outbox_campaign ON outbox(campaign_id, status);
+CREATE TABLE IF NOT EXISTS outbox_attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    outbox_id INTEGER NOT NULL,
+    attempt INTEGER NOT NULL,
+    attempted_at REAL NOT NULL,
+    latency_ms REAL,
+    ok INTEGER NOT NULL,
+    error TEXT
+);
+"""
+
+def make_idempotency_key(campaign_id, customer_id, channel):
+    return f"{campaign_id}:{customer_id}:{channel}"
+
+class NotificationOutbox:
+    """
+    Durable, SQLite-backed queue of pending notifications.
+
+    Messages are appended once per (campaign, customer, channel) and never rewritten;
+    every delivery attempt is appended to `outbox_attempts`. Claimed messages carry a
+    lease, so a worker that crashes mid-send has its messages re-delivered (at-least-once);
+    an acknowledgement only applies while its lease (attempt) is current. Re-enqueueing a resumed campaign is a no-op for messages already queued or sent.
+    """
+    def __init__(self, path=OUTBOX_DB, max_attempts=MAX_ATTEMPTS, base_backoff_s=BASE_BACKOFF_S,
+                 max_backoff_s=MAX_BACKOFF_S, lease_s=LEASE_S):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_backoff_s = base_backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.lease_s = lease_s
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _connect(self, write=True):
+        return _Transaction(self._connection(), "BEGIN IMMEDIATE" if write else "BEGIN")
+
+    # --- Producer side ---
+    def enqueue_many(self, messages):
+        """
+        Appends messages (dicts with campaign_id, customer_id, channel, recipient, subject, body).
+        Returns the number of newly queued messages; duplicates of an idempotency key are ignored.
+        """
+        now = time.time()
+        rows = [
+            (make_idempotency_key(m['campaign_id'], m['customer_id'], m['channel']),
+             m['campaign_id'], str(m['customer_id']), m['channel'], m.get('recipient'),
+             m.get('subject'), m['body'], now, now, now)
+            for m in messages
+        ]
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO outbox (idempotency_key, campaign_id, customer_id, channel, recipient, "
+                "subject, body, next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+
+    # --- Worker side ---
+    def claim(self, limit=100, campaign_id=None):
+        """
+        Leases up to `limit` due messages (pending, or sending with an expired lease).
+        """
+        now = time.time()
+        campaign_filter = "AND campaign_id = ?" if campaign_id else ""
+        params = [now, now] + ([campaign_id] if campaign_id else []) + [limit]
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM outbox WHERE ((status = 'pending' AND next_attempt_at <= ?) "
+                "OR (status = 'sending' AND lease_until <= ?)) "
+                f"{campaign_filter} ORDER BY next_attempt_at LIMIT ?",
+                params
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE outbox SET status = 'sending', lease_until = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    [(now + self.lease_s, now, row['id']) for row in rows]
+                )
+        return [dict(row, attempts=row['attempts'] + 1) for row in rows]
+
+    def mark_sent(self, message, latency_ms=None):
+        """
+        Acknowledges a delivery. Returns "sent", or "superseded" if the lease was lost (the
+        message was re-leased to another worker, which now owns its status).
+        """
+        now = time.time()
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE outbox SET status = 'sent', lease_until = NULL, last_error = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'sending' AND attempts = ?",
+                (now, message['id'], message['attempts'])
+            ).rowcount
+            self._record_attempt(conn, message, now, latency_ms, True, None)
+        return "sent" if updated else "superseded"
+
+    def mark_failed(self, message, error, latency_ms=None):
+        """
+        Schedules a retry with exponential backoff (plus jitter), or dead-letters the message
+        once `max_attempts` is reached. Returns the new status, or "superseded" if the lease
+        was lost.
+        """
+        now = time.time()
+        attempts = message['attempts']
+        if attempts >= self.max_attempts:
+            status, next_attempt = "dead", now
+        else:
+            delay = min(self.max_backoff_s, self.base_backoff_s * (2 ** (attempts - 1)))
+            status, next_attempt = "pending", now + delay * random.uniform(0.8, 1.2)
+        with self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE outbox SET status = ?, next_attempt_at = ?, lease_until = NULL, last_error = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'sending' AND attempts = ?",
+                (status, next_attempt, str(error), now, message['id'], attempts)
+            ).rowcount
+            self._record_attempt(conn, message, now, latency_ms, False, error)
+        return status if updated else "superseded"
+
+    @staticmethod
+    def _record_attempt(conn, message, now, latency_ms, ok, error):
+        conn.execute(
+            "INSERT INTO outbox_attempts (outbox_id, attempt, attempted_at, latency_ms, ok, error) VALUES (?, ?, ?, ?, ?, ?)",
+            (message['id'], message['attempts'], now, latency_ms, int(ok), None if error is None else str(error))
+        )
+
+    # --- Introspection ---
+    def next_due_in(self, campaign_id=None):
+        """
+        Seconds until the next undelivered message becomes claimable, or None if nothing is outstanding.
+        """
+        campaign_filter = "AND campaign_id = ?" if campaign_id else ""
+        params = [campaign_id] if campaign_id else []
+        with self._connect(write=False) as conn:
+            row = conn.execute(
+                "SELECT MIN(CASE WHEN status = 'pending' THEN next_attempt_at ELSE lease_until END) "
+                f"FROM outbox WHERE status IN ('pending', 'sending') {campaign_filter}",
+                params
+            ).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def stats(self, campaign_id=None):
+        campaign_filter = "WHERE campaign_id = ?" if campaign_id else ""
+        params = [campaign_id] if campaign_id else []
+        with self._connect(write=False) as conn:
+            rows = conn.execute(
+                f"SELECT channel, status, COUNT(*) FROM outbox {campaign_filter} GROUP BY channel, status",
+                params
+            ).fetchall()
+        stats = {}
+        for channel, status, count in rows:
+            stats.setdefault(channel, {})[status] = count
+        return stats
+
+    def statuses(self, campaign_id):
+        with self._connect(write=False) as conn:
+            rows = conn.execute(
+                "SELECT customer_id, channel, status FROM outbox WHERE campaign_id = ?", (campaign_id,)
+            ).fetchall()
+        return {(row[0], row[1]): row[2] for row in rows}
+
+    def dead_letters(self, campaign_id=None, limit=100):
+        campaign_filter = "AND campaign_id = ?" if campaign_id else ""
+        params = ([campaign_id] if campaign_id else []) + [limit]
+        with self._connect(write=False) as conn:
+            rows = conn.execute(
+                f"SELECT * FROM outbox WHERE status = 'dead' {campaign_filter} ORDER BY updated_at DESC LIMIT ?",
+                params
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+class _Transaction:
+    """
+    Context manager that commits (or rolls back) an explicit transaction on a shared connection.
+    """
+    def __init__(self, conn, begin):
+        self.conn = conn
+        self.begin = begin
+
+    def __enter__(self):
+        self.conn.execute(self.begin)
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.conn.in_transaction:
+            if exc_type is None:
+                self.conn.execute("COMMIT")
+            else:
+                self.conn.execute("ROLLBACK")
+        return False
+
+if __name__ == "__main__":
+    # Resume any partially sent campaign: drain everything still outstanding.
+    import sys
+    sys.path.append(BASE_DIR)
+    from utils.campaign_engine import CampaignEngine
+    outbox = NotificationOutbox()
+    report = CampaignEngine().drain(outbox)
+    print(CampaignEngine.format_report(report))
+    print(f"[OUTBOX] {outbox.stats()}")
@@ -1,8 +1,7 @@
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import os
 import datetime
+from utils.notification_templates import get_templates, get_mime_skeleton
 
 # --- SMTP CONFIGURATION ---
 # PLEASE REPLACE WITH YOUR ACTUAL CREDENTIALS
@@ -17,14 +16,16 @@ class EmailService:
         """
         Sends an email using the configured SMTP server.
         """
-        try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = SMTP_EMAIL
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            msg.attach(MIMEText(body, 'html'))
+        # Envelope is pre-serialized once per subject; only recipient and body change per message
+        message_text = get_mime_skeleton(SMTP_EMAIL, subject).serialize(to_email, body)
+        return EmailService.send_raw(to_email, message_text)
 
+    @staticmethod
+    def send_raw(to_email, message_text):
+        """
+        Sends an already serialized MIME message.
+        """
+        try:
             print(f"\n[EMAIL SERVICE] Connecting to {SMTP_SERVER}...")
             
             # Connect to Server
@@ -36,8 +37,7 @@ class EmailService:
             server.login(SMTP_EMAIL, SMTP_PASSWORD)
             
             # Send
-            text = msg.as_string()
-            server.sendmail(SMTP_EMAIL, to_email, text)
+            server.sendmail(SMTP_EMAIL, to_email, message_text)
             
             # Quit
             server.quit()
@@ -67,99 +67,191 @@ class SMSService:
 
 class AlertDispatcher:
     @staticmethod
-    def send_intervention_alert(customer):
+    def build_alert(customer):
         """
-        Orchestrates the sending of Email and SMS alerts for a specific customer.
+        Builds the Email and SMS content for a specific customer without sending anything.
         """
-        # Extract CRM details from enriched data
-        customer_id = customer.get('customer_id', 'Unknown')
-        name = customer.get('full_name', 'Valued Customer')
-        
+        return AlertDispatcher.build_alerts([customer])[0]
+
+    @staticmethod
+    def build_alerts(customers, errors=None, template_version=None):
+        """
+        Builds Email and SMS content for a batch of customers in one pass over precompiled templates.
+        Customers without an email_id are appended to `errors` as (customer, exception),
+        or raise if no `errors` list is given.
+        """
+        from utils.intervention_logic import RiskEngine
+        templates = get_templates(template_version)
+
         # STRICT: Use Real Data Only
-        email = customer.get('email_id')
-        if not email or str(email) == 'nan':
-            # Strict mode: specific error so dashboard knows
-            raise ValueError(f"Missing email_id for customer {customer_id}")
-             
-        phone = customer.get('mobile_number', '+1234567890')
-        
-        # 1. Determine Risk & Message
-        # RiskEngine might be imported from intervention_logic, ensure it works
-        try:
-            from utils.intervention_logic import RiskEngine, CommunicationEngine
-            risk_category = RiskEngine.get_risk_category(customer)
-            message_text = CommunicationEngine.generate_message(name, risk_category)
-        except Exception:
-            risk_category = "High"
-            message_text = f"Hi {name}, please review your account options."
-        
-        # 2. Generate Secure Token & Link
-        # Token is the Customer ID for this implementation
-        token = customer_id 
-        
+        valid = []
+        for customer in customers:
+            email = customer.get('email_id')
+            if not email or str(email) == 'nan':
+                # Strict mode: specific error so dashboard knows
+                error = ValueError(f"Missing email_id for customer {customer.get('customer_id', 'Unknown')}")
+                if errors is None:
+                    raise error
+                errors.append((customer, error))
+                continue
+            valid.append(customer)
+
+        # Extract CRM details from enriched data as columns
+        customer_ids = [c.get('customer_id', 'Unknown') for c in valid]
+        names = [c.get('full_name', 'Valued Customer') for c in valid]
+        risk_categories = RiskEngine.get_risk_category_batch(
+            {'probability_of_default': [c.get('probability_of_default', 0.0) for c in valid]}
+        ).tolist()
+
+        # Signed, expiring tokens (one shared expiry per batch)
+        from utils.secure_tokens import get_signer
+        from utils.data_loader import get_data_version
+        tokens = get_signer().issue_many(customer_ids, snapshot_version=get_data_version())
+
         # Dynamic URL Generation
         base_url = os.environ.get("INTERVENTION_BASE_URL", "http://localhost:8051")
-        secure_link = f"{base_url}/customer/intervention?token={token}"
-        
-        print(f"[ALERT] Generated Link: {secure_link}")
-        
-        # 3. Construct Email Content
-        email_subject = "We have personalized support options for you"
-        email_body = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #e0e0e0; border-radius: 8px;">
-                    <h2 style="color: #0a2342;">CREDIX Support</h2>
-                    <p>Hi {name},</p>
-                    <p>{message_text.replace('[Link]', '')}</p>
-                    <p>We have created a secure, personalized portal for you to review your options.</p>
-                    <div style="text-align: center; margin: 30px 0;">
-                        <a href="{secure_link}" style="background-color: #0a2342; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; font-weight: bold;">View Your Personalized Options</a>
-                    </div>
-                    <p style="font-size: 12px; color: #777;">This link is secure and valid for 48 hours.</p>
-                </div>
-            </body>
-        </html>
+        links = [f"{base_url}/customer/intervention?token={token}" for token in tokens]
+
+        email_bodies = templates.render_batch("email", risk_categories, names, links)
+        sms_bodies = templates.render_batch("sms", risk_categories, names, links)
+
+        return [
+            {
+                "customer_id": customer_ids[i],
+                "risk_category": risk_categories[i],
+                "email": valid[i].get('email_id'),
+                "phone": valid[i].get('mobile_number', '+1234567890'),
+                "email_subject": templates.email_subject,
+                "email_body": email_bodies[i],
+                "sms_body": sms_bodies[i],
+                "token": tokens[i],
+                "secure_link": links[i],
+                "template_version": templates.version
+            }
+            for i in range(len(valid))
+        ]
+
+    @staticmethod
+    def send_intervention_alert(customer, contact_history=None, event_log=None):
         """
-        
-        # 4. Construct SMS Content
-        sms_body = f"CREDIX: Hi {name}, please review your new support options securely: {secure_link}"
+        Orchestrates the sending of Email and SMS alerts for a specific customer.
+        With a `contact_history`, raises ContactCapExceeded if the customer was already emailed
+        within the cap window, and records the contacts that were sent.
+        With an `event_log`, successful sends are logged as SENT_EMAIL / SENT_SMS events.
+        """
+        if contact_history is not None:
+            contact_history.check(customer.get('customer_id', 'Unknown'), "email")
+
+        alert = AlertDispatcher.build_alert(customer)
+        print(f"[ALERT] Generated Link: {alert['secure_link']}")
         
         # 5. Send Alerts
-        email_sent = EmailService.send_email(email, email_subject, email_body)
-        sms_sent = SMSService.send_sms(phone, sms_body)
+        email_sent = EmailService.send_email(alert['email'], alert['email_subject'], alert['email_body'])
+        sms_sent = SMSService.send_sms(alert['phone'], alert['sms_body'])
+
+        if contact_history is not None:
+            sent = [(alert['customer_id'], channel, None) for channel, ok in (("email", email_sent), ("sms", sms_sent)) if ok]
+            contact_history.record_many(sent, source="dashboard")
+        if event_log is not None:
+            for channel, ok in (("email", email_sent), ("sms", sms_sent)):
+                if ok:
+                    event_log.log(alert['customer_id'], "N/A", f"SENT_{channel.upper()}")
         
         return {
-            "customer_id": customer_id,
-            "risk_category": risk_category,
+            "customer_id": alert['customer_id'],
+            "risk_category": alert['risk_category'],
             "email_sent": email_sent,
             "sms_sent": sms_sent,
-            "token": token,
+            "token": alert['token'],
             "timestamp": datetime.datetime.now().isoformat()
         }
 
 from utils.data_loader import load_data # changed from load_enriched_data if that didn't exist, defaulting to load_data
 
+DEMO_TOP_K = 3     # Customers alerted by a default (non-incremental) run
+_DEFAULT_TOP_K = object()
+
 class RiskMonitor:
     @staticmethod
-    def check_and_alert():
+    def run_campaign(threshold=None, top_k=_DEFAULT_TOP_K, max_concurrency=None, channel_rates=None, campaign_id=None,
+                     durable=True, frequency_caps=True, incremental=False, scores=None):
         """
-        Iterates through ENRICHED customer dataframe and triggers alerts for relevant cases.
+        Selects eligible customers (PD above `threshold` and/or the `top_k` highest PDs)
+        from the ENRICHED dataframe and alerts all of them concurrently. `top_k` defaults to
+        DEMO_TOP_K, or to no limit with `incremental`.
+        With `durable`, sends go through the notification outbox (retries, dead-lettering);
+        re-running with the same `campaign_id` resumes a partially sent campaign.
+        With `frequency_caps`, customers contacted within the cap window are skipped at selection
+        (or per channel) and counted in report['suppressed'].
+        With `incremental`, only customers whose risk category went up or whose PD jumped since the
+        last run are considered (see RiskCrossingDetector); `scores` may be a rescored batch to diff
+        instead of the full dataset. Once the campaign has run, the snapshot is advanced for every
+        customer except crossings that were not alerted (not selected by top_k, frequency-capped,
+        or failed on every channel), so the next run detects them again. Crossings at or below
+        `threshold` are skipped on purpose and committed.
+        Returns the campaign report (throughput, latency percentiles, failures, per-customer results).
         """
+        from utils.campaign_engine import CampaignEngine, DEFAULT_MAX_CONCURRENCY, CHANNELS
+        from utils.notification_outbox import NotificationOutbox
+        from utils.contact_history import get_contact_history
+        from utils.event_log import get_event_log
+
+        if top_k is _DEFAULT_TOP_K:
+            top_k = None if incremental else DEMO_TOP_K
+
         # Load merged data (ML + CRM)
-        try:
-            dataframe = load_data()
-        except:
-             return []
-        
-        results = []
-        
-        # DEMO LOGIC: Sort by PD descending and pick top 3
-        if 'probability_of_default' in dataframe.columns:
-            dataframe = dataframe.sort_values(by='probability_of_default', ascending=False)
-            
-        for index, row in dataframe.head(3).iterrows():
-            alert_result = AlertDispatcher.send_intervention_alert(row)
-            results.append(alert_result)
-                
-        return results
\ No newline at end of file
+        if scores is not None:
+            dataframe = scores
+        else:
+            try:
+                dataframe = load_data()
+            except:
+                 dataframe = None
+
+        history = get_contact_history() if frequency_caps else None
+        engine = CampaignEngine(max_concurrency=max_concurrency or DEFAULT_MAX_CONCURRENCY, channel_rates=channel_rates,
+                                campaign_id=campaign_id, contact_history=history, event_log=get_event_log())
+        outbox = NotificationOutbox() if durable else None
+        if dataframe is None:
+            return engine.run([], outbox=outbox)
+
+        candidates, detector = dataframe, None
+        if incremental:
+            from utils.risk_crossing import RiskCrossingDetector
+            detector = RiskCrossingDetector()
+            candidates = detector.diff(dataframe)
+            print(f"[MONITOR] {len(candidates)} of {len(dataframe)} customers crossed a risk threshold since the last run")
+
+        capped, selection = None, {}
+        if history is not None and 'customer_id' in candidates.columns:
+            capped = history.capped_mask(candidates['customer_id'], CHANNELS)
+        customers = CampaignEngine.select_customers(candidates, threshold=threshold, top_k=top_k, exclude=capped, stats=selection)
+        report = engine.run(customers, outbox=outbox)
+        report['suppressed']['customers'] = selection.get('suppressed', 0)
+        if detector is not None:
+            pending = RiskMonitor._unalerted_crossings(candidates, report, threshold)
+            detector.commit(dataframe[~dataframe['customer_id'].astype(str).isin(pending)])
+            report['crossings'] = len(candidates)
+            report['crossings_pending'] = len(pending)
+        print(CampaignEngine.format_report(report))
+        return report
+
+    @staticmethod
+    def _unalerted_crossings(candidates, report, threshold=None, pd_col='probability_of_default'):
+        # Customer ids of crossings still owed an alert: neither delivered on some channel
+        # nor at/below the threshold (an intentional skip)
+        alerted = {str(r['customer_id']) for r in report['results'] if r['email_sent'] or r['sms_sent']}
+        owed = candidates
+        if threshold is not None and pd_col in candidates.columns:
+            owed = candidates[candidates[pd_col].astype(float) > threshold]
+        ids = owed['customer_id'].astype(str)
+        return set(ids[~ids.isin(alerted)])
+
+    @staticmethod
+    def check_and_alert(threshold=None, top_k=_DEFAULT_TOP_K, incremental=False):
+        """
+        Triggers alerts for relevant cases. Defaults to the demo behaviour (top 3 by PD);
+        pass `threshold` (and `top_k=None`) to alert the whole eligible book, or `incremental`
+        to alert every customer whose risk crossed a threshold since the previous check.
+        """
+        return RiskMonitor.run_campaign(threshold=threshold, top_k=top_k, incremental=incremental)['results']
@@ -0,0 +1,165 @@
+import base64
+import html
+import os
+import string
+import uuid
+from email.header import Header
+
+import numpy as np
+
+# --- TEMPLATE VERSIONS ---
+# Add a new version instead of editing a released one, so sent campaigns stay reproducible.
+TEMPLATES = {
+    "v1": {
+        "message": {
+            "High": "Hi {name}, we noticed some recent changes in your account activity and would like to help you stay financially comfortable. Please review your personalized options here: [Link]",
+            "Moderate": "Hi {name}, to help you manage your upcoming payments more easily, we've prepared some flexible options for you. Check them out: [Link]",
+            "Low": "Hi {name}, thank you for banking with us! We have some new rewards and tips to help you grow your financial health. View here: [Link]"
+        },
+        "email_subject": "We have personalized support options for you",
+        "email_body": """
+        <html>
+            <body style="font-family: Arial, sans-serif; color: #333;">
+                <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #e0e0e0; border-radius: 8px;">
+                    <h2 style="color: #0a2342;">CREDIX Support</h2>
+                    <p>Hi {name},</p>
+                    <p>{message}</p>
+                    <p>We have created a secure, personalized portal for you to review your options.</p>
+                    <div style="text-align: center; margin: 30px 0;">
+                        <a href="{link}" style="background-color: #0a2342; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; font-weight: bold;">View Your Personalized Options</a>
+                    </div>
+                    <p style="font-size: 12px; color: #777;">This link is secure and valid for 48 hours.</p>
+                </div>
+            </body>
+        </html>
+        """,
+        "sms": "CREDIX: Hi {name}, please review your new support options securely: {link}"
+    }
+}
+
+ACTIVE_TEMPLATE_VERSION = os.environ.get("NOTIFICATION_TEMPLATE_VERSION", "v1")
+RISK_CATEGORIES = ("High", "Moderate", "Low")
+
+# --- 1. Compiled Template ---
+class CompiledTemplate:
+    """
+    A template parsed once into a positional format string.
+    Rendering a batch is one `str.format` call per row over pre-stringified columns.
+    """
+    def __init__(self, source):
+        self.source = source
+        self.fields = []
+        parts = []
+        for literal, field, _, _ in string.Formatter().parse(source):
+            parts.append(literal.replace("{", "{{").replace("}", "}}"))
+            if field is not None:
+                if field not in self.fields:
+                    self.fields.append(field)
+                parts.append("{%d}" % self.fields.index(field))
+        self._format = "".join(parts).format
+
+    def render(self, **values):
+        return self._format(*(values[f] for f in self.fields))
+
+    def render_batch(self, columns):
+        """
+        `columns` maps field name -> sequence of strings (all the same length).
+        """
+        fmt = self._format
+        return [fmt(*row) for row in zip(*(columns[f] for f in self.fields))]
+
+# --- 2. Template Set (one version) ---
+class TemplateSet:
+    def __init__(self, version):
+        if version not in TEMPLATES:
+            raise KeyError(f"Unknown notification template version: {version}")
+        spec = TEMPLATES[version]
+        self.version = version
+        self.email_subject = spec['email_subject']
+        self.templates = {}
+        for category in RISK_CATEGORIES:
+            message = spec['message'][category]
+            # Category text is inlined at compile time, so each (channel, category) pair renders in one pass
+            email_body = spec['email_body'].replace("{message}", message.replace("[Link]", "").replace("{name}", "{name_html}"))
+            self.templates[("message", category)] = CompiledTemplate(message)
+            self.templates[("email", category)] = CompiledTemplate(email_body.replace("{name}", "{name_html}"))
+            self.templates[("sms", category)] = CompiledTemplate(spec['sms'])
+
+    def get(self, channel, risk_category):
+        return self.templates.get((channel, risk_category)) or self.templates[(channel, "Low")]
+
+    def render(self, channel, risk_category, name, link=""):
+        values = {"name": name, "name_html": html.escape(name), "link": link}
+        return self.get(channel, risk_category).render(**values)
+
+    def render_batch(self, channel, risk_categories, names, links):
+        """
+        Renders a whole campaign for one channel from column arrays.
+        Rows are grouped by risk category so every group uses a single compiled template.
+        """
+        names = [str(n) for n in names]
+        columns = {
+            "name": np.asarray(names, dtype=object),
+            "name_html": np.asarray([html.escape(n) for n in names], dtype=object),
+            "link": np.asarray([str(l) for l in links], dtype=object)
+        }
+        categories = np.asarray(risk_categories, dtype=object)
+        out = np.empty(len(names), dtype=object)
+        for category in np.unique(categories):
+            idx = np.flatnonzero(categories == category)
+            template = self.get(channel, category)
+            out[idx] = template.render_batch({f: columns[f][idx] for f in template.fields})
+        return out.tolist()
+
+_TEMPLATE_SETS = {}
+
+def get_templates(version=None):
+    """
+    Returns the compiled templates for `version` (default: the active version), compiling once per process.
+    """
+    version = version or ACTIVE_TEMPLATE_VERSION
+    if version not in _TEMPLATE_SETS:
+        _TEMPLATE_SETS[version] = TemplateSet(version)
+    return _TEMPLATE_SETS[version]
+
+# --- 3. MIME Skeleton ---
+class MimeSkeleton:
+    """
+    Pre-serialized multipart/html envelope for one sender + subject.
+    Per message only the recipient and the base64 body are spliced in, instead of
+    building and serializing a MIMEMultipart tree every time.
+    """
+    def __init__(self, sender, subject):
+        boundary = "===============" + uuid.uuid4().hex + "=="
+        encoded_subject = subject if subject.isascii() else Header(subject, "utf-8").encode()
+        self._head = (
+            f'Content-Type: multipart/mixed; boundary="{boundary}"\n'
+            "MIME-Version: 1.0\n"
+            f"From: {sender}\n"
+            "To: "
+        )
+        self._mid = (
+            f"\nSubject: {encoded_subject}\n"
+            "\n"
+            f"--{boundary}\n"
+            'Content-Type: text/html; charset="utf-8"\n'
+            "MIME-Version: 1.0\n"
+            "Content-Transfer-Encoding: base64\n"
+            "\n"
+        )
+        self._tail = f"\n--{boundary}--\n"
+
+    def serialize(self, to_email, html_body):
+        body = base64.encodebytes(html_body.encode("utf-8")).decode("ascii")
+        return self._head + to_email + self._mid + body + self._tail
+
+    def serialize_batch(self, to_emails, html_bodies):
+        return [self.serialize(to, body) for to, body in zip(to_emails, html_bodies)]
+
+_MIME_SKELETONS = {}
+
+def get_mime_skeleton(sender, subject):
+    key = (sender, subject)
+    if key not in _MIME_SKELETONS:
+        _MIME_SKELETONS[key] = MimeSkeleton(sender, subject)
+    return _MIME_SKELETONS[key]
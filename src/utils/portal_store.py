@@ -0,0 +1,217 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+# Define store path dynamically relative to this file (next to the audit log)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORTAL_DB = os.path.join(BASE_DIR, "portal_store.db")
+
+# Only what the customer portal renders; everything else stays in the analytics dataset
+PORTAL_FIELDS = (
+    'customer_id', 'full_name', 'probability_of_default', 'emi_amount', 'tenure_months',
+    'relationship_tenure_months', 'monthly_salary_inr', 'bureau_score', 'cibil_score'
+)
+BUILD_BATCH_SIZE = 10_000
+
+SCHEMA = """
+CREATE TABLE customers (
+    customer_id TEXT PRIMARY KEY,
+    probability_of_default REAL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE offers (
+    customer_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    plan_id TEXT NOT NULL,
+    current_emi REAL, new_emi REAL, current_tenure REAL, new_tenure REAL, monthly_relief REAL,
+    total_payment_change REAL, income REAL, expenses REAL, current_balance REAL, new_balance REAL,
+    PRIMARY KEY (customer_id, position)
+) WITHOUT ROWID;
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+def _clean(value):
+    # NaN/None fields are dropped so the portal's own defaults apply
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+def build_portal_record(customer, risk_category=None, reasons=None, stability_points=None):
+    """
+    The slim, precomputed view of one customer: PORTAL_FIELDS plus risk category, reasons
+    and stability points (plan offers are stored separately, see PlanEngine.get_plans_batch).
+    Pass the batch RiskEngine results when building many records.
+    """
+    from utils.intervention_logic import RiskEngine
+    record = {f: _clean(customer.get(f)) for f in PORTAL_FIELDS}
+    record = {k: v for k, v in record.items() if v is not None}
+    record['customer_id'] = str(customer.get('customer_id'))
+    record['risk_category'] = risk_category if risk_category is not None else RiskEngine.get_risk_category(customer)
+    record['reasons'] = reasons if reasons is not None else RiskEngine.get_risk_reasons(customer)
+    record['stability_points'] = stability_points if stability_points is not None else RiskEngine.get_stability_points(customer)
+    return record
+
+class PortalStore:
+    """
+    Read-only key-value read model for the customer portal (one SQLite row per customer).
+
+    Built offline from the enriched dataset; the portal serves each page with two
+    primary-key lookups (record and plan offers) and never loads pandas or the analytics CSV.
+    Offer figures are precomputed for the whole portfolio in one vectorized pass; only the
+    static plan text is joined in at read time. A rebuild swaps the file atomically; readers
+    re-open it when its mtime changes.
+    """
+    def __init__(self, path=PORTAL_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._mtime = None
+        self._open()
+
+    def _open(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        self._mtime = mtime
+        self.meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+
+    def _reopen_if_rebuilt(self):
+        try:
+            if os.stat(self.path).st_mtime_ns != self._mtime:
+                self._open()
+        except FileNotFoundError:
+            pass
+
+    @property
+    def snapshot_version(self):
+        return self.meta.get("snapshot_version")
+
+    def _offer_rows(self, customer_id):
+        from utils.intervention_logic import OFFER_COLUMNS
+        columns = OFFER_COLUMNS[2:]
+        rows = self._conn.execute(
+            f"SELECT {', '.join(columns)} FROM offers WHERE customer_id = ? ORDER BY position", (str(customer_id),)
+        ).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def _record(self, row):
+        if row is None:
+            return None
+        from utils.intervention_logic import PlanEngine
+        record = json.loads(row[0])
+        record['plans'] = PlanEngine.plans_from_offers(self._offer_rows(record['customer_id']))
+        return record
+
+    def offers(self, customer_id):
+        """
+        The customer's precomputed plan offers as flat rows (position, plan_id and simulation figures).
+        """
+        with self._lock:
+            self._reopen_if_rebuilt()
+            return self._offer_rows(customer_id)
+
+    def get(self, customer_id):
+        """
+        The customer's portal record (dict, including precomputed 'plans'), or None.
+        """
+        with self._lock:
+            self._reopen_if_rebuilt()
+            row = self._conn.execute(
+                "SELECT payload FROM customers WHERE customer_id = ?", (str(customer_id),)
+            ).fetchone()
+            return self._record(row)
+
+    def first(self, min_pd=None):
+        """
+        A demo customer (first with PD above `min_pd`, else the first customer).
+        """
+        with self._lock:
+            self._reopen_if_rebuilt()
+            row = None
+            if min_pd is not None:
+                row = self._conn.execute(
+                    "SELECT payload FROM customers WHERE probability_of_default > ? ORDER BY rowid LIMIT 1", (min_pd,)
+                ).fetchone()
+            if row is None:
+                row = self._conn.execute("SELECT payload FROM customers ORDER BY rowid LIMIT 1").fetchone()
+            return self._record(row)
+
+    def __len__(self):
+        return int(self.meta.get("count", 0))
+
+    @staticmethod
+    def build(df, path=PORTAL_DB, snapshot_version=None):
+        """
+        Writes the read model for every customer in `df` to a temporary file and swaps it in.
+        Returns the number of customers stored.
+        """
+        from utils.intervention_logic import RiskEngine, PlanEngine, OFFER_COLUMNS
+
+        tmp_path = path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.executescript(SCHEMA)
+            conn.execute("BEGIN")
+            count = 0
+            offer_columns = [c for c in OFFER_COLUMNS if c != 'risk_category']
+            insert_offers = f"INSERT OR REPLACE INTO offers ({', '.join(offer_columns)}) VALUES ({', '.join('?' * len(offer_columns))})"
+            for start in range(0, len(df), BUILD_BATCH_SIZE):
+                batch = df.iloc[start:start + BUILD_BATCH_SIZE]
+                categories = RiskEngine.get_risk_category_batch(batch)
+                reasons = RiskEngine.decode_reasons(RiskEngine.get_risk_reasons_batch(batch))
+                points = RiskEngine.get_stability_points_batch(batch).tolist()
+                rows = []
+                for customer, category, customer_reasons, customer_points in zip(batch.to_dict('records'), categories, reasons, points):
+                    record = build_portal_record(customer, category, customer_reasons, customer_points)
+                    rows.append((record['customer_id'], record.get('probability_of_default'),
+                                 json.dumps(record, ensure_ascii=False, separators=(",", ":"))))
+                conn.executemany("INSERT OR REPLACE INTO customers VALUES (?, ?, ?)", rows)
+                offers = PlanEngine.get_plans_batch(batch, risk_categories=categories)
+                offers = offers.astype({c: object for c in offer_columns}).where(offers.notna(), None)
+                conn.executemany(insert_offers, offers[offer_columns].itertuples(index=False, name=None))
+                count += len(rows)
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("snapshot_version", str(snapshot_version or "")),
+                ("built_at", time.strftime("%Y-%m-%d %H:%M:%S")),
+                ("count", str(count))
+            ])
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        os.replace(tmp_path, path)
+        return count
+
+_STORES = {}
+
+def get_portal_store(path=PORTAL_DB):
+    """
+    Returns the process-wide portal store, or None if it has not been built yet.
+    """
+    if path not in _STORES:
+        if not os.path.exists(path):
+            return None
+        _STORES[path] = PortalStore(path)
+    return _STORES[path]
+
+if __name__ == "__main__":
+    # Build (or rebuild) the portal read model from the enriched dataset
+    import sys
+    sys.path.append(BASE_DIR)
+    from utils.data_loader import load_data, get_data_version
+    start = time.perf_counter()
+    df = load_data()
+    count = PortalStore.build(df, snapshot_version=get_data_version())
+    print(f"[PORTAL STORE] {count} customers written to {PORTAL_DB} in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.risk_rules import get_risk_rules
+
+# Define snapshot path dynamically relative to this file (next to the audit log)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_PATH = os.path.join(BASE_DIR, "risk_snapshot.npz")
+
+# --- CROSSING CONFIGURATION ---
+PD_JUMP_DELTA = 0.10               # PD rise that triggers an alert without a category change
+
+def risk_levels():
+    """
+    Category names of the current risk rules, lowest risk first (index = risk_codes value).
+    Read on every call, so a hot-reloaded rules file takes effect.
+    """
+    return get_risk_rules().current().category_names
+
+def risk_codes(pd_values):
+    """
+    Vectorized RiskEngine.get_risk_category: the index into risk_levels() of each PD's
+    category. NaN PD counts as the lowest category.
+    """
+    return get_risk_rules().current().category_codes({'probability_of_default': np.asarray(pd_values, dtype=float)})
+
+class RiskCrossingDetector:
+    """
+    Keeps the last-seen PD and risk category per customer and, for each rescored batch,
+    returns only the customers whose category went up or whose PD rose by more than `pd_delta`.
+
+    The snapshot is three parallel arrays (customer_id, pd, category code) stored as .npz;
+    a diff aligns the batch against it with one hash lookup (Index.get_indexer) and
+    compares the arrays in NumPy. Customers not seen before count as previously in the lowest category.
+    """
+    def __init__(self, path=SNAPSHOT_PATH, pd_delta=PD_JUMP_DELTA):
+        self.path = path
+        self.pd_delta = pd_delta
+        self._load()
+
+    def _load(self):
+        if self.path and os.path.exists(self.path):
+            with np.load(self.path, allow_pickle=False) as snap:
+                self.customer_ids = snap['customer_id']
+                self.pd_values = snap['pd']
+                self.codes = snap['category']
+        else:
+            self.customer_ids = np.array([], dtype=str)
+            self.pd_values = np.array([], dtype=float)
+            self.codes = np.array([], dtype=np.int8)
+        self._index = pd.Index(self.customer_ids)
+
+    def __len__(self):
+        return len(self.customer_ids)
+
+    @staticmethod
+    def _columns(df, pd_col):
+        ids = df['customer_id'].to_numpy().astype(str)
+        if pd_col in df.columns:
+            pd_values = df[pd_col].to_numpy(dtype=float, na_value=np.nan)
+        else:
+            pd_values = np.zeros(len(df))
+        return ids, pd_values
+
+    def diff(self, df, pd_col='probability_of_default'):
+        """
+        Returns the rows of `df` that crossed into a higher risk category or whose PD jumped,
+        with previous_pd, previous_risk_category, risk_category and crossing ("category_up" / "pd_jump") added.
+        """
+        if df.empty or 'customer_id' not in df.columns:
+            return df.iloc[0:0]
+
+        ids, pd_values = self._columns(df, pd_col)
+        codes = risk_codes(pd_values)
+
+        pos = self._index.get_indexer(ids)
+        known = pos >= 0
+        prev_codes = np.zeros(len(ids), dtype=np.int8)
+        prev_pd = np.full(len(ids), np.nan)
+        prev_codes[known] = self.codes[pos[known]]
+        prev_pd[known] = self.pd_values[pos[known]]
+
+        category_up = codes > prev_codes
+        with np.errstate(invalid='ignore'):
+            pd_jump = known & ((pd_values - prev_pd) > self.pd_delta)
+        changed = np.flatnonzero(category_up | pd_jump)
+
+        levels = np.asarray(risk_levels(), dtype=object)
+        crossings = df.iloc[changed].copy()
+        crossings['previous_pd'] = prev_pd[changed]
+        crossings['previous_risk_category'] = np.where(known[changed], levels[prev_codes[changed]], None)
+        crossings['risk_category'] = levels[codes[changed]]
+        crossings['crossing'] = np.where(category_up[changed], "category_up", "pd_jump")
+        return crossings
+
+    def commit(self, df, pd_col='probability_of_default'):
+        """
+        Folds a scored batch into the snapshot (updating known customers, appending new ones)
+        and persists it. Call after the alerts for `diff(df)` went out, so a crash re-detects them.
+        """
+        if df.empty or 'customer_id' not in df.columns:
+            return
+        ids, pd_values = self._columns(df, pd_col)
+        # Last occurrence wins if a batch repeats a customer
+        _, last = np.unique(ids[::-1], return_index=True)
+        keep = np.sort(len(ids) - 1 - last)
+        ids, pd_values = ids[keep], pd_values[keep]
+        codes = risk_codes(pd_values)
+
+        pos = self._index.get_indexer(ids)
+        known = pos >= 0
+        self.pd_values = self.pd_values.copy()
+        self.codes = self.codes.copy()
+        self.pd_values[pos[known]] = pd_values[known]
+        self.codes[pos[known]] = codes[known]
+        self.customer_ids = np.concatenate([self.customer_ids.astype(str), ids[~known]])
+        self.pd_values = np.concatenate([self.pd_values, pd_values[~known]])
+        self.codes = np.concatenate([self.codes, codes[~known]])
+        self._index = pd.Index(self.customer_ids)
+
+        if self.path:
+            tmp_path = self.path + ".tmp.npz"
+            np.savez(tmp_path, customer_id=self.customer_ids, pd=self.pd_values, category=self.codes)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,329 @@
+import json
+import operator
+import os
+import threading
+import time
+
+import numpy as np
+
+try:
+    import yaml  # Optional: only needed for .yaml / .yml rule files
+except ImportError:
+    yaml = None
+
+# Define rules path dynamically relative to this file
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RULES_FILE = os.environ.get("RISK_RULES_FILE", os.path.join(BASE_DIR, "risk_rules.json"))
+
+RELOAD_CHECK_S = 1.0            # How often the rules file's mtime is checked
+SCALAR_TIMING_SAMPLE = 64       # Time one in N single-record evaluations
+
+# Comparisons work unchanged on scalars and NumPy arrays, so one compiled rule serves both paths
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne
+}
+
+def load_rules_file(path):
+    """
+    Parses a JSON or (with PyYAML installed) YAML rules file.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ImportError(f"PyYAML is required to load {path}")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+def _batch_len(data):
+    return len(data) if hasattr(data, "columns") else len(next(iter(data.values()), ()))
+
+def batch_column(data, field, default):
+    """
+    One column of a DataFrame or dict of arrays as float64, or `default` everywhere if absent.
+    """
+    if field not in data:
+        return np.full(_batch_len(data), default, dtype=float)
+    values = data[field]
+    if hasattr(values, "to_numpy"):
+        return values.to_numpy(dtype=float, na_value=np.nan)
+    return np.asarray(values, dtype=float)
+
+# --- 1. Compiled Rule ---
+class Rule:
+    """
+    One `field op value` predicate. Missing fields take `default`; NaN compares False.
+    Calls and evaluation time are accumulated for the timing report.
+    """
+    def __init__(self, spec):
+        missing = {"name", "field", "op", "value"} - set(spec)
+        if missing:
+            raise ValueError(f"Rule {spec.get('name', spec)} is missing {sorted(missing)}")
+        if spec["op"] not in OPERATORS:
+            raise ValueError(f"Rule {spec['name']}: unknown operator {spec['op']!r}")
+        self.name = spec["name"]
+        self.field = spec["field"]
+        self.op = spec["op"]
+        self.value = spec["value"]
+        self.default = spec.get("default", 0)
+        self.text = spec.get("text")
+        self._compare = OPERATORS[self.op]
+        self.calls = 0
+        self.rows = 0
+        self.seconds = 0.0
+
+    def __call__(self, record):
+        """
+        Evaluates the rule on one record (dict / Series). Every SCALAR_TIMING_SAMPLE-th call is
+        timed (and scaled up), so the per-record path pays almost nothing for the report.
+        """
+        self.calls += 1
+        self.rows += 1
+        if self.calls % SCALAR_TIMING_SAMPLE:
+            return bool(self._compare(record.get(self.field, self.default), self.value))
+        start = time.perf_counter()
+        result = bool(self._compare(record.get(self.field, self.default), self.value))
+        self.seconds += (time.perf_counter() - start) * SCALAR_TIMING_SAMPLE
+        return result
+
+    def evaluate(self, data, columns=None):
+        """
+        Evaluates the rule on a DataFrame or dict of column arrays; returns a boolean array.
+        `columns` caches float columns shared by several rules in one pass.
+        """
+        start = time.perf_counter()
+        key = (self.field, self.default)
+        if columns is not None and key in columns:
+            values = columns[key]
+        else:
+            values = batch_column(data, self.field, self.default)
+            if columns is not None:
+                columns[key] = values
+        with np.errstate(invalid="ignore"):
+            result = self._compare(values, self.value)
+        self.seconds += time.perf_counter() - start
+        self.calls += 1
+        self.rows += len(result)
+        return result
+
+    def __repr__(self):
+        return f"Rule({self.name}: {self.field} {self.op} {self.value})"
+
+# --- 2. Rule Set (one version of the rules file) ---
+class RuleSet:
+    """
+    A rules file compiled once: risk category levels (first match wins), reason rules in
+    priority order plus a fallback, and the stability points formula.
+    """
+    def __init__(self, spec):
+        self.version = str(spec.get("version", ""))
+        categories = spec["categories"]
+        self.levels = [Rule(level) for level in categories["levels"]]
+        self.otherwise = categories["otherwise"]
+        # Ordered lowest -> highest risk, so codes index this tuple
+        self.category_names = tuple([self.otherwise] + [level.name for level in reversed(self.levels)])
+        self._category_array = np.array(self.category_names, dtype=object)
+        self._level_codes = [len(self.levels) - i for i in range(len(self.levels))]
+
+        self.reasons = [Rule(reason) for reason in spec.get("reasons", [])]
+        if len(self.reasons) > 31:
+            raise ValueError("At most 31 reason rules fit in a reason mask")
+        self.fallback = Rule(spec["fallback_reason"]) if spec.get("fallback_reason") else None
+        self.fallback_bit = 1 << len(self.reasons)
+        self.max_reasons = int(spec.get("max_reasons", 3))
+        self.mask_dtype = np.uint8 if len(self.reasons) < 8 else np.uint32
+        self._decoded = {}
+
+        stability = spec["stability"]
+        self.stability_rule = Rule(stability["eligible"])
+        self.tenure_field = stability.get("tenure_field", "tenure_months")
+        self.tenure_default = stability.get("tenure_default", 12)
+        self.base_points = stability.get("base_points", 500)
+        self.pd_points = stability.get("pd_points", 1000)
+        self.tenure_points = stability.get("tenure_points", 10)
+
+    @property
+    def rules(self):
+        return self.levels + self.reasons + [r for r in (self.fallback, self.stability_rule) if r is not None]
+
+    def category_threshold(self, name):
+        """
+        The PD threshold of a category level (e.g. "High" -> 0.7).
+        """
+        for level in self.levels:
+            if level.name == name:
+                return level.value
+        raise KeyError(f"No category level named {name}")
+
+    # --- Scalar (one record) ---
+    def category(self, record):
+        for level in self.levels:
+            if level(record):
+                return level.name
+        return self.otherwise
+
+    def reasons_for(self, record):
+        reasons = [rule.text for rule in self.reasons if rule(record)]
+        # Fallback if no specific reasons found but risk is high
+        if not reasons and self.fallback is not None and self.fallback(record):
+            reasons.append(self.fallback.text)
+        return reasons[:self.max_reasons]
+
+    def stability_points(self, record):
+        if self.stability_rule(record):
+            pd = record.get(self.stability_rule.field, self.stability_rule.default)
+            tenure = record.get(self.tenure_field, self.tenure_default)
+            return self.base_points + int((1 - pd) * self.pd_points) + (tenure * self.tenure_points)
+        return 0
+
+    # --- Batch (DataFrame or dict of column arrays) ---
+    def category_codes(self, data, columns=None):
+        """
+        Category per row as an int8 code into category_names (0 = lowest risk).
+        """
+        columns = {} if columns is None else columns
+        conditions = [level.evaluate(data, columns) for level in self.levels]
+        if not conditions:
+            return np.zeros(_batch_len(data), dtype=np.int8)
+        return np.select(conditions, self._level_codes, default=0).astype(np.int8)
+
+    def category_batch(self, data, columns=None):
+        return self._category_array[self.category_codes(data, columns)]
+
+    def reason_masks(self, data, columns=None):
+        """
+        Bit i set when reason rule i fires; fallback_bit when none does and the fallback rule fires.
+        """
+        columns = {} if columns is None else columns
+        masks = np.zeros(_batch_len(data), dtype=self.mask_dtype)
+        for i, rule in enumerate(self.reasons):
+            masks |= rule.evaluate(data, columns).astype(self.mask_dtype) << self.mask_dtype(i)
+        if self.fallback is not None:
+            fallback = (masks == 0) & self.fallback.evaluate(data, columns)
+            masks |= fallback.astype(self.mask_dtype) * self.mask_dtype(self.fallback_bit)
+        return masks
+
+    def decode_mask(self, mask):
+        """
+        Top reason texts for one mask (decoded on first use, then cached).
+        """
+        mask = int(mask)
+        if mask not in self._decoded:
+            texts = [rule.text for i, rule in enumerate(self.reasons) if mask & (1 << i)]
+            if mask & self.fallback_bit and self.fallback is not None:
+                texts.append(self.fallback.text)
+            self._decoded[mask] = tuple(texts[:self.max_reasons])
+        return list(self._decoded[mask])
+
+    def stability_points_batch(self, data, columns=None):
+        """
+        Integer array when the tenure column is integral (or missing), float otherwise,
+        so a NaN tenure yields NaN exactly as the scalar version does.
+        """
+        columns = {} if columns is None else columns
+        eligible = self.stability_rule.evaluate(data, columns)
+        pd = columns[(self.stability_rule.field, self.stability_rule.default)]
+        tenure = batch_column(data, self.tenure_field, self.tenure_default)
+        with np.errstate(invalid="ignore"):
+            points = np.where(eligible, self.base_points + np.trunc((1 - pd) * self.pd_points) + tenure * self.tenure_points, 0.0)
+        if self.tenure_field not in data or np.issubdtype(np.asarray(data[self.tenure_field]).dtype, np.integer):
+            return points.astype(np.int64)
+        return points
+
+# --- 3. Hot-reloading Engine ---
+class RiskRuleEngine:
+    """
+    Serves the current RuleSet, re-compiling it when the rules file changes on disk
+    (checked at most every RELOAD_CHECK_S). An invalid edit keeps the previous rules.
+    """
+    def __init__(self, path=RULES_FILE, check_interval_s=RELOAD_CHECK_S):
+        self.path = path
+        self.check_interval_s = check_interval_s
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self.ruleset = None
+        self.reload()
+
+    def reload(self):
+        """
+        Loads and compiles the rules file. Returns True if new rules were installed.
+        """
+        mtime = os.stat(self.path).st_mtime_ns
+        try:
+            ruleset = RuleSet(load_rules_file(self.path))
+        except Exception as e:
+            if self.ruleset is None:
+                raise
+            print(f"[RISK RULES] ERROR: Failed to reload {self.path}, keeping version {self.ruleset.version}: {e}")
+            self._mtime = mtime
+            return False
+        with self._lock:
+            self.ruleset = ruleset
+            self._mtime = mtime
+        print(f"[RISK RULES] Loaded version {ruleset.version} ({len(ruleset.rules)} rules) from {self.path}")
+        return True
+
+    def current(self):
+        """
+        The current RuleSet, reloaded first if the file changed.
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval_s:
+            self._checked_at = now
+            try:
+                if os.stat(self.path).st_mtime_ns != self._mtime:
+                    self.reload()
+            except FileNotFoundError:
+                pass
+        return self.ruleset
+
+    def timing_report(self):
+        """
+        Per-rule evaluation stats for the current rules, slowest first.
+        """
+        rows = [
+            {
+                "rule": rule.name,
+                "calls": rule.calls,
+                "rows": rule.rows,
+                "total_ms": rule.seconds * 1000,
+                "ns_per_row": rule.seconds * 1e9 / rule.rows if rule.rows else 0.0
+            }
+            for rule in self.ruleset.rules
+        ]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def format_timing_report(self):
+        lines = [f"[RISK RULES] Version {self.ruleset.version} evaluation times:"]
+        for row in self.timing_report():
+            lines.append(f"  {row['rule']:<22} {row['calls']:>8,} calls {row['rows']:>12,} rows "
+                         f"{row['total_ms']:>10.2f} ms {row['ns_per_row']:>8.1f} ns/row")
+        return "\n".join(lines)
+
+_ENGINES = {}
+
+def get_risk_rules(path=RULES_FILE):
+    """
+    Returns the process-wide rule engine for `path`.
+    """
+    if path not in _ENGINES:
+        _ENGINES[path] = RiskRuleEngine(path)
+    return _ENGINES[path]
+
+if __name__ == "__main__":
+    # Evaluate the current rules over the enriched dataset and print per-rule timings
+    import sys
+    sys.path.append(BASE_DIR)
+    from utils.data_loader import load_data
+    engine = get_risk_rules()
+    df = load_data()
+    rules = engine.current()
+    rules.category_batch(df)
+    rules.reason_masks(df)
+    rules.stability_points_batch(df)
+    print(engine.format_timing_report())
@@ -0,0 +1,116 @@
+import base64
+import hashlib
+import hmac
+import os
+import time
+
+# Define secret path dynamically relative to this file (next to the audit log)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRET_FILE = os.path.join(BASE_DIR, ".token_secret")
+
+# --- TOKEN CONFIGURATION ---
+TOKEN_TTL_S = 48 * 3600     # Matches "This link is secure and valid for 48 hours" in the email
+SIGNATURE_BYTES = 16        # HMAC-SHA256 truncated to 128 bits
+TOKEN_VERSION = "1"
+
+class InvalidToken(ValueError):
+    """
+    The token is malformed or its signature does not verify.
+    """
+
+class ExpiredToken(InvalidToken):
+    """
+    The token verified but is past its expiry.
+    """
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def load_secret():
+    """
+    Signing key from INTERVENTION_TOKEN_SECRET, else a random key persisted (0600) in SECRET_FILE,
+    so links stay valid across portal restarts.
+    """
+    secret = os.environ.get("INTERVENTION_TOKEN_SECRET")
+    if secret:
+        return secret.encode("utf-8")
+    try:
+        with open(SECRET_FILE, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        secret = os.urandom(32)
+        try:
+            fd = os.open(SECRET_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(secret)
+            return secret
+        except FileExistsError:
+            # Another process created it first; use theirs
+            with open(SECRET_FILE, "rb") as f:
+                return f.read()
+
+class TokenSigner:
+    """
+    Compact, self-contained intervention link tokens.
+
+    Token = base64url("1|customer_id|expiry|snapshot_version") + "." + base64url(HMAC-SHA256[:16]).
+    Verification is one HMAC plus a constant-time compare; nothing is looked up to trust the token.
+    """
+    def __init__(self, secret=None, ttl_s=TOKEN_TTL_S):
+        self._key = secret if isinstance(secret, bytes) else (secret.encode("utf-8") if secret else load_secret())
+        self.ttl_s = ttl_s
+
+    def _sign(self, payload):
+        return hmac.new(self._key, payload, hashlib.sha256).digest()[:SIGNATURE_BYTES]
+
+    def issue(self, customer_id, snapshot_version="", ttl_s=None, now=None):
+        expires_at = int((time.time() if now is None else now) + (self.ttl_s if ttl_s is None else ttl_s))
+        customer_id = str(customer_id)
+        if "|" in customer_id or "|" in str(snapshot_version):
+            raise ValueError("customer_id and snapshot_version must not contain '|'")
+        payload = f"{TOKEN_VERSION}|{customer_id}|{expires_at}|{snapshot_version}".encode("utf-8")
+        return f"{_b64encode(payload)}.{_b64encode(self._sign(payload))}"
+
+    def issue_many(self, customer_ids, snapshot_version="", ttl_s=None, now=None):
+        """
+        Tokens for a whole campaign, all sharing one expiry.
+        """
+        now = time.time() if now is None else now
+        return [self.issue(c, snapshot_version, ttl_s=ttl_s, now=now) for c in customer_ids]
+
+    def verify(self, token, now=None):
+        """
+        Returns {"customer_id", "expires_at", "snapshot_version"}; raises InvalidToken / ExpiredToken.
+        """
+        try:
+            payload_b64, signature_b64 = str(token).split(".", 1)
+            payload = _b64decode(payload_b64)
+            signature = _b64decode(signature_b64)
+        except ValueError:
+            raise InvalidToken("Malformed token")
+        if not hmac.compare_digest(self._sign(payload), signature):
+            raise InvalidToken("Token signature mismatch")
+        try:
+            version, customer_id, expires_at, snapshot_version = payload.decode("utf-8").split("|")
+            expires_at = int(expires_at)
+        except ValueError:
+            raise InvalidToken("Malformed token payload")
+        if version != TOKEN_VERSION:
+            raise InvalidToken(f"Unsupported token version {version}")
+        if expires_at < (time.time() if now is None else now):
+            raise ExpiredToken(f"Token for {customer_id} expired")
+        return {"customer_id": customer_id, "expires_at": expires_at, "snapshot_version": snapshot_version}
+
+_SIGNER = None
+
+def get_signer():
+    """
+    Returns the process-wide signer (the key is loaded once).
+    """
+    global _SIGNER
+    if _SIGNER is None:
+        _SIGNER = TokenSigner()
+    return _SIGNER
@@ -0,0 +1,150 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.risk_rules import get_risk_rules, batch_column
+
+# --- SEGMENTATION CONFIGURATION ---
+# Operations desk segments (PD > 0.40 / 0.70 / 0.85), lowest first
+OPS_EDGES = (0.4, 0.7, 0.85)
+OPS_LABELS = ("Low Monitor", "Follow-Up", "High Priority", "ESCALATION")
+
+def band_codes(values, edges, right=True):
+    """
+    Band index per value with np.digitize: with right=True band i holds edges[i-1] < v <= edges[i].
+    NaN lands in band 0, as a NaN comparison never fires a threshold.
+    """
+    values = np.asarray(values, dtype=float)
+    dtype = np.int8 if len(edges) < 127 else np.int32
+    codes = np.digitize(values, edges, right=right).astype(dtype)
+    codes[np.isnan(values)] = 0
+    return codes
+
+def band_rows(codes, n_bands):
+    """
+    Row positions of each band (ascending within a band): one stable argsort split by band counts.
+    """
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes, minlength=n_bands)
+    return np.split(order, np.cumsum(counts)[:-1])
+
+def _category_edges(rules):
+    """
+    Digitize edges for the rule set's category levels, or None when the levels are not plain
+    thresholds on one field (those fall back to RuleSet.category_codes).
+    """
+    levels = rules.levels
+    if not levels or len({(level.field, level.default) for level in levels}) > 1:
+        return None
+    ops = {level.op for level in levels}
+    if ops not in ({">"}, {">="}):
+        return None
+    # Levels run highest first, so their thresholds must be strictly decreasing
+    values = [level.value for level in levels]
+    if any(a <= b for a, b in zip(values, values[1:])):
+        return None
+    return tuple(reversed(values)), ops == {">"}
+
+class Segmentation:
+    """
+    Risk segments of one dataset, computed once: a band code per row and the row positions of
+    every band, per scheme. 'risk_band' follows the risk rules' categories (Low / Moderate / High),
+    'ops_segment' the operations desk priorities. Pages take `rows()` / `counts()` instead of
+    re-filtering the frame with boolean masks on every render.
+    """
+    def __init__(self, df, rules=None):
+        rules = rules or get_risk_rules().current()
+        self.rules_version = rules.version
+        self.size = len(df)
+        self._schemes = {}
+
+        field = rules.levels[0].field if rules.levels else "probability_of_default"
+        default = rules.levels[0].default if rules.levels else 0.0
+        pd_values = batch_column(df, field, default)
+
+        category_edges = _category_edges(rules)
+        if category_edges is not None:
+            edges, right = category_edges
+            risk_codes = band_codes(pd_values, edges, right=right)
+        else:
+            risk_codes = rules.category_codes(df)
+        self._add("risk_band", risk_codes, rules.category_names)
+        self._add("ops_segment", band_codes(pd_values, OPS_EDGES), OPS_LABELS)
+
+    def _add(self, scheme, codes, labels):
+        self._schemes[scheme] = {
+            "codes": codes,
+            "labels": tuple(labels),
+            "label_array": np.array(labels, dtype=object),
+            "rows": band_rows(codes, len(labels))
+        }
+
+    def _scheme(self, scheme):
+        if scheme not in self._schemes:
+            raise KeyError(f"Unknown segmentation scheme {scheme}")
+        return self._schemes[scheme]
+
+    def band_names(self, scheme="risk_band"):
+        return self._scheme(scheme)["labels"]
+
+    def codes(self, scheme="risk_band"):
+        """
+        Band code per row, aligned with the segmented frame (0 = lowest risk).
+        """
+        return self._scheme(scheme)["codes"]
+
+    def labels(self, scheme="risk_band"):
+        """
+        Band label per row as an object array, aligned with the segmented frame.
+        """
+        s = self._scheme(scheme)
+        return s["label_array"][s["codes"]]
+
+    def categorical(self, scheme="risk_band"):
+        """
+        Band label per row as an ordered pd.Categorical, e.g. for
+        `df.assign(risk_band=segmentation.categorical())`.
+        """
+        s = self._scheme(scheme)
+        return pd.Categorical.from_codes(s["codes"], categories=list(s["labels"]), ordered=True)
+
+    def rows(self, scheme="risk_band", *bands):
+        """
+        Row positions (for df.iloc) of the given bands, in frame order; all rows if none given.
+        """
+        s = self._scheme(scheme)
+        if not bands:
+            return np.arange(self.size)
+        parts = [s["rows"][s["labels"].index(band)] for band in bands]
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+    def counts(self, scheme="risk_band"):
+        """
+        {band label: row count}.
+        """
+        s = self._scheme(scheme)
+        return {label: len(rows) for label, rows in zip(s["labels"], s["rows"])}
+
+_LOCK = threading.Lock()
+_CURRENT = {}
+
+def get_segmentation(df=None):
+    """
+    The segmentation of `df` (default: load_data()), rebuilt only when the frame or the loaded
+    RuleSet changes (every reload is a new RuleSet, so an edit that keeps the "version" string
+    still re-bands). The frame is not modified: it is usually the cached load_data()
+    frame every page and thread shares, so callers that need a label column add their own
+    copy (df.assign(risk_band=segmentation.categorical())).
+    """
+    from utils.data_loader import load_data
+    if df is None:
+        df = load_data()
+    rules = get_risk_rules().current()
+    with _LOCK:
+        if (_CURRENT.get("frame") is not df or _CURRENT.get("rules") is not rules
+                or _CURRENT["segmentation"].size != len(df)):
+            _CURRENT["segmentation"] = Segmentation(df, rules)
+            _CURRENT["frame"] = df
+            _CURRENT["rules"] = rules
+        return _CURRENT["segmentation"]
@@ -0,0 +1,59 @@
+import sys
+import os
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.amortization import (
+    annuity_emi, principal_from_emi, total_interest, schedule, emi_grid, relief_cost, relief_grid,
+    GRID_TENURES, GRID_RATES
+)
+
+def reference_schedule(principal, annual_rate, tenure):
+    # Plain month-by-month loop
+    r = annual_rate / 12
+    emi = principal * r * (1 + r) ** tenure / ((1 + r) ** tenure - 1) if r else principal / tenure
+    balance, rows = principal, []
+    for _ in range(tenure):
+        interest = balance * r
+        balance -= emi - interest
+        rows.append((emi, interest, emi - interest, max(balance, 0)))
+    return np.array(rows)
+
+def test_emi_and_schedule_match_reference_loop():
+    # Known value: 10 lakh at 12% over 60 months -> EMI 22,244.45
+    assert abs(annuity_emi(1_000_000, 0.12, 60) - 22244.45) < 0.01
+    assert annuity_emi(120_000, 0.0, 12) == 10_000  # Zero rate
+    principal = np.array([500_000.0, 80_000.0, 1_200_000.0])
+    rates = np.array([0.105, 0.0, 0.18])
+    tenures = np.array([36, 12, 84])
+    sched = schedule(principal, rates, tenures)
+    assert sched['balance'].shape == (3, 84)
+    for i in range(3):
+        ref = reference_schedule(principal[i], rates[i], tenures[i])
+        got = np.stack([sched[k][i, :tenures[i]] for k in ("payment", "interest", "principal", "balance")], axis=1)
+        np.testing.assert_allclose(got, ref, rtol=1e-9, atol=1e-6)
+        assert not sched['payment'][i, tenures[i]:].any()
+        assert abs(sched['interest'][i].sum() - total_interest(principal[i], rates[i], tenures[i])) < 1e-6
+        assert abs(sched['principal'][i].sum() - principal[i]) < 1e-6
+    np.testing.assert_allclose(principal_from_emi(annuity_emi(principal, rates, tenures), rates, tenures), principal)
+
+def test_grid_and_relief_estimates_agree():
+    rng = np.random.default_rng(3)
+    n = 1000
+    principal = rng.uniform(50_000, 2_000_000, n)
+    current_tenure = rng.integers(12, 84, n)
+    current_emi = annuity_emi(principal, 0.12, current_tenure)
+    disposable = rng.uniform(5_000, 80_000, n)
+
+    grid = emi_grid(principal)
+    assert grid.shape == (n, len(GRID_TENURES), len(GRID_RATES))
+    t, r = 7, 13
+    np.testing.assert_allclose(grid[:, t, r], annuity_emi(principal, GRID_RATES[r], GRID_TENURES[t]))
+
+    estimate = relief_grid(principal, current_emi, current_tenure, disposable)
+    cell = relief_cost(principal, current_emi, current_tenure, GRID_RATES[r], GRID_TENURES[t])
+    assert abs(estimate['monthly_relief'][t, r] - cell['monthly_relief'].sum()) < 1e-3
+    assert abs(estimate['total_payment_change'][t, r] - cell['total_payment_change'].sum()) < 1e-2
+    assert estimate['affordable'][t, r] == np.count_nonzero(cell['new_emi'] <= disposable)
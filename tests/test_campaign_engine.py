@@ -0,0 +1,65 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils import campaign_engine
+from utils.campaign_engine import CampaignEngine
+
+def make_portfolio(n=1000, seed=7):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'customer_id': [f"CUST{i:06d}" for i in range(n)],
+        'full_name': ["Test Customer"] * n,
+        'email_id': [f"cust{i}@example.com" for i in range(n)],
+        'mobile_number': ["+910000000000"] * n,
+        'probability_of_default': rng.random(n)
+    })
+
+def test_select_threshold_and_top_k():
+    df = make_portfolio()
+    pd_values = df['probability_of_default']
+
+    selected = CampaignEngine.select_customers(df, threshold=0.8)
+    assert len(selected) == (pd_values > 0.8).sum()
+    assert selected['probability_of_default'].is_monotonic_decreasing
+
+    top = CampaignEngine.select_customers(df, top_k=10)
+    expected = pd_values.sort_values(ascending=False).head(10)
+    assert list(top['customer_id']) == list(df.loc[expected.index, 'customer_id'])
+
+def test_campaign_fans_out_and_reports(monkeypatch):
+    df = make_portfolio(200)
+    df.loc[3, 'email_id'] = np.nan  # Missing email must be reported, not raised
+
+    monkeypatch.setattr(campaign_engine.EmailService, "send_email", staticmethod(lambda to, subject, body: not to.startswith("cust1@")))
+    monkeypatch.setattr(campaign_engine.SMSService, "send_sms", staticmethod(lambda phone, body: True))
+
+    engine = CampaignEngine(max_concurrency=16, channel_rates={"email": None, "sms": None})
+    report = engine.run(df)
+
+    assert report['selected'] == 200
+    assert report['alerted'] == 199
+    assert report['channels']['email']['sent'] == 198
+    assert report['channels']['email']['failed'] == 1
+    assert report['channels']['sms']['sent'] == 199
+    assert {f['channel'] for f in report['failures']} == {"build", "email"}
+    assert report['channels']['sms']['latency_ms']['p99'] >= report['channels']['sms']['latency_ms']['p50']
+
+def test_drain_reports_every_campaign(tmp_path, monkeypatch):
+    from utils.notification_outbox import NotificationOutbox
+    monkeypatch.setattr(campaign_engine.EmailService, "send_email", staticmethod(lambda to, subject, body: True))
+    outbox = NotificationOutbox(str(tmp_path / "outbox.db"))
+    outbox.enqueue_many({"campaign_id": campaign, "customer_id": f"C{i}", "channel": "email", "recipient": "x@example.com",
+                         "subject": "Hi", "body": "Hi"} for i, campaign in enumerate(["CAMP-A", "CAMP-A", "CAMP-B"]))
+
+    report = CampaignEngine(channel_rates={"email": None}).drain(outbox)
+    assert report['channels']['email']['sent'] == 3
+    assert report['outbox'] == {"email": {"sent": 3}} and report['superseded'] == 0
+
+if __name__ == "__main__":
+    test_select_threshold_and_top_k()
+    print("Selection tests passed.")
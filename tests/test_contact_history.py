@@ -0,0 +1,128 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils import campaign_engine
+from utils.campaign_engine import CampaignEngine
+from utils.contact_history import ContactHistory, ContactCapExceeded
+
+def test_cap_blocks_until_window_expires(tmp_path):
+    history = ContactHistory(str(tmp_path / "contacts.db"), caps={"email": (2, 1)})
+    now = time.time()
+    history.record_many([("C1", "email", now - 7200), ("C1", "email", now - 60)])
+    assert history.allowed("C1", "email")  # Only one contact inside the 1h window
+    history.record("C1", "email")
+    assert not history.allowed("C1", "email")
+    assert history.allowed("C1", "sms")  # Uncapped channel
+    try:
+        history.check("C1", "email")
+        assert False, "expected ContactCapExceeded"
+    except ContactCapExceeded as e:
+        assert e.next_allowed_at > now
+
+def test_index_sees_writes_from_other_connections(tmp_path):
+    path = str(tmp_path / "contacts.db")
+    reader = ContactHistory(path)
+    ContactHistory(path).record("C9", "portal_open")
+    assert not reader.try_record("C9", "portal_open")
+    assert reader.try_record("C10", "portal_open")
+
+def test_campaign_skips_capped_customers(tmp_path, monkeypatch):
+    df = pd.DataFrame({
+        'customer_id': [f"C{i}" for i in range(6)],
+        'full_name': ["Test Customer"] * 6,
+        'email_id': [f"c{i}@example.com" for i in range(6)],
+        'mobile_number': ["+910000000000"] * 6,
+        'probability_of_default': [0.95, 0.9, 0.85, 0.8, 0.2, 0.1]
+    })
+    history = ContactHistory(str(tmp_path / "contacts.db"))
+    history.record_many([("C0", "email", None), ("C0", "sms", None), ("C1", "email", None)])
+
+    capped = history.capped_mask(df['customer_id'], ("email", "sms"))
+    assert list(np.flatnonzero(capped)) == [0]
+
+    stats = {}
+    selected = CampaignEngine.select_customers(df, top_k=3, exclude=capped, stats=stats)
+    assert list(selected['customer_id']) == ["C1", "C2", "C3"]
+    assert stats['suppressed'] == 1
+
+    monkeypatch.setattr(campaign_engine.EmailService, "send_email", staticmethod(lambda to, subject, body: True))
+    monkeypatch.setattr(campaign_engine.SMSService, "send_sms", staticmethod(lambda phone, body: True))
+    engine = CampaignEngine(channel_rates={"email": None, "sms": None}, contact_history=history)
+    report = engine.run(selected)
+    assert report['suppressed'] == {"email": 1, "sms": 0}
+    assert report['channels']['email']['sent'] == 2
+    assert not history.allowed("C2", "email") and not history.allowed("C3", "sms")
+
+def test_try_record_is_atomic_across_connections(tmp_path):
+    import threading
+    path = str(tmp_path / "contacts.db")
+    histories = [ContactHistory(path) for _ in range(8)]  # One connection each, as separate processes have
+    results = []
+    barrier = threading.Barrier(len(histories))
+
+    def contact(history):
+        barrier.wait()
+        results.append(history.try_record("C1", "email"))
+
+    threads = [threading.Thread(target=contact, args=(h,)) for h in histories]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == [False] * 7 + [True]
+
+def test_campaign_records_each_contact_as_sent(tmp_path, monkeypatch):
+    df = pd.DataFrame({
+        'customer_id': ["C0", "C1", "C2"],
+        'full_name': ["Test Customer"] * 3,
+        'email_id': ["c0@example.com", "c1@example.com", "c2@example.com"],
+        'mobile_number': ["+910000000000"] * 3,
+        'probability_of_default': [0.9, 0.8, 0.7]
+    })
+    path = str(tmp_path / "contacts.db")
+    history = ContactHistory(path)
+    dashboard = ContactHistory(path)  # Another process checking caps mid-campaign
+    seen = []
+
+    def send_email(to, subject, body):
+        seen.append([dashboard.allowed(c, "email") for c in ("C0", "C1", "C2")])
+        return True
+
+    monkeypatch.setattr(campaign_engine.EmailService, "send_email", staticmethod(send_email))
+    monkeypatch.setattr(campaign_engine.SMSService, "send_sms", staticmethod(lambda phone, body: True))
+    CampaignEngine(max_concurrency=1, channel_rates={"email": None, "sms": None}, contact_history=history).run(df)
+    # Earlier sends are visible to other connections before the campaign finishes
+    assert seen == [[True, True, True], [False, True, True], [False, False, True]]
+    assert not history.allowed("C2", "email")
+
+def test_resumed_campaign_does_not_count_its_own_sends_as_suppressed(tmp_path, monkeypatch):
+    from utils.notification_outbox import NotificationOutbox
+    df = pd.DataFrame({
+        'customer_id': ["C0", "C1"],
+        'full_name': ["Test Customer"] * 2,
+        'email_id': ["c0@example.com", "c1@example.com"],
+        'mobile_number': ["+910000000000"] * 2,
+        'probability_of_default': [0.9, 0.8]
+    })
+    history = ContactHistory(str(tmp_path / "contacts.db"))
+    history.record("C1", "sms")  # Contacted by another campaign
+    outbox = NotificationOutbox(str(tmp_path / "outbox.db"))
+    monkeypatch.setattr(campaign_engine.EmailService, "send_email", staticmethod(lambda to, subject, body: True))
+    monkeypatch.setattr(campaign_engine.SMSService, "send_sms", staticmethod(lambda phone, body: True))
+
+    def run():
+        engine = CampaignEngine(channel_rates={"email": None, "sms": None}, campaign_id="CAMP-R", contact_history=history)
+        return engine.run(df, outbox=outbox)
+
+    first = run()
+    assert first['suppressed'] == {"email": 0, "sms": 1} and first['already_sent'] == {"email": 0, "sms": 0}
+    resumed = run()
+    assert resumed['suppressed'] == {"email": 0, "sms": 1}
+    assert resumed['already_sent'] == {"email": 2, "sms": 1}
+    assert resumed['channels']['email']['sent'] == 2 and resumed['channels']['email']['attempts'] == 0
@@ -0,0 +1,95 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+# Add src/models to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models')))
+
+from preprocessing import encode_categoricals, OrdinalCategories, QuantileBins
+from ensembles import BaseModelCache, PrefitVoting
+from lgbm_training import HistLGBMClassifier
+from model_registry import save_model, load_model
+from distill_scorer import distill, fidelity_report
+import scoring
+
+def make_data(n=3000, seed=0, missing=0.0):
+    rng = np.random.default_rng(seed)
+    levels = np.array([f"branch_{i}" for i in range(12)])
+    branch = rng.integers(0, len(levels), n)
+    X = pd.DataFrame({'income': rng.normal(size=n), 'balance': rng.normal(size=n),
+                      'tenure': rng.integers(0, 60, n).astype(float), 'branch': levels[branch]})
+    X.loc[rng.random(n) < missing, 'income'] = np.nan
+    logit = X['income'].fillna(0) - X['balance'] + np.linspace(-1, 1, len(levels))[branch] + rng.normal(scale=0.5, size=n)
+    y = np.digitize(logit, np.quantile(logit, [1 / 3, 2 / 3]))
+    return encode_categoricals(X, ['branch'], native_categoricals=True), y
+
+def make_teacher(X, y):
+    estimators = [
+        ('lr', Pipeline([('ordinal', OrdinalCategories()), ('clf', LogisticRegression(max_iter=1000))])),
+        ('rf', Pipeline([('ordinal', OrdinalCategories()), ('clf', RandomForestClassifier(n_estimators=20, random_state=0))])),
+        ('lgbm', HistLGBMClassifier(num_leaves=8))
+    ]
+    return PrefitVoting(BaseModelCache(estimators, cv=2).fit(X, y).fitted())
+
+def test_quantile_bins_one_hot_per_feature():
+    X, _ = make_data(n=500, missing=0.05)
+    bins = QuantileBins(n_bins=4, max_levels=5).fit(X)
+    assert len(bins.edges_['income']) == 3 and list(bins.levels_) == ['branch']
+    X_score = X.head(20).copy()
+    X_score['branch'] = X_score['branch'].cat.add_categories(['branch_new'])
+    X_score.loc[X_score.index[0], 'branch'] = 'branch_new'
+    X_score.loc[X_score.index[1], 'branch'] = np.nan
+    Xb = bins.transform(X_score)
+    assert Xb.shape == (20, bins.n_bins_out_)
+    np.testing.assert_array_equal(Xb.sum(axis=1).A1, 4)
+    index = bins.bin_index(X_score)[:, 3] - bins.offsets_[3]
+    # Unseen levels share the 'other' bin, missing values get their own
+    assert index[0] == 5 and index[1] == 6
+    income = bins.bin_index(X)[:, 0]
+    np.testing.assert_array_equal(income[X['income'].isna().to_numpy()], 4)
+    assert income.max() == 4 and (income < 4).sum() == X['income'].notna().sum()
+
+def test_student_tracks_teacher_and_scores_from_registry(tmp_path):
+    X, y = make_data()
+    X_train, X_test, y_train, y_test = X.iloc[:2000], X.iloc[2000:], y[:2000], y[2000:]
+    teacher = make_teacher(X_train, y_train)
+    student = distill(teacher, X_train)
+    report = fidelity_report(teacher, student, X_test, y_test, timing=False)
+    assert report['auc_gap'] < 0.02
+    assert report['spearman_min'] > 0.9 and report['agreement'] > 0.8
+
+    save_model(student, name='distilled', registry_dir=str(tmp_path))
+    loaded = load_model('distilled', registry_dir=str(tmp_path))
+    assert loaded.manifest['estimators'][0]['steps'][0]['type'] == 'bins'
+    X_score = X_test.copy()
+    X_score.loc[X_score.index[20:40], 'income'] = np.nan
+    X_score['branch'] = X_score['branch'].cat.add_categories(['branch_new'])
+    X_score.loc[X_score.index[:10], 'branch'] = 'branch_new'
+    X_score.loc[X_score.index[10:20], 'branch'] = np.nan
+    np.testing.assert_allclose(loaded.predict_proba(X_score), student.predict_proba(X_score), atol=1e-12)
+    np.testing.assert_allclose(loaded.predict_proba(X_score.head(1)), student.predict_proba(X_score.head(1)), atol=1e-12)
+
+def test_scoring_modes_per_call_site(tmp_path, monkeypatch):
+    X, y = make_data(n=600)
+    teacher = make_teacher(X, y)
+    registry_dir = str(tmp_path)
+    save_model(teacher, name='ensemble', registry_dir=registry_dir)
+    monkeypatch.setattr(scoring, '_models', {})
+    assert scoring.mode_for('dashboard_batch') == 'ensemble' and scoring.mode_for('unlisted') == 'ensemble'
+    monkeypatch.setenv('SCORING_MODE_DASHBOARD_BATCH', 'ensemble')
+    assert scoring.mode_for('dashboard_batch') == 'ensemble'
+    # The student has no scoring mode: no site scores live
+    for mode in ('distilled', 'fast'):
+        monkeypatch.setenv('SCORING_MODE_DASHBOARD_BATCH', mode)
+        with pytest.raises(ValueError):
+            scoring.mode_for('dashboard_batch')
+    monkeypatch.delenv('SCORING_MODE_DASHBOARD_BATCH')
+
+    np.testing.assert_allclose(scoring.score(X.head(5), site='dashboard_batch', registry_dir=registry_dir),
+                               teacher.predict_proba(X.head(5)), rtol=1e-6)
+    assert scoring.get_model('ensemble', registry_dir) is scoring.get_model('ensemble', registry_dir)
@@ -40,7 +40,7 @@ def test_email_generation():
         print(f"Target Email: {customer.get('email_id')}")
         print(f"Generated Token: {result['token']}")
         # The link is printed by the service, but we can verify logic here
-        expected_link = f"http://localhost:8050/customer/intervention?token={customer.get('customer_id')}"
+        expected_link = f"http://localhost:8051/customer/intervention?token={result['token']}"
         print(f"Expected Link: {expected_link}")
         
     except Exception as e:
@@ -0,0 +1,44 @@
+import sys
+import os
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier, StackingClassifier
+from sklearn.linear_model import LogisticRegression
+
+# Add src/models to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models')))
+
+from ensembles import BaseModelCache, PrefitVoting, PrefitStacking
+
+def make_estimators():
+    return [
+        ('lr', LogisticRegression(max_iter=1000, random_state=0)),
+        ('rf', RandomForestClassifier(n_estimators=20, random_state=0))
+    ]
+
+def test_prefit_ensembles_match_sklearn():
+    for n_classes in (2, 4):
+        X, y = make_classification(n_samples=600, n_features=8, n_informative=5, n_classes=n_classes, random_state=1)
+        cache = BaseModelCache(make_estimators(), cv=3).fit(X, y)
+
+        voting = PrefitVoting(cache.fitted())
+        reference = VotingClassifier(make_estimators(), voting='soft').fit(X, y)
+        np.testing.assert_allclose(voting.predict_proba(X), reference.predict_proba(X))
+        assert np.array_equal(voting.predict(X), reference.predict(X))
+
+        stacking = PrefitStacking(cache.fitted(), final_estimator=LogisticRegression()).fit(cache.oof, y)
+        reference = StackingClassifier(make_estimators(), final_estimator=LogisticRegression(), cv=3).fit(X, y)
+        np.testing.assert_allclose(stacking.predict_proba(X), reference.predict_proba(X), rtol=1e-6, atol=1e-8)
+        assert np.array_equal(stacking.predict(X), reference.predict(X))
+
+def test_each_base_model_fit_once():
+    X, y = make_classification(n_samples=200, n_features=5, random_state=2)
+    cache = BaseModelCache(make_estimators(), cv=3).fit(X, y)
+    voting = PrefitVoting(cache.fitted())
+    stacking = PrefitStacking(cache.fitted(), final_estimator=LogisticRegression()).fit(cache.oof, y)
+    # Both ensembles share the same fitted base model objects
+    for a, b, (name, model) in zip(voting.estimators_, stacking.estimators_, cache.fitted()):
+        assert a is b is model is cache.models[name]
+    assert cache.oof['lr'].shape == (len(y), 2)
+    timings = cache.timing_report()
+    assert timings['refit_s'] > timings['cached_s']
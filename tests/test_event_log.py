@@ -0,0 +1,53 @@
+import sys
+import os
+import json
+import multiprocessing
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.event_log import EventLogWriter, make_event, parse_legacy_line, log_files, SCHEMA
+
+def write_events(path, worker, count):
+    writer = EventLogWriter(path, fsync="never", flush_interval_s=0.01, max_bytes=20000, backup_count=50)
+    for i in range(count):
+        writer.log(f"W{worker}-C{i}", "N/A", "OPENED", latency_ms=1.5)
+    writer.close()
+
+def read_lines(path):
+    lines = []
+    for file_path in log_files(path, backup_count=50):
+        with open(file_path, encoding="utf-8") as f:
+            lines.extend(f.read().splitlines())
+    return lines
+
+def test_buffered_events_follow_schema(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    writer = EventLogWriter(path, fsync="interval", flush_interval_s=60)
+    writer.log("C1", "emi_restructure", "ACCEPTED_FROM_DETAILS", latency_ms=12.34567, reason="café")
+    assert not os.path.exists(path) or os.path.getsize(path) == 0  # Still buffered
+    writer.flush()
+    event = json.loads(read_lines(path)[0])
+    assert tuple(event) == SCHEMA
+    assert event['customer_id'] == "C1" and event['latency_ms'] == 12.346 and event['reason'] == "café"
+    writer.close()
+
+def test_concurrent_processes_never_interleave(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    ctx = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    procs = [ctx.Process(target=write_events, args=(path, w, 400)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    lines = read_lines(path)
+    assert len(log_files(path, backup_count=50)) > 1  # Rotated at least once
+    events = [json.loads(line) for line in lines]
+    assert len(events) == 1600
+    assert len({e['customer_id'] for e in events}) == 1600
+
+def test_legacy_lines_are_parsed():
+    event = parse_legacy_line("2026-02-19 15:58:15 - INTERVENTION_LOG: Customer=TEST-CUST-888, Plan=PLAN-B, Status=ACCEPTED_FROM_DETAILS\n")
+    assert event == make_event("TEST-CUST-888", "PLAN-B", "ACCEPTED_FROM_DETAILS", ts="2026-02-19T15:58:15.000")
+    assert parse_legacy_line("random text") is None
@@ -0,0 +1,44 @@
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.event_log import EventLogWriter, make_event
+from utils.event_store import EventStore
+
+def write(writer, rows):
+    for customer_id, plan_id, status, ts in rows:
+        writer.write(make_event(customer_id, plan_id, status, ts=ts))
+    writer.flush()
+
+def test_ingest_is_incremental_and_queryable(tmp_path):
+    log_path = str(tmp_path / "events.jsonl")
+    writer = EventLogWriter(log_path, fsync="never", flush_interval_s=60)
+    store = EventStore(str(tmp_path / "events.db"), log_path=log_path, include_legacy=False)
+
+    write(writer, [
+        ("C1", "N/A", "SENT_EMAIL", "2026-03-01T09:00:00.000"),
+        ("C1", "N/A", "OPENED", "2026-03-01T10:00:00.000"),
+        ("C2", "N/A", "OPENED", "2026-03-02T10:00:00.000"),
+        ("C1", "emi_restructure", "ACCEPTED_FROM_DETAILS", "2026-03-02T11:00:00.000"),
+    ])
+    assert store.ingest() == 4
+    assert store.ingest() == 0
+
+    write(writer, [("C2", "payment_holiday", "ACCEPTED_FROM_DETAILS", "2026-03-09T11:00:00.000")])
+    # A second store on the same database resumes from the shared checkpoint
+    assert EventStore(store.path, log_path=log_path, include_legacy=False).ingest() == 1
+    assert store.count() == 5
+
+    history = store.customer_history("C1")
+    assert list(history['status']) == ["SENT_EMAIL", "OPENED", "ACCEPTED_FROM_DETAILS"]
+    assert store.stage_counts() == {"sent": 1, "opened": 2, "accepted": 2}
+
+    last_week = store.acceptance_by_plan(since="2026-03-02", until="2026-03-09")
+    assert last_week.to_dict('records') == [{"plan_id": "emi_restructure", "accepted": 1, "acceptance_rate": 1.0}]
+
+    funnel = store.funnel().set_index('day')
+    assert funnel.loc["2026-03-01"].to_dict() == {"sent": 1, "opened": 1, "accepted": 0}
+    assert list(store.recent(limit=1)['customer_id']) == ["C2"]
+    writer.close()
@@ -0,0 +1,72 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add src/models to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models')))
+
+import data_loader
+from preprocessing import create_dataset, load_dataset, source_columns
+from feature_selection import correlation_clusters, select_features
+
+def make_data(n=3000, seed=0):
+    # Two informative signals, each with near-duplicates; two noise columns; a categorical
+    rng = np.random.default_rng(seed)
+    income, spend = rng.normal(size=n), rng.normal(size=n)
+    X = pd.DataFrame({
+        'income': income, 'income_x2': 2 * income + rng.normal(scale=0.05, size=n),
+        'income_rank': np.argsort(np.argsort(income)).astype(float),
+        'spend': spend, 'spend_mean': spend + rng.normal(scale=0.1, size=n),
+        'noise_a': rng.normal(size=n), 'noise_b': rng.normal(size=n),
+        'segment': pd.Categorical(rng.choice(['a', 'b', 'c'], n))
+    })
+    y = ((income - spend + rng.normal(scale=0.5, size=n)) > 0).astype(int)
+    return X, y
+
+def test_correlation_clusters_group_near_duplicates():
+    X, _ = make_data(n=500)
+    clusters = correlation_clusters(X)
+    assert ['income', 'income_x2', 'income_rank'] in clusters and ['spend', 'spend_mean'] in clusters
+    assert ['noise_a'] in clusters and ['segment'] in clusters and len(clusters) == 5
+
+def test_select_features_keeps_one_per_informative_cluster():
+    X, y = make_data()
+    report = select_features(X, y)
+    assert len(report['features']) == 2
+    assert report['features'][0] in ('income', 'income_x2', 'income_rank')
+    assert report['features'][1] in ('spend', 'spend_mean')
+    assert {'noise_a', 'noise_b', 'segment'} <= set(report['unimportant'])
+    assert len(report['correlated']) == 3 and report['n_input'] == X.shape[1]
+
+def write_sources(data_dir, n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(n)
+    pd.DataFrame({'customer_id': ids, 'full_name': 'x', 'age': rng.integers(20, 70, n),
+                  'gender': rng.choice(['F', 'M', None], n), 'monthly_salary_inr': rng.normal(5e4, 1e4, n)}
+                 ).to_csv(os.path.join(data_dir, 'CUSTOMER_MASTER.csv'), index=False)
+    pd.DataFrame({'customer_id': ids, 'risk_band': rng.choice(['Low', 'Medium', 'High'], n),
+                  'emi_amount': rng.normal(1e4, 2e3, n), 'complaint_count': rng.integers(0, 5, n)}
+                 ).to_csv(os.path.join(data_dir, 'FEATURE_STORE.csv'), index=False)
+    txn_ids = rng.choice(ids[:-20], 1000)   # The last customers have no transactions
+    pd.DataFrame({'customer_id': txn_ids, 'amount_inr': rng.normal(1e3, 300, 1000),
+                  'balance_after_transaction': rng.normal(2e4, 5e3, 1000)}
+                 ).to_csv(os.path.join(data_dir, 'TRANSACTIONS.csv'), index=False)
+
+@pytest.mark.parametrize('features', [['gender', 'emi_amount', 'txn_amount_inr_sum'], ['age', 'complaint_count']])
+def test_create_dataset_reads_only_selected_columns(tmp_path, monkeypatch, features):
+    write_sources(str(tmp_path))
+    monkeypatch.setattr(data_loader, 'DATA_DIR', str(tmp_path))
+    full = create_dataset(native_categoricals=True)
+    pruned = create_dataset(native_categoricals=True, features=features)
+    pd.testing.assert_frame_equal(pruned, full[features + ['target']])
+
+    usecols = source_columns(features)
+    assert usecols['CUSTOMER_MASTER.csv']('customer_id') and not usecols['CUSTOMER_MASTER.csv']('monthly_salary_inr')
+    assert usecols['TRANSACTIONS.csv'] == (['customer_id', 'amount_inr'] if 'txn_amount_inr_sum' in features else [])
+
+    # Cached per column selection
+    cached = load_dataset(native_categoricals=True, cache_dir=str(tmp_path / 'cache'), data_dir=str(tmp_path), features=features)
+    assert list(cached.columns) == features + ['target']
+    assert len(os.listdir(tmp_path / 'cache')) == 1
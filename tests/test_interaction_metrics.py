@@ -0,0 +1,29 @@
+import sys
+import os
+import json
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.event_log import EventLogWriter
+from utils.interaction_metrics import EventLogTailer
+
+def test_tailer_reads_only_new_complete_lines_across_rotation(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    writer = EventLogWriter(path, fsync="never", flush_interval_s=60, max_bytes=400, backup_count=20)
+    tailer = EventLogTailer(path, backup_count=20, include_legacy=False)
+
+    for i in range(3):
+        writer.log(f"C{i}", "N/A", "OPENED")
+    writer.flush()
+    assert [e['customer_id'] for e in tailer.read_new()] == ["C0", "C1", "C2"]
+    assert tailer.read_new() == []
+
+    # Rotates several times between reads
+    for i in range(3, 20):
+        writer.log(f"C{i}", "N/A", "OPENED")
+        writer.flush()
+    with open(path, "a") as f:
+        f.write('{"ts": "2026-01-01T00:00:00.000", "customer_id": "PARTIAL"')  # Writer mid-line
+    assert [e['customer_id'] for e in tailer.read_new()] == [f"C{i}" for i in range(3, 20)]
+    writer.close()
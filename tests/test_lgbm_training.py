@@ -0,0 +1,81 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder
+
+# Add src/models to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models')))
+
+from preprocessing import encode_categoricals, fill_merged, OrdinalCategories
+from lgbm_training import HistLGBMClassifier, categorical_splits
+from ensembles import BaseModelCache, PrefitVoting, PrefitStacking
+
+def make_data(n=2000, n_classes=2, seed=0):
+    # Target driven by a 25-level categorical plus one numeric feature
+    rng = np.random.default_rng(seed)
+    levels = np.array([f"branch_{i:02d}" for i in range(25)])
+    effect = rng.normal(scale=2.0, size=len(levels))
+    branch = rng.integers(0, len(levels), n)
+    income = rng.normal(size=n)
+    logit = effect[branch] + income + rng.normal(scale=0.5, size=n)
+    y = np.digitize(logit, np.quantile(logit, np.linspace(0, 1, n_classes + 1)[1:-1]))
+    X = pd.DataFrame({'branch': levels[branch], 'income': income, 'segment': rng.choice(['A', 'B', 'C'], n)})
+    return encode_categoricals(X, ['branch', 'segment'], native_categoricals=True), y
+
+def test_native_categories_match_label_encoding():
+    raw = pd.DataFrame({'customer_id': ['c1', 'c2', 'c3', 'c4'], 'city': ['Pune', 'Agra', 'Unknown', 'Agra']})
+    native = encode_categoricals(raw.copy(), ['customer_id', 'city'], native_categoricals=True)
+    encoded = encode_categoricals(raw.copy(), ['customer_id', 'city'])
+    assert isinstance(native['city'].dtype, pd.CategoricalDtype)
+    assert native['customer_id'].tolist() == raw['customer_id'].tolist()
+    expected = LabelEncoder().fit_transform(raw['city'])
+    assert np.array_equal(native['city'].cat.codes, expected)
+    assert np.array_equal(encoded['city'], expected)
+
+def test_fill_merged_keeps_categoricals():
+    df = pd.DataFrame({'city': pd.Categorical(['Agra', None]), 'txn_count': [3.0, np.nan]})
+    out = fill_merged(df)
+    assert out['city'].tolist() == ['Agra', 'Unknown']
+    assert out['txn_count'].tolist() == [3.0, 0.0]
+
+def test_ordinal_step_uses_fit_categories():
+    X, _ = make_data(n=200)
+    step = OrdinalCategories().fit(X)
+    subset = X[X['branch'] != 'branch_00'].copy()
+    subset['branch'] = subset['branch'].cat.remove_unused_categories()
+    codes = step.transform(subset)
+    assert np.array_equal(codes['branch'], X.loc[subset.index, 'branch'].cat.codes)
+    assert np.array_equal(codes['income'], subset['income'])
+    unseen = X.head(3).copy()
+    unseen['branch'] = pd.Categorical(['branch_99'] * 3)
+    assert (step.transform(unseen)['branch'] == -1).all()
+    assert list(step.feature_names_in_) == list(X.columns)
+
+def test_lgbm_splits_on_categories_and_early_stops():
+    for n_classes in (2, 3):
+        X, y = make_data(n_classes=n_classes, seed=n_classes)
+        model = clone(HistLGBMClassifier(valid_fraction=0.2))
+        assert model.get_params()['valid_fraction'] == 0.2
+        model.fit(X, y)
+        assert model.best_iteration_ < model.n_estimators
+        assert categorical_splits(model) > 0
+        assert model.predict_proba(X).shape == (len(y), n_classes)
+
+def test_lgbm_joins_prefit_ensembles():
+    X, y = make_data(n_classes=3)
+    estimators = [
+        ('lr', Pipeline([('ordinal', OrdinalCategories()), ('clf', LogisticRegression(max_iter=1000))])),
+        ('rf', Pipeline([('ordinal', OrdinalCategories()), ('clf', RandomForestClassifier(n_estimators=20, random_state=0))])),
+        ('lgbm', HistLGBMClassifier())
+    ]
+    cache = BaseModelCache(estimators, cv=3).fit(X, y)
+    voting = PrefitVoting(cache.fitted())
+    stacking = PrefitStacking(cache.fitted(), final_estimator=LogisticRegression()).fit(cache.oof, y)
+    assert list(voting.feature_names_in_) == list(X.columns)
+    assert voting.predict_proba(X).shape == stacking.predict_proba(X).shape == (len(y), 3)
+    assert (voting.predict(X) == y).mean() > 0.7
@@ -0,0 +1,98 @@
+import sys
+import os
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+# Add src/models to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models')))
+
+from preprocessing import encode_categoricals, OrdinalCategories
+from ensembles import BaseModelCache, PrefitVoting, PrefitStacking
+from xgb_training import HistXGBClassifier
+from lgbm_training import HistLGBMClassifier
+from model_registry import save_model, load_model, manifest_extras
+
+def make_data(n=1200, n_classes=3, seed=0):
+    rng = np.random.default_rng(seed)
+    levels = np.array([f"region_{i}" for i in range(10)])
+    region = rng.integers(0, len(levels), n)
+    X = pd.DataFrame({'income': rng.normal(size=n), 'tenure': rng.integers(0, 120, n).astype(float),
+                      'region': levels[region], 'product': rng.choice(['card', 'loan', 'mortgage'], n)})
+    logit = X['income'] + 0.01 * X['tenure'] + np.linspace(-1, 1, len(levels))[region] + rng.normal(scale=0.5, size=n)
+    y = np.digitize(logit, np.quantile(logit, np.linspace(0, 1, n_classes + 1)[1:-1]))
+    return encode_categoricals(X, ['region', 'product'], native_categoricals=True), y
+
+def make_estimators():
+    return [
+        ('lr', Pipeline([('ordinal', OrdinalCategories()), ('scaler', StandardScaler()), ('clf', LogisticRegression(max_iter=1000))])),
+        ('rf', Pipeline([('ordinal', OrdinalCategories()), ('clf', RandomForestClassifier(n_estimators=10, random_state=0))])),
+        ('xgb', Pipeline([('ordinal', OrdinalCategories()), ('clf', HistXGBClassifier(max_depth=3))])),
+        ('lgbm', HistLGBMClassifier(num_leaves=8))
+    ]
+
+@pytest.mark.parametrize('n_classes', [2, 3])
+def test_registry_matches_pickled_ensembles(tmp_path, n_classes):
+    X, y = make_data(n_classes=n_classes, seed=n_classes)
+    cache = BaseModelCache(make_estimators(), cv=2).fit(X, y)
+    voting = PrefitVoting(cache.fitted())
+    stacking = PrefitStacking(cache.fitted(), final_estimator=LogisticRegression()).fit(cache.oof, y)
+    # Scoring frames may carry a different category set and column order
+    X_score = X.iloc[::-1, ::-1].head(300).copy()
+    X_score['region'] = X_score['region'].cat.remove_unused_categories()
+
+    for name, model in (('voting', voting), ('stacking', stacking)):
+        save_model(model, name=name, registry_dir=str(tmp_path))
+        loaded = load_model(name, registry_dir=str(tmp_path))
+        assert list(loaded.feature_names_in_) == list(X.columns)
+        assert list(loaded.classes_) == list(model.classes_)
+        for est_name, est in model.named_estimators_.items():
+            np.testing.assert_allclose(loaded.named_estimators_[est_name].predict_proba(X_score),
+                                       est.predict_proba(X_score[X.columns]), rtol=1e-5, atol=1e-6)
+        expected = model.predict_proba(X_score[X.columns])
+        np.testing.assert_allclose(loaded.predict_proba(X_score), expected, rtol=1e-5, atol=1e-6)
+        assert np.array_equal(loaded.predict(X_score), model.predict(X_score[X.columns]))
+
+def test_loading_is_lazy_and_memory_mapped(tmp_path):
+    X, y = make_data()
+    model = PrefitVoting(BaseModelCache(make_estimators(), cv=2).fit(X, y).fitted())
+    path = save_model(model, registry_dir=str(tmp_path), extra={'training_rows': len(y)})
+    with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    assert manifest['training_rows'] == len(y)
+    assert manifest_extras(registry_dir=str(tmp_path)) == {'training_rows': len(y)}
+    assert manifest_extras('missing', registry_dir=str(tmp_path)) == {}
+    assert [spec['model']['type'] for spec in manifest['estimators']] == ['linear', 'forest', 'xgboost', 'lightgbm']
+    assert not any(name.endswith('.pkl') for name in os.listdir(path))
+
+    loaded = load_model(registry_dir=str(tmp_path))
+    rf = loaded.named_estimators_['rf']
+    assert rf._scorer is None
+    rf.predict_proba(X.head(5))
+    assert isinstance(rf._scorer.threshold, np.memmap)
+    assert loaded.named_estimators_['xgb']._scorer is None
+
+    # Re-saving writes the next version and moves the pointer; the model opened before
+    # still loads its arrays, until its version leaves the retention window
+    second = save_model(model, registry_dir=str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ['ensemble']
+    assert sorted(os.listdir(tmp_path / 'ensemble')) == ['CURRENT', 'v0001', 'v0002']
+    assert load_model(registry_dir=str(tmp_path)).path == second
+    np.testing.assert_allclose(loaded.named_estimators_['xgb'].predict_proba(X.head(5)),
+                               model.named_estimators_['xgb'].predict_proba(X.head(5)), rtol=1e-5, atol=1e-6)
+    save_model(model, registry_dir=str(tmp_path))
+    assert sorted(os.listdir(tmp_path / 'ensemble')) == ['CURRENT', 'v0002', 'v0003']
+
+def test_unsupported_components_are_rejected(tmp_path):
+    from sklearn.neighbors import KNeighborsClassifier
+    X, y = make_data(n=200)
+    knn = Pipeline([('ordinal', OrdinalCategories()), ('clf', KNeighborsClassifier())]).fit(X, y)
+    with pytest.raises(TypeError):
+        save_model(knn, name='knn', registry_dir=str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        load_model('missing', registry_dir=str(tmp_path))
@@ -0,0 +1,60 @@
+import sys
+import os
+import time
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.notification_outbox import NotificationOutbox
+
+def make_message(customer_id, channel="email", campaign_id="CAMP-TEST"):
+    return {"campaign_id": campaign_id, "customer_id": customer_id, "channel": channel,
+            "recipient": f"{customer_id}@example.com", "subject": "Hi", "body": "<p>Hi</p>"}
+
+def test_enqueue_is_idempotent(tmp_path):
+    outbox = NotificationOutbox(str(tmp_path / "outbox.db"))
+    assert outbox.enqueue_many([make_message("C1"), make_message("C1", "sms")]) == 2
+    # Re-enqueueing the same campaign (e.g. after a crash) must not duplicate sends
+    assert outbox.enqueue_many([make_message("C1"), make_message("C2")]) == 1
+    assert outbox.stats("CAMP-TEST") == {"email": {"pending": 2}, "sms": {"pending": 1}}
+
+def test_retry_backoff_then_dead_letter(tmp_path):
+    outbox = NotificationOutbox(str(tmp_path / "outbox.db"), max_attempts=2, base_backoff_s=0.05)
+    outbox.enqueue_many([make_message("C1")])
+
+    first = outbox.claim()
+    assert len(first) == 1 and first[0]['attempts'] == 1
+    assert outbox.mark_failed(first[0], "SMTP down") == "pending"
+    assert outbox.claim() == []  # Backing off
+
+    time.sleep(0.1)
+    second = outbox.claim()
+    assert second[0]['attempts'] == 2
+    assert outbox.mark_failed(second[0], "SMTP down") == "dead"
+    assert outbox.next_due_in() is None
+    assert outbox.dead_letters()[0]['last_error'] == "SMTP down"
+
+def test_expired_lease_is_redelivered(tmp_path):
+    outbox = NotificationOutbox(str(tmp_path / "outbox.db"), lease_s=0.05)
+    outbox.enqueue_many([make_message("C1")])
+    assert len(outbox.claim()) == 1  # Worker "crashes" without acknowledging
+    assert outbox.claim() == []
+
+    time.sleep(0.1)
+    redelivered = outbox.claim()
+    assert len(redelivered) == 1
+    outbox.mark_sent(redelivered[0])
+    assert outbox.stats() == {"email": {"sent": 1}}
+
+def test_ack_after_lost_lease_is_superseded(tmp_path):
+    outbox = NotificationOutbox(str(tmp_path / "outbox.db"), lease_s=0.05)
+    outbox.enqueue_many([make_message("C1")])
+    stale = outbox.claim()[0]
+    time.sleep(0.1)
+    current = outbox.claim()[0]
+    # The first worker's late acknowledgement must not overwrite the re-leased message
+    assert outbox.mark_failed(stale, "timeout") == "superseded"
+    assert outbox.mark_sent(stale) == "superseded"
+    assert outbox.stats() == {"email": {"sending": 1}}
+    assert outbox.mark_sent(current) == "sent"
+    assert outbox.stats() == {"email": {"sent": 1}}
@@ -0,0 +1,32 @@
+import sys
+import os
+import email
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.notification_templates import get_templates, get_mime_skeleton
+
+def test_batch_render_matches_single_render():
+    templates = get_templates("v1")
+    categories = ["High", "Low", "Moderate", "High"]
+    names = ["Asha", "Ravi & Sons", "Meera", "Kiran"]
+    links = [f"http://portal/customer/intervention?token=T{i}" for i in range(4)]
+
+    for channel in ("email", "sms", "message"):
+        batch = templates.render_batch(channel, categories, names, links)
+        single = [templates.render(channel, c, n, l) for c, n, l in zip(categories, names, links)]
+        assert batch == single
+
+    body = templates.render("email", "Low", "Ravi & Sons", links[1])
+    assert "Ravi &amp; Sons" in body and links[1] in body and "[Link]" not in body
+
+def test_mime_skeleton_round_trip():
+    body = "<p>Namaste ₹ relief</p>"
+    raw = get_mime_skeleton("credix.alerts@gmail.com", "Support options").serialize("a@example.com", body)
+    msg = email.message_from_string(raw)
+    assert msg['To'] == "a@example.com"
+    assert msg['Subject'] == "Support options"
+    part = msg.get_payload()[0]
+    assert part.get_content_type() == "text/html"
+    assert part.get_payload(decode=True).decode("utf-8") == body
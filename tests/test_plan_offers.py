@@ -0,0 +1,76 @@
+import sys
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.amortization import BASE_ANNUAL_RATE, annuity_emi, principal_from_emi
+from utils.intervention_logic import RiskEngine, PlanEngine, OFFER_COLUMNS, DEFAULT_EMI, DEFAULT_TENURE, DEFAULT_INCOME
+
+def make_portfolio(n=500, seed=7):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'customer_id': [f"CUST{i:05d}" for i in range(n)],
+        'probability_of_default': rng.uniform(0, 1, n),
+        'emi_amount': rng.integers(2000, 60000, n).astype(float),
+        'tenure_months': rng.integers(6, 84, n).astype(float),
+        'monthly_salary_inr': rng.uniform(15000, 250000, n),
+        'existing_liabilities_inr': rng.uniform(0, 2_000_000, n)
+    })
+    # Missing / unusable values fall back exactly like the scalar path
+    df.loc[::7, 'emi_amount'] = np.nan
+    df.loc[::11, 'emi_amount'] = 0
+    df.loc[::14, 'existing_liabilities_inr'] = np.nan
+    df.loc[::13, 'tenure_months'] = np.nan
+    df.loc[::17, 'monthly_salary_inr'] = np.nan
+    df.loc[::19, 'probability_of_default'] = np.nan
+    df.loc[[0, 1], 'probability_of_default'] = [0.3, 0.7]  # Category edges
+    return df
+
+def test_batch_offers_match_scalar_plans():
+    df = make_portfolio()
+    offers = PlanEngine.get_plans_batch(df)
+    assert tuple(offers.columns) == OFFER_COLUMNS
+
+    grouped = {cid: rows for cid, rows in offers.groupby('customer_id', sort=False)}
+    assert list(grouped) == list(df['customer_id'])  # Customer order preserved
+    for customer in df.to_dict('records'):
+        rows = grouped[customer['customer_id']]
+        category = RiskEngine.get_risk_category(customer)
+        assert set(rows['risk_category']) == {category}
+        expected = PlanEngine.get_plans(category, **PlanEngine.plan_inputs(customer))
+        assert PlanEngine.plans_from_offers(rows.to_dict('records')) == expected
+        # JSON-ready: plain ints, no NumPy scalars
+        json.dumps(expected)
+
+def test_batch_uses_real_inputs_and_defaults():
+    df = pd.DataFrame({
+        'customer_id': ["A", "B", "C"],
+        'probability_of_default': [0.9, 0.5, 0.1],
+        'emi_amount': [20000, np.nan, 5000],
+        'tenure_months': [36, np.nan, 12],
+        'monthly_salary_inr': [100000, np.nan, 80000],
+        'existing_liabilities_inr': [0, 400000, 0]
+    })
+    offers = PlanEngine.get_plans_batch(df).set_index(['customer_id', 'plan_id'])
+    assert list(offers.loc["A"].index) == ["emi_restructure", "payment_holiday", "hardship_assistance"]
+    assert list(offers.loc["C"].index) == ["reward_rate_cut", "reward_limit_increase", "reward_priority_support"]
+
+    a = offers.loc[("A", "emi_restructure")]
+    assert (a['current_emi'], a['current_tenure'], a['income'], a['expenses']) == (20000, 36, 100000, 40000)
+    principal = principal_from_emi(20000, BASE_ANNUAL_RATE, 36)
+    assert a['new_tenure'] == 48 and a['new_emi'] == int(annuity_emi(principal, BASE_ANNUAL_RATE + 0.005, 48))
+
+    b = offers.loc[("B", "payment_holiday")]
+    assert b['current_emi'] == int(400000 * 0.05) and b['current_tenure'] == DEFAULT_TENURE
+    assert b['income'] == DEFAULT_INCOME and b['new_tenure'] == DEFAULT_TENURE + 1
+    assert offers.loc[("C", "reward_rate_cut")][['new_emi', 'income']].isna().all()
+
+def test_batch_handles_missing_columns_and_empty_frames():
+    offers = PlanEngine.get_plans_batch(pd.DataFrame({'customer_id': ["X"], 'probability_of_default': [0.95]}))
+    assert (offers['current_emi'] == DEFAULT_EMI).all() and len(offers) == 3
+    assert PlanEngine.get_plans_batch(pd.DataFrame(columns=['customer_id'])).empty
+    assert PlanEngine.get_plans_batch(make_portfolio(20), risk_categories=["Low"] * 20)['plan_id'].str.startswith("reward").all()
@@ -0,0 +1,60 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils import portal_store
+from utils.portal_store import PortalStore
+from utils.intervention_logic import RiskEngine, PlanEngine, CommunicationEngine
+from utils.secure_tokens import TokenSigner
+from utils import secure_tokens
+
+def make_customers():
+    return pd.DataFrame({
+        'customer_id': ["C1", "C2", "C3"],
+        'full_name': ["Asha Rao", "Ravi Kumar", None],
+        'probability_of_default': [0.1, 0.55, 0.9],
+        'emi_amount': [12000, 18000, np.nan],
+        'salary_credit_delay_days': [0, 7, 10],
+        'failed_auto_debits_last_3m': [0, 1, 2],
+        'occupation': ["Engineer", "Trader", "Clerk"]  # Not needed by the portal
+    })
+
+def test_build_and_lookup_match_engines(tmp_path):
+    path = str(tmp_path / "portal.db")
+    df = make_customers()
+    assert PortalStore.build(df, path, snapshot_version="v-test") == 3
+
+    store = PortalStore(path)
+    assert store.snapshot_version == "v-test" and len(store) == 3
+    for customer in df.to_dict('records'):
+        record = store.get(customer['customer_id'])
+        category = RiskEngine.get_risk_category(customer)
+        assert record['risk_category'] == category
+        assert record['reasons'] == RiskEngine.get_risk_reasons(customer)
+        assert record['stability_points'] == RiskEngine.get_stability_points(customer)
+        assert record['plans'] == PlanEngine.get_plans(category, **PlanEngine.plan_inputs(customer))
+        assert [o['plan_id'] for o in store.offers(customer['customer_id'])] == [p['id'] for p in record['plans']]
+        assert 'occupation' not in record
+    assert 'full_name' not in store.get("C3") and 'emi_amount' not in store.get("C3")  # Missing -> portal defaults
+    assert store.get("nope") is None
+    assert store.first(min_pd=0.6)['customer_id'] == "C3"
+
+    # Rebuild is picked up by an open reader
+    PortalStore.build(df.iloc[:1], path, snapshot_version="v-2")
+    os.utime(path, ns=(0, 10**18))
+    assert store.get("C2") is None and store.snapshot_version == "v-2"
+
+def test_token_resolution_uses_portal_store(tmp_path, monkeypatch):
+    path = str(tmp_path / "portal.db")
+    PortalStore.build(make_customers(), path, snapshot_version="v-test")
+    monkeypatch.setitem(portal_store._STORES, portal_store.PORTAL_DB, PortalStore(path))
+    signer = TokenSigner(secret=b"test-secret")
+    monkeypatch.setattr(secure_tokens, "_SIGNER", signer)
+
+    customer = CommunicationEngine.get_customer_by_token(signer.issue("C2", snapshot_version="v-test"))
+    assert customer['full_name'] == "Ravi Kumar" and customer['risk_category'] == "Moderate"
+    assert CommunicationEngine.get_customer_by_token("C2") is None
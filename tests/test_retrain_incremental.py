@@ -0,0 +1,93 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+# Add src/models and src/models/train to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models', 'train')))
+
+from preprocessing import encode_categoricals, OrdinalCategories
+from ensembles import BaseModelCache, PrefitVoting, PrefitStacking
+from xgb_training import HistXGBClassifier
+from lgbm_training import HistLGBMClassifier
+import retrain_incremental
+from retrain_incremental import update_learner, retrain
+
+def make_month(n, seed, shift=0.0):
+    rng = np.random.default_rng(seed)
+    levels = np.array([f"branch_{i}" for i in range(12)])
+    branch = rng.integers(0, len(levels), n)
+    X = pd.DataFrame({'income': rng.normal(size=n), 'utilization': rng.normal(size=n), 'branch': levels[branch]})
+    logit = X['income'] - X['utilization'] + np.linspace(-1, 1, len(levels))[branch] + shift + rng.normal(scale=0.5, size=n)
+    y = np.digitize(logit, [-0.5, 0.5])
+    return encode_categoricals(X, ['branch'], native_categoricals=True), y
+
+def make_estimators():
+    return [
+        ('lr', Pipeline([('ordinal', OrdinalCategories()), ('scaler', StandardScaler()), ('clf', LogisticRegression(max_iter=500))])),
+        ('rf', Pipeline([('ordinal', OrdinalCategories()), ('clf', RandomForestClassifier(n_estimators=15, random_state=0))])),
+        ('xgb', Pipeline([('ordinal', OrdinalCategories()), ('clf', HistXGBClassifier(max_depth=3))])),
+        ('lgbm', HistLGBMClassifier(num_leaves=8))
+    ]
+
+def test_learners_continue_from_current_state():
+    X, y = make_month(1500, 0)
+    X_new, y_new = make_month(400, 1)
+    cache = BaseModelCache(make_estimators(), cv=2).fit(X, y)
+    models = cache.models
+
+    xgb = update_learner(models['xgb'], X_new, y_new)
+    old_rounds = models['xgb'][-1].get_booster().num_boosted_rounds()
+    assert xgb[-1].get_booster().num_boosted_rounds() > old_rounds
+    assert models['xgb'][-1].get_booster().num_boosted_rounds() == old_rounds
+
+    lgbm = update_learner(models['lgbm'], X_new, y_new)
+    assert lgbm.booster_.num_trees() > models['lgbm'].booster_.num_trees()
+    assert lgbm.booster_.pandas_categorical == models['lgbm'].booster_.pandas_categorical
+
+    rf = update_learner(models['rf'], X_new, y_new)
+    assert len(rf[-1].estimators_) == 15 + retrain_incremental.RF_NEW_TREES
+    for kept, old in zip(rf[-1].estimators_[:15], models['rf'][-1].estimators_):
+        np.testing.assert_array_equal(kept.tree_.threshold, old.tree_.threshold)
+    assert rf['ordinal'].categories_['branch'].equals(models['rf']['ordinal'].categories_['branch'])
+
+    lr = update_learner(models['lr'], X_new, y_new)
+    assert lr['scaler'].n_samples_seen_ == len(y) + len(y_new)
+    assert not np.allclose(lr[-1].coef_, models['lr'][-1].coef_)
+
+    for model in (xgb, lgbm, rf, lr):
+        assert model.predict_proba(X_new).shape == (len(y_new), 3)
+
+def test_retrain_keeps_update_or_falls_back():
+    X, y = make_month(1500, 0)
+    X_new, y_new = make_month(500, 2, shift=0.3)
+    cache = BaseModelCache(make_estimators(), cv=2).fit(X, y)
+    stacking = PrefitStacking(cache.fitted(), final_estimator=LogisticRegression()).fit(cache.oof, y)
+
+    model, report = retrain(stacking, X_new, y_new, auc_tolerance=1.0)
+    assert report['mode'] == 'incremental'
+    assert isinstance(model, PrefitStacking)
+    assert set(report['learner_seconds']) == {'lr', 'rf', 'xgb', 'lgbm'}
+    assert model.final_estimator_ is stacking.final_estimator_
+    assert model.predict_proba(X_new).shape == (len(y_new), 3)
+
+    # Any AUC drop beyond a negative tolerance counts as degradation -> full retrain on history + new
+    calls = []
+    def retrain_full(X_all, y_all):
+        calls.append(len(y_all))
+        return PrefitVoting(BaseModelCache(make_estimators(), cv=2).fit(X_all, y_all).fitted())
+    model, report = retrain(PrefitVoting(cache.fitted()), X_new, y_new, history=lambda: (X, y),
+                            retrain_full=retrain_full, auc_tolerance=-1.0)
+    assert report['mode'] == 'full'
+    assert calls == [len(y) + len(y_new)]
+    assert isinstance(model, PrefitVoting)
+
+    # A month missing a class cannot warm-start the learners
+    keep = y_new != 2
+    _, report = retrain(PrefitVoting(cache.fitted()), X_new[keep], y_new[keep], retrain_full=retrain_full)
+    assert report['mode'] == 'full' and 'lacks classes' in report['reason']
@@ -0,0 +1,67 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.intervention_logic import RiskEngine
+from utils.risk_crossing import RiskCrossingDetector, risk_codes, risk_levels
+
+def scores(pairs):
+    return pd.DataFrame({'customer_id': [c for c, _ in pairs], 'probability_of_default': [p for _, p in pairs]})
+
+def test_risk_codes_match_risk_engine():
+    values = [0.0, 0.3, 0.30001, 0.5, 0.7, 0.70001, 1.0, np.nan]
+    expected = [RiskEngine.get_risk_category({'probability_of_default': v}) for v in values]
+    assert [risk_levels()[c] for c in risk_codes(values)] == expected
+
+def test_only_crossings_are_emitted(tmp_path):
+    path = str(tmp_path / "snapshot.npz")
+    detector = RiskCrossingDetector(path, pd_delta=0.1)
+    first = scores([("A", 0.2), ("B", 0.5), ("C", 0.8)])
+    # Empty snapshot: everyone above Low is new
+    assert list(detector.diff(first)['customer_id']) == ["B", "C"]
+    detector.commit(first)
+
+    reloaded = RiskCrossingDetector(path, pd_delta=0.1)
+    batch = scores([("A", 0.25), ("B", 0.75), ("C", 0.95), ("D", 0.1), ("E", 0.4)])
+    crossings = reloaded.diff(batch).set_index('customer_id')
+    assert list(crossings.index) == ["B", "C", "E"]
+    assert crossings.loc["B", 'crossing'] == "category_up"
+    assert crossings.loc["B", 'previous_risk_category'] == "Moderate"
+    assert crossings.loc["C", 'crossing'] == "pd_jump"
+    assert pd.isna(crossings.loc["E", 'previous_risk_category'])
+
+    reloaded.commit(batch)
+    assert len(reloaded) == 5
+    assert reloaded.diff(batch).empty
+
+def test_incremental_campaign_commits_only_alerted_crossings(tmp_path, monkeypatch):
+    from utils import campaign_engine, event_log, risk_crossing
+    from utils.notification_service import RiskMonitor
+    monkeypatch.setattr(campaign_engine.EmailService, "send_email", staticmethod(lambda to, subject, body: not to.startswith("d@")))
+    monkeypatch.setattr(campaign_engine.SMSService, "send_sms", staticmethod(lambda phone, body: not phone.startswith("D")))
+    monkeypatch.setattr(event_log, "get_event_log", lambda: None)
+    path = str(tmp_path / "snapshot.npz")
+    monkeypatch.setattr(risk_crossing, "RiskCrossingDetector", lambda: RiskCrossingDetector(path))
+
+    ids = ["A", "B", "C", "D", "E"]
+    book = scores(list(zip(ids, [0.75, 0.8, 0.85, 0.9, 0.1])))
+    book['full_name'] = "Test Customer"
+    book['email_id'] = [f"{c.lower()}@example.com" for c in ids]
+    book['mobile_number'] = [f"{c}-phone" for c in ids]
+    # Every crossing is eligible (no demo top 3); D fails on both channels
+    report = RiskMonitor.run_campaign(incremental=True, durable=False, frequency_caps=False, scores=book,
+                                      channel_rates={"email": None, "sms": None})
+    assert report['crossings'] == 4 and report['crossings_pending'] == 1
+    assert sorted(r['customer_id'] for r in report['results'] if r['email_sent']) == ["A", "B", "C"]
+    assert list(RiskCrossingDetector(path).diff(book)['customer_id']) == ["D"]
+
+    # Below-threshold crossings are skipped on purpose; top_k leftovers stay pending
+    book['probability_of_default'] = [0.99, 0.98, 0.97, 0.96, 0.75]
+    report = RiskMonitor.run_campaign(threshold=0.8, top_k=1, incremental=True, durable=False, frequency_caps=False,
+                                      scores=book, channel_rates={"email": None, "sms": None})
+    assert report['crossings'] == 5 and report['crossings_pending'] == 3
+    assert list(RiskCrossingDetector(path).diff(book)['customer_id']) == ["B", "C", "D"]
@@ -0,0 +1,71 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.intervention_logic import RiskEngine
+from utils.risk_rules import get_risk_rules
+
+RULES = get_risk_rules().current()
+REASON_TEXTS = [rule.text for rule in RULES.reasons]
+
+def make_customers(n=3000, seed=11):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'probability_of_default': rng.uniform(0, 1, n),
+        'tenure_months': rng.integers(1, 120, n),
+        'salary_credit_delay_days': rng.integers(0, 10, n).astype(float),
+        'savings_balance_trend_percent': rng.uniform(-30, 20, n),
+        'utility_payment_delay_days': rng.integers(0, 10, n),
+        'credit_utilization_percent': rng.uniform(0, 100, n),
+        'failed_auto_debits_last_3m': rng.integers(0, 3, n)
+    })
+    # Edges and missing values
+    df.loc[:9, 'probability_of_default'] = [0.3, 0.7, 0.5, 0.0, 1.0, np.nan, 0.2999, 0.7001, 0.5001, np.nan]
+    df.loc[::9, 'salary_credit_delay_days'] = np.nan
+    df.loc[::10, 'savings_balance_trend_percent'] = -10
+    df.loc[::13, 'credit_utilization_percent'] = np.nan
+    return df
+
+def assert_parity(data, records):
+    categories = RiskEngine.get_risk_category_batch(data)
+    reasons = RiskEngine.decode_reasons(RiskEngine.get_risk_reasons_batch(data))
+    points = RiskEngine.get_stability_points_batch(data)
+    for i, customer in enumerate(records):
+        assert categories[i] == RiskEngine.get_risk_category(customer)
+        assert reasons[i] == RiskEngine.get_risk_reasons(customer)
+        expected = RiskEngine.get_stability_points(customer)
+        assert (np.isnan(points[i]) and np.isnan(expected)) or points[i] == expected
+
+def test_batch_matches_scalar_on_dataframe():
+    df = make_customers()
+    records = df.to_dict('records')
+    assert_parity(df, records)
+    # Quiet customers above PD 0.5 get only the fallback reason
+    masks = RiskEngine.get_risk_reasons_batch(df)
+    assert (masks[masks & RULES.fallback_bit != 0] == RULES.fallback_bit).all()
+    assert masks.max() < RULES.fallback_bit << 1
+
+def test_batch_matches_scalar_with_missing_columns_and_nan_tenure():
+    df = make_customers(500).drop(columns=['utility_payment_delay_days', 'tenure_months'])
+    assert_parity(df, df.to_dict('records'))
+    assert RiskEngine.get_stability_points_batch(df).dtype == np.int64
+
+    df = make_customers(500).astype({'tenure_months': float})
+    df.loc[::4, 'tenure_months'] = np.nan
+    assert_parity(df, df.to_dict('records'))
+
+    # Records missing keys behave like missing columns
+    df = pd.DataFrame({'probability_of_default': [0.1, 0.6, 0.9]})
+    assert_parity(df, [{'probability_of_default': v} for v in [0.1, 0.6, 0.9]])
+
+def test_batch_accepts_column_arrays():
+    columns = {'probability_of_default': np.array([0.2, 0.9]), 'failed_auto_debits_last_3m': [0, 2],
+               'tenure_months': np.array([24, 6])}
+    assert list(RiskEngine.get_risk_category_batch(columns)) == ["Low", "High"]
+    assert list(RiskEngine.get_stability_points_batch(columns)) == [500 + 800 + 240, 0]
+    assert RiskEngine.decode_reasons(RiskEngine.get_risk_reasons_batch(columns)) == [[], [REASON_TEXTS[4]]]
+    assert RiskEngine.decode_reasons(np.uint8(0b11111)) == REASON_TEXTS[:3]
@@ -0,0 +1,61 @@
+import sys
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.risk_rules import RiskRuleEngine, RULES_FILE, load_rules_file
+
+def write_rules(path, spec):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(spec, f)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))  # Distinct mtime even on coarse clocks
+
+def test_rules_evaluate_records_and_frames_alike(tmp_path):
+    path = str(tmp_path / "rules.json")
+    write_rules(path, load_rules_file(RULES_FILE))
+    rules = RiskRuleEngine(path).current()
+    df = pd.DataFrame({
+        'probability_of_default': [0.1, 0.3, 0.45, 0.71, np.nan, 0.9],
+        'salary_credit_delay_days': [0, 6, np.nan, 9, 7, 0],
+        'credit_utilization_percent': [90, 10, 10, 95, 10, 10],
+        'tenure_months': [10, 20, 30, 40, 50, 60]
+    })
+    records = df.to_dict('records')
+    assert list(rules.category_batch(df)) == [rules.category(r) for r in records]
+    assert [rules.decode_mask(m) for m in rules.reason_masks(df)] == [rules.reasons_for(r) for r in records]
+    assert list(rules.stability_points_batch(df)) == [rules.stability_points(r) for r in records]
+    assert rules.category_threshold("High") == 0.7
+
+def test_hot_reload_and_invalid_edit_keeps_rules(tmp_path):
+    path = str(tmp_path / "rules.json")
+    spec = load_rules_file(RULES_FILE)
+    write_rules(path, spec)
+    engine = RiskRuleEngine(path, check_interval_s=0)
+    customer = {'probability_of_default': 0.65}
+    assert engine.current().category(customer) == "Moderate"
+
+    spec['version'] = "tightened"
+    spec['categories']['levels'][0]['value'] = 0.6
+    write_rules(path, spec)
+    assert engine.current().version == "tightened" and engine.current().category(customer) == "High"
+
+    spec['categories']['levels'][0]['op'] = "~"
+    write_rules(path, spec)
+    assert engine.current().version == "tightened"  # Bad edit is rejected
+
+def test_timing_report_counts_every_rule(tmp_path):
+    path = str(tmp_path / "rules.json")
+    write_rules(path, load_rules_file(RULES_FILE))
+    engine = RiskRuleEngine(path)
+    rules = engine.current()
+    frame = {'probability_of_default': np.linspace(0, 1, 1000)}
+    rules.category_batch(frame)
+    rules.reason_masks(frame)
+    report = {row['rule']: row for row in engine.timing_report()}
+    assert set(report) == {rule.name for rule in rules.rules}
+    assert report['High']['rows'] == 1000 and report['High']['total_ms'] > 0
+    assert "ns/row" in engine.format_timing_report()
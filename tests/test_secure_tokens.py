@@ -0,0 +1,32 @@
+import sys
+import os
+import time
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.secure_tokens import TokenSigner, InvalidToken, ExpiredToken
+
+def test_round_trip_and_expiry():
+    signer = TokenSigner(secret=b"test-secret", ttl_s=60)
+    now = time.time()
+    token = signer.issue("CUST000042", snapshot_version="abc123", now=now)
+    assert "CUST000042" not in token  # Not guessable from the customer id alone
+    assert signer.verify(token, now=now + 59) == {"customer_id": "CUST000042", "expires_at": int(now + 60), "snapshot_version": "abc123"}
+    try:
+        signer.verify(token, now=now + 61)
+        assert False, "expected ExpiredToken"
+    except ExpiredToken:
+        pass
+
+def test_tampered_or_foreign_tokens_are_rejected():
+    signer = TokenSigner(secret=b"test-secret")
+    token = signer.issue("CUST000042")
+    payload, signature = token.split(".")
+    forged = TokenSigner(secret=b"other-secret").issue("CUST000043").split(".")[0] + "." + signature
+    for bad in (forged, TokenSigner(secret=b"other-secret").issue("CUST000042"), "CUST000042", payload + ".", ""):
+        try:
+            signer.verify(bad)
+            assert False, f"accepted {bad!r}"
+        except InvalidToken:
+            pass
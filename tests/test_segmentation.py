@@ -0,0 +1,110 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from utils.intervention_logic import RiskEngine
+from utils.risk_rules import get_risk_rules, RuleSet
+from utils.segmentation import Segmentation, get_segmentation, band_codes, OPS_LABELS
+
+RULES = get_risk_rules().current()
+
+def make_frame(n=5000, seed=5):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'probability_of_default': rng.uniform(0, 1, n)})
+    df.loc[:8, 'probability_of_default'] = [0.3, 0.7, 0.4, 0.85, 0.0, 1.0, np.nan, 0.3001, 0.8501]
+    return df
+
+def test_risk_band_matches_risk_engine():
+    df = make_frame()
+    seg = Segmentation(df, RULES)
+    expected = RiskEngine.get_risk_category_batch(df)
+    assert list(seg.labels('risk_band')) == list(expected)
+    assert seg.band_names('risk_band') == RULES.category_names
+
+def test_ops_segment_thresholds():
+    df = make_frame()
+    seg = Segmentation(df, RULES)
+    pd_values = df['probability_of_default']
+    expected = np.select([pd_values > 0.85, pd_values > 0.70, pd_values > 0.40],
+                         ["ESCALATION", "High Priority", "Follow-Up"], default="Low Monitor")
+    assert list(seg.labels('ops_segment')) == list(expected)
+    # NaN PD never crosses a threshold
+    assert seg.labels('ops_segment')[6] == "Low Monitor"
+    assert seg.labels('risk_band')[6] == RULES.otherwise
+
+def test_rows_and_counts_partition_the_frame():
+    df = make_frame()
+    seg = Segmentation(df, RULES)
+    codes = seg.codes('ops_segment')
+    total = 0
+    for code, label in enumerate(OPS_LABELS):
+        rows = seg.rows('ops_segment', label)
+        assert np.array_equal(rows, np.flatnonzero(codes == code))
+        assert seg.counts('ops_segment')[label] == len(rows)
+        total += len(rows)
+    assert total == len(df)
+
+    stressed = seg.rows('risk_band', 'Moderate', 'High')
+    assert np.array_equal(stressed, np.flatnonzero(df['probability_of_default'].to_numpy() > 0.3))
+    assert np.array_equal(seg.rows('risk_band'), np.arange(len(df)))
+
+def test_band_codes_right_edge():
+    assert list(band_codes([0.1, 0.3, 0.31, 0.7, 0.71, np.nan], (0.3, 0.7))) == [0, 0, 1, 1, 2, 0]
+    assert list(band_codes([0.3, 0.7], (0.3, 0.7), right=False)) == [1, 2]
+
+def test_non_threshold_levels_fall_back_to_rules():
+    spec = {
+        "version": "mixed",
+        "categories": {
+            "levels": [
+                {"name": "High", "field": "probability_of_default", "op": ">", "value": 0.7},
+                {"name": "Moderate", "field": "credit_utilization_percent", "op": ">", "value": 80}
+            ],
+            "otherwise": "Low"
+        },
+        "stability": {"eligible": {"name": "eligible", "field": "probability_of_default", "op": "<", "value": 0.3}}
+    }
+    rules = RuleSet(spec)
+    df = pd.DataFrame({'probability_of_default': [0.9, 0.5, 0.1], 'credit_utilization_percent': [10, 95, 10]})
+    seg = Segmentation(df, rules)
+    assert list(seg.labels('risk_band')) == ["High", "Moderate", "Low"]
+
+def test_get_segmentation_cached_per_frame():
+    df = make_frame(200)
+    seg = get_segmentation(df)
+    assert get_segmentation(df) is seg
+    # The (shared) frame is not modified; labels come from the segmentation
+    assert 'risk_band' not in df.columns
+    bands = seg.categorical('risk_band')
+    assert list(bands.astype(str)) == list(seg.labels('risk_band'))
+    assert list(bands.categories) == list(RULES.category_names) and bands.ordered
+
+    other = make_frame(200, seed=6)
+    assert get_segmentation(other) is not seg
+
+def test_get_segmentation_rebuilt_on_reload_with_same_version(tmp_path, monkeypatch):
+    import json
+    from utils import segmentation
+    from utils.risk_rules import RiskRuleEngine, RULES_FILE
+    with open(RULES_FILE, encoding='utf-8') as f:
+        spec = json.load(f)
+    path = tmp_path / "risk_rules.json"
+    path.write_text(json.dumps(spec))
+    engine = RiskRuleEngine(str(path), check_interval_s=0)
+    monkeypatch.setattr(segmentation, 'get_risk_rules', lambda: engine)
+
+    df = make_frame(200)
+    seg = get_segmentation(df)
+    assert get_segmentation(df) is seg
+    # Threshold edit without a version bump
+    spec['categories']['levels'][0]['value'] = 0.95
+    path.write_text(json.dumps(spec))
+    os.utime(path, ns=(1, 1))
+    reloaded = get_segmentation(df)
+    assert reloaded is not seg and engine.current().version == seg.rules_version
+    assert reloaded.counts()['High'] < seg.counts()['High']
+    assert list(reloaded.labels('risk_band')) == list(engine.current().category_batch(df))
@@ -0,0 +1,92 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import cross_validate
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+# Add src/models to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models')))
+
+from train_scheduler import TrainScheduler, plan_threads, set_estimator_threads
+
+def make_models():
+    return {
+        'Logistic Regression': Pipeline([('scaler', StandardScaler()), ('clf', LogisticRegression(max_iter=500, random_state=0))]),
+        'Random Forest': RandomForestClassifier(n_estimators=10, random_state=0, n_jobs=-1)
+    }
+
+def test_plan_threads_stays_within_budget():
+    assert plan_threads(15, 32) == (15, 2)
+    assert plan_threads(3, 32) == (3, 10)
+    assert plan_threads(40, 32) == (32, 1)
+    assert plan_threads(10, 32, max_workers=4) == (4, 8)
+    assert plan_threads(5, 1) == (1, 1)
+    for jobs in range(1, 50):
+        workers, threads = plan_threads(jobs, 32)
+        assert workers * threads <= 32
+
+def test_set_estimator_threads_reaches_nested_params():
+    models = make_models()
+    set_estimator_threads(models['Random Forest'], 4)
+    set_estimator_threads(models['Logistic Regression'], 4)
+    assert models['Random Forest'].n_jobs == 4
+    # Unset scikit-learn n_jobs already means one job
+    assert models['Logistic Regression'].get_params()['clf__n_jobs'] is None
+
+    pipeline = Pipeline([('scaler', StandardScaler()), ('rf', RandomForestClassifier(n_jobs=-1))])
+    set_estimator_threads(pipeline, 3)
+    assert pipeline.get_params()['rf__n_jobs'] == 3
+
+    from xgboost import XGBClassifier
+    assert set_estimator_threads(XGBClassifier(), 2).n_jobs == 2
+
+def test_cross_validate_matches_sklearn_and_logs_jobs():
+    X, y = make_classification(n_samples=300, n_features=6, n_informative=4, n_classes=3, random_state=3)
+    X = pd.DataFrame(X, columns=[f"f{i}" for i in range(6)])
+    scoring = {'accuracy': 'accuracy', 'f1_macro': 'f1_macro'}
+    scheduler = TrainScheduler(total_threads=2)
+    results = scheduler.cross_validate(make_models(), X, y, cv=3, scoring=scoring)
+    for name, model in make_models().items():
+        expected = cross_validate(model, X, y, cv=3, scoring=scoring)
+        np.testing.assert_allclose(results[name]['test_accuracy'], expected['test_accuracy'])
+        np.testing.assert_allclose(results[name]['test_f1_macro'], expected['test_f1_macro'])
+
+    report = scheduler.report()
+    assert len(report) == 6
+    assert (report['threads'] == 1).all()
+    assert (report['wall_s'] > 0).all()
+    assert {'cpu_s', 'cpu_utilization', 'pid'} <= set(report.columns)
+    assert "Random Forest" in scheduler.format_report()
+
+def test_fit_all_returns_fitted_models():
+    X, y = make_classification(n_samples=200, n_features=5, random_state=4)
+    fitted = TrainScheduler(total_threads=1).fit_all(make_models(), X, y)
+    assert set(fitted) == set(make_models())
+    assert fitted['Random Forest'].n_jobs == 1
+    assert fitted['Logistic Regression'].predict(X).shape == (200,)
+
+def test_local_jobs_share_the_budget_and_folds():
+    X, y = make_classification(n_samples=300, n_features=6, n_informative=4, n_classes=3, random_state=3)
+    X = pd.DataFrame(X, columns=[f"f{i}" for i in range(6)])
+    seen = {}
+
+    def local_cv(folds, threads):
+        seen['folds'], seen['threads'] = folds, threads
+        return {'test_accuracy': np.zeros(len(folds))}
+
+    for total_threads in (1, 3):
+        scheduler = TrainScheduler(total_threads=total_threads)
+        results = scheduler.cross_validate(make_models(), X, y, cv=3, scoring={'accuracy': 'accuracy'},
+                                           local={'Local': local_cv})
+        assert set(results) == {'Logistic Regression', 'Random Forest', 'Local'}
+        assert len(seen['folds']) == 3 and seen['threads'] == 1
+        fitted = scheduler.fit_all(make_models(), X, y, local={'Local': lambda threads: ('fitted', threads)})
+        assert fitted['Local'] == ('fitted', 1)
+        report = scheduler.report()
+        assert list(report.loc[report['model'] == 'Local', 'fold']) == ['cv', None]
+        assert "Local                  cv" in scheduler.format_report()
@@ -0,0 +1,105 @@
+import sys
+import os
+import subprocess
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+# Add src/models to path
+MODELS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models'))
+sys.path.append(MODELS_DIR)
+
+from preprocessing import encode_categoricals, OrdinalCategories
+from ensembles import BaseModelCache, PrefitVoting
+from xgb_training import HistXGBClassifier
+from lgbm_training import HistLGBMClassifier
+from tree_compiler import TreeScorer, compile_forest, compile_xgboost, compile_lightgbm
+import model_registry
+from model_registry import save_model, load_model
+
+def make_data(n=2000, n_classes=3, seed=0):
+    # Missing values, exact zeros and a categorical column exercise every split rule
+    rng = np.random.default_rng(seed)
+    levels = np.array([f"branch_{i}" for i in range(12)])
+    branch = rng.integers(0, len(levels), n)
+    X = pd.DataFrame({'income': rng.normal(size=n), 'balance': np.where(rng.random(n) < 0.3, 0.0, rng.normal(size=n)),
+                      'tenure': rng.integers(0, 60, n).astype(float), 'branch': levels[branch]})
+    X.loc[rng.random(n) < 0.05, 'income'] = np.nan
+    logit = X['income'].fillna(0) - X['balance'] + np.linspace(-1, 1, len(levels))[branch] + rng.normal(scale=0.5, size=n)
+    y = np.digitize(logit, np.quantile(logit, np.linspace(0, 1, n_classes + 1)[1:-1]))
+    return encode_categoricals(X, ['branch'], native_categoricals=True), y
+
+def ordinal_pipeline(clf):
+    return Pipeline([('ordinal', OrdinalCategories()), ('clf', clf)])
+
+def with_unseen_level(X):
+    X = X.copy()
+    X['branch'] = X['branch'].cat.add_categories(['branch_new'])
+    X.loc[X.index[:25], 'branch'] = 'branch_new'
+    return X
+
+@pytest.mark.parametrize('n_classes', [2, 3])
+def test_compiled_trees_match_library_predictions(n_classes):
+    X, y = make_data(n_classes=n_classes, seed=n_classes)
+    ordinal = OrdinalCategories().fit(X)
+    X_score = with_unseen_level(X)
+    Xo = ordinal.transform(X_score).to_numpy(dtype=float)
+
+    rf = RandomForestClassifier(n_estimators=20, random_state=0).fit(ordinal.transform(X), y)
+    np.testing.assert_allclose(TreeScorer(*compile_forest(rf)).predict_proba(Xo), rf.predict_proba(Xo), atol=1e-12)
+
+    xgb_model = HistXGBClassifier(max_depth=4).fit(ordinal.transform(X), y)
+    booster = xgb_model.get_booster()[:xgb_model.best_iteration + 1]
+    np.testing.assert_allclose(TreeScorer(*compile_xgboost(booster)).predict_proba(Xo),
+                               xgb_model.predict_proba(Xo), rtol=1e-5, atol=1e-6)
+
+    lgbm = HistLGBMClassifier(num_leaves=15, min_data_per_group=10).fit(X, y)
+    arrays, meta = compile_lightgbm(lgbm.booster_, num_iteration=lgbm.best_iteration_ or None)
+    assert 'cat_table' in arrays
+    X_codes = X_score.copy()
+    X_codes['branch'] = pd.Index(meta['categories']['branch']).get_indexer(X_score['branch'].astype(str))
+    np.testing.assert_allclose(TreeScorer(arrays, meta).predict_proba(X_codes.to_numpy(dtype=float)),
+                               lgbm.predict_proba(X_score), atol=1e-12)
+
+def test_unsupported_boosters_fall_back_to_the_library(tmp_path):
+    X, y = make_data(n=500)
+    Xo = OrdinalCategories().fit_transform(X)
+    dart = xgb.XGBClassifier(booster='dart', n_estimators=5, max_depth=2).fit(Xo, y)
+    assert compile_xgboost(dart.get_booster()) is None
+    path = save_model(dart, name='dart', registry_dir=str(tmp_path))
+    loaded = load_model('dart', registry_dir=str(tmp_path))
+    assert loaded.manifest['estimators'][0]['model']['trees'] is None
+    np.testing.assert_allclose(loaded.predict_proba(Xo), dart.predict_proba(Xo), rtol=1e-5, atol=1e-6)
+    assert os.path.exists(os.path.join(path, 'model.ubj'))
+
+def test_registry_scores_without_model_libraries(tmp_path, monkeypatch):
+    X, y = make_data(n=800)
+    estimators = [
+        ('rf', ordinal_pipeline(RandomForestClassifier(n_estimators=5, random_state=0))),
+        ('xgb', ordinal_pipeline(HistXGBClassifier(max_depth=3))),
+        ('lgbm', HistLGBMClassifier(num_leaves=8))
+    ]
+    model = PrefitVoting(BaseModelCache(estimators, cv=2).fit(X, y).fitted(), weights=[1, 2, 1])
+    save_model(model, registry_dir=str(tmp_path))
+    X_score = with_unseen_level(X).head(300)
+    expected = model.predict_proba(X_score)
+    # Batches from NATIVE_MIN_ROWS (forests: FOREST_NATIVE_MIN_ROWS) use the libraries' own
+    # predictors; below it, compiled trees
+    for native_min_rows in (1, len(X_score) + 1):
+        monkeypatch.setattr(model_registry, 'NATIVE_MIN_ROWS', native_min_rows)
+        monkeypatch.setattr(model_registry, 'FOREST_NATIVE_MIN_ROWS', native_min_rows)
+        loaded = load_model(registry_dir=str(tmp_path))
+        np.testing.assert_allclose(loaded.predict_proba(X_score), expected, rtol=1e-5, atol=1e-6)
+        assert bool(loaded.named_estimators_['rf']._native) == (native_min_rows == 1)
+
+    # A fresh interpreter scores a single row with neither sklearn nor the boosting libraries
+    X_score.head(1).to_pickle(str(tmp_path / 'row.pkl'))
+    script = (f"import sys, pandas as pd; sys.path.insert(0, {MODELS_DIR!r})\n"
+              f"from model_registry import load_model\n"
+              f"load_model(registry_dir={str(tmp_path)!r}).predict_proba(pd.read_pickle({str(tmp_path / 'row.pkl')!r}))\n"
+              f"print(sorted(m for m in ('sklearn', 'xgboost', 'lightgbm') if m in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == '[]'
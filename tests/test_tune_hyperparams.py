@@ -0,0 +1,110 @@
+import sys
+import os
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+# Add src/models and src/models/train to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models', 'train')))
+
+import preprocessing
+from tune_hyperparams import SEARCH_SPACES, base_estimators, tune_all, write_params, load_params, list_versions
+from train_ensemble import make_base_estimators
+
+def make_data(n=900, seed=0):
+    X, y = make_classification(n_samples=n, n_features=8, n_informative=5, n_classes=3, random_state=seed)
+    return pd.DataFrame(X, columns=[f"f{i}" for i in range(8)]), y
+
+def test_search_spaces_cover_every_learner():
+    names = [name for name, _, _ in base_estimators()]
+    assert names == ['lr', 'rf', 'xgb', 'lgbm']
+    for name, estimator, step in base_estimators():
+        target = estimator.named_steps[step] if step else estimator
+        assert set(SEARCH_SPACES[name]) <= set(target.get_params())
+
+def test_tuned_pipelines_match_the_trained_ones():
+    # A tuned C only transfers if the LR sees the same (scaled) inputs it was tuned on
+    trained = dict(make_base_estimators())
+    for name, estimator, _ in base_estimators():
+        if hasattr(estimator, 'steps'):
+            assert [step for step, _ in estimator.steps] == [step for step, _ in trained[name].steps]
+
+def test_halving_prunes_candidates_and_writes_versions(tmp_path):
+    X, y = make_data()
+    results = tune_all(X, y, names=['rf'], n_candidates=9, cv=2, total_threads=1, min_resources=100)
+    rounds = results['rf']['candidates_per_round']
+    assert rounds[0] == 9 and rounds[-1] < rounds[0]
+    assert results['rf']['rows_per_round'][0] == 100
+    assert 0.5 < results['rf']['cv_score'] <= 1.0
+
+    params_dir = str(tmp_path)
+    assert load_params(params_dir=params_dir) == {}
+    first = write_params(results, fingerprint='abc', params_dir=params_dir)
+    second = write_params({'rf': {'params': {'n_estimators': 123}, 'cv_score': 0.5}}, params_dir=params_dir)
+    assert sorted(list_versions(params_dir)) == [1, 2]
+    with open(first, encoding='utf-8') as f:
+        doc = json.load(f)
+    assert doc['version'] == 1 and doc['dataset'] == 'abc'
+
+    # Latest version by default, earlier ones on request; params construct the estimator as-is
+    assert load_params(params_dir=params_dir) == {'rf': {'n_estimators': 123}}
+    tuned = load_params(version=1, params_dir=params_dir)['rf']
+    assert tuned == results['rf']['params']
+    RandomForestClassifier(**tuned).fit(X, y)
+    with pytest.raises(FileNotFoundError):
+        load_params(version=7, params_dir=params_dir)
+
+def test_dataset_cache_reused_until_sources_change(tmp_path, monkeypatch):
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    pd.DataFrame({'customer_id': ['c1', 'c2', 'c3'], 'segment': ['A', 'B', None], 'age': [30, 40, np.nan]}) \
+        .to_csv(data_dir / 'CUSTOMER_MASTER.csv', index=False)
+    pd.DataFrame({'customer_id': ['c1', 'c2', 'c3'], 'risk_band': ['Low', 'High', 'Moderate'], 'utilization': [0.1, 0.9, 0.5]}) \
+        .to_csv(data_dir / 'FEATURE_STORE.csv', index=False)
+    pd.DataFrame({'customer_id': ['c1', 'c1'], 'amount_inr': [100.0, 50.0], 'balance_after_transaction': [900.0, 850.0]}) \
+        .to_csv(data_dir / 'TRANSACTIONS.csv', index=False)
+
+    # data_dir reaches the loader: nothing points data_loader.DATA_DIR at the temp sources
+    calls = []
+    original = preprocessing.create_dataset
+    monkeypatch.setattr(preprocessing, 'create_dataset', lambda native=False, features=None, data_dir=None:
+                        calls.append(native) or original(native, features, data_dir))
+    cache_dir = str(tmp_path / 'cache')
+    first = preprocessing.load_dataset(True, cache_dir=cache_dir, data_dir=str(data_dir))
+    second = preprocessing.load_dataset(True, cache_dir=cache_dir, data_dir=str(data_dir))
+    assert calls == [True]
+    pd.testing.assert_frame_equal(first, second)
+    assert isinstance(second['segment'].dtype, pd.CategoricalDtype)
+    assert second['txn_amount_inr_count'].tolist() == [2.0, 0.0, 0.0]
+
+    # Encoding mode and source changes get their own cache entries
+    preprocessing.load_dataset(False, cache_dir=cache_dir, data_dir=str(data_dir))
+    os.utime(data_dir / 'TRANSACTIONS.csv', ns=(0, 0))
+    preprocessing.load_dataset(True, cache_dir=cache_dir, data_dir=str(data_dir))
+    assert calls == [True, False, True]
+
+    # So does a preprocessing schema bump
+    monkeypatch.setattr(preprocessing, 'DATASET_SCHEMA_VERSION', preprocessing.DATASET_SCHEMA_VERSION + 1)
+    preprocessing.load_dataset(True, cache_dir=cache_dir, data_dir=str(data_dir))
+    assert calls == [True, False, True, True]
+
+def test_xgb_tuned_on_one_quantile_cache():
+    X, y = make_data()
+    results = tune_all(X, y, names=['xgb'], n_candidates=9, cv=2, total_threads=1, min_resources=100)
+    assert results['xgb']['candidates_per_round'] == [9, 3, 1]
+    assert results['xgb']['rows_per_round'][0] == 100
+    # Keys come back without the pipeline prefix, ready for HistXGBClassifier(**params)
+    assert set(results['xgb']['params']) == set(SEARCH_SPACES['xgb'])
+    assert 0.5 < results['xgb']['cv_score'] <= 1.0
+
+def test_load_params_warns_on_dataset_mismatch(tmp_path, capsys):
+    params_dir = str(tmp_path)
+    write_params({'rf': {'params': {'n_estimators': 50}, 'cv_score': 0.5}}, fingerprint='abc', params_dir=params_dir)
+    assert load_params(params_dir=params_dir, fingerprint='abc') == {'rf': {'n_estimators': 50}}
+    assert 'Warning' not in capsys.readouterr().out
+    assert load_params(params_dir=params_dir, fingerprint='def') == {'rf': {'n_estimators': 50}}
+    assert 'tuned on dataset abc' in capsys.readouterr().out
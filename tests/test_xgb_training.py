@@ -0,0 +1,85 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.base import clone
+from sklearn.datasets import make_classification
+
+# Add src/models to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'models')))
+
+from xgb_training import QuantileCache, HalvingSearch, train_booster, booster_to_classifier, fit_xgb, cross_validate_xgb, HistXGBClassifier
+
+def make_data(n=1500, n_classes=3, seed=0):
+    X, y = make_classification(n_samples=n, n_features=12, n_informative=6, n_classes=n_classes, random_state=seed)
+    return pd.DataFrame(X, columns=[f"f{i}" for i in range(12)]), y
+
+def test_fold_matrices_built_once_and_reused_across_trials():
+    X, y = make_data()
+    cache = QuantileCache(X, y)
+    first = cross_validate_xgb(cache, cv=3)
+    builds = cache.builds
+    # Reference + (train, valid) per fold
+    assert builds == 1 + 2 * 3
+    second = cross_validate_xgb(cache, {'max_depth': 3}, cv=3)
+    assert cache.builds == builds
+    assert first['test_roc_auc_ovr'].shape == second['test_roc_auc_ovr'].shape == (3,)
+    assert (first['test_roc_auc_ovr'] > 0.8).all()
+
+def test_early_stopping_truncates_booster():
+    X, y = make_data()
+    cache = QuantileCache(X, y)
+    train_idx, valid_idx = cache.holdout()
+    booster = train_booster(cache, train_idx, valid_idx, {'learning_rate': 0.5}, num_boost_round=500, early_stopping_rounds=5)
+    assert booster.num_boosted_rounds() < 500
+
+def test_classifier_wraps_booster():
+    for n_classes in (2, 3):
+        X, y = make_data(n_classes=n_classes, seed=n_classes)
+        cache = QuantileCache(X, y)
+        train_idx, valid_idx = cache.holdout()
+        booster = train_booster(cache, train_idx, valid_idx)
+        clf = booster_to_classifier(booster)
+        assert list(clf.classes_) == list(range(n_classes))
+        expected = booster.predict(xgb.DMatrix(X))
+        if n_classes == 2:
+            expected = np.column_stack([1 - expected, expected])
+        np.testing.assert_allclose(clf.predict_proba(X), expected, rtol=1e-5, atol=1e-6)
+        assert clf.feature_importances_.shape == (12,)
+
+        fitted = fit_xgb(X, y, cache=cache)
+        assert fitted.predict(X).shape == (len(y),)
+
+def test_hist_classifier_clones_and_early_stops():
+    X, y = make_data()
+    model = clone(HistXGBClassifier(valid_fraction=0.2, learning_rate=0.5))
+    assert model.get_params()['valid_fraction'] == 0.2
+    assert model.get_params()['tree_method'] == 'hist'
+    model.fit(X, y)
+    assert model.best_iteration < model.n_estimators
+    assert model.predict_proba(X).shape == (len(y), 3)
+
+def test_holdout_fit_sketches_training_rows_only():
+    X, y = make_data()
+    cache = QuantileCache(X, y)
+    train_idx, valid_idx = cache.holdout()
+    sketched = QuantileCache(X, y, sketch_idx=train_idx)
+    booster = train_booster(sketched, train_idx, valid_idx)
+    # The training matrix is the reference: two matrices instead of three
+    assert sketched.builds == 2
+    assert booster.num_boosted_rounds() > 0
+
+def test_halving_search_shares_fold_matrices_across_candidates():
+    X, y = make_data(n=2000)
+    cache = QuantileCache(X, y)
+    space = {'max_depth': [2, 3, 4], 'learning_rate': [0.1, 0.3, 0.5]}
+    search = HalvingSearch(space, n_candidates=9, factor=3, min_resources=200, cv=2).fit(cache)
+    assert search.n_candidates_ == [9, 3, 1] and search.n_resources_ == [200, 600, 1800]
+    # Reference + (train, valid) per fold per round, whatever the number of candidates
+    assert cache.builds == 1 + 3 * 2 * 2
+    assert set(search.best_params_) == set(space) and 0.5 < search.best_score_ <= 1.0
+
+    folds = cache.folds(3)
+    np.testing.assert_allclose(cross_validate_xgb(cache, cv=folds)['test_roc_auc_ovr'],
+                               cross_validate_xgb(cache, cv=3)['test_roc_auc_ovr'])